@@ -10,12 +10,18 @@ rejected by ERPNext so the two can coexist.
 
 Jobs reuse the biometric_sync cache format (biometric_sync:{job_id}) so the
 page polls them through the existing get_sync_job_status + pollJobStatus().
+
+Punches and OT are imported in bulk: MongoDB is read in keyset pages over its
+time field (projection only, one indexed range query per page), existing
+checkins / OT rows for the window are pre-loaded into sets, checkins are
+written with bulk_insert and committed per batch.
 """
 
 import json
+import re
 import time
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import frappe
 from customize_erpnext.api.biometric_auth import check_biometric_access
@@ -23,6 +29,9 @@ from customize_erpnext.api.biometric_auth import check_biometric_access
 MONGO_TIMEOUT_MS = 10000
 CONNECT_RETRIES = 3          # device may be briefly locked by the auto sync service
 CONNECT_RETRY_DELAY_S = 5
+MONGO_PAGE_SIZE = 5000       # documents per keyset page
+INSERT_BATCH_SIZE = 500      # checkins per bulk_insert + commit
+OT_COMMIT_EVERY = 50         # Overtime Registrations per commit
 
 
 # ---------------------------------------------------------------------------
@@ -70,44 +79,131 @@ def _parse_date(value, param):
         frappe.throw(f"Invalid {param}: {value} (expected YYYY-MM-DD)")
 
 
-def _add_checkin(employee_field_value, timestamp, device_id):
-    """Insert one Employee Checkin via the hrms function the tool used over REST.
-
-    Returns (status, message): processed | skipped (duplicate) |
-    skipped_no_employee | error. Commits on success, rolls back on failure so
-    each punch behaves like the tool's one-REST-call-per-punch transactions.
+def _load_device_employees():
+    """{attendance_device_id: (employee, employee_name, status)} — one query.
 
-    IMPORTANT: hrms validate_duplicate_log matches employee+time+log_type, and
-    log_type is assigned by overrides AFTER that check — re-inserting an old
-    punch can get a different log_type and slip past it (verified in prod).
-    So we check employee+time ourselves first to make re-sync truly idempotent.
+    Same lookup hrms add_log_based_on_employee_field did per punch (first match wins).
     """
-    from hrms.hr.doctype.employee_checkin.employee_checkin import add_log_based_on_employee_field
-
-    employee = frappe.db.get_value(
-        "Employee", {"attendance_device_id": str(employee_field_value)}, "name")
-    if not employee:
-        return "skipped_no_employee", f"No Employee for attendance_device_id {employee_field_value}"
-    if frappe.db.exists("Employee Checkin", {"employee": employee, "time": timestamp}):
-        return "skipped", None
+    device_map = {}
+    for row in frappe.db.sql(
+        """SELECT `name`, `employee_name`, `status`, `attendance_device_id` FROM `tabEmployee`
+        WHERE IFNULL(`attendance_device_id`, '') != '' ORDER BY `name`""",
+        as_dict=True,
+    ):
+        device_map.setdefault(str(row.attendance_device_id), (row.name, row.employee_name, row.status))
+    return device_map
+
+
+def _import_checkins(punches, cache_key, phase_label, progress_range=(0, 100)):
+    """Insert Employee Checkins for (attendance_device_id, timestamp, device_id) punches.
+
+    Returns counts {processed, skipped, skipped_no_employee, error}.
+
+    Duplicates are matched on employee+time against the checkins already in the
+    window (one query), not left to hrms validate_duplicate_log: that matches
+    employee+time+log_type, and log_type is assigned by overrides AFTER the check
+    — re-inserting an old punch can get a different log_type and slip past it
+    (verified in prod).
+
+    New checkins are written with bulk_insert in INSERT_BATCH_SIZE batches; shift
+    and log_type are then assigned for the touched employees / dates in one
+    bulk_update_employee_checkin pass (what the per-insert hook did one punch
+    at a time), and the attendance recalc hook is replayed per employee-day.
+    """
+    from customize_erpnext.overrides.employee_checkin.employee_checkin import (
+        _checkin_recalc_enabled,
+        _recalculate_attendance,
+        bulk_update_employee_checkin,
+    )
 
-    try:
-        add_log_based_on_employee_field(
-            employee_field_value=str(employee_field_value),
-            timestamp=timestamp,
-            device_id=device_id,
-            log_type=None,
+    counts = {"processed": 0, "skipped": 0, "skipped_no_employee": 0, "error": 0}
+    punches = [(str(att_id), ts.replace(tzinfo=None), device) for att_id, ts, device in punches if att_id and ts]
+    if not punches:
+        return counts
+
+    device_map = _load_device_employees()
+    start = min(ts for _a, ts, _d in punches)
+    end = max(ts for _a, ts, _d in punches)
+    existing = {
+        (row[0], row[1]) for row in frappe.db.sql(
+            "SELECT `employee`, `time` FROM `tabEmployee Checkin` WHERE `time` BETWEEN %s AND %s",
+            (start, end),
         )
+    }
+
+    rows, touched = [], set()
+    for att_id, ts, device in punches:
+        employee = device_map.get(att_id)
+        if not employee or employee[2] == "Inactive":
+            counts["skipped_no_employee"] += 1
+            continue
+        if (employee[0], ts) in existing:
+            counts["skipped"] += 1
+            continue
+        existing.add((employee[0], ts))
+        rows.append((employee[0], employee[1], ts, device))
+        touched.add((employee[0], ts.date()))
+
+    user, lo, hi = frappe.session.user, progress_range[0], progress_range[1]
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        batch = rows[i:i + INSERT_BATCH_SIZE]
+        now = datetime.now()
+        try:
+            frappe.db.bulk_insert(
+                "Employee Checkin",
+                ["name", "employee", "employee_name", "time", "device_id", "skip_auto_attendance",
+                 "docstatus", "creation", "modified", "owner", "modified_by"],
+                [(frappe.generate_hash(length=10), emp, emp_name, ts, device, 0, 0, now, now, user, user)
+                 for emp, emp_name, ts, device in batch],
+            )
+            frappe.db.commit()
+            counts["processed"] += len(batch)
+        except Exception as e:
+            frappe.db.rollback()
+            counts["error"] += len(batch)
+            touched.difference_update((emp, ts.date()) for emp, _n, ts, _d in batch)
+            _append_result(cache_key, False, "-", phase_label,
+                           f"Batch {batch[0][2]}..{batch[-1][2]} failed: {e}")
+        done = min(i + INSERT_BATCH_SIZE, len(rows))
+        _update_cache(cache_key, {
+            "progress_pct": int(lo + (hi - lo) * done / max(len(rows), 1)),
+            "phase": f"{phase_label}: inserted {done}/{len(rows)} new checkins...",
+        })
+
+    if touched:
+        employees = sorted({emp for emp, _d in touched})
+        dates = sorted(d for _e, d in touched)
+        _update_cache(cache_key, {"phase": f"{phase_label}: assigning shift / log type..."})
+        bulk_update_employee_checkin(str(dates[0]), str(dates[-1]), employees=employees)
         frappe.db.commit()
-        return "processed", None
-    except Exception as e:
-        frappe.db.rollback()
-        msg = str(e)
-        if "already has a log with the same timestamp" in msg:
-            return "skipped", None
-        if "No Employee found" in msg or "Inactive Employee" in msg:
-            return "skipped_no_employee", msg
-        return "error", msg
+        if _checkin_recalc_enabled():
+            for emp, day in sorted(touched):
+                _recalculate_attendance(emp, day)
+    return counts
+
+
+def _iter_mongo_pages(collection, query, projection, time_field, page_size=MONGO_PAGE_SIZE):
+    """Yield lists of documents ordered by (time_field, _id), one keyset page at a time.
+
+    Each page is a fresh range query (no long-lived cursor to time out while the
+    previous page is being written), served by the time-field index.
+    """
+    projection = dict(projection, **{time_field: 1, "_id": 1})
+    last = None
+    while True:
+        page_query = dict(query)
+        if last is not None:
+            page_query["$or"] = [
+                {time_field: {"$gt": last[0]}},
+                {time_field: last[0], "_id": {"$gt": last[1]}},
+            ]
+        page = list(collection.find(page_query, projection).sort([(time_field, 1), ("_id", 1)]).limit(page_size))
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last = (page[-1][time_field], page[-1]["_id"])
 
 
 # ---------------------------------------------------------------------------
@@ -198,19 +294,13 @@ def _run_device_resync_job(machine_names, from_date, to_date, cache_key):
             _append_result(cache_key, True, "-", machine_name,
                            f"Fetched {len(attendances)} logs, {len(in_range)} in range {from_date}..{to_date}")
 
-            for i, att in enumerate(in_range):
-                status, msg = _add_checkin(att.user_id, att.timestamp, machine_name)
-                counts[status] += 1
-                if status == "error":
-                    _append_result(cache_key, False, str(att.user_id), machine_name,
-                                   f"{att.timestamp}: {msg}")
-                if i % 50 == 0:
-                    machine_pct = int(i / max(len(in_range), 1) * 100)
-                    overall = int((done_machines + i / max(len(in_range), 1)) / len(machine_names) * 100)
-                    _update_cache(cache_key, {
-                        "phase": f"{machine_name}: {i}/{len(in_range)} punches ({machine_pct}%)",
-                        "progress_pct": overall,
-                    })
+            lo = int(done_machines / len(machine_names) * 100)
+            hi = int((done_machines + 1) / len(machine_names) * 100)
+            for key, value in _import_checkins(
+                [(att.user_id, att.timestamp, machine_name) for att in in_range],
+                cache_key, machine_name, progress_range=(lo, hi),
+            ).items():
+                counts[key] += value
 
             done_machines += 1
             _append_result(cache_key, True, "-", machine_name,
@@ -290,28 +380,19 @@ def _run_mongodb_resync_job(from_date, to_date, cache_key):
         if int(frappe.conf.get("biometric_sync_only_machine0", 1)):
             query["machineNo"] = 0
 
-        records = list(collection.find(query, {"attFingerId": 1, "timestamp": 1, "machineNo": 1}))
+        punches = []
+        for page in _iter_mongo_pages(collection, query, {"attFingerId": 1, "machineNo": 1}, "timestamp"):
+            punches.extend(
+                (rec.get("attFingerId"), rec.get("timestamp"), _map_machine_no(rec.get("machineNo", 0)))
+                for rec in page
+            )
+            _update_cache(cache_key, {"phase": f"Reading MongoDB: {len(punches)} records..."})
         client.close()
-        total = len(records)
+        total = len(punches)
         _update_cache(cache_key, {"total_count": total, "phase": f"Processing {total} records..."})
 
-        counts = {"processed": 0, "skipped": 0, "skipped_no_employee": 0, "error": 0}
-        for i, rec in enumerate(records):
-            att_id = rec.get("attFingerId")
-            ts = rec.get("timestamp")
-            if not att_id or not ts:
-                counts["skipped"] += 1
-                continue
-            status, msg = _add_checkin(att_id, ts, _map_machine_no(rec.get("machineNo", 0)))
-            counts[status] += 1
-            if status == "error":
-                _append_result(cache_key, False, str(att_id), "MongoDB", f"{ts}: {msg}")
-            if i % 50 == 0:
-                _update_cache(cache_key, {
-                    "done_count": i,
-                    "progress_pct": int(i / max(total, 1) * 100),
-                    "phase": f"Processing {i}/{total} records...",
-                })
+        counts = _import_checkins(punches, cache_key, "MongoDB")
+        counts["skipped"] += sum(1 for att_id, ts, _d in punches if not att_id or not ts)
 
         _update_cache(cache_key, {
             "status": "done",
@@ -363,14 +444,41 @@ def _normalize_time(value, default):
     return value + ":00" if len(value) == 5 else value
 
 
-def _employee_has_ot(emp_id, ot_date, begin_time, end_time):
-    """Same conflict rule as the CLI tool: identical employee/date/begin/end."""
-    existing = frappe.get_all(
-        "Overtime Registration Detail",
-        filters={"employee": emp_id, "date": ot_date},
-        fields=["begin_time", "end_time"],
-    )
-    return any(str(row.begin_time) == begin_time and str(row.end_time) == end_time for row in existing)
+def _time_key(value):
+    """HH:MM:SS for a Time value read from the DB (timedelta) or the tool ("7:00:00")."""
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    parts = str(value).split(":")
+    return ":".join(p.zfill(2) for p in (parts + ["00", "00"])[:3])
+
+
+def _load_existing_ot(from_date, to_date=None):
+    """Pre-load what the conflict rules need for the window, in two queries.
+
+    Returns (request_numbers, ot_keys): request numbers already imported (from
+    reason_general) and {(employee, date, begin, end)} — the CLI tool's rule that
+    an identical employee/date/begin/end row is not imported twice.
+    """
+    request_numbers = set()
+    for (reason,) in frappe.db.sql(
+        "SELECT `reason_general` FROM `tabOvertime Registration` WHERE `reason_general` LIKE %s",
+        ("%Request number: %",),
+    ):
+        request_numbers.update(re.findall(r"Request number: (\S+)", reason or ""))
+
+    condition, values = "`date` >= %s", [from_date]
+    if to_date:
+        condition += " AND `date` <= %s"
+        values.append(to_date)
+    ot_keys = {
+        (row[0], str(row[1]), _time_key(row[2]), _time_key(row[3]))
+        for row in frappe.db.sql(
+            f"SELECT `employee`, `date`, `begin_time`, `end_time` FROM `tabOvertime Registration Detail` WHERE {condition}",
+            values,
+        )
+    }
+    return request_numbers, ot_keys
 
 
 def _run_ot_sync_job(from_date, cache_key, to_date=None):
@@ -384,8 +492,12 @@ def _run_ot_sync_job(from_date, cache_key, to_date=None):
         if to_date:
             ot_filter["$lte"] = datetime.strptime(to_date, "%Y-%m-%d").replace(
                 hour=23, minute=59, second=59, tzinfo=timezone.utc)
-        records = list(collection.find({"otDate": ot_filter}))
+        records = []
+        projection = {"empId": 1, "otTimeBegin": 1, "otTimeEnd": 1, "requestNo": 1, "requestDate": 1}
+        for page in _iter_mongo_pages(collection, {"otDate": ot_filter}, projection, "otDate"):
+            records.extend(page)
         client.close()
+        request_numbers, ot_keys = _load_existing_ot(from_date, to_date)
 
         # Dedup identical rows then group by requestNo (same as CLI tool)
         seen = set()
@@ -405,10 +517,9 @@ def _run_ot_sync_job(from_date, cache_key, to_date=None):
 
         created = skipped = failed = 0
         for i, (request_no, recs) in enumerate(sorted(grouped.items())):
+            frappe.db.savepoint("ot_sync_request")
             try:
-                if frappe.get_all("Overtime Registration",
-                                  filters=[["reason_general", "like", f"%Request number: {request_no}%"]],
-                                  limit=1):
+                if request_no in request_numbers:
                     skipped += 1
                     continue
 
@@ -427,7 +538,7 @@ def _run_ot_sync_job(from_date, cache_key, to_date=None):
                     ot_date = ot_date_raw.strftime("%Y-%m-%d")
                     begin_time = _normalize_time(rec.get("otTimeBegin"), "17:00")
                     end_time = _normalize_time(rec.get("otTimeEnd"), "19:00")
-                    if _employee_has_ot(emp_id, ot_date, begin_time, end_time):
+                    if (emp_id, ot_date, _time_key(begin_time), _time_key(end_time)) in ot_keys:
                         continue
                     ot_employees.append({
                         "employee": emp_id,
@@ -449,21 +560,29 @@ def _run_ot_sync_job(from_date, cache_key, to_date=None):
                     "ot_employees": ot_employees,
                 })
                 doc.insert(ignore_permissions=True)
-                frappe.db.commit()
+                request_numbers.add(request_no)
+                ot_keys.update(
+                    (row["employee"], row["date"], _time_key(row["begin_time"]), _time_key(row["end_time"]))
+                    for row in ot_employees
+                )
                 created += 1
                 _append_result(cache_key, True, request_no, "OT",
                                f"Created with {len(ot_employees)} employee(s)")
             except Exception as e:
-                frappe.db.rollback()
+                # only this request — earlier uncommitted inserts stay
+                frappe.db.rollback(save_point="ot_sync_request")
                 failed += 1
                 _append_result(cache_key, False, request_no, "OT", str(e))
 
+            if created and created % OT_COMMIT_EVERY == 0:
+                frappe.db.commit()
             if i % 10 == 0:
                 _update_cache(cache_key, {
                     "done_count": i,
                     "progress_pct": int(i / max(total, 1) * 100),
                 })
 
+        frappe.db.commit()
         _update_cache(cache_key, {
             "status": "done",
             "done_count": total,
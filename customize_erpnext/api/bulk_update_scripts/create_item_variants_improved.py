@@ -6,6 +6,13 @@ import datetime
 from frappe.utils import cstr
 import re
 
+from customize_erpnext.api.item.attribute_value_check import attribute_value_errors
+from customize_erpnext.api.item.bulk_variant_builder import (
+    drop_duplicate_codes,
+    get_attribute_abbreviations,
+    insert_variant_specs,
+)
+
 @frappe.whitelist()
 def create_item_variants_improved(file_path=None, file_url=None):
     """
@@ -243,6 +250,9 @@ def create_item_variants_improved(file_path=None, file_url=None):
         success_count = 0
         error_count = 0
         results = []
+        pending_variants = {}  # template_item_code -> [(vị trí trong results, spec)]
+        # Item Attribute Value load một lần — bulk insert không chạy Item.validate
+        attribute_map = get_attribute_abbreviations(["Color", "Size", "Brand", "Season", "Info"])
         
         # Process each row in the Excel file
         for index, row in df.iterrows():
@@ -324,143 +334,35 @@ def create_item_variants_improved(file_path=None, file_url=None):
                     error_count += 1
                     continue
                 
-                log_message(f"Creating variant {variant_item_code} from template {template_item_code}...")
-                
-                # Get template item
-                template_item = frappe.get_doc("Item", template_item_code)
-                
-                # Create variant
-                variant = frappe.new_doc("Item")
-                
                 # Set variant attributes
-                attributes = []
-                
-                # Always add Color attribute (including "Blank" values)
-                attributes.append({
-                    "attribute": "Color",
-                    "attribute_value": color_value
-                })
-                
-                # Always add Size attribute (including "Blank" values)
-                attributes.append({
-                    "attribute": "Size",
-                    "attribute_value": size_value
-                })
-                
-                # Always add Brand attribute (including "Blank" values)
-                attributes.append({
-                    "attribute": "Brand",
-                    "attribute_value": brand_value
-                })
-                
-                # Always add Season attribute (including "Blank" values)
-                attributes.append({
-                    "attribute": "Season",
-                    "attribute_value": season_value
-                })
+                attributes = [
+                    # Always add Color, Size, Brand, Season attributes (including "Blank" values)
+                    ("Color", color_value),
+                    ("Size", size_value),
+                    ("Brand", brand_value),
+                    ("Season", season_value),
+                ]
                 
                 # Only add Info attribute if template has Info attribute
                 if template_has_attribute(template_item_code, "Info"):
-                    attributes.append({
-                        "attribute": "Info",
-                        "attribute_value": info_value
-                    })
-                    log_message(f"Template has Info attribute, adding Info: {info_value}")
-                else:
-                    log_message(f"Template does not have Info attribute, skipping Info attribute")
-                
-                # Create the variant with basic properties
-                variant.item_code = variant_item_code
-                variant.item_name = item_name  # Use original item_name from Excel
-                variant.variant_of = template_item_code
-                variant.item_group = template_item.item_group
-                variant.stock_uom = template_item.stock_uom
-                variant.brand = template_item.brand
-                variant.custom_item_name_detail = custom_item_name_detail
-                
-                # Safely copy properties that might not exist in all installations
-                properties_to_copy = [
-                    'is_purchase_item', 
-                    'is_customer_provided_item', 
-                    'is_sales_item', 
-                    'include_item_in_manufacturing',
-                ]
-                
-                # Copy each property if it exists in the template
-                for field in properties_to_copy:
-                    try:
-                        field_value = getattr(template_item, field, None)
-                        if field_value is not None:
-                            setattr(variant, field, field_value)
-                    except Exception as field_err:
-                        log_message(f"Note: Could not copy field '{field}': {str(field_err)}")
-                
-                # Copy description from template
-                if hasattr(template_item, 'description'):
-                    variant.description = template_item.description
-                
-                # Copy custom_description_vietnamese if it exists
-                if hasattr(template_item, 'custom_description_vietnamese'):
-                    variant.custom_description_vietnamese = template_item.custom_description_vietnamese
-                
-                # Add attributes
-                for attr in attributes:
-                    variant.append("attributes", attr)
-                
-                # Save the variant with ignore_permissions to ensure it works
-                variant.flags.ignore_permissions = True
-                variant.insert(ignore_permissions=True)
+                    attributes.append(("Info", info_value))
                 
-                # Copy item_defaults from template
-                try:
-                    # Get item defaults from template
-                    template_defaults = frappe.db.sql("""
-                        SELECT * FROM `tabItem Default`
-                        WHERE parent=%s
-                    """, (template_item_code,), as_dict=1)
-                    
-                    if template_defaults:
-                        log_message(f"Found {len(template_defaults)} item defaults to copy from template")
-                        
-                        # Copy each default row to the variant
-                        for default_row in template_defaults:
-                            # Create a clean copy of the default row
-                            new_default = {}
-                            for key, value in default_row.items():
-                                if key not in ['name', 'creation', 'modified', 'modified_by', 'owner', 'docstatus', 'idx', 'parent', 'parentfield', 'parenttype']:
-                                    new_default[key] = value
-                            
-                            # Check for existing item default with the same company
-                            existing_default = frappe.db.get_value("Item Default", 
-                                {"parent": variant_item_code, "company": new_default.get("company")}, 
-                                "name")
-                            
-                            if existing_default:
-                                # Update existing default
-                                frappe.db.set_value("Item Default", existing_default, new_default)
-                                log_message(f"Updated existing item default for company {new_default.get('company')}")
-                            else:
-                                # Create new item default
-                                item_default = frappe.new_doc('Item Default')
-                                item_default.parent = variant_item_code
-                                item_default.parenttype = 'Item'
-                                item_default.parentfield = 'item_defaults'
-                                
-                                for key, value in new_default.items():
-                                    item_default.set(key, value)
-                                
-                                item_default.insert()
-                                log_message(f"Created new item default with warehouse: {new_default.get('default_warehouse', 'Not specified')}")
-                
-                except Exception as def_err:
-                    log_message(f"Warning: Error copying item defaults: {str(def_err)}", is_error=True)
-                
-                # Commit the transaction after all operations
-                frappe.db.commit()
+                attribute_errors = attribute_value_errors(attributes, attribute_map)
+                if attribute_errors:
+                    error_msg = f"Row {index+2}: " + "; ".join(attribute_errors)
+                    log_message(error_msg, is_error=True)
+                    results.append(error_msg)
+                    error_count += 1
+                    continue
                 
-                log_message(f"Row {index+2}: Successfully created item variant '{variant_item_code}' from template '{template_item_code}'.")
-                results.append(variant_item_code)  # Store successful item_code
-                success_count += 1
+                # Gom theo template — insert hàng loạt sau vòng lặp (bulk_variant_builder)
+                pending_variants.setdefault(template_item_code, []).append((len(results), {
+                    "item_code": variant_item_code,
+                    "item_name": item_name,  # Use original item_name from Excel
+                    "custom_item_name_detail": custom_item_name_detail,
+                    "attributes": attributes,
+                }))
+                results.append(None)  # Điền sau khi insert
                 
             except Exception as e:
                 error_msg = f"Row {index+2}: Error creating item variant: {str(e)}"
@@ -471,6 +373,35 @@ def create_item_variants_improved(file_path=None, file_url=None):
                 # Rollback transaction for this row in case of error
                 frappe.db.rollback()
         
+        # Bulk insert variant theo từng template, commit một lần mỗi template
+        for template_item_code, rows in pending_variants.items():
+            specs, duplicate_codes = drop_duplicate_codes([spec for _, spec in rows])
+            inserted_codes = {spec["item_code"] for spec in specs}
+            try:
+                template_item = frappe.get_doc("Item", template_item_code)
+                insert_variant_specs(template_item, specs)
+                frappe.db.commit()
+                log_message(f"Created {len(specs)} variants from template '{template_item_code}'")
+            except Exception as e:
+                frappe.db.rollback()
+                log_message(f"Error creating variants from template '{template_item_code}': {str(e)}", is_error=True)
+                log_message(f"Error details: {frappe.get_traceback()}", is_error=True)
+                inserted_codes = set()
+            
+            for result_index, spec in rows:
+                row_number = df.index[result_index] + 2
+                if spec["item_code"] in inserted_codes:
+                    inserted_codes.discard(spec["item_code"])  # dòng trùng mã phía sau báo lỗi
+                    results[result_index] = spec["item_code"]
+                    success_count += 1
+                    log_message(f"Row {row_number}: Successfully created item variant '{spec['item_code']}' from template '{template_item_code}'.")
+                else:
+                    reason = "already exists" if spec["item_code"] in duplicate_codes else "was not created (see error log)"
+                    error_msg = f"Row {row_number}: Item variant '{spec['item_code']}' {reason}"
+                    log_message(error_msg, is_error=True)
+                    results[result_index] = error_msg
+                    error_count += 1
+        
         # Update the Results column in the Excel file
         try:
             df['Result'] = results
@@ -10,6 +10,8 @@ import datetime
 import sys
 import json
 
+from customize_erpnext.api.item.item_lookup import find_item, find_items, suggest_items
+
 # Company mặc định
 DEFAULT_COMPANY = "Toray International, VietNam Company Limited - Quang Ngai Branch"
 
@@ -118,6 +120,7 @@ def validate_excel_file(file_url):
         global item_cache, warehouse_cache
         item_cache.clear()
         warehouse_cache.clear()
+        existing_warehouse_cache.clear()
         
         # Khởi tạo logger
         logger = Logger()
@@ -282,6 +285,10 @@ def validate_excel_data_detailed(df):
         logger.log_info(f"Batch lookup for {len(valid_item_codes)} warehouses...")
         warehouses_map = batch_get_warehouses(valid_item_codes)
         
+        # Batch check warehouses được nhập trực tiếp trong Excel
+        if 's_warehouse' in df.columns:
+            batch_check_warehouses(df['s_warehouse'].dropna().unique().tolist())
+        
         # Batch find suggestions for missing items
         missing_patterns = [pattern for pattern, item in items_map.items() if item is None]
         suggestions_map = {}
@@ -323,7 +330,7 @@ def validate_excel_data_detailed(df):
                     if excel_warehouse and pd.notna(excel_warehouse) and str(excel_warehouse).strip():
                         # Validate warehouse từ Excel có tồn tại không
                         excel_warehouse = str(excel_warehouse).strip()
-                        if frappe.db.exists("Warehouse", excel_warehouse):
+                        if warehouse_exists(excel_warehouse):
                             warehouse = excel_warehouse
                             logger.log_info(f"  Using warehouse from Excel: {warehouse} for item {item['item_code']}")
                         else:
@@ -407,48 +414,13 @@ def validate_excel_data_detailed(df):
 def find_similar_items(search_term, limit=5):
     """
     Tìm items có custom_item_name_detail tương tự để suggest khi exact match thất bại
+    (exact → prefix → fuzzy trên item pattern index, không LIKE scan tabItem)
     """
     try:
         if not search_term or pd.isna(search_term):
             return []
-            
-        search_term = cstr(search_term).strip()
         
-        # Tìm items có custom_item_name_detail chứa một phần của search_term
-        similar_items = frappe.db.sql("""
-            SELECT 
-                item_code,
-                custom_item_name_detail,
-                CASE 
-                    WHEN custom_item_name_detail = %s THEN 100
-                    WHEN custom_item_name_detail LIKE %s THEN 90
-                    WHEN custom_item_name_detail LIKE %s THEN 80
-                    WHEN custom_item_name_detail LIKE %s THEN 70
-                    ELSE 60
-                END as similarity_score
-            FROM `tabItem`
-            WHERE custom_item_name_detail IS NOT NULL
-            AND custom_item_name_detail != ''
-            AND has_variants = 0
-            AND (
-                custom_item_name_detail LIKE %s
-                OR custom_item_name_detail LIKE %s
-                OR custom_item_name_detail LIKE %s
-            )
-            ORDER BY similarity_score DESC, custom_item_name_detail
-            LIMIT %s
-        """, (
-            search_term,  # Exact match (shouldn't happen here but for completeness)
-            f"{search_term}%",  # Starts with
-            f"%{search_term}%",  # Contains
-            f"%{search_term}",   # Ends with
-            f"%{search_term}%",  # Contains (repeat for OR)
-            f"{search_term}%",   # Starts with (repeat for OR)
-            f"%{search_term}",   # Ends with (repeat for OR)
-            limit
-        ), as_dict=True)
-        
-        return similar_items
+        return suggest_items(cstr(search_term).strip(), limit)
         
     except Exception as e:
         if logger:
@@ -552,6 +524,24 @@ def batch_get_warehouses(item_codes):
             logger.log_error(f"Error in batch warehouse lookup: {str(e)}")
         return {}
 
+def batch_check_warehouses(warehouse_names):
+    """
+    Performance optimization: Kiểm tra tồn tại của nhiều warehouse bằng một query
+    """
+    names = list({cstr(w).strip() for w in warehouse_names if cstr(w).strip()})
+    uncached = [w for w in names if w not in existing_warehouse_cache]
+    if uncached:
+        found = set(frappe.get_all("Warehouse", filters={"name": ["in", uncached]}, pluck="name"))
+        for w in uncached:
+            existing_warehouse_cache[w] = w in found
+    return {w: existing_warehouse_cache[w] for w in names}
+
+def warehouse_exists(warehouse):
+    """Kiểm tra warehouse với cache, fallback về query khi chưa batch"""
+    if warehouse not in existing_warehouse_cache:
+        existing_warehouse_cache[warehouse] = bool(frappe.db.exists("Warehouse", warehouse))
+    return existing_warehouse_cache[warehouse]
+
 def get_available_qty_by_invoice(item_code, warehouse, invoice_number):
     """
     Tính available quantity theo invoice number từ Stock Ledger Entry
@@ -634,6 +624,47 @@ def get_available_qty_by_invoice(item_code, warehouse, invoice_number):
             print(f"❌ {error_msg}")
         return 0.0
 
+def batch_get_available_qty_by_invoice(keys):
+    """
+    Performance optimization: get_available_qty_by_invoice cho nhiều
+    (item_code, warehouse, invoice_number) bằng một query Stock Ledger Entry.
+    Cùng logic: base từ Stock Reconciliation gần nhất rồi cộng actual_qty phía sau.
+
+    Returns:
+        dict: {(item_code, warehouse, invoice_number): available_qty}
+    """
+    keys = set(keys)
+    result = {key: 0.0 for key in keys}
+    if not keys:
+        return result
+
+    entries = frappe.db.sql("""
+        SELECT item_code, warehouse, custom_invoice_number,
+            voucher_type, actual_qty, qty_after_transaction
+        FROM `tabStock Ledger Entry`
+        WHERE item_code IN %(item_codes)s
+        AND warehouse IN %(warehouses)s
+        AND custom_invoice_number IN %(invoices)s
+        AND is_cancelled = 0
+        AND docstatus < 2
+        ORDER BY posting_date ASC, posting_time ASC, creation ASC
+    """, {
+        "item_codes": list({k[0] for k in keys}),
+        "warehouses": list({k[1] for k in keys}),
+        "invoices": list({k[2] for k in keys}),
+    }, as_dict=True)
+
+    for entry in entries:
+        key = (entry.item_code, entry.warehouse, entry.custom_invoice_number)
+        if key not in result:
+            continue
+        if entry.voucher_type == 'Stock Reconciliation':
+            result[key] = flt(entry.qty_after_transaction)
+        else:
+            result[key] += flt(entry.actual_qty)
+
+    return result
+
 def create_material_issue(file_path=None):
     """
     Hàm chính để tạo Material Issue Stock Entry từ file Excel
@@ -796,6 +827,7 @@ def process_excel_file(file_path):
         global item_cache, warehouse_cache
         item_cache.clear()
         warehouse_cache.clear()
+        existing_warehouse_cache.clear()
         
         # Đọc file Excel
         logger.log_info(f"Đang đọc file: {file_path}")
@@ -825,6 +857,8 @@ def process_excel_file(file_path):
         
         valid_item_codes = [item['item_code'] for item in items_map.values() if item is not None]
         warehouses_map = batch_get_warehouses(valid_item_codes)
+        if 's_warehouse' in df.columns:
+            batch_check_warehouses(df['s_warehouse'].dropna().unique().tolist())
         
         logger.log_info(f"Cached {len(items_map)} items and {len(warehouses_map)} warehouses")
         
@@ -1171,6 +1205,7 @@ def format_text_field(value, field_name):
 # Performance optimization: Add item cache
 item_cache = {}
 warehouse_cache = {}
+existing_warehouse_cache = {}
 
 def find_item_by_pattern(pattern_search):
     """
@@ -1186,23 +1221,15 @@ def find_item_by_pattern(pattern_search):
         if pattern_search in item_cache:
             return item_cache[pattern_search]
         
-        # Exact match với custom_item_name_detail
-        items = frappe.get_list(
-            "Item",
-            filters={
-                "custom_item_name_detail": pattern_search,
-                "has_variants": 0,
-            },
-            fields=["name", "item_code", "item_name", "stock_uom", "custom_item_name_detail"],
-            limit=1
-        )
+        # Exact match với custom_item_name_detail (qua item pattern index)
+        item = find_item(pattern_search)
         
-        if items:
+        if item:
             # Cache the result
-            item_cache[pattern_search] = items[0]
+            item_cache[pattern_search] = item
             if logger:
-                logger.log_info(f"   Found exact match: {items[0]['item_code']} - {items[0]['custom_item_name_detail']}")
-            return items[0]
+                logger.log_info(f"   Found exact match: {item['item_code']} - {item['custom_item_name_detail']}")
+            return item
         
         # Cache negative result as well
         item_cache[pattern_search] = None
@@ -1228,25 +1255,8 @@ def batch_find_items(pattern_list):
         uncached_patterns = [p for p in pattern_list if p not in item_cache]
         
         if uncached_patterns:
-            # Batch query for all uncached items
-            items = frappe.db.sql("""
-                SELECT name, item_code, item_name, stock_uom, custom_item_name_detail
-                FROM `tabItem`
-                WHERE custom_item_name_detail IN %(patterns)s
-                AND has_variants = 0
-            """, {"patterns": uncached_patterns}, as_dict=True)
-            
-            # Update cache with results
-            found_patterns = set()
-            for item in items:
-                pattern = item['custom_item_name_detail']
-                item_cache[pattern] = item
-                found_patterns.add(pattern)
-            
-            # Cache negative results
-            for pattern in uncached_patterns:
-                if pattern not in found_patterns:
-                    item_cache[pattern] = None
+            # Mỗi pattern là một dict probe trên item pattern index (cache cả kết quả None)
+            item_cache.update(find_items(uncached_patterns))
         
         # Return all requested items from cache
         return {pattern: item_cache.get(pattern) for pattern in pattern_list}
@@ -1286,7 +1296,7 @@ def add_item_to_stock_entry(stock_entry, row, row_number):
         if excel_warehouse and pd.notna(excel_warehouse) and str(excel_warehouse).strip():
             # Use warehouse from Excel
             excel_warehouse = str(excel_warehouse).strip()
-            if frappe.db.exists("Warehouse", excel_warehouse):
+            if warehouse_exists(excel_warehouse):
                 warehouse = excel_warehouse
                 logger.log_info(f"  Using warehouse from Excel: {warehouse} for item {item['item_code']}")
             else:
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Staged pipeline cho import Material Issue / Material Receipt từ Excel.
+
+Stage 1 (prepare_import): đọc + làm sạch toàn bộ file, resolve item / warehouse /
+tồn kho theo invoice bằng các query batch (không query theo từng dòng).
+Stage 2 (run_stock_entry_import): tạo Stock Entry theo từng chunk nhóm custom_no
+trong background job (queue long), commit sau mỗi chunk, báo tiến độ qua
+realtime event `stock_entry_import_progress`.
+
+Trạng thái job lưu trong cache (stock_entry_import:{job_id}) gồm danh sách
+custom_no đã tạo xong — resume_stock_entry_import() chạy lại job và bỏ qua các
+nhóm đó, nên một nhóm lỗi (hoặc worker chết giữa chừng) không bắt import lại từ đầu.
+"""
+
+import importlib
+import uuid
+
+import frappe
+import pandas as pd
+from frappe import _
+from frappe.utils import cstr, flt, get_datetime, now_datetime, time_diff_in_seconds
+
+IMPORTERS = {
+    "Material Issue": "customize_erpnext.api.bulk_update_scripts.create_material_issue",
+    "Material Receipt": "customize_erpnext.api.bulk_update_scripts.create_material_receipt",
+}
+
+# Cột warehouse trong Excel theo purpose
+WAREHOUSE_COLUMN = {
+    "Material Issue": "s_warehouse",
+    "Material Receipt": "t_warehouse",
+}
+
+CHUNK_SIZE = 10               # số nhóm custom_no mỗi lần commit
+JOB_STATE_TTL = 24 * 3600     # giữ trạng thái 1 ngày để còn resume được
+REALTIME_EVENT = "stock_entry_import_progress"
+STALE_JOB_SECONDS = 15 * 60   # job "running" mà không cập nhật quá lâu = worker đã chết
+
+
+def _get_importer(purpose):
+    if purpose not in IMPORTERS:
+        frappe.throw(_("Unsupported import purpose: {0}").format(purpose))
+    return importlib.import_module(IMPORTERS[purpose])
+
+
+# ---------------------------------------------------------------------------
+# Job state
+# ---------------------------------------------------------------------------
+
+def _cache_key(job_id):
+    return f"stock_entry_import:{job_id}"
+
+
+def _get_state(job_id):
+    return frappe.cache().get_value(_cache_key(job_id))
+
+
+def _save_state(state):
+    state["heartbeat"] = str(now_datetime())
+    frappe.cache().set_value(_cache_key(state["job_id"]), state, expires_in_sec=JOB_STATE_TTL)
+
+
+def _publish(state):
+    frappe.publish_realtime(
+        REALTIME_EVENT,
+        {
+            "job_id": state["job_id"],
+            "status": state["status"],
+            "phase": state["phase"],
+            "progress_pct": state["progress_pct"],
+            "done_groups": len(state["done_groups"]),
+            "total_groups": state["total_groups"],
+        },
+        user=state["user"],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Stage 1 — parse + batch resolve
+# ---------------------------------------------------------------------------
+
+def prepare_import(importer, df, purpose):
+    """Resolve toàn bộ dòng với số query cố định (không phụ thuộc số dòng).
+
+    Returns:
+        dict: {
+            "valid_indexes": {custom_no: [df index, ...]},
+            "row_errors": [{"row", "custom_no", "message"}],
+        }
+    Dòng lỗi bị loại khỏi nhóm; nhóm không còn dòng hợp lệ sẽ không được tạo.
+    """
+    warehouse_column = WAREHOUSE_COLUMN[purpose]
+
+    patterns = df["custom_item_name_detail"].dropna().unique().tolist()
+    items_map = importer.batch_find_items(patterns)
+    item_codes = [item["item_code"] for item in items_map.values() if item]
+    default_warehouses = importer.batch_get_warehouses(item_codes)
+
+    excel_warehouses = []
+    if warehouse_column in df.columns:
+        excel_warehouses = [
+            cstr(w).strip() for w in df[warehouse_column].dropna().unique().tolist() if cstr(w).strip()
+        ]
+    existing_warehouses = importer.batch_check_warehouses(excel_warehouses)
+
+    resolved = []
+    row_errors = []
+    for index, row in df.iterrows():
+        row_number = index + 2
+        custom_no = row.get("custom_no")
+        pattern = row.get("custom_item_name_detail", "")
+        item = items_map.get(pattern)
+        if not item:
+            row_errors.append({"row": row_number, "custom_no": custom_no,
+                               "message": f"Không tìm thấy item với pattern: '{pattern}'"})
+            continue
+
+        excel_warehouse = row.get(warehouse_column, "") if warehouse_column in df.columns else ""
+        excel_warehouse = cstr(excel_warehouse).strip() if pd.notna(excel_warehouse) else ""
+        if excel_warehouse:
+            if not existing_warehouses.get(excel_warehouse):
+                row_errors.append({"row": row_number, "custom_no": custom_no,
+                                   "message": f"Excel warehouse '{excel_warehouse}' không tồn tại"})
+                continue
+            warehouse = excel_warehouse
+        else:
+            warehouse = default_warehouses.get(item["item_code"])
+        if not warehouse:
+            row_errors.append({"row": row_number, "custom_no": custom_no,
+                               "message": f"Không có warehouse cho item {item['item_code']}"})
+            continue
+
+        qty = flt(row.get("qty", 0))
+        if qty <= 0:
+            row_errors.append({"row": row_number, "custom_no": custom_no,
+                               "message": f"Số lượng không hợp lệ: {qty}"})
+            continue
+
+        invoice_number = cstr(row.get("custom_invoice_number", "")).strip()
+        if not invoice_number:
+            row_errors.append({"row": row_number, "custom_no": custom_no,
+                               "message": f"Thiếu invoice number cho item {item['item_code']}"})
+            continue
+
+        resolved.append((index, row_number, custom_no, item["item_code"], warehouse, invoice_number, qty))
+
+    # Material Issue: kiểm tra tồn kho theo invoice bằng một query SLE cho cả file.
+    # Số lượng xuất được cộng dồn theo thứ tự file, dòng nào vượt tồn thì loại.
+    if purpose == "Material Issue" and resolved:
+        keys = {(r[3], r[4], r[5]) for r in resolved}
+        available = importer.batch_get_available_qty_by_invoice(keys)
+        checked = []
+        for entry in resolved:
+            index, row_number, custom_no, item_code, warehouse, invoice_number, qty = entry
+            key = (item_code, warehouse, invoice_number)
+            if flt(available.get(key)) < qty:
+                row_errors.append({
+                    "row": row_number, "custom_no": custom_no,
+                    "message": f"Không đủ tồn kho cho {item_code} - {warehouse} - {invoice_number}: "
+                               f"còn {flt(available.get(key))}, cần {qty}",
+                })
+                continue
+            available[key] = flt(available.get(key)) - qty
+            checked.append(entry)
+        resolved = checked
+
+    valid_indexes = {}
+    for entry in resolved:
+        valid_indexes.setdefault(entry[2], []).append(entry[0])
+
+    return {"valid_indexes": valid_indexes, "row_errors": row_errors}
+
+
+# ---------------------------------------------------------------------------
+# Stage 2 — background creation
+# ---------------------------------------------------------------------------
+
+@frappe.whitelist()
+def enqueue_stock_entry_import(file_url, purpose):
+    """Tạo job import và đẩy vào queue long. Trả về job_id để client theo dõi."""
+    frappe.has_permission("Stock Entry", "create", throw=True)
+    _get_importer(purpose)
+
+    job_id = uuid.uuid4().hex[:12]
+    state = {
+        "job_id": job_id,
+        "file_url": file_url,
+        "purpose": purpose,
+        "user": frappe.session.user,
+        "status": "queued",
+        "phase": "Queued...",
+        "progress_pct": 0,
+        "total_groups": 0,
+        "done_groups": {},          # custom_no -> created entry details
+        "failed_groups": {},        # custom_no -> error message
+        "row_errors": [],
+        "started_at": str(now_datetime()),
+    }
+    _save_state(state)
+    _enqueue(job_id)
+    return {"job_id": job_id}
+
+
+@frappe.whitelist()
+def resume_stock_entry_import(job_id):
+    """Chạy lại job: bỏ qua nhóm đã tạo xong, thử lại các nhóm lỗi/chưa chạy."""
+    state = _get_state(job_id)
+    if not state:
+        frappe.throw(_("Import job {0} not found or expired").format(job_id))
+    _check_owner(state)
+    if state["status"] in ("queued", "running") and not _is_stale(state):
+        return {"job_id": job_id, "status": state["status"]}
+
+    state.update({"status": "queued", "phase": "Queued (resume)...", "failed_groups": {}})
+    _save_state(state)
+    _enqueue(job_id)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@frappe.whitelist()
+def get_stock_entry_import_status(job_id):
+    state = _get_state(job_id)
+    if not state:
+        return {"status": "not_found"}
+    _check_owner(state)
+    return _build_result(state)
+
+
+def _check_owner(state):
+    """Chỉ người tạo job (hoặc System Manager) được xem / resume job."""
+    user = frappe.session.user
+    if state["user"] != user and user != "Administrator" and "System Manager" not in frappe.get_roles(user):
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+
+def _is_stale(state):
+    return time_diff_in_seconds(now_datetime(), get_datetime(state["heartbeat"])) > STALE_JOB_SECONDS
+
+
+def _enqueue(job_id):
+    frappe.enqueue(
+        "customize_erpnext.api.bulk_update_scripts.stock_entry_import_pipeline.run_stock_entry_import",
+        queue="long",
+        timeout=7200,
+        job_id=job_id,
+        enqueue_after_commit=True,
+    )
+
+
+def run_stock_entry_import(job_id):
+    state = _get_state(job_id)
+    if not state:
+        return
+
+    importer = _get_importer(state["purpose"])
+    importer.logger = importer.Logger()
+    importer.item_cache.clear()
+    importer.warehouse_cache.clear()
+    importer.existing_warehouse_cache.clear()
+
+    try:
+        state.update({"status": "running", "phase": "Reading Excel file..."})
+        _save_state(state)
+        _publish(state)
+
+        df = pd.read_excel(importer.get_file_path_from_url(state["file_url"]))
+        columns = importer.validate_excel_columns(df)
+        if not columns["success"]:
+            raise frappe.ValidationError(columns["message"])
+        df = importer.clean_dataframe(df)
+
+        state["phase"] = "Resolving items, warehouses and stock..."
+        _save_state(state)
+        _publish(state)
+        plan = prepare_import(importer, df, state["purpose"])
+        state["row_errors"] = plan["row_errors"]
+
+        groups = [
+            (custom_no, indexes) for custom_no, indexes in plan["valid_indexes"].items()
+            if custom_no not in state["done_groups"]
+        ]
+        state["total_groups"] = len(groups) + len(state["done_groups"])
+
+        for chunk_start in range(0, len(groups), CHUNK_SIZE):
+            created = {}
+            for custom_no, indexes in groups[chunk_start:chunk_start + CHUNK_SIZE]:
+                _create_group(importer, state, created, custom_no, df.loc[indexes])
+
+            # Commit trước rồi mới ghi nhóm vào done_groups — nếu chunk lỗi giữa
+            # chừng (rollback ở except), state không báo "xong" cho nhóm chưa
+            # thực sự nằm trong DB và resume sẽ tạo lại chúng.
+            frappe.db.commit()
+            state["done_groups"].update(created)
+            for custom_no in created:
+                state["failed_groups"].pop(custom_no, None)
+            processed = len(state["done_groups"]) + len(state["failed_groups"])
+            state["progress_pct"] = int(processed * 100 / max(state["total_groups"], 1))
+            state["phase"] = f"Created {len(state['done_groups'])}/{state['total_groups']} Stock Entries"
+            _save_state(state)
+            _publish(state)
+
+        state.update({
+            "status": "partial" if state["failed_groups"] else "done",
+            "progress_pct": 100,
+            "phase": f"Complete: {len(state['done_groups'])} created, "
+                     f"{len(state['failed_groups'])} failed, {len(state['row_errors'])} invalid rows",
+        })
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), f"Stock Entry import {job_id} failed")
+        state.update({"status": "error", "phase": f"Error: {e}"})
+    finally:
+        importer.logger.finalize(_build_result(state))
+        _save_state(state)
+        _publish(state)
+
+
+def _create_group(importer, state, created, custom_no, group_df):
+    """Tạo Stock Entry cho một nhóm; nhóm thành công vào `created` (chưa commit)."""
+    savepoint = f"se_import_{uuid.uuid4().hex[:8]}"
+    frappe.db.savepoint(savepoint)
+    try:
+        entry = importer.create_stock_entry_for_group(custom_no, group_df)
+    except Exception as e:
+        entry = {"success": False, "message": str(e)}
+
+    if entry["success"]:
+        created[custom_no] = {
+            "name": entry["stock_entry_name"],
+            "posting_date": cstr(entry.get("posting_date", "")),
+            "custom_no": cstr(entry.get("custom_no", "")),
+            "custom_invoice_number": cstr(entry.get("custom_invoice_number", "")),
+            "items_count": entry["items_count"],
+        }
+    else:
+        frappe.db.rollback(save_point=savepoint)
+        state["failed_groups"][custom_no] = entry["message"]
+
+
+def _build_result(state):
+    """Kết quả cùng dạng với import_material_*_from_excel để client dùng lại phần hiển thị."""
+    details = list(state["done_groups"].values())
+    errors = [f"Nhóm {custom_no}: {msg}" for custom_no, msg in state["failed_groups"].items()]
+    errors += [f"Dòng {e['row']} ({e['custom_no']}): {e['message']}" for e in state["row_errors"]]
+    return {
+        "job_id": state["job_id"],
+        "status": state["status"],
+        "phase": state["phase"],
+        "progress_pct": state["progress_pct"],
+        "success": state["status"] == "done",
+        "success_count": len(details),
+        "error_count": len(state["failed_groups"]) + len(state["row_errors"]),
+        "total_items": sum(d["items_count"] for d in details),
+        "created_entries": [d["name"] for d in details],
+        "created_entries_details": details,
+        "errors": errors,
+        "can_resume": state["status"] in ("error", "partial"),
+    }
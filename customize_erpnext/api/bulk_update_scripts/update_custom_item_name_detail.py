@@ -1,4 +1,5 @@
 import frappe
+from customize_erpnext.api.item.item_lookup import invalidate_item_pattern_index
 def update_custom_item_name_detail(old_string=None, new_string=None):
     # Get all records with custom_item_name_detail field
     items = frappe.get_all("Item", filters={}, fields=["name", "custom_item_name_detail"])
@@ -12,6 +13,7 @@ def update_custom_item_name_detail(old_string=None, new_string=None):
                 frappe.db.set_value("Item", item.name, "custom_item_name_detail", updated_name)
     # Commit the changes
     frappe.db.commit()
+    invalidate_item_pattern_index()
 
     print("Custom item name details updated successfully")
 if __name__ == "__main__": 
@@ -0,0 +1,127 @@
+"""Snapshot danh sách nhân viên đủ điều kiện cho form self-service (Guest).
+
+`get_eligible_employees` của onboarding_api / self_update_api là endpoint
+allow_guest: mỗi lần kiosk / điện thoại mở form đều chạy query bảng con Settings,
+query Employee IN (...) và query trạng thái form. Cả đợt công nhân mở form cùng
+lúc thì MariaDB trả cùng một kết quả hàng trăm lần.
+
+Ở đây kết quả được dựng MỘT lần thành snapshot:
+  - Redis: `eligible_employees:<kind>` (dữ liệu) + `eligible_employees_etag:<kind>`.
+  - Bộ nhớ process: {kind: (etag, data)} — request sau chỉ đọc key etag (một GET
+    Redis nhỏ), khớp thì trả luôn dữ liệu trong RAM của worker.
+  - ETag = hash nội dung snapshot. Client gửi If-None-Match đúng etag thì nhận
+    304, không tải lại danh sách.
+
+Snapshot bị xoá (sau commit) khi Settings, form, hoặc Employee liên quan đổi —
+xem các hàm `invalidate_*` và doc_events trong hooks.py. SNAPSHOT_TTL chỉ là
+lưới an toàn cho các đường ghi không qua document (vd. `frappe.db.set_value`
+ngoài các API đã gọi invalidate).
+"""
+
+import hashlib
+
+import frappe
+
+KINDS = ("onboarding", "self_update")
+SNAPSHOT_TTL = 15 * 60
+
+# Employee fields that appear in (or filter) the eligible lists
+EMPLOYEE_FIELDS = ("employee_name", "date_of_birth", "cell_number", "date_of_joining", "custom_group", "status")
+# Form doctype -> snapshot kind. Forms with these statuses drop out of the list.
+FORM_KINDS = {"Employee Onboarding Form": "onboarding", "Employee Self Update Form": "self_update"}
+DONE_STATUSES = ("Approved", "Synced")
+
+_local = {}
+
+
+def _data_key(kind):
+	return f"eligible_employees:{kind}"
+
+
+def _etag_key(kind):
+	return f"eligible_employees_etag:{kind}"
+
+
+def get_snapshot(kind, builder):
+	"""(etag, data) của snapshot `kind`; dựng lại bằng builder() nếu chưa có / đã bị xoá."""
+	cache = frappe.cache()
+	etag = cache.get_value(_etag_key(kind))
+	if etag:
+		local = _local.get(kind)
+		if local and local[0] == etag:
+			return local
+		data = cache.get_value(_data_key(kind))
+		if data is not None:
+			_local[kind] = (etag, data)
+			return etag, data
+
+	data = builder()
+	etag = hashlib.sha1(frappe.as_json(data).encode("utf-8")).hexdigest()
+	cache.set_value(_data_key(kind), data, expires_in_sec=SNAPSHOT_TTL)
+	cache.set_value(_etag_key(kind), etag, expires_in_sec=SNAPSHOT_TTL)
+	_local[kind] = (etag, data)
+	return etag, data
+
+
+def serve(kind, builder):
+	"""Trả snapshot cho whitelisted method, kèm ETag; If-None-Match khớp → 304.
+
+	Gọi từ server (không có HTTP request) thì chỉ trả về data như cũ.
+	"""
+	etag, data = get_snapshot(kind, builder)
+	request = getattr(frappe.local, "request", None)
+	if request is None:
+		return data
+
+	headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+	if request.if_none_match.contains(etag):
+		from werkzeug.wrappers import Response
+
+		return Response(status=304, headers=headers)
+
+	response_headers = getattr(frappe.local, "response_headers", None)
+	if response_headers is not None:
+		for name, value in headers.items():
+			response_headers[name] = value
+	return data
+
+
+def invalidate(*kinds):
+	"""Xoá snapshot sau khi transaction hiện tại commit (request khác không kịp
+	dựng lại snapshot từ dữ liệu chưa commit)."""
+	kinds = kinds or KINDS
+
+	def _clear():
+		for kind in kinds:
+			frappe.cache().delete_value([_data_key(kind), _etag_key(kind)])
+			_local.pop(kind, None)
+
+	frappe.db.after_commit.add(_clear)
+
+
+def invalidate_onboarding(doc=None, method=None):
+	"""doc_events: Employee Onboarding Settings."""
+	invalidate("onboarding")
+
+
+def invalidate_self_update(doc=None, method=None):
+	"""Employee Self Update Setting.on_update."""
+	invalidate("self_update")
+
+
+def invalidate_on_form_change(doc, method=None):
+	"""Form on_update / on_trash: chỉ xoá khi form vào / ra khỏi Approved-Synced.
+
+	Guest lưu form (Pending Review) không đổi danh sách — không xoá snapshot, để
+	cả đợt điền form buổi sáng vẫn đọc từ cache.
+	"""
+	old = doc.get_doc_before_save() if method != "on_trash" else None
+	was_done = bool(old) and old.status in DONE_STATUSES
+	if method == "on_trash" or (doc.status in DONE_STATUSES) != was_done:
+		invalidate(FORM_KINDS[doc.doctype])
+
+
+def invalidate_on_employee_change(doc, method=None):
+	"""doc_events Employee.on_update: chỉ xoá khi field hiển thị / lọc thay đổi."""
+	if any(doc.has_value_changed(field) for field in EMPLOYEE_FIELDS):
+		invalidate()
@@ -12,6 +12,16 @@ from frappe.utils import get_site_path
 from frappe.utils import getdate, nowdate, cint, flt, get_files_path, cstr
 import io
 from datetime import datetime
+from customize_erpnext.api.employee.photo_thumbnails import build_thumbnails, resolve_photo_path, thumbnail_key
+from customize_erpnext.api.excel_feed import (
+	FORMATS as EXCEL_FEED_FORMATS,
+	IN_SCOPE,
+	clean_value,
+	encode_csv_gz,
+	feed_page_size,
+	split_page,
+	to_columnar,
+)
 try:
     from PIL import Image
 except:
@@ -409,19 +419,7 @@ def generate_employee_cards_html_api(employee_ids, with_barcode=0, page_size='A4
         except (ValueError, TypeError):
             max_length_font_20 = 20
 
-        employees = []
-        for emp_id in employee_ids:
-            try:
-                emp = frappe.get_doc('Employee', emp_id)
-                employees.append({
-                    'name': emp.name,
-                    'employee_name': emp.employee_name or '',
-                    'custom_section': emp.custom_section or '',
-                    'image': emp.image or ''
-                })
-            except Exception as emp_err:
-                frappe.logger().error(f"Error loading employee {emp_id}: {str(emp_err)}")
-                continue
+        employees = load_card_employees(employee_ids)
 
         if not employees:
             frappe.throw(_("No valid employees found"))
@@ -504,21 +502,8 @@ def generate_employee_cards_pdf(employee_ids, with_barcode=0, page_size='A4', na
 
         frappe.logger().info(f"Generating employee cards for {len(employee_ids)} employees (page_size={page_size}, name_font_size={name_font_size}pt, max_length_font_20={max_length_font_20}, card_border_radius={card_border_radius})")
 
-        # Get employee data
-        employees = []
-        for emp_id in employee_ids:
-            try:
-                emp = frappe.get_doc('Employee', emp_id)
-                employees.append({
-                    'name': emp.name,
-                    'employee_name': emp.employee_name or '',
-                    'custom_section': emp.custom_section or '',
-                    'image': emp.image or ''
-                })
-                frappe.logger().info(f"Added employee {emp_id}, image: {emp.image}")
-            except Exception as emp_err:
-                frappe.logger().error(f"Error loading employee {emp_id}: {str(emp_err)}")
-                continue
+        # Get employee data (one query, in the order of employee_ids)
+        employees = load_card_employees(employee_ids)
 
         if not employees:
             frappe.throw(_("No valid employees found"))
@@ -531,9 +516,26 @@ def generate_employee_cards_pdf(employee_ids, with_barcode=0, page_size='A4', na
                 'image': ''
             })
             frappe.logger().info("Added placeholder employee to make even count")
+        card_kwargs = dict(with_barcode=with_barcode, page_size=page_size, name_font_size=name_font_size, max_length_font_20=max_length_font_20, card_border_radius=card_border_radius, bg_color=bg_color, border_color=border_color)
+
+        # Large batches: page-aligned chunks rendered by parallel wkhtmltopdf
+        # processes in a background job (api/pdf_batch.py), then concatenated
+        if len(employees) > CARD_ASYNC_THRESHOLD:
+            from customize_erpnext.api.pdf_batch import enqueue_pdf_batch
+
+            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            result = enqueue_pdf_batch(
+                'customize_erpnext.api.employee.employee_utils.build_employee_cards_chunks',
+                {'employees': employees, 'card_kwargs': card_kwargs},
+                f'employee_cards_{timestamp}.pdf',
+                title='Employee Cards PDF',
+            )
+            result.update({'status': 'success', 'message': f'Generating {len(employees)} employee cards in background'})
+            return result
+
         # Generate HTML for cards
         frappe.logger().info(f"Generating HTML for employee cards (with_barcode={with_barcode}, page_size={page_size}, name_font_size={name_font_size}pt, max_length_font_20={max_length_font_20})")
-        html = generate_employee_cards_html(employees, with_barcode=with_barcode, page_size=page_size, name_font_size=name_font_size, max_length_font_20=max_length_font_20, card_border_radius=card_border_radius, bg_color=bg_color, border_color=border_color)
+        html = generate_employee_cards_html(employees, **card_kwargs)
 
         # Debug: Save HTML to file for inspection (uncomment if needed)
         # html_path = f'/tmp/employee_cards_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.html'
@@ -544,23 +546,7 @@ def generate_employee_cards_pdf(employee_ids, with_barcode=0, page_size='A4', na
         # Convert HTML to PDF with better error handling
         frappe.logger().info("Converting HTML to PDF")
         try:
-            # Set PDF options based on page size
-            # CRITICAL: Margins must match CSS @page margins
-            pdf_options = {
-                'page-size': page_size,
-                'orientation': 'Landscape' if page_size == 'A5' else 'Portrait',
-                'margin-top': '5mm',
-                'margin-bottom': '5mm',
-                'margin-left': '5mm',
-                'margin-right': '5mm',
-                'encoding': 'UTF-8',
-                'no-outline': None,
-                'enable-local-file-access': None,  # Allow loading local images
-                'dpi': 96,  # Standard DPI
-                'zoom': 1.0,  # NO SCALING
-                'disable-smart-shrinking': None  # Prevent auto-shrinking
-            }
-            pdf_data = get_pdf(html, pdf_options)
+            pdf_data = get_pdf(html, get_employee_cards_pdf_options(page_size))
         except Exception as pdf_err:
             error_msg = str(pdf_err)
             frappe.logger().error(f"PDF generation error: {error_msg}")
@@ -594,6 +580,93 @@ def generate_employee_cards_pdf(employee_ids, with_barcode=0, page_size='A4', na
         frappe.log_error(f"Error: {str(e)}\n\nTraceback:\n{error_trace}", "Employee Cards PDF Error")
         frappe.throw(_("Failed to generate employee cards PDF: {0}").format(str(e)))
 
+# Above this many cards the PDF is built in a background job, CARD_PAGES_PER_CHUNK
+# pages per wkhtmltopdf run (see build_employee_cards_chunks)
+CARD_ASYNC_THRESHOLD = 100
+CARD_PAGES_PER_CHUNK = 5
+
+
+def get_employee_cards_pdf_options(page_size):
+    """wkhtmltopdf options for the card sheets"""
+    # Set PDF options based on page size
+    # CRITICAL: Margins must match CSS @page margins
+    return {
+        'page-size': page_size,
+        'orientation': 'Landscape' if page_size == 'A5' else 'Portrait',
+        'margin-top': '5mm',
+        'margin-bottom': '5mm',
+        'margin-left': '5mm',
+        'margin-right': '5mm',
+        'encoding': 'UTF-8',
+        'no-outline': None,
+        'enable-local-file-access': None,  # Allow loading local images
+        'dpi': 96,  # Standard DPI
+        'zoom': 1.0,  # NO SCALING
+        'disable-smart-shrinking': None  # Prevent auto-shrinking
+    }
+
+
+def _render_employee_cards_chunk(payload):
+    """pdf_batch thread worker: HTML + PDF for one page-aligned chunk of cards"""
+    employees, card_kwargs = payload
+    html = generate_employee_cards_html(employees, **card_kwargs)
+    return get_pdf(html, get_employee_cards_pdf_options(card_kwargs['page_size']))
+
+
+def build_employee_cards_chunks(employees, card_kwargs):
+    """
+    pdf_batch builder: split cards into chunks of whole sheets (front + back pages
+    stay paired for duplex printing) and render them in parallel
+    """
+    from customize_erpnext.api.pdf_batch import page_chunks, render_in_threads
+
+    cards_per_page = 4 if card_kwargs['page_size'] == 'A5' else 10
+    chunks = page_chunks(employees, cards_per_page, CARD_PAGES_PER_CHUNK)
+    return render_in_threads(_render_employee_cards_chunk, [(chunk, card_kwargs) for chunk in chunks])
+
+
+def load_card_employees(employee_ids):
+    """Card fields for the given employees in one query, keeping the order of employee_ids."""
+    rows = frappe.get_all(
+        'Employee',
+        filters={'name': ['in', list(employee_ids)]},
+        fields=['name', 'employee_name', 'custom_section', 'image'],
+    ) if employee_ids else []
+    by_name = {row.name: row for row in rows}
+
+    employees = []
+    for emp_id in employee_ids:
+        emp = by_name.get(emp_id)
+        if not emp:
+            frappe.logger().error(f"Error loading employee {emp_id}: not found")
+            continue
+        employees.append({
+            'name': emp.name,
+            'employee_name': emp.employee_name or '',
+            'custom_section': emp.custom_section or '',
+            'image': emp.image or ''
+        })
+    return employees
+
+
+def get_employee_reissue_counts(employee_ids):
+    """{employee: reissue_number} for many employees — same rule as get_employee_reissue_count, one query."""
+    employee_ids = [e for e in employee_ids if e]
+    counts = {emp_id: 1 for emp_id in employee_ids}
+    if not employee_ids:
+        return counts
+    rows = frappe.db.sql("""
+        SELECT employee, MAX(reissue_count)
+        FROM `tabEmployee Item Reissue`
+        WHERE employee IN %(employees)s
+        GROUP BY employee
+    """, {"employees": employee_ids})
+    for employee, reissue_count in rows:
+        if reissue_count:
+            counts[employee] = reissue_count + 1
+    return counts
+
+
 def get_employee_reissue_count(employee_id):
     """Get the reissue count for an employee from Employee Item Reissue doctype"""
     # Default is 1 for first issuance
@@ -637,6 +710,22 @@ def generate_employee_cards_html(employees, with_barcode=False, page_size='A4',
     # Get company logo
     company_logo = get_company_logo()
 
+    # Preload photos (cached thumbnails, resized in parallel) and reissue numbers
+    # for every card at once instead of per card
+    photos = get_photo_thumbnails(
+        [e.get('image') for e in employees if e.get('image') and not e['image'].startswith(('data:', 'http'))],
+        CARD_PHOTO_BOX, fmt='auto', quality=85
+    )
+    reissue_counts = get_employee_reissue_counts([e.get('name') for e in employees])
+    employees = [
+        dict(
+            e,
+            photo_data_uri=_thumbnail_data_uri(photos.get(e.get('image'))),
+            reissue_number=reissue_counts.get(e.get('name'), 1),
+        )
+        for e in employees
+    ]
+
     # Determine page orientation and size
     page_orientation = 'landscape' if page_size == 'A5' else 'portrait'
 
@@ -952,7 +1041,8 @@ def generate_single_card_html(employee, company_logo, with_barcode=False, max_le
     """Generate HTML for a single employee card with customizable name length threshold"""
 
     # Get employee image URL - always returns a valid base64 image or placeholder
-    emp_image_url = get_full_image_url(employee.get('image', ''))
+    # (generate_employee_cards_html preloads a cached thumbnail as photo_data_uri)
+    emp_image_url = employee.get('photo_data_uri') or get_full_image_url(employee.get('image', ''))
 
     # Escape HTML special characters in text
     employee_name = frappe.utils.escape_html(employee.get('employee_name', ''))
@@ -960,7 +1050,7 @@ def generate_single_card_html(employee, company_logo, with_barcode=False, max_le
     employee_section = frappe.utils.escape_html(employee.get('custom_section', ''))
 
     # Get the reissue number for this employee
-    reissue_number = get_employee_reissue_count(employee_code)
+    reissue_number = employee.get('reissue_number') or get_employee_reissue_count(employee_code)
     reissue_display = reissue_number if reissue_number > 1 else ''
 
     # New logic: use max_length_font_20 as threshold
@@ -1197,6 +1287,49 @@ def get_placeholder_image(type='no-photo'):
     return f'data:image/svg+xml;base64,{base64_svg}'
 
 
+# Thumbnail cache: key = (file, mtime, target size, format, quality) — see photo_thumbnails
+PHOTO_THUMB_CACHE_PREFIX = 'employee_photo_thumb:'
+PHOTO_THUMB_CACHE_TTL = 7 * 24 * 3600
+# Card photo 30mm x 40mm at 300 DPI
+CARD_PHOTO_BOX = (360, 480)
+# Employee list photo 2cm x 1.5cm at 300 DPI
+LIST_PHOTO_BOX = (int((2 / 2.54) * 300), int((1.5 / 2.54) * 300))
+
+
+def get_photo_thumbnails(image_urls, box, fmt='JPEG', quality=60):
+    """
+    {image_url: (mime, base64) | None} for many photos.
+
+    Paths are resolved and cache keys built in this thread (frappe.cache() needs
+    frappe.local); only cache misses are decoded/resized, in a thread pool.
+    """
+    site_path = frappe.get_site_path()
+    files_path = get_files_path()
+    paths = {url: resolve_photo_path(url, site_path, files_path) for url in set(filter(None, image_urls))}
+    keys = {path: thumbnail_key(path, box, fmt, quality) for path in set(filter(None, paths.values()))}
+
+    thumbnails = {}
+    misses = []
+    for path, key in keys.items():
+        cached = frappe.cache().get_value(PHOTO_THUMB_CACHE_PREFIX + key) if key else None
+        if cached:
+            thumbnails[path] = tuple(cached)
+        else:
+            misses.append(path)
+
+    for path, thumb in build_thumbnails(misses, box, fmt, quality).items():
+        thumbnails[path] = thumb
+        if thumb and keys.get(path):
+            frappe.cache().set_value(PHOTO_THUMB_CACHE_PREFIX + keys[path], list(thumb),
+                                     expires_in_sec=PHOTO_THUMB_CACHE_TTL)
+
+    return {url: thumbnails.get(path) if path else None for url, path in paths.items()}
+
+
+def _thumbnail_data_uri(thumb):
+    return f'data:{thumb[0]};base64,{thumb[1]}' if thumb else None
+
+
 @frappe.whitelist()
 def get_file_content_base64(file_url):
     """
@@ -1874,12 +2007,10 @@ def get_employee_data(employees=None, include_department=1, include_section=0):
         order_by="name"
     )
     
-    # Process employee images - with optimizations for size
+    # Process employee images - cached thumbnails, resized in parallel
+    photos = get_employee_list_photos(employee_data)
     for emp in employee_data:
-        # Try various methods to get the image
-        image_result = process_employee_photo_optimized(emp.get("image"), emp.get("name"))
-        
-        emp["image_data"] = image_result
+        emp["image_data"] = photos.get(emp.get("name"))
         
         # Map section field if found - now section_field is always defined
         if section_field and section_field in emp:
@@ -1888,6 +2019,47 @@ def get_employee_data(employees=None, include_department=1, include_section=0):
     return employee_data
 
 
+def get_employee_list_photos(employees):
+    """
+    Base64 JPEG photo (or initials placeholder) for many employees at once
+    
+    Args:
+        employees: dicts with name, image and (optionally) employee_name
+        
+    Returns:
+        dict: {employee_id: base64 image data}
+    """
+    thumbs = get_photo_thumbnails([emp.get("image") for emp in employees], LIST_PHOTO_BOX)
+    
+    # Image set but not found on disk: fall back to the employee's public image
+    # attachments - one File query for all of them
+    unresolved = [emp.get("name") for emp in employees if emp.get("image") and not thumbs.get(emp.get("image"))]
+    attachment_urls = {}
+    if unresolved:
+        for attachment in frappe.get_all(
+            "File",
+            fields=["attached_to_name", "file_url"],
+            filters={
+                "attached_to_doctype": "Employee",
+                "attached_to_name": ["in", unresolved],
+                "is_private": 0
+            }
+        ):
+            file_url = attachment.get("file_url")
+            if file_url and file_url.lower().endswith(('.jpg', '.jpeg', '.png')):
+                attachment_urls.setdefault(attachment.attached_to_name, []).append(file_url)
+        thumbs.update(get_photo_thumbnails(
+            [url for urls in attachment_urls.values() for url in urls], LIST_PHOTO_BOX))
+    
+    result = {}
+    for emp in employees:
+        emp_id = emp.get("name")
+        candidates = [emp.get("image")] + attachment_urls.get(emp_id, [])
+        thumb = next((thumbs[url] for url in candidates if url and thumbs.get(url)), None)
+        result[emp_id] = thumb[1] if thumb else generate_placeholder_image(emp_id, emp.get("employee_name"))
+    return result
+
+
 def process_employee_photo_optimized(image_url, employee_id):
     """
     Process employee photo with optimizations for file size
@@ -1897,114 +2069,39 @@ def process_employee_photo_optimized(image_url, employee_id):
         employee_id: Employee ID for direct lookup
         
     Returns:
-        str: Base64 encoded image data or empty string
+        str: Base64 encoded image data or placeholder
     """
     try:
-        # Start with standard path processing
-        if image_url:
-            # Remove leading slash if present
-            if image_url.startswith("/"):
-                image_url = image_url[1:]
-            
-            # Get full path to image
-            site_path = frappe.get_site_path()
-            img_path = os.path.join(site_path, "public", image_url)
-            
-            # Check if file exists
-            if not os.path.exists(img_path):
-                # Try alternative path formats
-                alt_paths = [
-                    os.path.join(site_path, image_url),
-                    os.path.join(get_files_path(), os.path.basename(image_url)),
-                    os.path.join(site_path, "public", "files", os.path.basename(image_url)),
-                    os.path.join(site_path, "public", "files", "employee_photos", os.path.basename(image_url)),
-                    os.path.join(site_path, "private", "files", os.path.basename(image_url))
-                ]
-                
-                for path in alt_paths:
-                    if path and os.path.exists(path):
-                        img_path = path
-                        break
-                else:
-                    # Try to get from attachments
-                    attachments = frappe.get_all(
-                        "File",
-                        fields=["file_url", "file_name"],
-                        filters={
-                            "attached_to_doctype": "Employee",
-                            "attached_to_name": employee_id,
-                            "is_private": 0
-                        }
-                    )
-                    
-                    for attachment in attachments:
-                        file_url = attachment.get("file_url")
-                        if file_url and file_url.lower().endswith(('.jpg', '.jpeg', '.png')):
-                            img_path = os.path.join(site_path, "public", file_url.lstrip("/"))
-                            if os.path.exists(img_path):
-                                break
-                    else:
-                        # Generate a placeholder with initials
-                        return generate_placeholder_image(employee_id)
-        else:
-            # No image URL, generate placeholder
-            return generate_placeholder_image(employee_id)
-                
-        # Process the image with size optimizations
-        try:
-            # Open and resize image
-            img = Image.open(img_path)
-            
-            # Calculate desired size - smaller size to reduce PDF file size
-            # 1 inch = 2.54 cm
-            # 2cm = (2/2.54) inches = (2/2.54)*300 pixels
-            # 1.5cm = (1.5/2.54) inches = (1.5/2.54)*300 pixels
-            width_px = int((2/2.54) * 300)  # Using 300 DPI instead of 300 for smaller file size
-            height_px = int((1.5/2.54) * 300)
-            
-            # Resize maintaining aspect ratio
-            img.thumbnail((width_px, height_px), Image.Resampling.LANCZOS)
-            
-            # Convert to RGB if needed
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Convert to base64 with reduced quality for smaller size
-            buffered = io.BytesIO()
-            img.save(buffered, format="JPEG", quality=60)  # Lower quality (60 instead of 95)
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-            
-            return img_str
-        except Exception:
-            # If image processing fails, create a placeholder
-            return generate_placeholder_image(employee_id)
+        return get_employee_list_photos([{"name": employee_id, "image": image_url}])[employee_id]
     except Exception:
         # Silent error handling - return placeholder on any error
         return generate_placeholder_image(employee_id)
 
 
-def generate_placeholder_image(employee_id):
+def generate_placeholder_image(employee_id, employee_name=None):
     """
     Generate a placeholder image for employees without photos
     
     Args:
         employee_id: Employee ID to generate placeholder for
+        employee_name: Employee name (looked up when not given)
         
     Returns:
         str: Base64 encoded placeholder image
     """
     try:
         # Get employee details for the placeholder
-        employee = frappe.get_doc("Employee", employee_id)
-        if not employee:
+        if employee_name is None:
+            employee_name = frappe.db.get_value("Employee", employee_id, "employee_name")
+        if not employee_name:
             return ""
             
         # Create a colorful placeholder with initials
-        name_parts = employee.employee_name.split()
+        name_parts = employee_name.split()
         initials = ''.join([part[0].upper() for part in name_parts if part])[:2]
         
         # Create colored background based on name hash
-        name_hash = sum(ord(c) for c in employee.employee_name)
+        name_hash = sum(ord(c) for c in employee_name)
         colors = [
             (240, 98, 146),  # Pink
             (186, 104, 200),  # Purple
@@ -2283,43 +2380,58 @@ def generate_employee_list_html(employee_data, company_name, include_department=
     """
     
     return html
-def check_employee_maternity_status(employee, attendance_date):
-	"""Cấu trúc mới: 1 record/employee với 3 cặp ngày riêng biệt."""
+def load_maternity_index(employees):
+	"""IntervalIndex {employee: giai đoạn thai sản} cho nhiều nhân viên — một query.
+
+	Giá trị là (maternity_status, apply_pregnant_benefit), add theo đúng thứ tự ưu tiên
+	của check_employee_maternity_status: Maternity Leave → Young Child → Pregnant.
+	Mỗi nhân viên chỉ lấy record đầu tiên (cấu trúc mới: 1 record/employee).
+	"""
 	from frappe.utils import getdate
-	apply_pregnant_benefit = False
-	maternity_status = None
+	from customize_erpnext.overrides.interval_index import IntervalIndex
 
-	em = frappe.db.sql("""
-		SELECT pregnant_from_date, pregnant_to_date, estimated_due_date,
+	index = IntervalIndex()
+	employees = list(dict.fromkeys(e for e in employees if e))
+	if not employees:
+		return index
+
+	records = frappe.db.sql("""
+		SELECT employee, pregnant_from_date, pregnant_to_date, estimated_due_date,
 		       maternity_from_date, maternity_to_date,
 		       youg_child_from_date, youg_child_to_date,
 		       apply_benefit
 		FROM `tabEmployee Maternity`
-		WHERE employee = %(employee)s
-		LIMIT 1
-	""", {"employee": employee}, as_dict=True)
-
-	if not em:
-		return maternity_status, apply_pregnant_benefit
-
-	rec = em[0]
-	check_d = getdate(attendance_date)
-
-	if rec.maternity_from_date and rec.maternity_to_date:
-		if getdate(rec.maternity_from_date) <= check_d <= getdate(rec.maternity_to_date):
-			return "Maternity Leave", True
+		WHERE employee IN %(employees)s
+	""", {"employees": employees}, as_dict=True)
+
+	seen = set()
+	for rec in records:
+		if rec.employee in seen:
+			continue
+		seen.add(rec.employee)
+		if rec.maternity_from_date and rec.maternity_to_date:
+			index.add(rec.employee, getdate(rec.maternity_from_date), getdate(rec.maternity_to_date),
+				("Maternity Leave", True))
+		if rec.youg_child_from_date and rec.youg_child_to_date:
+			index.add(rec.employee, getdate(rec.youg_child_from_date), getdate(rec.youg_child_to_date),
+				("Young Child", True))
+		eff_to = rec.pregnant_to_date or rec.estimated_due_date
+		if rec.pregnant_from_date and eff_to:
+			index.add(rec.employee, getdate(rec.pregnant_from_date), getdate(eff_to),
+				("Pregnant", bool(rec.apply_benefit)))
+	return index
 
-	if rec.youg_child_from_date and rec.youg_child_to_date:
-		if getdate(rec.youg_child_from_date) <= check_d <= getdate(rec.youg_child_to_date):
-			return "Young Child", True
 
-	if rec.pregnant_from_date:
-		eff_to = rec.pregnant_to_date or rec.estimated_due_date
-		if eff_to and getdate(rec.pregnant_from_date) <= check_d <= getdate(eff_to):
-			apply_benefit = bool(rec.apply_benefit)
-			return "Pregnant", apply_benefit
+def check_employee_maternity_status(employee, attendance_date, maternity_index=None):
+	"""Cấu trúc mới: 1 record/employee với 3 cặp ngày riêng biệt.
 
-	return maternity_status, apply_pregnant_benefit
+	Caller lặp nhiều ngày / nhiều nhân viên nên truyền `maternity_index` dựng sẵn bằng
+	load_maternity_index() thay vì mỗi lần gọi một query.
+	"""
+	from frappe.utils import getdate
+	if maternity_index is None:
+		maternity_index = load_maternity_index([employee])
+	return maternity_index.get(employee, getdate(attendance_date), (None, False))
 
 @frappe.whitelist()
 def get_employees_of_assigntment_shifts_on_date(shift_type, attendance_date):
@@ -2732,6 +2844,10 @@ def get_employees_for_excel(
 	page_size=500,
 	lang="en",
 	field_set="all",
+	feed=0,
+	after=None,
+	modified_since=None,
+	feed_format="json",
 ):
 	"""
 	API for Excel / Power Query – returns employee list with full or basic fields.
@@ -2751,6 +2867,13 @@ def get_employees_for_excel(
 		                            date_of_joining, department, custom_section,
 		                            custom_group, designation, relieving_date,
 		                            reason_for_leaving
+		feed              : 1 = feed mode (api/excel_feed.py) — keyset pagination
+		                    on employee ID, no COUNT; page_size up to 5000
+		                    (0 = all), `page` is ignored
+		after             : feed – next_after of the previous page
+		modified_since    : feed – server_time of the previous refresh → only
+		                    changed rows; out-of-filter rows come back in `removed`
+		feed_format       : feed – 'json' | 'columnar' | 'csv.gz'
 
 	Returns:
 		{
@@ -2762,7 +2885,10 @@ def get_employees_for_excel(
 			"page_size"   : int,
 			"total_pages" : int,
 		}
+		Feed mode: { data | rows, columns, col_keys, removed, next_after,
+		server_time } — or a csv.gz file (see send_excel_feed).
 	"""
+	requested_page_size = page_size
 	page      = cint(page)
 	page_size = cint(page_size)
 	load_all  = page_size == 0           # page_size=0 → no LIMIT, return all
@@ -2823,6 +2949,26 @@ def get_employees_for_excel(
 
 	select_sql = ", ".join(select_fields)
 
+	if cint(feed):
+		result = query_excel_feed(
+			select_sql=select_sql,
+			from_sql="FROM `tabEmployee` emp",
+			key_sql="emp.name",
+			key_field="employee",
+			modified_sql="emp.modified >= %(modified_since)s",
+			conditions=conditions,
+			params=params,
+			after=after,
+			modified_since=modified_since,
+			page_size=requested_page_size,
+			deleted_doctype="Employee",
+		)
+		rows = [{k: clean_value(v) for k, v in row.items()} for row in result.data]
+		return send_excel_feed(
+			result, rows, col_order, [label_dict.get(f, f) for f in col_order],
+			key_field="employee", feed_format=feed_format, filename="employees",
+		)
+
 	# Count
 	total = frappe.db.sql(
 		f"SELECT COUNT(*) FROM `tabEmployee` emp {where_sql}",
@@ -2860,17 +3006,7 @@ def get_employees_for_excel(
 		)
 
 	# Sanitize: None → "", date → ISO string
-	cleaned = []
-	for row in rows:
-		r = {}
-		for k, v in row.items():
-			if v is None:
-				r[k] = ""
-			elif hasattr(v, "isoformat"):
-				r[k] = v.isoformat()
-			else:
-				r[k] = v
-		cleaned.append(r)
+	cleaned = [{k: clean_value(v) for k, v in row.items()} for row in rows]
 
 	columns = [label_dict.get(f, f) for f in col_order]
 
@@ -2883,3 +3019,108 @@ def get_employees_for_excel(
 		"page_size"   : page_size,
 		"total_pages" : math.ceil(total / page_size) if page_size else 1,
 	}
+
+
+def query_excel_feed(
+	select_sql,
+	from_sql,
+	key_sql,
+	key_field,
+	modified_sql,
+	conditions,
+	params,
+	after=None,
+	modified_since=None,
+	page_size=None,
+	deleted_doctype=None,
+):
+	"""Keyset / delta page for the Power Query feeds (api/excel_feed.py).
+
+	Normal refresh: the filters go into WHERE. Delta refresh: WHERE is only
+	"changed since", and the filters become the _in_scope column so rows that
+	left the filter set are reported as removed instead of silently kept.
+	`server_time` is taken before the query — the next delta starts there, and
+	rows written during this read are simply sent again.
+
+	Returns:
+		frappe._dict(data, removed, next_after, server_time)
+	"""
+	server_time = str(frappe.utils.now_datetime())
+	page_size = feed_page_size(page_size)
+	params = dict(params)
+	where = []
+
+	if modified_since:
+		params["modified_since"] = frappe.utils.get_datetime(modified_since)
+		where.append(modified_sql)
+		scope_sql = f"COALESCE(({' AND '.join(conditions)}), 0)" if conditions else "1"
+	else:
+		where.extend(conditions)
+		scope_sql = "1"
+
+	if after:
+		where.append(f"{key_sql} > %(after)s")
+		params["after"] = after
+
+	limit_sql = ""
+	if page_size:
+		limit_sql = "LIMIT %(limit)s"
+		params["limit"] = page_size
+
+	where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+	rows = frappe.db.sql(
+		f"""
+		SELECT {select_sql}, {scope_sql} AS `{IN_SCOPE}`
+		{from_sql}
+		{where_sql}
+		ORDER BY {key_sql}
+		{limit_sql}
+		""",
+		params,
+		as_dict=True,
+	)
+	data, removed, next_after = split_page(rows, key_field, page_size)
+
+	# Deleted records: once per refresh, on the first page
+	if modified_since and not after and deleted_doctype:
+		removed = frappe.get_all(
+			"Deleted Document",
+			filters={
+				"deleted_doctype": deleted_doctype,
+				"creation": [">=", params["modified_since"]],
+			},
+			pluck="deleted_name",
+		) + removed
+
+	return frappe._dict(data=data, removed=removed, next_after=next_after, server_time=server_time)
+
+
+def send_excel_feed(result, rows, col_keys, columns, key_field, feed_format="json", filename="export"):
+	"""Response of a feed page in the requested format.
+
+	json / columnar return a dict (whitelisted method → {"message": ...}).
+	csv.gz is sent as a binary file: header = column labels, the cursor and
+	watermark go in the X-Next-After / X-Server-Time response headers.
+	"""
+	feed_format = feed_format if feed_format in EXCEL_FEED_FORMATS else "json"
+	meta = {
+		"removed": result.removed,
+		"next_after": result.next_after,
+		"server_time": result.server_time,
+	}
+	if feed_format == "json":
+		return {"data": rows, "columns": columns, "col_keys": col_keys, **meta}
+
+	values = to_columnar(rows, col_keys)
+	if feed_format == "columnar":
+		return {"rows": values, "columns": columns, "col_keys": col_keys, **meta}
+
+	frappe.response["type"] = "binary"
+	frappe.response["filename"] = f"{filename}.csv.gz"
+	frappe.response["filecontent"] = encode_csv_gz(
+		columns, values, result.removed, col_keys.index(key_field)
+	)
+	response_headers = getattr(frappe.local, "response_headers", None)
+	if response_headers is not None:
+		response_headers["X-Next-After"] = result.next_after or ""
+		response_headers["X-Server-Time"] = result.server_time
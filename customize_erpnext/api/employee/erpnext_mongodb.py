@@ -5,14 +5,27 @@
 """
 ERPNext MongoDB Integration for Employee Sync
 Automatically syncs Employee data from ERPNext to MongoDB
+
+  - Hooks (sync_employee_to_mongodb / delete_employee_from_mongodb) reuse one
+    pooled client per worker (mongodb_mirror.get_client).
+  - sync_all_employees builds every document from ONE SQL projection and writes
+    them with bulk_write in chunks; incremental=1 only pushes employees
+    modified since the stored watermark (sync_modified_employees, scheduler).
+
+Connection: site_config `mongodb_employee_uri` (e.g. mongodb://localhost:27017
+for a local mongod) overrides MONGODB_HOST / MONGODB_PORT.
 """
 
 from __future__ import unicode_literals
 import frappe
 from frappe import _
-from pymongo import MongoClient, errors
-from datetime import datetime
 from customize_erpnext.api.site_restriction import only_for_sites
+from customize_erpnext.api.employee.mongodb_mirror import (
+    bulk_upsert,
+    get_client,
+    transform_employee_data,
+    upsert_one,
+)
 
 # MongoDB connection settings
 MONGODB_HOST = "10.0.1.4"
@@ -20,29 +33,30 @@ MONGODB_PORT = 27017
 MONGODB_DB = "tiqn"
 MONGODB_COLLECTION = "Employee"
 
+# Global default holding `modified` of the last employee pushed
+WATERMARK_KEY = "mongodb_employee_sync_watermark"
+
+# Employee columns read by transform_employee_data (one SQL projection)
+EMPLOYEE_COLUMNS = (
+    "name", "employee_name", "gender", "department", "custom_group", "custom_section",
+    "designation", "grade", "status", "attendance_device_id",
+    "date_of_birth", "date_of_joining", "relieving_date", "modified",
+)
+
+
+def _mongodb_uri():
+    return frappe.conf.get("mongodb_employee_uri") or f"mongodb://{MONGODB_HOST}:{MONGODB_PORT}"
+
+
 def get_mongodb_connection():
     """
-    Get MongoDB connection and return collection
-    Returns: MongoDB collection object or None if connection fails
+    Get the pooled MongoDB client and return collection
+    Returns: (collection, client) or (None, None) if the client cannot be created.
+    The client is shared by the worker — callers must NOT close it.
     """
     try:
-        client = MongoClient(
-            host=MONGODB_HOST,
-            port=MONGODB_PORT,
-            serverSelectionTimeoutMS=5000,  # 5 second timeout
-            connectTimeoutMS=5000
-        )
-        # Test connection
-        client.server_info()
-        db = client[MONGODB_DB]
-        collection = db[MONGODB_COLLECTION]
-        return collection, client
-    except errors.ServerSelectionTimeoutError as e:
-        frappe.log_error(
-            message=f"MongoDB Connection Timeout: {str(e)}",
-            title="MongoDB Connection Error"
-        )
-        return None, None
+        client = get_client(_mongodb_uri())
+        return client[MONGODB_DB][MONGODB_COLLECTION], client
     except Exception as e:
         frappe.log_error(
             message=f"MongoDB Connection Error: {str(e)}",
@@ -51,76 +65,6 @@ def get_mongodb_connection():
         return None, None
 
 
-def transform_employee_data(doc):
-    """
-    Transform ERPNext Employee document to MongoDB format
-
-    Args:
-        doc: ERPNext Employee document
-
-    Returns:
-        dict: Transformed data for MongoDB
-    """
-    # Gender mapping
-    gender_map = {
-        "Female": "F",
-        "Male": "M"
-    }
-
-    # Status mapping
-    status_map = {
-        "Active": "Working",
-        "Left": "Resigned"
-    }
-
-    # Department cleanup - remove " - TIQN" suffix
-    department = doc.get("department") or ""
-    if department:
-        department = department.replace(" - TIQN", "").strip()
-
-    # Handle relieving_date - if empty, use 2099-01-01
-    relieving_date = doc.get("relieving_date")
-    if not relieving_date:
-        relieving_date = datetime(2099, 1, 1)
-    else:
-        # Convert string date to datetime if needed
-        if isinstance(relieving_date, str):
-            relieving_date = datetime.strptime(relieving_date, "%Y-%m-%d")
-
-    # Handle other dates
-    def convert_date(date_value):
-        """Convert date to datetime object"""
-        if not date_value:
-            return None
-        if isinstance(date_value, str):
-            return datetime.strptime(date_value, "%Y-%m-%d")
-        return date_value
-
-    # Build MongoDB document with all fields from collection
-    mongo_doc = {
-        "empId": doc.get("name") or "",
-        "name": doc.get("employee_name") or "",
-        "gender": gender_map.get(doc.get("gender"), ""),
-        "department": department,
-        "group": doc.get("custom_group") or "",
-        "section": doc.get("custom_section") or "",
-        "position": doc.get("designation") or "",
-        "level": doc.get("grade") or "",
-        "workStatus": status_map.get(doc.get("status"), ""),
-        "attFingerId": int(doc.get("attendance_device_id")) or 0,
-        "dob": convert_date(doc.get("date_of_birth")),
-        "joiningDate": convert_date(doc.get("date_of_joining")),
-        "resignOn": relieving_date,
-        # Additional fields from MongoDB collection
-        "directIndirect": "",
-        "lineTeam": doc.get("custom_group") or "",
-        "sewingNonSewing": "",
-        "supporting": ""
-    }
-
-    return mongo_doc
-
-
 @only_for_sites("erp.tiqn.local")
 def sync_employee_to_mongodb(doc, method=None):
     """
@@ -141,38 +85,9 @@ def sync_employee_to_mongodb(doc, method=None):
             )
             return
 
-        # Transform data
-        mongo_doc = transform_employee_data(doc)
-
-        # Check if employee exists in MongoDB
-        existing = collection.find_one({"empId": doc.name})
-
-        if existing:
-            # Update existing document (don't update _id)
-            result = collection.update_one(
-                {"empId": doc.name},
-                {"$set": mongo_doc}
-            )
-            frappe.logger().info(
-                f"Updated Employee {doc.name} in MongoDB - Modified: {result.modified_count}"
-            )
-        else:
-            # Get next _id value
-            max_id_doc = collection.find_one(sort=[("_id", -1)])
-            next_id = (max_id_doc["_id"] + 1) if max_id_doc else 1
-
-            # Add _id to document
-            mongo_doc["_id"] = next_id
-
-            # Insert new document
-            result = collection.insert_one(mongo_doc)
-            frappe.logger().info(
-                f"Inserted Employee {doc.name} to MongoDB - ID: {result.inserted_id}"
-            )
-
-        # Close connection
-        if client is not None:
-            client.close()
+        # One round trip when the employee is already mirrored
+        action = upsert_one(collection, transform_employee_data(doc))
+        frappe.logger().info(f"{action.capitalize()} Employee {doc.name} in MongoDB")
 
     except Exception as e:
         frappe.log_error(
@@ -213,10 +128,6 @@ def delete_employee_from_mongodb(doc, method=None):
                 f"Employee {doc.name} not found in MongoDB for deletion"
             )
 
-        # Close connection
-        if client is not None:
-            client.close()
-
     except Exception as e:
         frappe.log_error(
             message=f"Error deleting Employee {doc.name} from MongoDB: {str(e)}\n{frappe.get_traceback()}",
@@ -242,13 +153,9 @@ def test_mongodb_connection():
                 "message": "Failed to connect to MongoDB"
             }
 
-        # Test query
+        # Test query (also opens the connection)
         count = collection.count_documents({})
 
-        # Close connection
-        if client is not None:
-            client.close()
-
         return {
             "success": True,
             "message": f"Successfully connected to MongoDB. Collection has {count} documents.",
@@ -266,45 +173,81 @@ def test_mongodb_connection():
         }
 
 
+def _fetch_employee_rows(since=None):
+    """Employee rows for the mirror — one SQL projection, oldest change first."""
+    columns = ", ".join(f"`{c}`" for c in EMPLOYEE_COLUMNS)
+    condition, values = "", {}
+    if since:
+        # >= : rows saved in the same second as the watermark are re-sent (idempotent)
+        condition, values = "WHERE `modified` >= %(since)s", {"since": since}
+    return frappe.db.sql(
+        f"SELECT {columns} FROM `tabEmployee` {condition} ORDER BY `modified`, `name`",
+        values,
+        as_dict=True,
+    )
+
+
 @frappe.whitelist()
-def sync_all_employees():
+def sync_all_employees(incremental=0):
     """
-    Manually sync all active employees to MongoDB
-    Useful for initial setup or bulk sync
+    Sync employees to MongoDB with bulk writes
+    Full mode (default): every Employee — initial setup or repair.
+    incremental=1: only employees modified since the stored watermark.
 
     Returns:
         dict: Sync results
     """
     try:
-        # Get all employees
-        employees = frappe.get_all(
-            "Employee",
-            fields=["name"]
-        )
+        incremental = frappe.utils.cint(incremental)
+        since = frappe.db.get_global(WATERMARK_KEY) if incremental else None
+        rows = _fetch_employee_rows(since)
 
-        success_count = 0
-        error_count = 0
-        errors = []
+        collection, client = get_mongodb_connection()
+        if collection is None:
+            return {
+                "success": False,
+                "message": "Failed to connect to MongoDB"
+            }
 
-        for emp in employees:
+        docs, errors = [], []
+        for row in rows:
             try:
-                doc = frappe.get_doc("Employee", emp.name)
-                sync_employee_to_mongodb(doc)
-                success_count += 1
+                docs.append(transform_employee_data(row))
             except Exception as e:
-                error_count += 1
-                errors.append(f"{emp.name}: {str(e)}")
+                errors.append({"empId": row.name, "message": str(e)})
+
+        result = bulk_upsert(collection, docs)
+        errors += result["errors"]
+
+        # Only advance when every row went through, so failed rows are retried
+        if rows and not errors:
+            frappe.db.set_global(WATERMARK_KEY, str(rows[-1].modified))
+            frappe.db.commit()
 
         return {
             "success": True,
-            "total": len(employees),
-            "synced": success_count,
-            "errors": error_count,
-            "error_details": errors
+            "mode": "incremental" if incremental else "full",
+            "since": since,
+            "total": len(rows),
+            "synced": len(docs) - len(result["errors"]),
+            "inserted": result["inserted"],
+            "modified": result["modified"],
+            "errors": len(errors),
+            "error_details": [f"{e['empId']}: {e['message']}" for e in errors]
         }
 
     except Exception as e:
+        frappe.log_error(
+            message=f"Error syncing employees to MongoDB: {str(e)}\n{frappe.get_traceback()}",
+            title="MongoDB Sync Error"
+        )
         return {
             "success": False,
             "message": f"Error: {str(e)}"
         }
+
+
+@only_for_sites("erp.tiqn.local")
+def sync_modified_employees():
+    """Scheduler task: push employees changed since the last run (incremental mode)."""
+    return sync_all_employees(incremental=1)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, IT Team - TIQN and contributors
+# For license information, please see license.txt
+
+"""
+MongoDB side of the Employee mirror (pymongo only — no frappe)
+
+erpnext_mongodb.py decides WHICH employees to push; this module turns Employee
+rows into Mongo documents and writes them:
+
+  - get_client(uri): one pooled MongoClient per process and URI. Hooks used to
+    open (and ping) a new client for every Employee save.
+  - bulk_upsert(collection, docs): one `find` for the empIds that already exist
+    and one unordered `bulk_write` per chunk, instead of find_one + update /
+    insert per employee.
+  - upsert_one(collection, doc): single save — one round trip when the
+    employee is already mirrored.
+
+New documents keep the legacy numeric `_id` (max + 1) that other apps reading
+the collection rely on.
+
+Kept free of frappe so it can be tested against a local mongod
+(tests/test_mongodb_mirror.py).
+"""
+
+import threading
+from datetime import date, datetime
+
+from pymongo import MongoClient, UpdateOne, errors
+
+CHUNK_SIZE = 500
+SERVER_TIMEOUT_MS = 5000
+MAX_POOL_SIZE = 10
+RESIGN_PLACEHOLDER = datetime(2099, 1, 1)
+
+GENDER_MAP = {
+    "Female": "F",
+    "Male": "M"
+}
+
+STATUS_MAP = {
+    "Active": "Working",
+    "Left": "Resigned"
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(uri):
+    """Pooled MongoClient for `uri` (thread-safe, created on first use)."""
+    client = _clients.get(uri)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(uri)
+            if client is None:
+                client = MongoClient(
+                    uri,
+                    serverSelectionTimeoutMS=SERVER_TIMEOUT_MS,
+                    connectTimeoutMS=SERVER_TIMEOUT_MS,
+                    maxPoolSize=MAX_POOL_SIZE,
+                )
+                _clients[uri] = client
+    return client
+
+
+def reset_clients():
+    """Close every pooled client (next get_client reconnects)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def _to_datetime(value):
+    """BSON only stores datetime: accept 'YYYY-MM-DD', date or datetime."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], "%Y-%m-%d")
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _to_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def transform_employee_data(doc):
+    """
+    Transform an ERPNext Employee (document or SQL row) to MongoDB format
+
+    Args:
+        doc: anything with .get() — Employee document or dict row
+
+    Returns:
+        dict: Transformed data for MongoDB
+    """
+    # Department cleanup - remove " - TIQN" suffix
+    department = (doc.get("department") or "").replace(" - TIQN", "").strip()
+
+    # Build MongoDB document with all fields from collection
+    return {
+        "empId": doc.get("name") or "",
+        "name": doc.get("employee_name") or "",
+        "gender": GENDER_MAP.get(doc.get("gender"), ""),
+        "department": department,
+        "group": doc.get("custom_group") or "",
+        "section": doc.get("custom_section") or "",
+        "position": doc.get("designation") or "",
+        "level": doc.get("grade") or "",
+        "workStatus": STATUS_MAP.get(doc.get("status"), ""),
+        "attFingerId": _to_int(doc.get("attendance_device_id")),
+        "dob": _to_datetime(doc.get("date_of_birth")),
+        "joiningDate": _to_datetime(doc.get("date_of_joining")),
+        # Empty relieving_date → 2099-01-01
+        "resignOn": _to_datetime(doc.get("relieving_date")) or RESIGN_PLACEHOLDER,
+        # Additional fields from MongoDB collection
+        "directIndirect": "",
+        "lineTeam": doc.get("custom_group") or "",
+        "sewingNonSewing": "",
+        "supporting": ""
+    }
+
+
+def next_numeric_id(collection):
+    """Largest numeric _id + 1 (1 for an empty collection)."""
+    last = collection.find_one({"_id": {"$type": "number"}}, sort=[("_id", -1)], projection={"_id": 1})
+    return int(last["_id"]) + 1 if last else 1
+
+
+def bulk_upsert(collection, docs, chunk_size=CHUNK_SIZE):
+    """
+    Write transformed docs with unordered bulk_write, chunk by chunk.
+
+    Returns:
+        dict: {"matched", "modified", "inserted", "errors": [{"empId", "message"}]}
+    """
+    summary = {"matched": 0, "modified": 0, "inserted": 0, "errors": []}
+    for start in range(0, len(docs), chunk_size):
+        chunk = docs[start:start + chunk_size]
+        emp_ids = [d["empId"] for d in chunk]
+        existing = {
+            d["empId"] for d in collection.find({"empId": {"$in": emp_ids}}, projection={"empId": 1, "_id": 0})
+        }
+
+        next_id = None
+        ops = []
+        for doc in chunk:
+            if doc["empId"] in existing:
+                ops.append(UpdateOne({"empId": doc["empId"]}, {"$set": doc}))
+                continue
+            if next_id is None:
+                next_id = next_numeric_id(collection)
+            ops.append(UpdateOne({"empId": doc["empId"]}, {"$set": doc, "$setOnInsert": {"_id": next_id}}, upsert=True))
+            next_id += 1
+
+        try:
+            result = collection.bulk_write(ops, ordered=False)
+            details = result.bulk_api_result
+        except errors.BulkWriteError as e:
+            details = e.details
+            for err in details.get("writeErrors", []):
+                summary["errors"].append({"empId": chunk[err["index"]]["empId"], "message": err.get("errmsg", "")})
+
+        summary["matched"] += details.get("nMatched", 0)
+        summary["modified"] += details.get("nModified", 0)
+        summary["inserted"] += details.get("nUpserted", 0)
+    return summary
+
+
+def upsert_one(collection, doc, retries=3):
+    """
+    Update one mirrored employee, inserting it with the next numeric _id if new.
+
+    Returns:
+        str: "updated" or "inserted"
+    """
+    if collection.update_one({"empId": doc["empId"]}, {"$set": doc}).matched_count:
+        return "updated"
+    for attempt in range(retries):
+        try:
+            collection.insert_one(dict(doc, _id=next_numeric_id(collection)))
+            return "inserted"
+        except errors.DuplicateKeyError:
+            # Another writer took this _id (or inserted the same empId) — retry
+            if collection.update_one({"empId": doc["empId"]}, {"$set": doc}).matched_count:
+                return "updated"
+            if attempt == retries - 1:
+                raise
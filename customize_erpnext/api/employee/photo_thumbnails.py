@@ -0,0 +1,108 @@
+"""Thumbnail ảnh nhân viên cho PDF thẻ nhân viên / danh sách nhân viên.
+
+Chỉ dùng stdlib + Pillow (không import frappe) để test được ngoài bench và để
+chạy an toàn trong thread pool: `frappe.local` không tồn tại trong thread con.
+
+  - `resolve_photo_path`: dò các vị trí file ảnh như
+    `process_employee_photo_optimized` cũ, nhưng chỉ bằng os.path.
+  - `thumbnail_key`: khoá cache (đường dẫn, mtime, kích thước đích, format,
+    quality) — ảnh bị thay thì mtime đổi, cache cũ tự hết hiệu lực.
+  - `build_thumbnails`: decode + resize nhiều ảnh song song. Pillow nhả GIL khi
+    decode/resize nên thread pool thật sự chạy song song.
+
+Việc đọc/ghi cache Redis do caller (employee_utils) làm ở thread chính.
+"""
+
+import base64
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+MAX_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def candidate_paths(image_url, site_path, files_path=None):
+    """Các đường dẫn có thể của file ảnh, theo thứ tự ưu tiên."""
+    if not image_url:
+        return []
+    rel = image_url.lstrip("/")
+    base = os.path.basename(rel)
+    paths = [
+        os.path.join(site_path, rel) if rel.startswith("private/") else os.path.join(site_path, "public", rel),
+        os.path.join(site_path, rel),
+    ]
+    if files_path:
+        paths.append(os.path.join(files_path, base))
+    paths += [
+        os.path.join(site_path, "public", "files", base),
+        os.path.join(site_path, "public", "files", "employee_photos", base),
+        os.path.join(site_path, "private", "files", base),
+    ]
+    return paths
+
+
+def resolve_photo_path(image_url, site_path, files_path=None):
+    """Đường dẫn đầu tiên tồn tại, hoặc None."""
+    for path in candidate_paths(image_url, site_path, files_path):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def thumbnail_key(path, box, fmt="JPEG", quality=60):
+    """Khoá cache cho thumbnail của `path`; None nếu file không stat được."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    raw = f"{path}|{mtime}|{box[0]}x{box[1]}|{fmt}|{quality}"
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def make_thumbnail(path, box, fmt="JPEG", quality=60):
+    """(mime, base64) của ảnh thu nhỏ vào khung `box`, giữ tỉ lệ.
+
+    fmt="auto": ảnh có kênh alpha (ảnh đã tách nền) giữ PNG, còn lại JPEG.
+    """
+    with Image.open(path) as img:
+        img.thumbnail(box, Image.Resampling.LANCZOS)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if fmt == "auto":
+            fmt = "PNG" if has_alpha else "JPEG"
+        if fmt == "JPEG" and img.mode != "RGB":
+            img = img.convert("RGB")
+
+        buffered = io.BytesIO()
+        if fmt == "PNG":
+            img.save(buffered, format="PNG", optimize=True)
+        else:
+            img.save(buffered, format="JPEG", quality=quality)
+    return ("image/png" if fmt == "PNG" else "image/jpeg"), base64.b64encode(buffered.getvalue()).decode()
+
+
+def build_thumbnails(paths, box, fmt="JPEG", quality=60, max_workers=MAX_WORKERS):
+    """{path: (mime, base64) | None} cho nhiều ảnh, xử lý song song.
+
+    Ảnh lỗi (hỏng, không đọc được) trả về None để caller dùng placeholder.
+    """
+    paths = list(dict.fromkeys(paths))
+    if not paths or Image is None:
+        return {path: None for path in paths}
+
+    def work(path):
+        try:
+            return make_thumbnail(path, box, fmt, quality)
+        except Exception:
+            return None
+
+    if len(paths) == 1:
+        return {paths[0]: work(paths[0])}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        return dict(zip(paths, pool.map(work, paths)))
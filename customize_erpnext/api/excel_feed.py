@@ -0,0 +1,87 @@
+"""Keyset / delta feed for the Power Query (Excel) exports.
+
+get_employees_for_excel and get_employee_maternity_for_excel page with
+LIMIT / OFFSET, run a COUNT(*) on every page and return one JSON object per
+row (every key repeated on every row). Feed mode (`feed=1`) instead:
+
+- keyset pagination on `name`: `after=<next_after of the previous page>` →
+  `WHERE name > after ORDER BY name LIMIT n`, no COUNT. The last page has
+  `next_after = null`.
+- delta: `modified_since=<server_time of the previous refresh>` returns only
+  rows changed since then. Rows that changed but no longer match the filters
+  (e.g. an employee who became Left) and deleted records come back as keys in
+  `removed`, so the consumer can drop them.
+- `feed_format`: json (row objects, as before), columnar (keys sent once, one
+  list per row) or csv.gz (gzip'd CSV with a trailing `_removed` column).
+
+This module is pure stdlib so it can be tested without a bench
+(tests/test_excel_feed.py); the SQL and the HTTP response live in
+employee_utils (`query_excel_feed` / `send_excel_feed`).
+"""
+
+import csv
+import gzip
+import io
+
+FORMATS = ("json", "columnar", "csv.gz")
+DEFAULT_FEED_PAGE_SIZE = 2000
+MAX_FEED_PAGE_SIZE = 5000
+
+# Column added by query_excel_feed: 1 = row matches the filters, 0 = drop it
+IN_SCOPE = "_in_scope"
+REMOVED = "_removed"
+
+
+def clean_value(value):
+	"""None → "", date / datetime → ISO string (same as the paged exports)."""
+	if value is None:
+		return ""
+	if hasattr(value, "isoformat"):
+		return value.isoformat()
+	return value
+
+
+def feed_page_size(page_size):
+	"""0 = everything in one response; capped at MAX_FEED_PAGE_SIZE, invalid → DEFAULT_FEED_PAGE_SIZE."""
+	try:
+		page_size = int(page_size or 0)
+	except (TypeError, ValueError):
+		return DEFAULT_FEED_PAGE_SIZE
+	if page_size < 0:
+		return DEFAULT_FEED_PAGE_SIZE
+	return min(page_size, MAX_FEED_PAGE_SIZE)
+
+
+def split_page(rows, key, page_size):
+	"""(data, removed, next_after) of one keyset page.
+
+	rows: dicts in key order, each carrying IN_SCOPE (popped here). The cursor
+	is taken before splitting: a page full of removed keys still advances.
+	"""
+	next_after = rows[-1][key] if page_size and len(rows) == page_size else None
+	data, removed = [], []
+	for row in rows:
+		if row.pop(IN_SCOPE, 1):
+			data.append(row)
+		else:
+			removed.append(row[key])
+	return data, removed, next_after
+
+
+def to_columnar(rows, col_keys):
+	return [[row.get(k, "") for k in col_keys] for row in rows]
+
+
+def encode_csv_gz(header, values, removed=(), key_index=0):
+	"""gzip'd UTF-8 CSV: header + values, then one row per removed key (_removed = 1)."""
+	buffer = io.StringIO()
+	writer = csv.writer(buffer, lineterminator="\r\n")
+	writer.writerow(list(header) + [REMOVED])
+	for row in values:
+		writer.writerow(list(row) + [0])
+	for key in removed:
+		row = [""] * len(header)
+		row[key_index] = key
+		writer.writerow(row + [1])
+	# BOM: Excel / Csv.Document pick UTF-8 without an explicit encoding
+	return gzip.compress(("\ufeff" + buffer.getvalue()).encode("utf-8"))
@@ -0,0 +1,442 @@
+"""Đồng bộ hàng loạt form self-service (Onboarding / Self Update) sang Employee.
+
+Trước đây `sync_to_employee` xử lý từng form: `get_doc("Employee")` đầy đủ (kèm
+mọi bảng con), `emp.save()` chạy toàn bộ validate / hook, rồi `doc.save()` form,
+commit — và màn hình list gọi tuần tự từng form một. Duyệt 300 form sau ngày
+nhận việc là trình duyệt của HR bị treo vài phút.
+
+Engine này nhận một SYNC_SPEC (khai trong onboarding_api / self_update_api):
+
+    {
+        "form_doctype":  "Employee Self Update Form",
+        "form_fields":   [...],                  # field cần đọc từ form
+        "values":        fn(form) -> {emp_field: value},
+        "tables":        fn(form) -> {table_field: [row dict]},   # tuỳ chọn, thay cả bảng
+        "table_fields":  {table_field: (child field, ...)},       # field so sánh / ghi
+        "invalidate":    fn(),                   # xoá snapshot danh sách guest
+    }
+
+và với mỗi lô BATCH_SIZE form:
+  1. Đọc form, Employee (chỉ các field được map) và bảng con liên quan bằng vài
+     query IN (...) — không get_doc.
+  2. So sánh trong bộ nhớ: chỉ field / bảng con thực sự khác mới được ghi. Giá trị
+     được kiểm theo DocField (Select, Link, Date, Int, Email) thay cho validate
+     của Employee.save().
+  3. Mỗi form ghi trong savepoint riêng: một dòng lỗi chỉ rollback dòng đó, lỗi
+     được ghi vào kết quả. Form thành công chuyển Synced bằng một UPDATE cho cả
+     lô; thay đổi Employee được lưu Version như khi save bình thường.
+
+Đường ghi thẳng (`set_value`) bỏ qua Employee.validate, nên `_check_employee` chạy lại
+phần liên quan khi form đổi ngày hoặc email: thứ tự ngày sinh / vào làm / nghỉ việc /
+hết hợp đồng và `prefered_email`.
+
+Employee có `user_id` vẫn đi đường `get_doc` + `save()`: controller Employee đồng
+bộ ngày sinh / SĐT sang User, ghi thẳng sẽ bỏ sót.
+
+`start_form_sync` chạy engine trong job nền (queue long) và báo tiến độ qua
+`publish_progress` + realtime `form_sync_done`; `run_form_sync` chạy ngay (dùng
+cho sync từng form).
+"""
+
+import datetime
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, getdate, now, today, validate_email_address
+
+BATCH_SIZE = 100
+JOB_TTL = 6 * 3600
+MAX_ERRORS_KEPT = 500
+
+
+def _cache_key(job_id):
+	return f"form_sync:{job_id}"
+
+
+def _update_state(job_id, patch):
+	state = frappe.cache().get_value(_cache_key(job_id))
+	if state:
+		state.update(patch)
+		frappe.cache().set_value(_cache_key(job_id), state, expires_in_sec=JOB_TTL)
+	return state
+
+
+def start_form_sync(spec_path, names, title):
+	"""Đưa job sync vào queue long. spec_path: dotted path tới SYNC_SPEC.
+
+	Trả về {"job_id", "total"} — client theo dõi qua realtime `form_sync_done`
+	hoặc `get_form_sync_status`.
+	"""
+	names = list(dict.fromkeys(n for n in names or [] if n))
+	if not names:
+		frappe.throw(_("Chưa chọn form nào."))
+
+	job_id = frappe.generate_hash(length=12)
+	frappe.cache().set_value(_cache_key(job_id), {
+		"status": "queued",
+		"user": frappe.session.user,
+		"title": title,
+		"total": len(names),
+		"done": 0,
+		"synced": 0,
+		"unchanged": 0,
+		"skipped": 0,
+		"failed": 0,
+		"errors": [],
+		"error": None,
+	}, expires_in_sec=JOB_TTL)
+
+	frappe.enqueue(
+		"customize_erpnext.api.form_sync.build_form_sync",
+		queue="long",
+		timeout=3600,
+		job_id=f"form_sync::{job_id}",
+		enqueue_after_commit=True,
+		sync_id=job_id,
+		spec_path=spec_path,
+		names=names,
+	)
+	return {"job_id": job_id, "total": len(names)}
+
+
+def build_form_sync(sync_id, spec_path, names):
+	"""Background job: chạy run_form_sync theo lô, báo tiến độ sau mỗi lô."""
+	state = _update_state(sync_id, {"status": "running"})
+	if not state:
+		return
+
+	def on_batch(summary):
+		_update_state(sync_id, {
+			key: summary[key] for key in ("done", "synced", "unchanged", "skipped", "failed")
+		} | {"errors": summary["errors"][:MAX_ERRORS_KEPT]})
+		frappe.publish_progress(
+			summary["done"] * 100 / len(names),
+			title=state["title"],
+			description=_("{0} / {1} form").format(summary["done"], len(names)),
+		)
+
+	try:
+		summary = run_form_sync(frappe.get_attr(spec_path), names, on_batch=on_batch)
+	except Exception as e:
+		frappe.db.rollback()
+		frappe.log_error(frappe.get_traceback(), "Form Sync Error")
+		_update_state(sync_id, {"status": "failed", "error": str(e)})
+		frappe.publish_realtime(
+			"form_sync_done", {"job_id": sync_id, "success": False, "error": str(e)}, user=state["user"]
+		)
+		return
+
+	_update_state(sync_id, {"status": "done"})
+	frappe.publish_realtime(
+		"form_sync_done",
+		{
+			"job_id": sync_id,
+			"success": True,
+			"synced": summary["synced"],
+			"unchanged": summary["unchanged"],
+			"skipped": summary["skipped"],
+			"failed": summary["failed"],
+			"errors": summary["errors"][:MAX_ERRORS_KEPT],
+		},
+		user=state["user"],
+	)
+
+
+@frappe.whitelist()
+def get_form_sync_status(job_id):
+	state = frappe.cache().get_value(_cache_key(job_id))
+	if not state or state["user"] != frappe.session.user:
+		frappe.throw(_("Sync job không tồn tại hoặc đã hết hạn."), frappe.DoesNotExistError)
+	return {
+		key: state.get(key)
+		for key in ("status", "title", "total", "done", "synced", "unchanged", "skipped", "failed", "errors", "error")
+	}
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+def run_form_sync(spec, names, on_batch=None):
+	"""Sync các form Approved trong `names` sang Employee, commit sau mỗi lô.
+
+	Trả về {"done", "synced", "unchanged", "skipped", "failed", "errors", "results"}.
+	results[name] = {"ok", "fields" | "message"}; unchanged = form Synced mà
+	Employee vốn đã khớp (không ghi gì).
+	"""
+	ctx = _SyncContext(spec)
+	summary = {"done": 0, "synced": 0, "unchanged": 0, "skipped": 0, "failed": 0, "errors": [], "results": {}}
+
+	for start in range(0, len(names), BATCH_SIZE):
+		batch = names[start:start + BATCH_SIZE]
+		ctx.sync_batch(batch, summary)
+		frappe.db.commit()
+		summary["done"] += len(batch)
+		if on_batch:
+			on_batch(summary)
+
+	if summary["synced"] or summary["unchanged"]:
+		spec["invalidate"]()
+		frappe.db.commit()  # chạy after_commit của invalidate
+	return summary
+
+
+def _norm(value):
+	"""Dạng so sánh được của một giá trị DB / form (None == "", date == 'YYYY-MM-DD')."""
+	if value is None:
+		return ""
+	if isinstance(value, (datetime.date, datetime.datetime)):
+		return value.isoformat()
+	if isinstance(value, float) and value.is_integer():
+		return str(int(value))
+	return str(value)
+
+
+# Field Employee.validate (validate_date / set_preferred_email) cần — luôn đọc kèm
+_DATE_ORDER_FIELDS = ("date_of_birth", "date_of_joining", "relieving_date", "contract_end_date")
+_EMAIL_FIELDS = ("prefered_contact_email", "personal_email", "company_email")
+_CHECK_FIELDS = _DATE_ORDER_FIELDS + _EMAIL_FIELDS + ("prefered_email",)
+
+
+def _check_employee(emp, changes):
+	"""Phần Employee.validate mà `set_value` bỏ qua; có thể thêm `prefered_email` vào changes."""
+	if any(f in changes for f in _DATE_ORDER_FIELDS):
+		dob, doj, relieving, contract_end = (
+			getdate(v) if v else None
+			for v in (changes.get(f, emp.get(f)) for f in _DATE_ORDER_FIELDS)
+		)
+		if dob and dob > getdate(today()):
+			raise frappe.ValidationError(_("Date of Birth cannot be greater than today."))
+		if dob and doj and dob >= doj:
+			raise frappe.ValidationError(_("Date of Joining must be greater than Date of Birth"))
+		if relieving and doj and relieving < doj:
+			raise frappe.ValidationError(_("Relieving Date must be greater than or equal to Date of Joining"))
+		if contract_end and doj and contract_end <= doj:
+			raise frappe.ValidationError(_("Contract End Date must be greater than Date of Joining"))
+
+	if any(f in changes for f in _EMAIL_FIELDS):
+		preferred_field = frappe.scrub(changes.get("prefered_contact_email", emp.get("prefered_contact_email")) or "")
+		if preferred_field:
+			preferred = changes.get(preferred_field, emp.get(preferred_field))
+			if _norm(preferred) != _norm(emp.get("prefered_email")):
+				changes["prefered_email"] = preferred
+
+
+class _SyncContext:
+	"""Meta Employee + cache tra Link, dùng chung cho mọi lô của một lần sync."""
+
+	def __init__(self, spec):
+		self.spec = spec
+		self.form_doctype = spec["form_doctype"]
+		self.meta = frappe.get_meta("Employee")
+		self.link_cache = {}
+
+	def sync_batch(self, names, summary):
+		fields = ["name", "employee", "status"] + [f for f in self.spec["form_fields"] if f not in ("name", "employee", "status")]
+		forms = {row.name: row for row in frappe.get_all(
+			self.form_doctype, filters={"name": ["in", names]}, fields=fields
+		)}
+
+		planned = {}
+		for name in names:
+			form = forms.get(name)
+			if not form:
+				self._fail(summary, name, None, _("Không tìm thấy form."))
+				continue
+			if form.status != "Approved":
+				summary["skipped"] += 1
+				summary["results"][name] = {"ok": False, "message": _("Bỏ qua — trạng thái {0}").format(form.status)}
+				continue
+			try:
+				planned[name] = (form, self._values(form), self._tables(form))
+			except frappe.ValidationError as e:
+				self._fail(summary, name, form.employee, str(e))
+
+		if not planned:
+			return
+
+		employee_ids = list({form.employee for form, _values, _tables in planned.values()})
+		value_fields = sorted({f for _form, values, _tables in planned.values() for f in values})
+		employees = {row.name: row for row in frappe.get_all(
+			"Employee",
+			filters={"name": ["in", employee_ids]},
+			fields=list(dict.fromkeys(["name", "user_id", *_CHECK_FIELDS] + value_fields)),
+		)}
+		current_tables = self._load_tables(employee_ids, {f for _form, _values, tables in planned.values() for f in tables})
+
+		synced, versions = [], []
+		for name, (form, values, tables) in planned.items():
+			emp = employees.get(form.employee)
+			if not emp:
+				self._fail(summary, name, form.employee, _("Không tìm thấy Employee {0}.").format(form.employee))
+				continue
+
+			changes = {f: v for f, v in values.items() if _norm(emp.get(f)) != _norm(v)}
+			table_changes = {
+				f: rows for f, rows in tables.items()
+				if self._rows_key(f, rows) != self._rows_key(f, current_tables.get((emp.name, f), []))
+			}
+
+			frappe.db.savepoint("form_sync_row")
+			try:
+				if emp.user_id and (changes or table_changes):
+					self._save_employee(emp.name, changes, table_changes)
+				else:
+					_check_employee(emp, changes)
+					if changes:
+						frappe.db.set_value("Employee", emp.name, changes)
+					for table_field, rows in table_changes.items():
+						self._replace_rows(emp.name, table_field, rows)
+					if changes or table_changes:
+						versions.append((emp.name, [[f, emp.get(f), v] for f, v in changes.items()], table_changes))
+			except Exception as e:
+				frappe.db.rollback(save_point="form_sync_row")
+				self._fail(summary, name, form.employee, str(e).split("\n")[0][:200])
+				continue
+
+			synced.append(name)
+			if changes or table_changes:
+				summary["synced"] += 1
+			else:
+				summary["unchanged"] += 1
+			summary["results"][name] = {"ok": True, "fields": list(changes) + list(table_changes)}
+
+		self._insert_versions(versions)
+		if synced:
+			frappe.db.sql(
+				f"UPDATE `tab{self.form_doctype}` SET `status`='Synced', `modified`=%s, `modified_by`=%s"
+				" WHERE `name` IN %s AND `status`='Approved'",
+				(now(), frappe.session.user, tuple(synced)),
+			)
+
+	def _fail(self, summary, name, employee, message):
+		summary["failed"] += 1
+		summary["results"][name] = {"ok": False, "message": message}
+		summary["errors"].append({"form": name, "employee": employee, "message": message})
+
+	# -- values ---------------------------------------------------------------
+
+	def _values(self, form):
+		"""{emp_field: value} đã kiểm tra / ép kiểu; bỏ field không có trên Employee."""
+		out = {}
+		for fieldname, value in self.spec["values"](form).items():
+			df = self.meta.get_field(fieldname)
+			if df:
+				out[fieldname] = self._coerce(df, value)
+		return out
+
+	def _coerce(self, df, value):
+		if value in (None, ""):
+			# NULL như Document.save — "" vào cột DATE / Link là dữ liệu rác
+			return 0 if df.fieldtype in ("Int", "Check", "Float", "Currency", "Percent") else None
+		label = _(df.label or df.fieldname)
+		if df.fieldtype in ("Int", "Check"):
+			return cint(value)
+		if df.fieldtype in ("Float", "Currency", "Percent"):
+			return flt(value)
+		if df.fieldtype == "Date":
+			try:
+				return getdate(value)
+			except Exception:
+				raise frappe.ValidationError(_("{0}: ngày không hợp lệ ({1})").format(label, value))
+		if df.fieldtype == "Select":
+			options = [o for o in (df.options or "").split("\n") if o]
+			if options and value not in options:
+				raise frappe.ValidationError(_("{0}: giá trị '{1}' không có trong danh sách chọn").format(label, value))
+		elif df.fieldtype == "Link" and df.options:
+			key = (df.options, value)
+			if key not in self.link_cache:
+				self.link_cache[key] = bool(frappe.db.exists(df.options, value))
+			if not self.link_cache[key]:
+				raise frappe.ValidationError(_("{0}: không tìm thấy {1} '{2}'").format(label, _(df.options), value))
+		elif df.options == "Email" and not validate_email_address(value):
+			raise frappe.ValidationError(_("{0}: email không hợp lệ ({1})").format(label, value))
+		return value
+
+	# -- child tables ---------------------------------------------------------
+
+	def _tables(self, form):
+		tables_fn = self.spec.get("tables")
+		if not tables_fn:
+			return {}
+		return {
+			table_field: rows
+			for table_field, rows in tables_fn(form).items()
+			if self.meta.get_field(table_field)
+		}
+
+	def _table_fields(self, table_field):
+		return list(self.spec.get("table_fields", {}).get(table_field, ()))
+
+	def _rows_key(self, table_field, rows):
+		fields = self._table_fields(table_field)
+		return [tuple(_norm(row.get(f)) for f in fields) for row in rows]
+
+	def _load_tables(self, employee_ids, table_fields):
+		current = {}
+		for table_field in table_fields:
+			child_doctype = self.meta.get_field(table_field).options
+			fields = self._table_fields(table_field)
+			for row in frappe.get_all(
+				child_doctype,
+				filters={"parent": ["in", employee_ids], "parenttype": "Employee", "parentfield": table_field},
+				fields=["parent"] + fields,
+				order_by="parent asc, idx asc",
+			):
+				current.setdefault((row.parent, table_field), []).append(row)
+		return current
+
+	def _replace_rows(self, employee, table_field, rows):
+		child_doctype = self.meta.get_field(table_field).options
+		frappe.db.delete(child_doctype, {"parent": employee, "parenttype": "Employee", "parentfield": table_field})
+		if not rows:
+			return
+		fields = self._table_fields(table_field)
+		timestamp, user = now(), frappe.session.user
+		frappe.db.bulk_insert(
+			child_doctype,
+			["name", "parent", "parenttype", "parentfield", "idx", "docstatus",
+				"creation", "modified", "owner", "modified_by"] + fields,
+			[
+				[frappe.generate_hash(length=10), employee, "Employee", table_field, idx, 0,
+					timestamp, timestamp, user, user] + [row.get(f) for f in fields]
+				for idx, row in enumerate(rows, 1)
+			],
+		)
+
+	# -- writes ---------------------------------------------------------------
+
+	def _save_employee(self, employee, changes, table_changes):
+		"""Đường chậm (Employee gắn User): save đầy đủ để controller đồng bộ User."""
+		emp = frappe.get_doc("Employee", employee)
+		emp.update(changes)
+		for table_field, rows in table_changes.items():
+			emp.set(table_field, [])
+			for row in rows:
+				emp.append(table_field, row)
+		emp.flags.ignore_permissions = True
+		emp.flags.ignore_mandatory = True
+		emp.save()
+
+	def _insert_versions(self, versions):
+		"""Version cho các Employee ghi thẳng — lịch sử thay đổi giống khi save."""
+		if not versions:
+			return
+		timestamp, user = now(), frappe.session.user
+		frappe.db.bulk_insert(
+			"Version",
+			["name", "ref_doctype", "docname", "data", "docstatus", "creation", "modified", "owner", "modified_by"],
+			[
+				[
+					frappe.generate_hash(length=10), "Employee", employee,
+					frappe.as_json({
+						"changed": changed,
+						"row_changed": [],
+						"added": [[f, row] for f, rows in table_changes.items() for row in rows],
+						"removed": [],
+					}),
+					0, timestamp, timestamp, user, user,
+				]
+				for employee, changed, table_changes in versions
+			],
+		)
@@ -0,0 +1,189 @@
+"""Nhận ảnh upload từ form self-service (CCCD, giấy tờ khác) rồi chuẩn hoá trong job nền.
+
+Trước đây `upload_cccd_photo` / `upload_other_doc` decode, ghi file, tạo File
+row và commit ngay trong request guest, không xử lý gì thêm: ảnh điện thoại vài
+MB (kèm EXIF, GPS) nằm nguyên trong public/files.
+
+Luồng mới:
+  1. Request (`accept_upload`): decode dataURL, ghi bytes ra đúng file_url sẽ
+     trả về (client xem trước được ngay), enqueue job — không insert File, không
+     đọc lại file. Upload trùng (cùng nội dung, cùng nhân viên) trả lại URL cũ,
+     không ghi / xử lý lại: khoá `image_ingest:<doctype>:<employee>:<sha1>`.
+  2. Job (`process_upload`, queue short): xoay theo EXIF Orientation, thu về cạnh
+     dài MAX_SIDE, encode lại JPEG QUALITY không metadata, thay file tại chỗ
+     (os.replace — không bao giờ có file đọc dở) kể cả khi bản mới không nhỏ hơn
+     (mục đích chính là bỏ EXIF / GPS), rồi tạo / cập nhật File row với
+     content_hash của file đã chuẩn hoá. File đã chuẩn hoá (content_hash khớp) thì
+     bỏ qua, nên job chạy lại không làm ảnh xấu đi.
+
+Upload lại vào cùng file_url khi job đang chạy bị deduplicate vào job đó (job_id
+theo file_url — không bao giờ có hai job ghi cùng một file), nên job kiểm lại file
+trên đĩa cả trước khi thay lẫn sau khi commit, và xử lý tiếp nếu file đã bị ghi đè.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import re
+from urllib.parse import quote, unquote
+
+import frappe
+from frappe import _
+
+MAX_UPLOAD_BYTES = 4 * 1024 * 1024
+MAX_SIDE = 2000  # px, cạnh dài sau khi chuẩn hoá — vẫn đọc rõ chữ trên CCCD / giấy tờ
+QUALITY = 85
+DEDUP_TTL = 7 * 24 * 3600
+
+
+def decode_data_url(image_data, too_large_message=None):
+	"""bytes của dataURL `data:image/<type>;base64,...` (throw nếu sai / quá MAX_UPLOAD_BYTES)."""
+	if not image_data or not image_data.startswith("data:"):
+		frappe.throw(_("Invalid image data"))
+	match = re.match(r"data:image/(\w+);base64,(.+)", image_data, re.S)
+	if not match:
+		frappe.throw(_("Invalid image format"))
+	try:
+		file_bytes = base64.b64decode(match.group(2))
+	except Exception:
+		frappe.throw(_("Failed to decode image"))
+
+	if len(file_bytes) > MAX_UPLOAD_BYTES:
+		frappe.throw(too_large_message or _("Image is too large. Maximum size is 4 MB."))
+	return file_bytes
+
+
+def _dedup_key(attached_to_doctype, attached_to_name, digest):
+	return f"image_ingest:{attached_to_doctype}:{attached_to_name}:{digest}"
+
+
+def _public_path(file_url):
+	return frappe.get_site_path("public", "files", unquote(file_url).rsplit("/", 1)[-1])
+
+
+def accept_upload(file_bytes, file_name, attached_to_doctype, attached_to_name, dedupe=True):
+	"""Ghi ảnh vào public/files/<file_name> và enqueue job chuẩn hoá. Trả về file_url.
+
+	dedupe: cùng nội dung đã upload cho cùng nhân viên (và file còn trên đĩa) →
+	trả URL cũ. Tắt khi file_name cố định (CCCD mặt trước / sau) mà người dùng cố
+	tình chụp lại — ghi đè vẫn đúng nghĩa.
+	"""
+	digest = hashlib.sha1(file_bytes).hexdigest()
+	cache = frappe.cache()
+	if dedupe:
+		known_url = cache.get_value(_dedup_key(attached_to_doctype, attached_to_name, digest))
+		if known_url and os.path.isfile(_public_path(known_url)):
+			return known_url
+
+	file_url = "/files/" + quote(file_name)
+	path = _public_path(file_url)
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	tmp_path = f"{path}.{digest[:8]}.upload"
+	with open(tmp_path, "wb") as f:
+		f.write(file_bytes)
+	os.replace(tmp_path, path)
+
+	if dedupe:
+		cache.set_value(
+			_dedup_key(attached_to_doctype, attached_to_name, digest), file_url, expires_in_sec=DEDUP_TTL
+		)
+	frappe.enqueue(
+		"customize_erpnext.api.image_ingest.process_upload",
+		queue="short",
+		job_id=f"image_ingest::{file_url}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		file_url=file_url,
+		file_name=file_name,
+		attached_to_doctype=attached_to_doctype,
+		attached_to_name=attached_to_name,
+	)
+	return file_url
+
+
+def normalize_image(data, max_side=MAX_SIDE, quality=QUALITY):
+	"""JPEG đã xoay đúng chiều, thu nhỏ, không EXIF / ICC. None nếu không phải ảnh."""
+	from PIL import Image, ImageOps
+
+	try:
+		with Image.open(io.BytesIO(data)) as img:
+			img = ImageOps.exif_transpose(img)
+			if img.mode != "RGB":
+				img = img.convert("RGB")
+			img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+			out = io.BytesIO()
+			img.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+	except Exception:
+		return None
+	return out.getvalue()
+
+
+def _changed_since(path, stat):
+	"""File tại `path` đã bị ghi lại (hoặc xoá) sau lần os.stat() `stat`."""
+	try:
+		current = os.stat(path)
+	except FileNotFoundError:
+		return False
+	return (current.st_mtime_ns, current.st_size, current.st_ino) != (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def process_upload(file_url, file_name, attached_to_doctype, attached_to_name):
+	"""Background job: chuẩn hoá file tại chỗ rồi tạo / cập nhật File row."""
+	path = _public_path(file_url)
+	if not os.path.isfile(path):
+		return
+
+	stat = os.stat(path)
+	with open(path, "rb") as f:
+		data = f.read()
+	existing = frappe.db.get_value("File", {"file_url": file_url}, ["name", "content_hash"], as_dict=True)
+	if existing and existing.content_hash == hashlib.md5(data).hexdigest():
+		return  # already normalised
+
+	normalized = normalize_image(data)
+	if normalized:
+		# Ghi cả khi không nhỏ hơn: bản gốc còn EXIF / GPS
+		tmp_path = f"{path}.normalized"
+		with open(tmp_path, "wb") as f:
+			f.write(normalized)
+		if _changed_since(path, stat):
+			# Re-uploaded while we were encoding (its enqueue was deduplicated
+			# against this running job): drop our result, process the new bytes
+			os.unlink(tmp_path)
+			return process_upload(file_url, file_name, attached_to_doctype, attached_to_name)
+		os.replace(tmp_path, path)
+		data = normalized
+		stat = os.stat(path)
+
+	content_hash = hashlib.md5(data).hexdigest()
+	if existing:
+		frappe.db.set_value(
+			"File",
+			existing.name,
+			{
+				"attached_to_doctype": attached_to_doctype,
+				"attached_to_name": attached_to_name,
+				"file_size": len(data),
+				"content_hash": content_hash,
+			},
+			update_modified=False,
+		)
+	else:
+		file_doc = frappe.get_doc({
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": file_url,
+			"attached_to_doctype": attached_to_doctype,
+			"attached_to_name": attached_to_name,
+			"is_private": 0,
+			"file_size": len(data),
+			"content_hash": content_hash,
+		})
+		file_doc.flags.ignore_permissions = True
+		file_doc.insert()
+	frappe.db.commit()
+
+	if _changed_since(path, stat):
+		# Upload lại trong lúc job chạy, enqueue của nó bị deduplicate vào job này
+		return process_upload(file_url, file_name, attached_to_doctype, attached_to_name)
@@ -0,0 +1,60 @@
+"""Kiểm attribute value của variant theo Item Attribute đã load sẵn.
+
+Cùng quy tắc với `erpnext.controllers.item_variant.validate_item_attribute_value` /
+`validate_is_incremental` — thứ `variant.insert()` chạy trong Item.validate. Bulk
+insert (`bulk_variant_builder`) bỏ qua Item.validate nên phải kiểm ở đây, trước khi
+dựng spec: value không có trong danh sách sẽ bị bỏ khỏi item_code và làm mã ngắn
+lại / trùng mã.
+
+Chỉ dùng stdlib để test được không cần bench (tests/test_attribute_value_check.py).
+
+attribute_map: {attribute: {"numeric": bool, "abbr": {value: abbr},
+                            "range": (from_range, to_range, increment)}}
+(xem `bulk_variant_builder.get_attribute_abbreviations`).
+"""
+
+
+def _to_float(value):
+	try:
+		return float(value)
+	except (TypeError, ValueError):
+		return None
+
+
+def _decimals(value):
+	# Như ERPNext: số chữ số sau dấu chấm (bỏ số 0 cuối) của giá trị / increment
+	return len(str(value).split(".")[-1].rstrip("0"))
+
+
+def is_incremental(value, from_range, to_range, increment):
+	"""value nằm trong [from_range, to_range] và cách from_range một bội số của increment."""
+	number = _to_float(value)
+	if number is None or not increment:
+		return False
+	from_range, to_range, increment = float(from_range or 0), float(to_range or 0), float(increment)
+	if not from_range <= number <= to_range:
+		return False
+	precision = max(_decimals(value), _decimals(increment))
+	remainder = round((number - from_range) % increment, precision)
+	return remainder == 0 or remainder == increment
+
+
+def attribute_value_errors(attribute_values, attribute_map):
+	"""Danh sách lỗi (chuỗi) cho các cặp (attribute, value) không hợp lệ; [] nếu hợp lệ."""
+	errors = []
+	for attribute, value in attribute_values:
+		entry = attribute_map.get(attribute)
+		if not entry:
+			errors.append(f"Attribute {attribute} does not exist")
+		elif entry["numeric"]:
+			from_range, to_range, increment = entry.get("range") or (0, 0, 0)
+			if not increment:
+				errors.append(f"Increment for Attribute {attribute} cannot be 0")
+			elif not is_incremental(value, from_range, to_range, increment):
+				errors.append(
+					f"Value for Attribute {attribute} must be within the range of {from_range} to {to_range}"
+					f" in the increments of {increment}"
+				)
+		elif str(value if value is not None else "") not in entry["abbr"]:
+			errors.append(f"Value {value} for Attribute {attribute} does not exist in the list of valid Item Attribute Values")
+	return errors
@@ -0,0 +1,251 @@
+"""Tạo Item Variant số lượng lớn bằng bulk insert thay vì `variant.insert()` từng item.
+
+Luồng cũ (`create_multiple_variants_skip_duplicates`, script
+`create_item_variants_improved`) gọi `get_variant()` + `create_variant()` +
+`insert()` cho MỖI variant: vài chục query + toàn bộ validate/naming/hook của Item
+cho mỗi dòng → ma trận màu × size 2000 SKU mất hàng chục phút.
+
+Ở đây:
+  1. Tổ hợp attribute tính sẵn; variant đã có (theo tổ hợp attribute) và item_code
+     đã tồn tại được phát hiện bằng MỘT query mỗi loại.
+  2. Abbreviation của mọi attribute value load bằng một query, item_code / item_name
+     sinh theo đúng quy tắc `make_variant_item_code` của ERPNext. Value không có trong
+     Item Attribute (hoặc số ngoài khoảng / sai bước) bị từ chối trước khi dựng spec
+     (`attribute_value_check`) — thay cho `validate_item_attribute_value` mà
+     `variant.insert()` từng chạy.
+  3. Một variant mẫu (prototype) được dựng bằng `create_variant()` của ERPNext để lấy
+     các field copy từ template theo Item Variant Settings; các variant còn lại là bản
+     sao của prototype, chỉ khác attribute / mã / tên / mô tả / barcode.
+  4. Item, Item Variant Attribute, Item Barcode, UOM Conversion Detail, Item Default …
+     được `frappe.db.bulk_insert` theo chunk, commit một lần mỗi chunk.
+
+Đánh đổi: controller validate/on_update của Item KHÔNG chạy cho từng variant. Template
+đã qua validate và variant chỉ khác template ở các field kể trên; barcode được sinh bằng
+chính hook `auto_add_barcode_on_item_save` của app. Server Script / hook của app khác trên
+Item sẽ không chạy — dùng luồng cũ nếu cần các hook đó.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cstr, now
+
+from erpnext.controllers.item_variant import create_variant, generate_keyed_value_combinations
+
+from customize_erpnext.api.bulk_update_scripts.item_update_barcode import auto_add_barcode_on_item_save
+from customize_erpnext.api.item.attribute_value_check import attribute_value_errors
+from customize_erpnext.api.item.item_lookup import invalidate_item_pattern_index
+
+CHUNK_SIZE = 500
+MAX_VARIANTS = 5000
+
+
+def get_existing_attribute_sets(template):
+	"""Tập (attribute, value) của mọi variant hiện có của template — một query."""
+	rows = frappe.db.sql(
+		"""
+		SELECT iva.parent, iva.attribute, iva.attribute_value
+		FROM `tabItem Variant Attribute` iva
+		INNER JOIN `tabItem` i ON i.name = iva.parent
+		WHERE i.variant_of = %s
+		""",
+		template,
+	)
+	by_variant = {}
+	for parent, attribute, value in rows:
+		by_variant.setdefault(parent, set()).add((attribute, cstr(value)))
+	return list(by_variant.values())
+
+
+def get_attribute_abbreviations(attributes):
+	"""{attribute: {"numeric": bool, "abbr": {value: abbr}, "range": (from, to, increment)}} — một query."""
+	if not attributes:
+		return {}
+	rows = frappe.db.sql(
+		"""
+		SELECT ia.name AS attribute, ia.numeric_values, ia.from_range, ia.to_range, ia.increment,
+		       iav.attribute_value, iav.abbr
+		FROM `tabItem Attribute` ia
+		LEFT JOIN `tabItem Attribute Value` iav ON iav.parent = ia.name
+		WHERE ia.name IN %(attributes)s
+		""",
+		{"attributes": list(attributes)},
+		as_dict=True,
+	)
+	result = {}
+	for row in rows:
+		entry = result.setdefault(row.attribute, {
+			"numeric": bool(row.numeric_values),
+			"abbr": {},
+			"range": (row.from_range, row.to_range, row.increment),
+		})
+		if row.attribute_value is not None:
+			entry["abbr"][cstr(row.attribute_value)] = row.abbr
+	return result
+
+
+def make_variant_code_and_name(template_code, template_name, attribute_values, abbr_map):
+	"""Giống `erpnext.controllers.item_variant.make_variant_item_code` nhưng dùng
+	abbreviation đã load sẵn thay vì một query cho mỗi attribute."""
+	abbreviations = []
+	for attribute, value in attribute_values:
+		entry = abbr_map.get(attribute)
+		if not entry:
+			continue
+		if entry["numeric"]:
+			abbreviations.append(cstr(value))
+		elif cstr(value) in entry["abbr"]:
+			abbreviations.append(entry["abbr"][cstr(value)])
+
+	if not abbreviations:
+		return template_code, template_name
+	suffix = "-".join(abbreviations)
+	return f"{template_code}-{suffix}", f"{template_name}-{suffix}"
+
+
+def plan_variants(template_doc, args):
+	"""Spec cho các tổ hợp cần tạo + danh sách item_code bị bỏ qua do trùng mã."""
+	args = {key: values for key, values in args.items() if values}
+	combos = generate_keyed_value_combinations(args)
+
+	existing = {
+		frozenset((a, v) for a, v in attr_set if a in args) for attr_set in get_existing_attribute_sets(template_doc.name)
+	}
+	abbr_map = get_attribute_abbreviations([d.attribute for d in template_doc.attributes])
+
+	specs, errors = [], []
+	for combo in combos:
+		if frozenset((a, cstr(v)) for a, v in combo.items()) in existing:
+			continue
+		# Thứ tự attribute theo bảng attributes của template, như create_variant()
+		attribute_values = [(d.attribute, combo.get(d.attribute)) for d in template_doc.attributes]
+		for error in attribute_value_errors(attribute_values, abbr_map):
+			if error not in errors:
+				errors.append(error)
+		if errors:
+			continue
+		item_code, item_name = make_variant_code_and_name(
+			template_doc.item_code, template_doc.item_name, attribute_values, abbr_map
+		)
+		specs.append({"item_code": item_code, "item_name": item_name, "attributes": attribute_values})
+
+	if errors:
+		frappe.throw("<br>".join(errors), title=_("Invalid Attribute Value"))
+	return drop_duplicate_codes(specs)
+
+
+def drop_duplicate_codes(specs):
+	"""Bỏ spec có item_code đã tồn tại (hoặc trùng nhau trong lô) — một query."""
+	codes = [spec["item_code"] for spec in specs]
+	taken = set(frappe.get_all("Item", filters={"name": ["in", codes]}, pluck="name")) if codes else set()
+
+	result, skipped = [], []
+	for spec in specs:
+		if spec["item_code"] in taken:
+			skipped.append(spec["item_code"])
+			continue
+		taken.add(spec["item_code"])
+		result.append(spec)
+	return result, skipped
+
+
+def insert_variant_specs(template_doc, specs, use_template_image=False, publish_progress=False):
+	"""Bulk insert các variant theo spec, mỗi lần CHUNK_SIZE variant (chạy nền thì
+	commit + báo tiến độ sau mỗi chunk; gọi đồng bộ thì để caller commit).
+
+	spec: {"item_code", "item_name", "attributes": [(attribute, value)],
+	       "custom_item_name_detail" (tuỳ chọn)}
+
+	Không có Item.validate: spec có attribute value không hợp lệ làm hỏng cả lô
+	(caller kiểm từng dòng trước bằng `attribute_value_errors` để báo lỗi theo dòng).
+	"""
+	if not specs:
+		return 0
+
+	abbr_map = get_attribute_abbreviations({a for spec in specs for a, _v in spec["attributes"]})
+	for spec in specs:
+		errors = attribute_value_errors(spec["attributes"], abbr_map)
+		if errors:
+			frappe.throw(f"{spec['item_code']}: " + "<br>".join(errors), title=_("Invalid Attribute Value"))
+
+	prototype = create_variant(template_doc.name, dict(specs[0]["attributes"]))
+	if use_template_image and template_doc.image:
+		prototype.image = template_doc.image
+	if not prototype.get("item_defaults"):
+		for row in template_doc.get("item_defaults"):
+			prototype.append("item_defaults", row.as_dict(no_default_fields=True))
+
+	describe_attributes = template_doc.variant_based_on == "Item Attribute" and "description" in frappe.get_all(
+		"Variant Field", pluck="field_name"
+	)
+
+	created = 0
+	for start in range(0, len(specs), CHUNK_SIZE):
+		chunk = specs[start:start + CHUNK_SIZE]
+		rows_by_doctype = {}
+		for spec in chunk:
+			doc = _build_variant(prototype, template_doc, spec, describe_attributes)
+			rows_by_doctype.setdefault("Item", []).append(doc.get_valid_dict(convert_dates_to_str=True))
+			for child in doc.get_all_children():
+				rows_by_doctype.setdefault(child.doctype, []).append(child.get_valid_dict(convert_dates_to_str=True))
+
+		for doctype, rows in rows_by_doctype.items():
+			fields = list(rows[0])
+			frappe.db.bulk_insert(doctype, fields, [tuple(row.get(f) for f in fields) for row in rows])
+
+		created += len(chunk)
+		if publish_progress:
+			frappe.db.commit()
+			frappe.publish_progress(
+				created * 100 / len(specs),
+				title=_("Creating Variants"),
+				description=_("{0} of {1} variants").format(created, len(specs)),
+			)
+
+	invalidate_item_pattern_index()
+	return created
+
+
+def _build_variant(prototype, template_doc, spec, describe_attributes):
+	doc = frappe.copy_doc(prototype)
+	timestamp, user = now(), frappe.session.user
+
+	doc.set("attributes", [{"attribute": a, "attribute_value": v} for a, v in spec["attributes"]])
+	doc.item_code = doc.name = spec["item_code"]
+	doc.item_name = spec["item_name"]
+	if spec.get("custom_item_name_detail"):
+		doc.custom_item_name_detail = spec["custom_item_name_detail"]
+	if describe_attributes:
+		doc.description = (template_doc.description or "") + " " + "".join(
+			f"<div>{a}: {cstr(v)}</div>" for a, v in spec["attributes"]
+		)
+
+	# Item.validate sẽ thêm dòng stock_uom vào bảng uoms — làm thay ở đây
+	if not any(row.uom == doc.stock_uom for row in doc.get("uoms")):
+		doc.append("uoms", {"uom": doc.stock_uom, "conversion_factor": 1})
+	doc.set("barcodes", [])
+	auto_add_barcode_on_item_save(doc)
+
+	doc.update({"owner": user, "modified_by": user, "creation": timestamp, "modified": timestamp, "docstatus": 0})
+	for child in doc.get_all_children():
+		child.update({
+			"name": frappe.generate_hash(length=10),
+			"parent": doc.name,
+			"parenttype": "Item",
+			"owner": user,
+			"modified_by": user,
+			"creation": timestamp,
+			"modified": timestamp,
+			"docstatus": 0,
+		})
+	return doc
+
+
+def create_variants_bulk(item, args, use_template_image=False, publish_progress=False):
+	"""Thay cho vòng lặp insert từng variant. Trả về {"created", "skipped"}."""
+	template_doc = frappe.get_doc("Item", item)
+	specs, skipped = plan_variants(template_doc, args)
+	if len(specs) > MAX_VARIANTS:
+		frappe.throw(_("Please do not create more than {0} items at a time").format(MAX_VARIANTS))
+
+	created = insert_variant_specs(template_doc, specs, use_template_image, publish_progress)
+	return {"created": created, "skipped": skipped}
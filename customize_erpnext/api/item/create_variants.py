@@ -9,6 +9,11 @@ Hàm ở đây bọc mỗi lần insert trong một savepoint: nếu trùng thì
 dòng đó, ghi nhận tên item bị bỏ qua rồi tiếp tục tạo các variant còn lại.
 Trả về {"created": <số tạo mới>, "skipped": [<tên item trùng>...]} để client
 hiển thị frappe.show_alert.
+
+`enqueue_multiple_variant_creation` (nút tạo nhiều variant) nay dùng
+`bulk_variant_builder.create_variants_bulk` — cùng kết quả trả về nhưng insert theo
+lô. `create_multiple_variants_skip_duplicates` giữ lại làm đường đi qua đầy đủ
+validate/hook của Item cho từng variant.
 """
 
 import json
@@ -16,6 +21,7 @@ import json
 import frappe
 from frappe import _
 
+from customize_erpnext.api.item.bulk_variant_builder import MAX_VARIANTS, create_variants_bulk
 from erpnext.controllers.item_variant import (
     create_variant,
     generate_keyed_value_combinations,
@@ -26,25 +32,28 @@ from erpnext.controllers.item_variant import (
 @frappe.whitelist()
 def enqueue_multiple_variant_creation(item, args, use_template_image=False):
 	"""Giữ nguyên hành vi enqueue của ERPNext (sync khi nhỏ, background khi lớn),
-	nhưng dùng create_multiple_variants_skip_duplicates để bỏ qua item trùng."""
+	nhưng tạo variant bằng bulk_variant_builder (bỏ qua tổ hợp / mã đã tồn tại)."""
 	variants = json.loads(args) if isinstance(args, str) else args
 
 	total_variants = 1
 	for key in variants:
 		total_variants *= len(variants[key])
 
-	if total_variants >= 600:
-		frappe.throw(_("Please do not create more than 500 items at a time"))
+	if total_variants > MAX_VARIANTS:
+		frappe.throw(_("Please do not create more than {0} items at a time").format(MAX_VARIANTS))
 		return
 
 	if total_variants < 10:
-		return create_multiple_variants_skip_duplicates(item, args, use_template_image)
+		return create_variants_bulk(item, variants, use_template_image)
 	else:
 		frappe.enqueue(
-			"customize_erpnext.api.item.create_variants.create_multiple_variants_skip_duplicates",
+			"customize_erpnext.api.item.bulk_variant_builder.create_variants_bulk",
+			queue="long",
+			timeout=3600,
 			item=item,
-			args=args,
+			args=variants,
 			use_template_image=use_template_image,
+			publish_progress=True,
 			now=frappe.in_test,
 		)
 		return "queued"
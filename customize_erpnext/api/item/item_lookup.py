@@ -0,0 +1,105 @@
+"""Resolve pattern item (custom_item_name_detail / item_code / tổ hợp attribute)
+qua `ItemPatternIndex` thay vì query `tabItem` cho từng pattern.
+
+Dòng thô (Item không phải template + Item Variant Attribute) được load bằng 2
+query và lưu trong Redis; mỗi worker dựng index một lần và giữ trong bộ nhớ
+process cho tới khi version trong Redis đổi. Hook Item (on_update — chạy sau cả
+insert lẫn save — / on_trash / after_rename) gọi `invalidate_item_pattern_index`
+→ mọi worker dựng lại ở lần tra kế tiếp. Script sửa Item bằng SQL/db_set (không chạy hook) phải tự gọi
+hàm invalidate; TTL của Redis là lưới an toàn cuối cùng.
+"""
+
+import frappe
+
+from customize_erpnext.api.item.item_pattern_index import ItemPatternIndex
+
+ROWS_CACHE_KEY = "item_pattern_index_rows"
+VERSION_CACHE_KEY = "item_pattern_index_version"
+ROWS_TTL = 6 * 3600
+
+# {site: (version, ItemPatternIndex)} — index đã dựng trong process này
+_local_index = {}
+
+
+def _load_rows():
+	items = frappe.db.sql(
+		"""
+		SELECT name, item_code, item_name, stock_uom, custom_item_name_detail, variant_of
+		FROM `tabItem`
+		WHERE has_variants = 0
+		ORDER BY creation
+		""",
+		as_dict=True,
+	)
+	attributes = frappe.db.sql(
+		"""
+		SELECT iva.parent, iva.attribute, iva.attribute_value
+		FROM `tabItem Variant Attribute` iva
+		INNER JOIN `tabItem` i ON i.name = iva.parent
+		WHERE i.variant_of IS NOT NULL AND i.variant_of != ''
+		"""
+	)
+	return {"items": [dict(row) for row in items], "attributes": [list(row) for row in attributes]}
+
+
+def _get_version():
+	version = frappe.cache().get_value(VERSION_CACHE_KEY)
+	if version is None:
+		version = frappe.generate_hash(length=10)
+		frappe.cache().set_value(VERSION_CACHE_KEY, version)
+	return version
+
+
+def get_item_pattern_index():
+	"""Index dùng chung cho các importer. Chi phí mỗi lần gọi: một GET Redis."""
+	version = _get_version()
+	cached = _local_index.get(frappe.local.site)
+	if cached and cached[0] == version:
+		return cached[1]
+
+	rows = frappe.cache().get_value(ROWS_CACHE_KEY)
+	if not rows or rows.get("version") != version:
+		rows = _load_rows()
+		rows["version"] = version
+		frappe.cache().set_value(ROWS_CACHE_KEY, rows, expires_in_sec=ROWS_TTL)
+
+	index = ItemPatternIndex(rows["items"], rows["attributes"])
+	_local_index[frappe.local.site] = (version, index)
+	return index
+
+
+def invalidate_item_pattern_index(doc=None, method=None):
+	"""doc_events Item — đổi version để mọi worker dựng lại index.
+
+	Đổi cả ngay lúc gọi lẫn sau commit: worker khác có thể đã dựng lại index từ
+	dữ liệu chưa commit trong khoảng giữa hai thời điểm đó.
+	"""
+	_bump_version()
+	frappe.db.after_commit.add(_bump_version)
+
+
+def _bump_version():
+	frappe.cache().delete_value(ROWS_CACHE_KEY)
+	frappe.cache().set_value(VERSION_CACHE_KEY, frappe.generate_hash(length=10))
+	_local_index.pop(frappe.local.site, None)
+
+
+def find_item(pattern):
+	return get_item_pattern_index().exact(pattern)
+
+
+def find_items(patterns):
+	"""{pattern: item | None} cho nhiều pattern — mỗi pattern là một dict probe."""
+	index = get_item_pattern_index()
+	return {pattern: index.exact(pattern) for pattern in patterns}
+
+
+def suggest_items(pattern, limit=5):
+	return get_item_pattern_index().suggest(pattern, limit)
+
+
+@frappe.whitelist()
+def search_item_patterns(txt, limit=10):
+	"""Gợi ý item theo custom_item_name_detail (exact → prefix → fuzzy)."""
+	frappe.has_permission("Item", "read", throw=True)
+	return suggest_items(txt, int(limit))
@@ -0,0 +1,144 @@
+"""Index trong bộ nhớ để resolve pattern item từ file Excel ra Item.
+
+Chỉ dùng stdlib: index dựng từ các dòng thô (xem `item_lookup.get_item_pattern_index`
+— nơi load và cache các dòng đó), nên test được mà không cần bench.
+
+Chuẩn hoá gần giống cách MariaDB so sánh `custom_item_name_detail` với collation
+mặc định `utf8mb4_unicode_ci` (mà các lookup `WHERE custom_item_name_detail = %s`
+cũ dựa vào): không phân biệt hoa/thường, bỏ khoảng trắng thừa.
+"""
+
+import bisect
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+_WHITESPACE = re.compile(r"\s+")
+_TOKEN_SPLIT = re.compile(r"[\s\-_/.,;:()]+")
+
+ITEM_FIELDS = ("name", "item_code", "item_name", "stock_uom", "custom_item_name_detail", "variant_of")
+
+
+def normalize_pattern(text):
+	"""NFC + casefold + gộp khoảng trắng. Trả về "" nếu rỗng."""
+	if text is None:
+		return ""
+	text = unicodedata.normalize("NFC", str(text)).casefold()
+	return _WHITESPACE.sub(" ", text).strip()
+
+
+def _tokens(normalized):
+	return {t for t in _TOKEN_SPLIT.split(normalized) if t}
+
+
+class ItemPatternIndex:
+	"""Tra exact / prefix / fuzzy theo custom_item_name_detail, item_code và
+	tổ hợp attribute của variant.
+
+	items       -- các dict có các key trong ITEM_FIELDS
+	attributes  -- các tuple (item_code, attribute, attribute_value)
+	"""
+
+	def __init__(self, items, attributes=()):
+		self.by_detail = {}
+		self.by_code = {}
+		self.by_attributes = {}
+		self.tokens = {}
+
+		for row in items:
+			item = {field: row.get(field) for field in ITEM_FIELDS}
+			self.by_code.setdefault(normalize_pattern(item["item_code"]), item)
+			detail = normalize_pattern(item["custom_item_name_detail"])
+			if not detail or detail in self.by_detail:
+				# Trùng custom_item_name_detail: giữ item đầu tiên như LIMIT 1 cũ
+				continue
+			self.by_detail[detail] = item
+			for token in _tokens(detail):
+				self.tokens.setdefault(token, []).append(detail)
+
+		self.sorted_details = sorted(self.by_detail)
+
+		values_by_item = {}
+		for item_code, _attribute, value in attributes:
+			values_by_item.setdefault(item_code, []).append(normalize_pattern(value))
+		for item_code, values in values_by_item.items():
+			item = self.by_code.get(normalize_pattern(item_code))
+			if item and item["variant_of"]:
+				key = (normalize_pattern(item["variant_of"]), frozenset(values))
+				self.by_attributes.setdefault(key, item)
+
+	def __len__(self):
+		return len(self.by_detail)
+
+	def exact(self, pattern):
+		return self.by_detail.get(normalize_pattern(pattern))
+
+	def item_code(self, item_code):
+		return self.by_code.get(normalize_pattern(item_code))
+
+	def variant(self, template, attribute_values):
+		"""Variant của `template` có đúng tập attribute value này."""
+		key = (normalize_pattern(template), frozenset(normalize_pattern(v) for v in attribute_values))
+		return self.by_attributes.get(key)
+
+	def prefix(self, pattern, limit=5):
+		"""Các item có detail bắt đầu bằng `pattern`, theo thứ tự alphabet."""
+		prefix = normalize_pattern(pattern)
+		if not prefix:
+			return []
+		result = []
+		for detail in self.sorted_details[bisect.bisect_left(self.sorted_details, prefix):]:
+			if not detail.startswith(prefix) or len(result) >= limit:
+				break
+			result.append(self.by_detail[detail])
+		return result
+
+	def fuzzy(self, pattern, limit=5, cutoff=0.6):
+		"""Các detail gần nhất theo SequenceMatcher ratio, dạng (item, ratio).
+
+		Chỉ so với các detail có chung ít nhất một token với pattern — không bao
+		giờ quét cả danh mục item.
+		"""
+		needle = normalize_pattern(pattern)
+		if not needle:
+			return []
+		candidates = set()
+		for token in _tokens(needle):
+			candidates.update(self.tokens.get(token, ()))
+
+		matcher = SequenceMatcher(b=needle, autojunk=False)
+		scored = []
+		for detail in candidates:
+			matcher.set_seq1(detail)
+			if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+				continue
+			ratio = matcher.ratio()
+			if ratio >= cutoff:
+				scored.append((ratio, detail))
+		scored.sort(key=lambda s: (-s[0], s[1]))
+		return [(self.by_detail[detail], ratio) for ratio, detail in scored[:limit]]
+
+	def suggest(self, pattern, limit=5):
+		"""Gợi ý cùng dạng với `find_similar_items` cũ của các importer:
+		dict gồm item_code, custom_item_name_detail, similarity_score."""
+		seen = set()
+		result = []
+
+		def add(item, score):
+			if item["item_code"] in seen or len(result) >= limit:
+				return
+			seen.add(item["item_code"])
+			result.append({
+				"item_code": item["item_code"],
+				"custom_item_name_detail": item["custom_item_name_detail"],
+				"similarity_score": score,
+			})
+
+		exact = self.exact(pattern)
+		if exact:
+			add(exact, 100)
+		for item in self.prefix(pattern, limit):
+			add(item, 90)
+		for item, ratio in self.fuzzy(pattern, limit):
+			add(item, min(int(ratio * 100), 89))
+		return result
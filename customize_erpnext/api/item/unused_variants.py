@@ -1,22 +1,49 @@
-"""Lọc các Item Variant "chết": tồn kho = 0 VÀ chưa từng tham gia giao dịch kho.
+"""Lọc các Item Variant "chết": tồn kho = 0 VÀ chưa từng được dùng ở đâu.
 
 Điều kiện:
   - Là item variant (variant_of có giá trị).
-  - KHÔNG có bất kỳ Stock Ledger Entry nào (chưa từng tham gia giao dịch kho).
-    (Mặc định tính cả phiếu đã hủy; bỏ chú thích AND sle.is_cancelled = 0 nếu muốn
-     bỏ qua các phiếu đã hủy.)
-  - KHÔNG có Bin nào còn actual_qty != 0 (tồn kho = 0).
+  - KHÔNG xuất hiện ở bất kỳ nguồn nào trong USAGE_SOURCES: Stock Ledger Entry
+    (chưa từng tham gia giao dịch kho — tính cả phiếu đã hủy), Bin còn
+    actual_qty != 0, BOM / BOM Item, Sales Order Item, Material Request Item,
+    Work Order / Work Order Item.
 
 Tham số:
   - item_group: bỏ trống = tất cả nhóm.
   - created_before: chỉ lấy item có creation < ngày này (bỏ trống = không lọc theo ngày).
+
+Mọi nguồn được tính trong MỘT query: mỗi nguồn là một cột EXISTS (semi-join
+trên cột item đã có index — xem patch add_item_usage_indexes), item "chết" là
+anti-join của tất cả. Kết quả (kèm cờ từng nguồn) cache theo item_group trong
+CACHE_TTL giây; created_before lọc trên kết quả cache. Job dọn dẹp kiểm tra lại
+từng chunk trước khi disable/xoá nên cache cũ không gây xoá nhầm.
 """
 
 import frappe
-
-
-@frappe.whitelist()
-def get_unused_variants(item_group=None, created_before=None):
+from frappe import _
+from frappe.utils import cint, get_datetime, now
+
+from customize_erpnext.api.item.item_lookup import invalidate_item_pattern_index
+
+# (key, doctype, cột item, điều kiện thêm)
+USAGE_SOURCES = (
+	("stock_ledger", "Stock Ledger Entry", "item_code", ""),
+	("stock_balance", "Bin", "item_code", "AND u.actual_qty != 0"),
+	("bom", "BOM", "item", ""),
+	("bom_item", "BOM Item", "item_code", ""),
+	("sales_order", "Sales Order Item", "item_code", ""),
+	("material_request", "Material Request Item", "item_code", ""),
+	("work_order", "Work Order", "production_item", ""),
+	("work_order_item", "Work Order Item", "item_code", ""),
+)
+
+CACHE_KEY_PREFIX = "unused_variants:"
+CACHE_TTL = 3600
+CLEANUP_CHUNK_SIZE = 200
+CLEANUP_ACTIONS = ("disable", "delete")
+
+
+def _usage_rows(item_group=None, item_codes=None):
+	"""Mọi variant (lọc theo nhóm hoặc danh sách mã) kèm một cột cờ cho mỗi nguồn."""
 	conditions = ["i.variant_of IS NOT NULL", "i.variant_of != ''"]
 	params = {}
 
@@ -24,34 +51,151 @@ def get_unused_variants(item_group=None, created_before=None):
 		conditions.append("i.item_group = %(item_group)s")
 		params["item_group"] = item_group
 
-	if created_before:
-		conditions.append("i.creation < %(created_before)s")
-		params["created_before"] = created_before
+	if item_codes is not None:
+		conditions.append("i.name IN %(item_codes)s")
+		params["item_codes"] = list(item_codes)
 
+	flags = ",\n".join(
+		f"EXISTS (SELECT 1 FROM `tab{doctype}` u WHERE u.{column} = i.name {extra}) AS {key}"
+		for key, doctype, column, extra in USAGE_SOURCES
+	)
 	where = " AND ".join(conditions)
 
-	rows = frappe.db.sql(
+	return frappe.db.sql(
 		f"""
 		SELECT i.name AS item_code, i.item_name, i.item_group,
-		       i.variant_of, i.creation, i.disabled
+		       i.variant_of, i.creation, i.disabled,
+		       {flags}
 		FROM `tabItem` i
 		WHERE {where}
-		  AND NOT EXISTS (
-		        SELECT 1 FROM `tabStock Ledger Entry` sle
-		        WHERE sle.item_code = i.name
-		        -- AND sle.is_cancelled = 0
-		  )
-		  AND NOT EXISTS (
-		        SELECT 1 FROM `tabBin` b
-		        WHERE b.item_code = i.name AND b.actual_qty != 0
-		  )
 		ORDER BY i.item_group, i.name
 		""",
 		params,
 		as_dict=True,
 	)
 
-	return {"count": len(rows), "items": rows}
+
+def _is_unused(row):
+	return not any(row[key] for key, *_rest in USAGE_SOURCES)
+
+
+def _cached_usage_rows(item_group=None, refresh=False):
+	key = CACHE_KEY_PREFIX + (item_group or "*")
+	rows = None if refresh else frappe.cache().get_value(key)
+	if rows is None:
+		rows = [dict(row) for row in _usage_rows(item_group)]
+		frappe.cache().set_value(key, rows, expires_in_sec=CACHE_TTL)
+	return rows
+
+
+def clear_unused_variant_cache():
+	frappe.cache().delete_keys(CACHE_KEY_PREFIX)
+
+
+def _filter_created_before(rows, created_before):
+	if not created_before:
+		return rows
+	created_before = get_datetime(created_before)
+	return [row for row in rows if get_datetime(row["creation"]) < created_before]
+
+
+@frappe.whitelist()
+def get_unused_variants(item_group=None, created_before=None, refresh=False):
+	rows = _filter_created_before(_cached_usage_rows(item_group, cint(refresh)), created_before)
+	items = [
+		{field: row[field] for field in ("item_code", "item_name", "item_group", "variant_of", "creation", "disabled")}
+		for row in rows
+		if _is_unused(row)
+	]
+	return {"count": len(items), "items": items}
+
+
+@frappe.whitelist()
+def analyze_variant_usage(item_group=None, created_before=None, refresh=False):
+	"""Tổng hợp: bao nhiêu variant, bao nhiêu "chết", mỗi nguồn đang giữ bao nhiêu variant."""
+	rows = _filter_created_before(_cached_usage_rows(item_group, cint(refresh)), created_before)
+	return {
+		"total": len(rows),
+		"unused": sum(1 for row in rows if _is_unused(row)),
+		"used_by": {key: sum(1 for row in rows if row[key]) for key, *_rest in USAGE_SOURCES},
+	}
+
+
+@frappe.whitelist()
+def enqueue_unused_variant_cleanup(action="disable", item_codes=None, item_group=None, created_before=None):
+	"""Disable / xoá các variant "chết" trong background job (queue long).
+
+	item_codes bỏ trống = toàn bộ kết quả của get_unused_variants(item_group, created_before).
+	"""
+	if action not in CLEANUP_ACTIONS:
+		frappe.throw(_("Invalid action: {0}").format(action))
+	frappe.has_permission("Item", "delete" if action == "delete" else "write", throw=True)
+
+	if isinstance(item_codes, str):
+		item_codes = frappe.parse_json(item_codes)
+	if not item_codes:
+		item_codes = [row["item_code"] for row in get_unused_variants(item_group, created_before)["items"]]
+	if not item_codes:
+		return {"queued": 0}
+
+	frappe.enqueue(
+		run_unused_variant_cleanup,
+		queue="long",
+		timeout=3600,
+		enqueue_after_commit=True,
+		action=action,
+		item_codes=item_codes,
+		user=frappe.session.user,
+	)
+	return {"queued": len(item_codes)}
+
+
+def run_unused_variant_cleanup(action, item_codes, user=None):
+	"""Mỗi chunk: kiểm tra lại bằng _usage_rows (item có thể vừa được dùng sau khi
+	cache được dựng), disable bằng một UPDATE hoặc xoá từng item trong savepoint,
+	rồi commit và báo tiến độ."""
+	done, skipped, failed = [], [], []
+
+	for start in range(0, len(item_codes), CLEANUP_CHUNK_SIZE):
+		chunk = item_codes[start:start + CLEANUP_CHUNK_SIZE]
+		unused = [row.item_code for row in _usage_rows(item_codes=chunk) if _is_unused(row)]
+		skipped.extend(sorted(set(chunk) - set(unused)))
+
+		if action == "disable" and unused:
+			frappe.db.sql(
+				"""
+				UPDATE `tabItem`
+				SET disabled = 1, modified = %(modified)s, modified_by = %(user)s
+				WHERE name IN %(names)s
+				""",
+				{"names": unused, "modified": now(), "user": user or frappe.session.user},
+			)
+			done.extend(unused)
+		elif action == "delete":
+			for item_code in unused:
+				frappe.db.savepoint("unused_variant_delete")
+				try:
+					frappe.delete_doc("Item", item_code, ignore_missing=True)
+					done.append(item_code)
+				except Exception as e:
+					frappe.db.rollback(save_point="unused_variant_delete")
+					failed.append({"item_code": item_code, "error": str(e)})
+
+		frappe.db.commit()
+		processed = min(start + CLEANUP_CHUNK_SIZE, len(item_codes))
+		frappe.publish_progress(
+			processed * 100 / len(item_codes),
+			title=_("Cleaning Up Unused Variants"),
+			description=_("{0} of {1} items").format(processed, len(item_codes)),
+		)
+
+	clear_unused_variant_cache()
+	invalidate_item_pattern_index()
+	frappe.db.commit()
+
+	result = {"action": action, "done": len(done), "skipped": skipped, "failed": failed}
+	frappe.publish_realtime("unused_variant_cleanup_done", result, user=user)
+	return result
 
 """
 
@@ -65,11 +209,19 @@ def get_unused_variants(item_group=None, created_before=None):
   # lọc theo nhóm
   bench --site erp.tiqn.local execute customize_erpnext.api.item.unused_variants.get_unused_variants \
     --kwargs "{'item_group': 'C-Fabric', 'created_before': '2026-06-01'}"
-    
+
+  # tổng hợp theo nguồn / disable các variant chết của một nhóm (chạy nền)
+  bench --site erp.tiqn.local execute customize_erpnext.api.item.unused_variants.analyze_variant_usage \
+    --kwargs "{'item_group': 'C-Fabric'}"
+  bench --site erp.tiqn.local execute customize_erpnext.api.item.unused_variants.enqueue_unused_variant_cleanup \
+    --kwargs "{'action': 'disable', 'item_group': 'C-Fabric', 'created_before': '2026-06-01'}"
+
   HTTP API:
   GET /api/method/customize_erpnext.api.item.unused_variants.get_unused_variants?item_group=C-Fabric&created_before=2026-06-01
+  (kết quả cache CACHE_TTL giây theo item_group — thêm &refresh=1 để tính lại)
 
-  SQL thuần (chạy bench --site erp.tiqn.local mariadb)
+  SQL thuần (chạy bench --site erp.tiqn.local mariadb) — bản rút gọn chỉ xét SLE + Bin;
+  các nguồn còn lại xem USAGE_SOURCES.
 
   SELECT i.name AS item_code, i.item_name, i.item_group,
          i.variant_of, i.creation, i.disabled
@@ -0,0 +1,66 @@
+"""File private do background job tạo ra (ZIP export, PDF batch).
+
+Dùng chung cho `zip_export` và `pdf_batch`: job ghi file ra
+private/files/<prefix><job_id>.<ext>, `save_job_file` tạo File row (chỉ người
+tạo / System Manager đọc được) và `cleanup_job_files` (scheduler hourly) xoá
+file cũ hơn TTL. Client nhận link qua `public/js/background_file_job.js`.
+"""
+
+import hashlib
+import os
+
+import frappe
+
+
+def md5_of(path, block_size=1 << 20):
+	"""content_hash của file trên đĩa, đọc theo khối."""
+	digest = hashlib.md5()
+	with open(path, "rb") as f:
+		for block in iter(lambda: f.read(block_size), b""):
+			digest.update(block)
+	return digest.hexdigest()
+
+
+def job_file_path(stored_name):
+	return frappe.get_site_path("private", "files", stored_name)
+
+
+def save_job_file(stored_name, filename):
+	"""Tạo File private trỏ vào private/files/<stored_name> (caller commit)."""
+	path = job_file_path(stored_name)
+	file_doc = frappe.get_doc({
+		"doctype": "File",
+		"file_name": filename,
+		"file_url": f"/private/files/{stored_name}",
+		"is_private": 1,
+		"file_size": os.path.getsize(path),
+		"content_hash": md5_of(path),
+	})
+	file_doc.insert(ignore_permissions=True)
+	return file_doc
+
+
+def discard_job_file(stored_name):
+	"""Xoá file dở dang khi job lỗi."""
+	path = job_file_path(stored_name)
+	if os.path.exists(path):
+		os.unlink(path)
+
+
+def cleanup_job_files(prefix, extension, ttl, error_title):
+	"""Xoá File private `<prefix>*.<extension>` cũ hơn `ttl` giây."""
+	old_files = frappe.get_all(
+		"File",
+		filters={
+			"file_url": ["like", f"/private/files/{prefix}%.{extension}"],
+			"creation": ["<", frappe.utils.add_to_date(frappe.utils.now_datetime(), seconds=-ttl)],
+		},
+		pluck="name",
+	)
+	for name in old_files:
+		try:
+			frappe.delete_doc("File", name, ignore_permissions=True)
+		except Exception:
+			frappe.log_error(frappe.get_traceback(), error_title)
+	if old_files:
+		frappe.db.commit()
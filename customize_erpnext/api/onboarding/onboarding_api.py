@@ -11,16 +11,20 @@ Public APIs (allow_guest=True) — dùng cho web page self-service:
 
 HR APIs (require login):
   approve_onboarding      → Duyệt 1 form
-  bulk_approve_onboarding → Duyệt nhiều / tất cả
+  bulk_approve_onboarding → Duyệt nhiều / tất cả (tuỳ chọn sync luôn)
   reject_onboarding       → Từ chối (kèm lý do)
   sync_to_employee        → Đồng bộ dữ liệu sang Employee
-  download_cccd_photos    → Tải ảnh CCCD về dưới dạng ZIP
+  bulk_sync_to_employee   → Đồng bộ nhiều / tất cả form Approved (job nền, api/form_sync)
+  download_cccd_photos    → Tải ảnh CCCD về dưới dạng ZIP (job nền, api/zip_export)
   download_onboarding_excel → Xuất Excel thông tin onboarding
 """
 
 import frappe
 from frappe import _
 
+from customize_erpnext.api.eligible_employees_cache import invalidate_onboarding, serve
+from customize_erpnext.api.form_sync import run_form_sync, start_form_sync
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -152,7 +156,13 @@ def get_eligible_employees():
 	- Theo cấu hình Settings
 	- Chỉ trả những employee CHƯA có form hoặc có form status=Rejected
 	- Không trả cell_number (private)
+
+	Served from a cached snapshot with ETag / 304 (api/eligible_employees_cache).
 	"""
+	return serve("onboarding", _build_eligible_employees)
+
+
+def _build_eligible_employees():
 	employees = _get_eligible_employee_ids()
 	if not employees:
 		return []
@@ -363,6 +373,9 @@ def save_onboarding_form(employee_id, **kwargs):
 		frappe.db.sql("UPDATE `tabEmployee` SET `date_of_birth`=%s WHERE `name`=%s", (new_dob, employee_id))
 	if new_cell:
 		frappe.db.sql("UPDATE `tabEmployee` SET `cell_number`=%s WHERE `name`=%s", (new_cell, employee_id))
+	if new_dob or new_cell:
+		# bypasses doc_events — drop the guest eligible-list snapshot here
+		invalidate_onboarding()
 
 	frappe.db.commit()
 	return {"status": "success", "message": _("Thông tin đã được lưu thành công.")}
@@ -395,51 +408,70 @@ def approve_onboarding(name):
 	return {"status": "success"}
 
 
+def _parse_names(names):
+	import json as _json
+
+	if isinstance(names, str):
+		try:
+			names = _json.loads(names)
+		except Exception:
+			frappe.throw(_("Invalid names format"))
+	return names or []
+
+
+def _truthy(value):
+	if isinstance(value, str):
+		return value.lower() in ("1", "true", "yes")
+	return bool(value)
+
+
 @frappe.whitelist()
-def bulk_approve_onboarding(names=None, approve_all=False):
+def bulk_approve_onboarding(names=None, approve_all=False, sync=False):
 	"""
 	Approve multiple onboarding forms.
 	names: JSON list of form names, e.g. '["HR-EMP-001", "HR-EMP-002"]'
 	approve_all: if True, approve ALL Pending Review forms regardless of names
+	sync: if True, also queue the Employee sync job for the approved forms
+	Trạng thái được đổi bằng một UPDATE cho cả danh sách.
 	"""
-	import json as _json
-
 	_require_hr()
 
-	if isinstance(approve_all, str):
-		approve_all = approve_all.lower() in ("1", "true", "yes")
-
-	if approve_all:
+	if _truthy(approve_all):
 		pending = frappe.get_all(
 			"Employee Onboarding Form",
 			filters={"status": "Pending Review"},
 			pluck="name",
 		)
 	else:
-		if isinstance(names, str):
-			try:
-				names = _json.loads(names)
-			except Exception:
-				frappe.throw(_("Invalid names format"))
-		pending = names or []
-
-	approved = []
-	skipped = []
-	for name in pending:
-		status = frappe.db.get_value("Employee Onboarding Form", name, "status")
-		if status != "Pending Review":
-			skipped.append(name)
-			continue
-		frappe.db.set_value("Employee Onboarding Form", name, "status", "Approved")
-		approved.append(name)
+		pending = _parse_names(names)
 
+	approvable = set(frappe.get_all(
+		"Employee Onboarding Form",
+		filters={"name": ["in", pending], "status": "Pending Review"},
+		pluck="name",
+	)) if pending else set()
+	approved = [name for name in dict.fromkeys(pending) if name in approvable]
+	skipped = [name for name in pending if name not in approvable]
+
+	if approved:
+		frappe.db.sql(
+			"UPDATE `tabEmployee Onboarding Form` SET `status`='Approved', `modified`=%s, `modified_by`=%s"
+			" WHERE `name` IN %s AND `status`='Pending Review'",
+			(frappe.utils.now(), frappe.session.user, tuple(approved)),
+		)
+		# bypasses doc_events — drop the guest eligible-list snapshot here
+		invalidate_onboarding()
 	frappe.db.commit()
-	return {
+
+	result = {
 		"status": "success",
 		"approved_count": len(approved),
 		"skipped_count": len(skipped),
 		"approved": approved,
 	}
+	if approved and _truthy(sync):
+		result["sync_job"] = start_form_sync(_SYNC_SPEC_PATH, approved, _("Sync Onboarding → Employee"))
+	return result
 
 
 @frappe.whitelist()
@@ -457,47 +489,59 @@ def reject_onboarding(name, reason=""):
 	return {"status": "success"}
 
 
+def _employee_values(form):
+	return {emp_field: form.get(form_field) for form_field, emp_field in _SYNC_MAP.items()}
+
+
+# Cấu hình cho engine sync hàng loạt (api/form_sync.py)
+SYNC_SPEC = {
+	"form_doctype": "Employee Onboarding Form",
+	"form_fields": list(_SYNC_MAP),
+	"values": _employee_values,
+	"invalidate": invalidate_onboarding,
+}
+_SYNC_SPEC_PATH = "customize_erpnext.api.onboarding.onboarding_api.SYNC_SPEC"
+
+
 @frappe.whitelist()
 def sync_to_employee(name):
 	"""
 	Sync onboarding form data to the linked Employee document.
-	Maps onboarding fields → Employee fields (with custom_ prefix where needed).
+	Maps onboarding fields → Employee fields (with custom_ prefix where needed);
+	only fields whose value differs are written (api/form_sync).
 	"""
 	_require_hr()
 
-	doc = frappe.get_doc("Employee Onboarding Form", name)
-	if doc.status != "Approved":
+	if frappe.db.get_value("Employee Onboarding Form", name, "status") != "Approved":
 		frappe.throw(_("Only Approved forms can be synced to Employee."))
 
-	emp = frappe.get_doc("Employee", doc.employee)
-
-	# Get valid fields on Employee doctype
-	emp_meta = frappe.get_meta("Employee")
-	valid_emp_fields = {f.fieldname for f in emp_meta.fields}
-
-	synced_fields = []
-	for form_field, emp_field in _SYNC_MAP.items():
-		val = doc.get(form_field)
-		if emp_field in valid_emp_fields:
-			emp.set(emp_field, val)
-			synced_fields.append(emp_field)
-
-	emp.flags.ignore_permissions = True
-	emp.flags.ignore_mandatory = True
-	emp.save()
-
-	doc.status = "Synced"
-	doc.flags.ignore_validate_update_after_submit = True
-	doc.save(ignore_permissions=True)
-	frappe.db.commit()
+	result = run_form_sync(SYNC_SPEC, [name])["results"][name]
+	if not result["ok"]:
+		frappe.throw(result["message"])
 
 	return {
 		"status": "success",
-		"synced_fields": synced_fields,
+		"synced_fields": result["fields"],
 		"message": _("Data synced to Employee successfully."),
 	}
 
 
+@frappe.whitelist()
+def bulk_sync_to_employee(names=None, sync_all=False):
+	"""
+	Sync many Approved forms in a background job (progress + `form_sync_done`).
+	names: JSON list of form names; sync_all: every Approved form.
+	Returns {"job_id", "total"} — per-form errors come back with the job result.
+	"""
+	_require_hr()
+
+	if _truthy(sync_all):
+		names = frappe.get_all("Employee Onboarding Form", filters={"status": "Approved"}, pluck="name")
+	else:
+		names = _parse_names(names)
+	return start_form_sync(_SYNC_SPEC_PATH, names, _("Sync Onboarding → Employee"))
+
+
 # ---------------------------------------------------------------------------
 # Photo upload (allow_guest — used from onboarding web page)
 # ---------------------------------------------------------------------------
@@ -511,12 +555,12 @@ def upload_cccd_photo(employee_id, side, image_data):
 	side: "front" or "back"
 	image_data: base64 dataURL (client already cropped & compressed to ≤3 MB JPEG)
 
-	Returns: {"file_url": "/files/<encoded_name>"}
+	Returns: {"file_url": "/files/<encoded_name>"} as soon as the bytes are on disk;
+	normalisation runs in the background (api/image_ingest).
 	"""
-	import base64
-	import os
 	import re
-	from urllib.parse import quote
+
+	from customize_erpnext.api.image_ingest import accept_upload, decode_data_url
 
 	if not employee_id or side not in ("front", "back"):
 		frappe.throw(_("Invalid parameters"))
@@ -530,55 +574,17 @@ def upload_cccd_photo(employee_id, side, image_data):
 		frappe.throw(_("Employee not found"))
 	employee_name = emp[0].employee_name or employee_id
 
-	# Parse dataURL
-	if not image_data or not image_data.startswith("data:"):
-		frappe.throw(_("Invalid image data"))
-	match = re.match(r"data:image/(\w+);base64,(.+)", image_data)
-	if not match:
-		frappe.throw(_("Invalid image format"))
-
-	raw = match.group(2)
-	try:
-		file_bytes = base64.b64decode(raw)
-	except Exception:
-		frappe.throw(_("Failed to decode image"))
-
-	# 4 MB hard limit (client targets ≤3 MB, buffer for overhead)
-	if len(file_bytes) > 4 * 1024 * 1024:
-		frappe.throw(_("Image is too large. Maximum size is 4 MB."))
+	# Parse dataURL — 4 MB hard limit (client targets ≤3 MB, buffer for overhead)
+	file_bytes = decode_data_url(image_data)
 
 	# Build filename: "TIQN-1234 Nguyen Van A CCCD mặt trước.JPG"
 	side_label = "mặt trước" if side == "front" else "mặt sau"
 	safe_name = re.sub(r'[\\/:*?"<>|]', "", employee_name).strip()
 	file_name = f"{employee_id} {safe_name} CCCD {side_label}.JPG"
-	file_url = "/files/" + quote(file_name)
-
-	# Save to Frappe public files (overwrite previous upload for same employee+side)
-	site_path = frappe.get_site_path()
-	public_files = os.path.join(site_path, "public", "files")
-	os.makedirs(public_files, exist_ok=True)
-	file_path = os.path.join(public_files, file_name)
-	with open(file_path, "wb") as f:
-		f.write(file_bytes)
-
-	# Create/update File record
-	existing_file = frappe.db.get_value("File", {"file_url": file_url}, "name")
-	if existing_file:
-		frappe.db.set_value("File", existing_file, "attached_to_doctype", "Employee Onboarding Form")
-		frappe.db.set_value("File", existing_file, "attached_to_name", employee_id)
-	else:
-		file_doc = frappe.get_doc({
-			"doctype": "File",
-			"file_name": file_name,
-			"file_url": file_url,
-			"attached_to_doctype": "Employee Onboarding Form",
-			"attached_to_name": employee_id,
-			"is_private": 0,
-		})
-		file_doc.flags.ignore_permissions = True
-		file_doc.insert()
 
-	frappe.db.commit()
+	# Overwrite previous upload for same employee+side; resize / strip EXIF and the
+	# File record happen in a background job (api/image_ingest)
+	file_url = accept_upload(file_bytes, file_name, "Employee Onboarding Form", employee_id, dedupe=False)
 
 	return {"file_url": file_url}
 
@@ -590,16 +596,16 @@ def upload_cccd_photo(employee_id, side, image_data):
 @frappe.whitelist()
 def download_cccd_photos(names=None):
 	"""
-	Return base64-encoded ZIP of CCCD photos for selected (or all) forms.
+	Build a ZIP of CCCD photos for selected (or all) forms in a background job.
 	Each form contributes up to 2 files: front + back.
+	Returns {"job_id", "total"} — see customize_erpnext.api.zip_export.
 	"""
-	import base64
-	import io
 	import json
 	import os
-	import zipfile
 	from urllib.parse import unquote
 
+	from customize_erpnext.api.zip_export import start_zip_export
+
 	_require_hr()
 
 	filters = {}
@@ -615,38 +621,18 @@ def download_cccd_photos(names=None):
 		order_by="employee_name asc",
 	)
 
-	site_path = frappe.get_site_path()
-	buf = io.BytesIO()
-	added = 0
-
-	with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-		for r in records:
-			for side, url_field in [("front", "id_card_front_photo"), ("back", "id_card_back_photo")]:
-				file_url = r.get(url_field)
-				if not file_url:
-					continue
-				# URL-decode first (field may store %20 etc.), then resolve filesystem path
-				decoded_url = unquote(file_url)
-				# Handle both /files/... (public) and /private/files/... (private)
-				if decoded_url.startswith("/private/"):
-					rel_path = decoded_url.lstrip("/")  # "private/files/..."
-					abs_path = os.path.join(site_path, rel_path)
-				else:
-					rel_path = decoded_url.lstrip("/")  # "files/..."
-					abs_path = os.path.join(site_path, "public", rel_path)
-				if not os.path.exists(abs_path):
-					continue
-				arc_name = os.path.basename(abs_path)
-				zf.write(abs_path, arc_name)
-				added += 1
-
-	if added == 0:
-		frappe.throw(_("Không có ảnh CCCD nào để tải."))
-
-	return {
-		"filename": "CCCD_photos.zip",
-		"data": base64.b64encode(buf.getvalue()).decode("utf-8"),
-	}
+	entries = [
+		(os.path.basename(unquote(r.get(url_field))), r.get(url_field))
+		for r in records
+		for url_field in ("id_card_front_photo", "id_card_back_photo")
+		if r.get(url_field)
+	]
+	return start_zip_export(
+		entries,
+		"CCCD_photos.zip",
+		title=_("Tải ảnh CCCD"),
+		empty_message=_("Không có ảnh CCCD nào để tải."),
+	)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,159 @@
+"""Render PDF lớn (tem QR, thẻ nhân viên) theo chunk trong background job.
+
+Thay vì một story ReportLab / một HTML khổng lồ cho cả lô, danh sách được cắt
+thành các chunk trọn trang (`page_chunks`), mỗi chunk render ra một file PDF tạm
+rồi ghép lại (`concat_pdfs`, pypdf — đã có sẵn theo frappe). Bộ nhớ chỉ phụ
+thuộc kích thước một chunk.
+
+Hai kiểu song song:
+  - `render_in_processes`: renderer thuần Python (ReportLab) — process pool
+    context "spawn" để không fork worker đang giữ kết nối DB/Redis.
+  - `render_in_threads`: renderer cần frappe (wkhtmltopdf qua `get_pdf`) — mỗi
+    thread tự `frappe.init` / `connect`; wkhtmltopdf là process riêng nên các
+    thread chạy song song thật.
+
+`enqueue_pdf_batch` đưa job vào queue long; khi xong file được lưu thành File
+private (chỉ người tạo đọc được) và client nhận realtime `pdf_batch_done`.
+File cũ hơn FILE_TTL bị xoá bởi `cleanup_pdf_batches` (scheduler hourly). Tạo /
+xoá File dùng chung với zip_export (`job_files`).
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import frappe
+from frappe import _
+
+from customize_erpnext.api.job_files import cleanup_job_files, discard_job_file, job_file_path, save_job_file
+
+MAX_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+FILE_PREFIX = "pdf_batch_"
+FILE_TTL = 6 * 3600
+
+
+def page_chunks(items, per_page, pages_per_chunk):
+	"""Cắt items thành các chunk trọn trang (per_page * pages_per_chunk phần tử)."""
+	size = max(1, per_page * pages_per_chunk)
+	return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def render_in_processes(worker, payloads, max_workers=MAX_WORKERS):
+	"""worker(payload, out_path) chạy trong process pool — phải là hàm top-level
+	không cần frappe context. Trả về các out_path theo đúng thứ tự payloads."""
+	tmpdir = tempfile.mkdtemp(prefix=FILE_PREFIX)
+	paths = [os.path.join(tmpdir, f"{i:05d}.pdf") for i in range(len(payloads))]
+	if len(payloads) == 1:
+		worker(payloads[0], paths[0])
+		return paths
+
+	context = multiprocessing.get_context("spawn")
+	with ProcessPoolExecutor(max_workers=min(max_workers, len(payloads)), mp_context=context) as pool:
+		list(pool.map(worker, payloads, paths))
+	return paths
+
+
+def render_in_threads(render, payloads, max_workers=MAX_WORKERS):
+	"""render(payload) -> bytes PDF, chạy trong thread pool với frappe context
+	riêng cho mỗi thread. Trả về các file tạm theo đúng thứ tự payloads."""
+	site = frappe.local.site
+	user = frappe.session.user
+	tmpdir = tempfile.mkdtemp(prefix=FILE_PREFIX)
+	paths = [os.path.join(tmpdir, f"{i:05d}.pdf") for i in range(len(payloads))]
+
+	def work(payload, path):
+		frappe.init(site=site)
+		try:
+			frappe.connect()
+			frappe.set_user(user)
+			with open(path, "wb") as f:
+				f.write(render(payload))
+		finally:
+			frappe.destroy()
+
+	if len(payloads) == 1:
+		with open(paths[0], "wb") as f:
+			f.write(render(payloads[0]))
+		return paths
+
+	with ThreadPoolExecutor(max_workers=min(max_workers, len(payloads))) as pool:
+		list(pool.map(work, payloads, paths))
+	return paths
+
+
+def concat_pdfs(paths, out_path):
+	"""Ghép các PDF theo thứ tự vào out_path."""
+	from pypdf import PdfWriter
+
+	if len(paths) == 1:
+		shutil.copyfile(paths[0], out_path)
+		return out_path
+
+	writer = PdfWriter()
+	for path in paths:
+		writer.append(path)
+	with open(out_path, "wb") as f:
+		writer.write(f)
+	writer.close()
+	return out_path
+
+
+def enqueue_pdf_batch(builder, kwargs, filename, title):
+	"""builder: dotted path tới hàm (**kwargs) -> [đường dẫn PDF chunk theo thứ tự].
+
+	Trả về {"background_job": True, "job_id"} để client chờ realtime `pdf_batch_done`.
+	"""
+	job_id = frappe.generate_hash(length=12)
+	frappe.enqueue(
+		"customize_erpnext.api.pdf_batch.run_pdf_batch",
+		queue="long",
+		timeout=3600,
+		job_id=f"pdf_batch::{job_id}",
+		enqueue_after_commit=True,
+		batch_id=job_id,
+		builder=builder,
+		builder_kwargs=kwargs,
+		filename=filename,
+		title=title,
+	)
+	return {"background_job": True, "job_id": job_id}
+
+
+def run_pdf_batch(batch_id, builder, builder_kwargs, filename, title):
+	"""Background job: render chunk → ghép → File private → realtime."""
+	chunk_paths = []
+	stored_name = f"{FILE_PREFIX}{batch_id}.pdf"
+	out_path = job_file_path(stored_name)
+	try:
+		frappe.publish_progress(5, title=title, description=_("Rendering pages..."))
+		chunk_paths = frappe.get_attr(builder)(**builder_kwargs)
+		frappe.publish_progress(90, title=title, description=_("Merging {0} parts...").format(len(chunk_paths)))
+		concat_pdfs(chunk_paths, out_path)
+
+		file_doc = save_job_file(stored_name, filename)
+		frappe.db.commit()
+		frappe.publish_progress(100, title=title)
+		frappe.publish_realtime(
+			"pdf_batch_done",
+			{"job_id": batch_id, "success": True, "file_url": file_doc.file_url, "filename": filename},
+			user=frappe.session.user,
+		)
+	except Exception as e:
+		frappe.db.rollback()
+		discard_job_file(stored_name)
+		frappe.log_error(frappe.get_traceback(), "PDF Batch Error")
+		frappe.publish_realtime(
+			"pdf_batch_done",
+			{"job_id": batch_id, "success": False, "error": str(e)},
+			user=frappe.session.user,
+		)
+	finally:
+		for tmpdir in {os.path.dirname(p) for p in chunk_paths}:
+			shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def cleanup_pdf_batches():
+	"""Hourly scheduler task: xoá các file PDF batch cũ hơn FILE_TTL."""
+	cleanup_job_files(FILE_PREFIX, "pdf", FILE_TTL, "PDF Batch Cleanup Error")
@@ -3,6 +3,8 @@ import frappe
 from io import BytesIO
 import base64
 
+from customize_erpnext.api import qr_png_cache
+
 try:
     import qrcode
     import qrcode.constants
@@ -28,6 +30,18 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+# Above this many labels the PDF is rendered in a background job, in page-aligned
+# chunks of LABEL_PAGES_PER_CHUNK pages spread over a process pool (api/pdf_batch.py)
+LABEL_ASYNC_THRESHOLD = 300
+LABEL_PAGES_PER_CHUNK = 4
+A5_LABELS_PER_PAGE = 12  # Fixed 3x4 grid
+
+# QR PNGs are content-addressed (api/qr_png_cache.py) so they never go stale;
+# the TTL only bounds Redis memory for codes that are not printed again
+QR_CACHE_PREFIX = 'qr_png:'
+QR_CACHE_TTL = 30 * 24 * 3600
+QR_BULK_LIMIT = 2000
+
 
 @frappe.whitelist()
 def generate_qr_labels_pdf(filters=None, page_format='a5_landscape'):
@@ -62,6 +76,25 @@ def generate_qr_labels_pdf(filters=None, page_format='a5_landscape'):
         if not items:
             frappe.throw("No items found with the specified filters")
 
+        filename = f'qr_labels_{page_format}_{frappe.utils.now()}.pdf'
+
+        # Large runs: chunked, process-parallel rendering in a background job
+        if len(items) > LABEL_ASYNC_THRESHOLD:
+            from customize_erpnext.api.pdf_batch import enqueue_pdf_batch
+
+            label_fields = ('item_code', 'item_name', 'custom_item_name_detail', 'item_group')
+            result = enqueue_pdf_batch(
+                'customize_erpnext.api.qr_label_print.build_qr_labels_chunks',
+                {
+                    'items': [{f: item.get(f) for f in label_fields} for item in items],
+                    'page_format': page_format,
+                },
+                filename,
+                title='QR Labels PDF',
+            )
+            result['items_count'] = len(items)
+            return result
+
         # Generate PDF based on page format
         if page_format == 'a5_landscape':
             pdf_buffer = create_qr_labels_pdf_a5_landscape(items)
@@ -73,7 +106,7 @@ def generate_qr_labels_pdf(filters=None, page_format='a5_landscape'):
 
         return {
             'pdf_data': pdf_base64,
-            'filename': f'qr_labels_{page_format}_{frappe.utils.now()}.pdf',
+            'filename': filename,
             'items_count': len(items)
         }
 
@@ -150,24 +183,51 @@ def get_filtered_items(filters):
     return frappe.db.sql(query, values, as_dict=True)
 
 
-def generate_qr_code(data, size=None):
-    """Generate QR code image"""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_Q,
-        box_size=8,
-        border=2
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
+def get_qr_pngs(payloads):
+    """{payload: QR PNG bytes} for many payloads at once.
 
-    # Create QR code image
-    qr_img = qr.make_image(fill_color="black", back_color="white")
+    Lookup order: in-process LRU -> Redis (one MGET) -> encode the remaining
+    misses in one pass and write them back to both layers. Redis is skipped when
+    there is no site context (process-pool workers of api/pdf_batch.py).
+    """
+    pngs, missing = qr_png_cache.lookup_many(p for p in payloads if p)
+    if not missing:
+        return pngs
 
-    # Convert to bytes
-    img_buffer = BytesIO()
-    qr_img.save(img_buffer, format='PNG')
-    img_buffer.seek(0)
+    cache = frappe.cache() if getattr(frappe.local, 'site', None) else None
+    if cache:
+        names = [cache.make_key(QR_CACHE_PREFIX + qr_png_cache.qr_key(data)) for data in missing]
+        try:
+            found = {data: png for data, png in zip(missing, cache.mget(names)) if png}
+        except Exception:
+            found = {}
+        qr_png_cache.store_many(found)
+        pngs.update(found)
+        missing = [data for data in missing if data not in found]
+
+    if missing:
+        generated = qr_png_cache.encode_many(missing)
+        qr_png_cache.store_many(generated)
+        pngs.update(generated)
+        if cache:
+            try:
+                pipe = cache.pipeline()
+                for data, png in generated.items():
+                    pipe.set(cache.make_key(QR_CACHE_PREFIX + qr_png_cache.qr_key(data)), png, ex=QR_CACHE_TTL)
+                pipe.execute()
+            except Exception:
+                pass  # Redis is only an accelerator here
+    return pngs
+
+
+def get_qr_png(data):
+    """QR PNG bytes for one payload (cached)"""
+    return get_qr_pngs([data])[data]
+
+
+def generate_qr_code(data, size=None):
+    """Generate QR code image"""
+    img_buffer = BytesIO(get_qr_png(data))
 
     # Create ReportLab Image with default size if not provided
     if size is None:
@@ -180,37 +240,82 @@ def generate_qr_code(data, size=None):
 def generate_qr_code_base64(data):
     """Generate QR code image and return as base64 string for web display"""
     try:
-        import qrcode
-        import qrcode.constants
-        from io import BytesIO
-        import base64
-        
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_Q,
-            box_size=8,
-            border=2
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        # Create QR code image
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        img_buffer = BytesIO()
-        qr_img.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-        
-        return base64.b64encode(img_buffer.getvalue()).decode()
-        
+        return base64.b64encode(get_qr_png(data)).decode()
+
     except Exception as e:
         frappe.log_error(f"Error generating QR code: {str(e)}")
         return ""
 
 
+@frappe.whitelist()
+def generate_qr_codes_base64(data_list):
+    """Bulk variant of generate_qr_code_base64: {payload: base64 PNG}
+
+    Each new payload is a Redis write kept QR_CACHE_TTL, so HTTP callers need
+    Item read permission (these are Item label codes). Print formats use
+    qr_codes_base64 (jinja) instead: printing already checked the document.
+    """
+    frappe.has_permission("Item", "read", throw=True)
+    return qr_codes_base64(data_list)
+
+
+def qr_codes_base64(data_list):
+    """{payload: base64 PNG} — jinja method, not whitelisted."""
+    if isinstance(data_list, str):
+        import json
+        data_list = json.loads(data_list)
+
+    payloads = [str(data) for data in (data_list or []) if data]
+    if len(payloads) > QR_BULK_LIMIT:
+        frappe.throw(f"Too many QR codes requested at once (max {QR_BULK_LIMIT})")
+    if not QRCODE_AVAILABLE:
+        frappe.throw("QR code library not available. Please install: pip install qrcode[pil]")
+
+    return {data: base64.b64encode(png).decode() for data, png in get_qr_pngs(payloads).items()}
+
+
+def labels_per_page(page_format):
+    """Number of labels on one page for the given page format"""
+    if page_format == 'a5_landscape':
+        return A5_LABELS_PER_PAGE
+    cols, rows = _tommy_grid()
+    return min(100, cols * rows)
+
+
+def _tommy_grid():
+    """Columns x rows of 40x14mm labels on A4 (2mm/4mm margins, 1mm gap)"""
+    page_width, page_height = A4
+    gap = 1 * mm
+    available_width = page_width - 2 * 2 * mm
+    available_height = page_height - 2 * 4 * mm
+    cols = int((available_width + gap) / (40 * mm + gap))
+    rows = int((available_height + gap) / (14 * mm + gap))
+    return max(1, cols), max(1, rows)
+
+
+def render_label_chunk(payload, out_path):
+    """Process-pool worker: render one page-aligned chunk of labels to out_path"""
+    page_format, items = payload
+    if page_format == 'a5_landscape':
+        pdf_buffer = create_qr_labels_pdf_a5_landscape(items)
+    else:
+        pdf_buffer = create_qr_labels_pdf(items)
+    with open(out_path, 'wb') as f:
+        f.write(pdf_buffer.getvalue())
+
+
+def build_qr_labels_chunks(items, page_format):
+    """pdf_batch builder: split labels into page-aligned chunks, render them in parallel"""
+    from customize_erpnext.api.pdf_batch import page_chunks, render_in_processes
+
+    chunks = page_chunks(items, labels_per_page(page_format), LABEL_PAGES_PER_CHUNK)
+    return render_in_processes(render_label_chunk, [(page_format, chunk) for chunk in chunks])
+
+
 def create_qr_labels_pdf(items):
     """Create PDF with QR labels layout"""
+    # Warm the QR cache for the whole run: one Redis MGET + one batched encode
+    get_qr_pngs([item['item_code'] for item in items])
     buffer = BytesIO()
     
     # A4 dimensions with margins
@@ -250,7 +355,7 @@ def create_qr_labels_pdf(items):
     story = []
     current_page_items = []
     
-    # Fixed: 100 labels per page maximum
+    # Fixed: 100 labels per page maximum (same value as labels_per_page('a4_tommy'))
     items_per_page = min(100, cols * rows)
     
     for i, item in enumerate(items):
@@ -411,6 +516,7 @@ def create_qr_labels_pdf_a5_landscape(items):
             - Left (12mm width): QR code (10x10mm, centered)
             - Right (38mm width): Group & Location (2 lines, left-aligned)
     """
+    get_qr_pngs([item['item_code'] for item in items])
     buffer = BytesIO()
 
     # A5 landscape dimensions
@@ -457,7 +563,7 @@ def create_qr_labels_pdf_a5_landscape(items):
 
     # Create table data
     story = []
-    items_per_page = 12  # Fixed: 3x4 grid = 12 items per page
+    items_per_page = A5_LABELS_PER_PAGE  # Fixed: 3x4 grid = 12 items per page
 
     for page_idx, page_start in enumerate(range(0, len(items), items_per_page)):
         # Add page break before each page except the first
@@ -0,0 +1,120 @@
+"""Content-addressed PNG cache for QR codes (tem QR, print format Jinja).
+
+Key = sha1(payload + QR parameters), so a cached PNG never goes stale: the same
+payload with the same parameters always encodes to the same image. Reprints of
+the same item / batch codes therefore skip qrcode + PIL + PNG encoding.
+
+This module only needs stdlib (+ qrcode / Pillow for encoding) and does not
+import frappe, so it also works inside the spawned process-pool workers of
+api/pdf_batch.py and can be tested outside a bench. The Redis layer lives in
+qr_label_print (`get_qr_pngs`), which uses this module's in-process LRU first.
+
+Encoding bypasses `qr.make_image()`, which draws one rectangle per module:
+the module matrix is written into a 1 pixel-per-module 1-bit image and scaled
+up with NEAREST, giving the same pixels at a fraction of the cost.
+"""
+
+import hashlib
+import io
+from collections import OrderedDict
+from threading import Lock
+
+try:
+    import qrcode
+    import qrcode.constants
+    from PIL import Image
+    ENCODER_AVAILABLE = True
+except ImportError:
+    ENCODER_AVAILABLE = False
+
+BOX_SIZE = 8
+BORDER = 2
+ERROR_CORRECTION = "Q"
+LRU_SIZE = 4096
+
+
+def qr_key(data, box_size=BOX_SIZE, border=BORDER, error_correction=ERROR_CORRECTION):
+    """Content address of one QR PNG."""
+    raw = f"{error_correction}|{box_size}|{border}|{data}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Small thread-safe LRU of key -> bytes, bounded by entry count."""
+
+    def __init__(self, maxsize=LRU_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+lru = LRUCache()
+
+
+def encode_qr_png(data, box_size=BOX_SIZE, border=BORDER):
+    """PNG bytes of one QR code, pixel-identical to qrcode's black/white PIL image."""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_Q,
+        box_size=box_size,
+        border=border
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    matrix = qr.get_matrix()  # includes the border
+    n = len(matrix)
+    img = Image.new("1", (n, n), 1)
+    img.putdata([0 if module else 1 for row in matrix for module in row])
+    img = img.resize((n * box_size, n * box_size), Image.NEAREST)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def encode_many(payloads):
+    """{payload: PNG bytes} for the cache misses of one batch, deduplicated."""
+    return {data: encode_qr_png(data) for data in dict.fromkeys(payloads)}
+
+
+def lookup_many(payloads):
+    """Split payloads into ({payload: PNG} LRU hits, [missing payloads])."""
+    hits, missing = {}, []
+    for data in dict.fromkeys(payloads):
+        png = lru.get(qr_key(data))
+        if png is None:
+            missing.append(data)
+        else:
+            hits[data] = png
+    return hits, missing
+
+
+def store_many(pngs):
+    """Put {payload: PNG} into the LRU."""
+    for data, png in pngs.items():
+        lru.set(qr_key(data), png)
@@ -11,19 +11,23 @@ Public APIs (allow_guest=True) — dùng cho web page self-service:
 
 HR APIs (require login):
   approve_form            → Duyệt 1 form
-  approve_form_bulk       → Duyệt nhiều form
+  approve_form_bulk       → Duyệt nhiều form (tuỳ chọn sync luôn)
   reject_form             → Từ chối (kèm lý do)
   sync_to_employee        → Đồng bộ dữ liệu sang Employee
+  sync_to_employee_bulk   → Đồng bộ nhiều form (job nền, api/form_sync)
   get_employees_by_date   → Nhân viên theo ngày vào làm
   add_employees_to_setting → Thêm vào danh sách Setting
   download_excel          → Export Excel
-  download_cccd_photos    → Export ZIP ảnh CCCD
+  download_cccd_photos    → Export ZIP ảnh CCCD (job nền, api/zip_export)
   generate_qr_codes       → Tạo QR links HTML
 """
 
 import frappe
 from frappe import _
 
+from customize_erpnext.api.eligible_employees_cache import invalidate_self_update, serve
+from customize_erpnext.api.form_sync import run_form_sync, start_form_sync
+
 
 # ---------------------------------------------------------------------------
 # SYNC_MAP: form field → Employee field
@@ -182,7 +186,13 @@ def get_eligible_employees():
     Filters from Setting (each optional, combinable):
       - filter_date → Employee.date_of_joining == filter_date
       - group       → Employee.custom_group == group
+
+    Served from a cached snapshot with ETag / 304 (api/eligible_employees_cache).
     """
+    return serve("self_update", _build_eligible_employees)
+
+
+def _build_eligible_employees():
     emp_ids = _get_setting_employees()
     if not emp_ids:
         return []
@@ -490,6 +500,9 @@ def save_form_data(employee_id, **kwargs):
         frappe.db.sql("UPDATE `tabEmployee` SET `date_of_birth`=%s WHERE `name`=%s", (new_dob, employee_id))
     if new_cell:
         frappe.db.sql("UPDATE `tabEmployee` SET `cell_number`=%s WHERE `name`=%s", (new_cell, employee_id))
+    if new_dob or new_cell:
+        # bypasses doc_events — drop the guest eligible-list snapshot here
+        invalidate_self_update()
 
     frappe.db.commit()
 
@@ -513,12 +526,12 @@ def upload_cccd_photo(employee_id, side, image_data):
     employee_id: e.g. "TIQN-1234"
     side: "front" or "back"
     image_data: base64 dataURL (cropped & compressed ≤3MB JPEG)
-    Returns: {"file_url": "/files/<encoded_name>"}
+    Returns: {"file_url": "/files/<encoded_name>"} as soon as the bytes are on disk;
+    normalisation runs in the background (api/image_ingest).
     """
-    import base64
-    import os
     import re
-    from urllib.parse import quote
+
+    from customize_erpnext.api.image_ingest import accept_upload, decode_data_url
 
     if not employee_id or side not in ("front", "back"):
         frappe.throw(_("Invalid parameters"))
@@ -532,66 +545,29 @@ def upload_cccd_photo(employee_id, side, image_data):
         frappe.throw(_("Employee not found"))
     employee_name = emp[0].employee_name or employee_id
 
-    if not image_data or not image_data.startswith("data:"):
-        frappe.throw(_("Invalid image data"))
-
-    match = re.match(r"data:image/(\w+);base64,(.+)", image_data)
-    if not match:
-        frappe.throw(_("Invalid image format"))
-
-    try:
-        file_bytes = base64.b64decode(match.group(2))
-    except Exception:
-        frappe.throw(_("Failed to decode image"))
-
-    if len(file_bytes) > 4 * 1024 * 1024:
-        frappe.throw(_("Image is too large. Maximum size is 4 MB."))
+    file_bytes = decode_data_url(image_data)
 
     side_label = "mặt trước" if side == "front" else "mặt sau"
     safe_name = re.sub(r'[\\/:*?"<>|]', "", employee_name).strip()
     file_name = f"{employee_id} {safe_name} CCCD {side_label}.JPG"
-    file_url = "/files/" + quote(file_name)
-
-    site_path = frappe.get_site_path()
-    public_files = os.path.join(site_path, "public", "files")
-    os.makedirs(public_files, exist_ok=True)
-    file_path = os.path.join(public_files, file_name)
-    with open(file_path, "wb") as f:
-        f.write(file_bytes)
-
-    # Create/update File record
-    existing_file = frappe.db.get_value("File", {"file_url": file_url}, "name")
-    if existing_file:
-        frappe.db.set_value("File", existing_file, "attached_to_doctype", "Employee Self Update Form")
-        frappe.db.set_value("File", existing_file, "attached_to_name", employee_id)
-    else:
-        file_doc = frappe.get_doc({
-            "doctype": "File",
-            "file_name": file_name,
-            "file_url": file_url,
-            "attached_to_doctype": "Employee Self Update Form",
-            "attached_to_name": employee_id,
-            "is_private": 0,
-        })
-        file_doc.flags.ignore_permissions = True
-        file_doc.insert()
 
-    frappe.db.commit()
+    # Resize / strip EXIF and the File record happen in a background job
+    file_url = accept_upload(file_bytes, file_name, "Employee Self Update Form", employee_id, dedupe=False)
     return {"file_url": file_url}
 
 
 @frappe.whitelist(allow_guest=True)
 def upload_other_doc(employee_id, image_data):
     """
-    Upload one other-document photo. Each call produces a unique file (timestamp suffix).
+    Upload one other-document photo. Each call produces a unique file (timestamp suffix),
+    except an identical re-upload, which returns the earlier file_url.
     Old files are cleaned up by save_form_data when the form is submitted.
     Returns: {"file_url": "/files/<encoded_name>"}
     """
-    import base64
-    import os
     import re
     import time
-    from urllib.parse import quote
+
+    from customize_erpnext.api.image_ingest import accept_upload, decode_data_url
 
     if not employee_id:
         frappe.throw(_("Employee ID is required"))
@@ -605,44 +581,14 @@ def upload_other_doc(employee_id, image_data):
         frappe.throw(_("Employee not found"))
     employee_name = emp[0].employee_name or employee_id
 
-    if not image_data or not image_data.startswith("data:"):
-        frappe.throw(_("Invalid image data"))
-
-    match = re.match(r"data:image/(\w+);base64,(.+)", image_data)
-    if not match:
-        frappe.throw(_("Invalid image format"))
-
-    try:
-        file_bytes = base64.b64decode(match.group(2))
-    except Exception:
-        frappe.throw(_("Failed to decode image"))
-
-    if len(file_bytes) > 4 * 1024 * 1024:
-        frappe.throw(_("Image is too large. Maximum 4 MB."))
+    file_bytes = decode_data_url(image_data, _("Image is too large. Maximum 4 MB."))
 
     safe_name = re.sub(r'[\\/:*?"<>|]', "", employee_name).strip()
     ts = int(time.time() * 1000)
     file_name = f"{employee_id} {safe_name} GiayToKhac {ts}.JPG"
-    file_url = "/files/" + quote(file_name)
-
-    site_path = frappe.get_site_path()
-    public_files = os.path.join(site_path, "public", "files")
-    os.makedirs(public_files, exist_ok=True)
-    with open(os.path.join(public_files, file_name), "wb") as f:
-        f.write(file_bytes)
-
-    file_doc = frappe.get_doc({
-        "doctype": "File",
-        "file_name": file_name,
-        "file_url": file_url,
-        "attached_to_doctype": "Employee Self Update Form",
-        "attached_to_name": employee_id,
-        "is_private": 0,
-    })
-    file_doc.flags.ignore_permissions = True
-    file_doc.insert()
 
-    frappe.db.commit()
+    # Same photo sent twice (retry / double tap) → the first file_url comes back
+    file_url = accept_upload(file_bytes, file_name, "Employee Self Update Form", employee_id)
     return {"file_url": file_url}
 
 
@@ -665,8 +611,11 @@ def approve_form(form_name):
 
 
 @frappe.whitelist()
-def approve_form_bulk(names=None):
-    """Approve multiple forms by name list."""
+def approve_form_bulk(names=None, sync=False):
+    """
+    Approve multiple forms by name list — one UPDATE for the whole list.
+    sync: if truthy, also queue the Employee sync job for the approved forms.
+    """
     import json as _json
 
     _require_hr()
@@ -677,17 +626,28 @@ def approve_form_bulk(names=None):
             frappe.throw(_("Invalid names format"))
     names = names or []
 
-    approved, skipped = [], []
-    for name in names:
-        status = frappe.db.get_value("Employee Self Update Form", name, "status")
-        if status != "Pending Review":
-            skipped.append(name)
-            continue
-        frappe.db.set_value("Employee Self Update Form", name, "status", "Approved")
-        approved.append(name)
-
+    approvable = set(frappe.get_all(
+        "Employee Self Update Form",
+        filters={"name": ["in", names], "status": "Pending Review"},
+        pluck="name",
+    )) if names else set()
+    approved = [name for name in dict.fromkeys(names) if name in approvable]
+    skipped = [name for name in names if name not in approvable]
+
+    if approved:
+        frappe.db.sql(
+            "UPDATE `tabEmployee Self Update Form` SET `status`='Approved', `modified`=%s, `modified_by`=%s"
+            " WHERE `name` IN %s AND `status`='Pending Review'",
+            (frappe.utils.now(), frappe.session.user, tuple(approved)),
+        )
+        # bypasses doc_events — drop the guest eligible-list snapshot here
+        invalidate_self_update()
     frappe.db.commit()
-    return {"status": "success", "approved_count": len(approved), "skipped_count": len(skipped)}
+
+    result = {"status": "success", "approved_count": len(approved), "skipped_count": len(skipped)}
+    if approved and str(sync).lower() in ("1", "true", "yes"):
+        result["sync_job"] = start_form_sync(_SYNC_SPEC_PATH, approved, _("Sync Self Update → Employee"))
+    return result
 
 
 @frappe.whitelist()
@@ -715,6 +675,9 @@ def reopen_form_bulk(names=None):
         frappe.db.set_value("Employee Self Update Form", name, "status", "Pending Review")
         reopened.append(name)
 
+    if reopened:
+        # set_value bypasses doc_events — drop the guest eligible-list snapshot here
+        invalidate_self_update()
     frappe.db.commit()
     return {"status": "success", "reopened_count": len(reopened), "skipped_count": len(skipped)}
 
@@ -734,78 +697,94 @@ def reject_form(form_name, reason=""):
     return {"status": "success"}
 
 
-@frappe.whitelist()
-def sync_to_employee(form_name):
-    """
-    Sync form data to Employee.
-    Special handling: bank_name = Vietcombank, work_history_json → external_work_history.
-    """
-    import json as _json
-
-    _require_hr()
-    doc = frappe.get_doc("Employee Self Update Form", form_name)
-    if doc.status != "Approved":
-        frappe.throw(_("Chỉ form Approved mới có thể sync."))
-
-    emp = frappe.get_doc("Employee", doc.employee)
-    emp_meta = frappe.get_meta("Employee")
-    valid_emp_fields = {f.fieldname for f in emp_meta.fields}
-    # frappe.get_meta().fields only returns standard DocFields; custom fields live in
-    # tabCustom Field and must be merged in separately to avoid being silently skipped.
-    custom_field_names = frappe.db.sql(
-        "SELECT fieldname FROM `tabCustom Field` WHERE dt='Employee'",
-        as_list=True,
-    )
-    valid_emp_fields.update(row[0] for row in custom_field_names)
+def _employee_values(form):
+    values = {emp_field: form.get(form_field) for form_field, emp_field in _SYNC_MAP.items()}
+    # Special: bank_name always Vietcombank
+    values["bank_name"] = "Vietcombank"
+    return values
 
-    synced = []
-    for form_field, emp_field in _SYNC_MAP.items():
-        val = doc.get(form_field)
-        if emp_field in valid_emp_fields:
-            emp.set(emp_field, val)
-            synced.append(emp_field)
 
-    # Special: bank_name always Vietcombank
-    if "bank_name" in valid_emp_fields:
-        emp.set("bank_name", "Vietcombank")
+def _employee_tables(form):
+    """Child tables rebuilt from the form (only the ones the form actually filled)."""
+    import json as _json
 
+    tables = {}
     # Special: work_history_json → external_work_history child table
-    work_json = (doc.get("work_history_json") or "").strip()
+    work_json = (form.get("work_history_json") or "").strip()
     if work_json and work_json != "[]":
         try:
-            rows = _json.loads(work_json)
-            emp.set("external_work_history", [])
-            for row in rows:
-                emp.append("external_work_history", {
+            tables["external_work_history"] = [
+                {
                     "company_name": row.get("company_name", ""),
                     "designation": row.get("designation", ""),
                     "total_experience": row.get("total_experience", ""),
-                })
+                }
+                for row in _json.loads(work_json)
+            ]
         except Exception:
             pass
 
     # Special: education_level / university / major → education child table (Employee Education)
-    edu_level = (doc.get("education_level") or "").strip()
-    edu_univ  = (doc.get("university") or "").strip()
-    edu_major = (doc.get("major") or "").strip()
+    edu_level = (form.get("education_level") or "").strip()
+    edu_univ  = (form.get("university") or "").strip()
+    edu_major = (form.get("major") or "").strip()
     if edu_level or edu_univ or edu_major:
-        emp.set("education", [])
-        emp.append("education", {
+        tables["education"] = [{
             "school_univ":    edu_univ,
             "level":          edu_level,
             "maj_opt_subj":   edu_major,
-        })
+        }]
+    return tables
+
+
+# Cấu hình cho engine sync hàng loạt (api/form_sync.py)
+SYNC_SPEC = {
+    "form_doctype": "Employee Self Update Form",
+    "form_fields": list(_SYNC_MAP) + ["education_level", "university", "major", "work_history_json"],
+    "values": _employee_values,
+    "tables": _employee_tables,
+    "table_fields": {
+        "external_work_history": ("company_name", "designation", "total_experience"),
+        "education": ("school_univ", "level", "maj_opt_subj"),
+    },
+    "invalidate": invalidate_self_update,
+}
+_SYNC_SPEC_PATH = "customize_erpnext.api.self_update.self_update_api.SYNC_SPEC"
 
-    emp.flags.ignore_permissions = True
-    emp.flags.ignore_mandatory = True
-    emp.save()
 
-    doc.status = "Synced"
-    doc.flags.ignore_validate_update_after_submit = True
-    doc.save(ignore_permissions=True)
-    frappe.db.commit()
+@frappe.whitelist()
+def sync_to_employee(form_name):
+    """
+    Sync form data to Employee (only fields that differ are written — api/form_sync).
+    Special handling: bank_name = Vietcombank, work_history_json → external_work_history,
+    education fields → education child table.
+    """
+    _require_hr()
+    if frappe.db.get_value("Employee Self Update Form", form_name, "status") != "Approved":
+        frappe.throw(_("Chỉ form Approved mới có thể sync."))
+
+    result = run_form_sync(SYNC_SPEC, [form_name])["results"][form_name]
+    if not result["ok"]:
+        frappe.throw(result["message"])
+
+    return {"status": "success", "synced_fields": result["fields"], "message": _("Đã đồng bộ vào Employee thành công.")}
+
 
-    return {"status": "success", "synced_fields": synced, "message": _("Đã đồng bộ vào Employee thành công.")}
+@frappe.whitelist()
+def sync_to_employee_bulk(names=None):
+    """
+    Sync many Approved forms in a background job (progress + realtime `form_sync_done`).
+    Returns {"job_id", "total"}; per-form errors come back with the job result.
+    """
+    import json as _json
+
+    _require_hr()
+    if isinstance(names, str):
+        try:
+            names = _json.loads(names)
+        except Exception:
+            frappe.throw(_("Invalid names format"))
+    return start_form_sync(_SYNC_SPEC_PATH, names or [], _("Sync Self Update → Employee"))
 
 
 @frappe.whitelist()
@@ -973,14 +952,16 @@ def download_excel(names=None):
 
 @frappe.whitelist()
 def download_cccd_photos(names=None):
-    """Return base64-encoded ZIP of CCCD photos for selected (or all) forms."""
-    import base64
-    import io
+    """Build a ZIP of CCCD photos for selected (or all) forms in a background job.
+
+    Returns {"job_id", "total"} — see customize_erpnext.api.zip_export.
+    """
     import json as _json
     import os
-    import zipfile
     from urllib.parse import unquote
 
+    from customize_erpnext.api.zip_export import start_zip_export
+
     _require_hr()
 
     filters = {}
@@ -996,33 +977,18 @@ def download_cccd_photos(names=None):
         order_by="employee_name asc",
     )
 
-    site_path = frappe.get_site_path()
-    buf = io.BytesIO()
-    added = 0
-
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for r in records:
-            for url_field in ("id_card_front_photo", "id_card_back_photo"):
-                file_url = r.get(url_field)
-                if not file_url:
-                    continue
-                decoded_url = unquote(file_url)
-                if decoded_url.startswith("/private/"):
-                    abs_path = os.path.join(site_path, decoded_url.lstrip("/"))
-                else:
-                    abs_path = os.path.join(site_path, "public", decoded_url.lstrip("/"))
-                if not os.path.exists(abs_path):
-                    continue
-                zf.write(abs_path, os.path.basename(abs_path))
-                added += 1
-
-    if added == 0:
-        frappe.throw(_("Không có ảnh CCCD nào để tải."))
-
-    return {
-        "filename": "CCCD_self_update.zip",
-        "data": base64.b64encode(buf.getvalue()).decode("utf-8"),
-    }
+    entries = [
+        (os.path.basename(unquote(r.get(url_field))), r.get(url_field))
+        for r in records
+        for url_field in ("id_card_front_photo", "id_card_back_photo")
+        if r.get(url_field)
+    ]
+    return start_zip_export(
+        entries,
+        "CCCD_self_update.zip",
+        title=_("Tải ảnh CCCD"),
+        empty_message=_("Không có ảnh CCCD nào để tải."),
+    )
 
 
 @frappe.whitelist()
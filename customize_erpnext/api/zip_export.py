@@ -0,0 +1,224 @@
+"""Xuất ZIP ảnh (CCCD onboarding / self update, ảnh thùng Packing List) trong
+background job, ghi thẳng ra file private thay vì dựng cả ZIP trong `BytesIO`.
+
+Luồng:
+  1. Endpoint nghiệp vụ gom danh sách (arcname, file_url) — chỉ query DB — rồi gọi
+     `start_zip_export`. Web worker không đọc một byte ảnh nào.
+  2. `build_zip_export` (queue long) ghi từng entry vào
+     private/files/zip_export_<job_id>.zip: `ZipFile.write` đọc file nguồn theo
+     từng khối nên bộ nhớ không phụ thuộc tổng dung lượng ảnh. Ảnh (jpg/png/webp)
+     đã nén sẵn nên lưu STORED, không tốn CPU deflate lần nữa.
+  3. Xong thì tạo File (private) trỏ vào file đó, báo tiến độ qua
+     `publish_progress`, gửi realtime `zip_export_done` + Notification Log kèm
+     download_url có token — chỉ người tạo job tải được, hết hạn theo JOB_TTL.
+
+File ZIP cũ hơn JOB_TTL bị xoá bởi `cleanup_zip_exports` (scheduler hourly). Tạo /
+xoá File dùng chung với pdf_batch (`job_files`).
+"""
+
+import hmac
+import os
+import zipfile
+from urllib.parse import unquote
+
+import frappe
+from frappe import _
+
+from customize_erpnext.api.job_files import cleanup_job_files, discard_job_file, job_file_path, save_job_file
+
+JOB_TTL = 6 * 3600
+PROGRESS_EVERY = 25
+FILE_PREFIX = "zip_export_"
+STORED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".zip", ".pdf")
+
+
+def _cache_key(job_id):
+	return f"zip_export:{job_id}"
+
+
+def _update_state(job_id, patch):
+	state = frappe.cache().get_value(_cache_key(job_id))
+	if state:
+		state.update(patch)
+		frappe.cache().set_value(_cache_key(job_id), state, expires_in_sec=JOB_TTL)
+	return state
+
+
+def resolve_file_path(file_url):
+	"""Đường dẫn tuyệt đối của /files/... (public) hoặc /private/files/... (private).
+
+	URL được decode trước (field có thể lưu %20 …). Trả về None nếu file không tồn tại.
+	"""
+	if not file_url:
+		return None
+	decoded_url = unquote(file_url).lstrip("/")
+	if decoded_url.startswith("private/"):
+		abs_path = frappe.get_site_path(decoded_url)
+	else:
+		abs_path = frappe.get_site_path("public", decoded_url)
+	return abs_path if os.path.isfile(abs_path) else None
+
+
+def start_zip_export(entries, filename, title=None, empty_message=None):
+	"""Đưa job dựng ZIP vào queue long. entries: [(arcname, file_url)].
+
+	Trả về {"job_id", "total"} — client theo dõi qua realtime `zip_export_done`
+	hoặc `get_zip_export_status`.
+	"""
+	entries = [(arcname, file_url) for arcname, file_url in entries if file_url]
+	if not entries:
+		frappe.throw(empty_message or _("Không có file nào để tải."))
+
+	job_id = frappe.generate_hash(length=12)
+	frappe.cache().set_value(_cache_key(job_id), {
+		"status": "queued",
+		"user": frappe.session.user,
+		"filename": filename,
+		"title": title or filename,
+		"total": len(entries),
+		"done": 0,
+		"added": 0,
+		"missing": 0,
+		"token": frappe.generate_hash(length=32),
+		"file_url": None,
+		"error": None,
+	}, expires_in_sec=JOB_TTL)
+
+	frappe.enqueue(
+		"customize_erpnext.api.zip_export.build_zip_export",
+		queue="long",
+		timeout=3600,
+		job_id=f"zip_export::{job_id}",
+		enqueue_after_commit=True,
+		export_id=job_id,
+		entries=entries,
+	)
+	return {"job_id": job_id, "total": len(entries)}
+
+
+def _unique_arcname(arcname, used):
+	"""Thêm hậu tố _2, _3 … nếu tên entry đã có trong ZIP."""
+	if arcname not in used:
+		used.add(arcname)
+		return arcname
+	stem, ext = os.path.splitext(arcname)
+	n = 2
+	while f"{stem}_{n}{ext}" in used:
+		n += 1
+	used.add(f"{stem}_{n}{ext}")
+	return f"{stem}_{n}{ext}"
+
+
+def build_zip_export(export_id, entries):
+	"""Background job: ghi ZIP ra đĩa theo từng entry, rồi tạo File private."""
+	state = _update_state(export_id, {"status": "running"})
+	if not state:
+		return
+
+	stored_name = f"{FILE_PREFIX}{export_id}.zip"
+	path = job_file_path(stored_name)
+	title = state["title"]
+	added = missing = 0
+	used = set()
+
+	try:
+		with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+			for i, (arcname, file_url) in enumerate(entries, 1):
+				abs_path = resolve_file_path(file_url)
+				if abs_path:
+					compress_type = (
+						zipfile.ZIP_STORED if abs_path.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+					)
+					zf.write(abs_path, _unique_arcname(arcname or os.path.basename(abs_path), used), compress_type)
+					added += 1
+				else:
+					missing += 1
+
+				if i % PROGRESS_EVERY == 0 or i == len(entries):
+					_update_state(export_id, {"done": i, "added": added, "missing": missing})
+					frappe.publish_progress(
+						i * 100 / len(entries),
+						title=title,
+						description=_("{0} / {1} file").format(i, len(entries)),
+					)
+
+		if not added:
+			raise frappe.ValidationError(_("Không tìm thấy file nào trên đĩa."))
+
+		file_doc = save_job_file(stored_name, state["filename"])
+		frappe.db.commit()
+	except Exception as e:
+		frappe.db.rollback()
+		discard_job_file(stored_name)
+		frappe.log_error(frappe.get_traceback(), "ZIP Export Error")
+		_update_state(export_id, {"status": "failed", "error": str(e)})
+		frappe.publish_realtime(
+			"zip_export_done",
+			{"job_id": export_id, "success": False, "error": str(e)},
+			user=state["user"],
+		)
+		return
+
+	download_url = (
+		"/api/method/customize_erpnext.api.zip_export.download_zip_export"
+		f"?job_id={export_id}&token={state['token']}"
+	)
+	_update_state(export_id, {"status": "done", "file_url": file_doc.file_url, "file_name": file_doc.name})
+
+	# Bell notification — realtime event bị mất nếu user đã rời trang
+	try:
+		frappe.get_doc({
+			"doctype": "Notification Log",
+			"subject": _("File ZIP đã sẵn sàng: {0}").format(state["filename"]),
+			"for_user": state["user"],
+			"type": "Alert",
+			"email_content": f"<a href='{download_url}'>{state['filename']}</a> ({added} file)",
+		}).insert(ignore_permissions=True)
+		frappe.db.commit()
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "ZIP Export Notification Error")
+
+	frappe.publish_realtime(
+		"zip_export_done",
+		{
+			"job_id": export_id,
+			"success": True,
+			"filename": state["filename"],
+			"download_url": download_url,
+			"added": added,
+			"missing": missing,
+		},
+		user=state["user"],
+	)
+
+
+def _get_own_state(job_id):
+	state = frappe.cache().get_value(_cache_key(job_id))
+	if not state or state["user"] != frappe.session.user:
+		frappe.throw(_("Export job không tồn tại hoặc đã hết hạn."), frappe.DoesNotExistError)
+	return state
+
+
+@frappe.whitelist()
+def get_zip_export_status(job_id):
+	state = _get_own_state(job_id)
+	return {key: state.get(key) for key in ("status", "filename", "total", "done", "added", "missing", "error")}
+
+
+@frappe.whitelist()
+def download_zip_export(job_id, token):
+	"""Stream file ZIP từ đĩa (không đọc vào bộ nhớ) — cần đúng user và token."""
+	from frappe.utils.response import send_private_file
+
+	state = _get_own_state(job_id)
+	if not hmac.compare_digest(state["token"], token or "") or state["status"] != "done":
+		raise frappe.PermissionError
+
+	response = send_private_file(state["file_url"].replace("/private/", "", 1))
+	response.headers["Content-Disposition"] = f'attachment; filename="{state["filename"]}"'
+	return response
+
+
+def cleanup_zip_exports():
+	"""Hourly scheduler task: xoá các file ZIP export cũ hơn JOB_TTL."""
+	cleanup_job_files(FILE_PREFIX, "zip", JOB_TTL, "ZIP Export Cleanup Error")
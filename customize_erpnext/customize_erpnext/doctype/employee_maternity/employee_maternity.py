@@ -345,6 +345,9 @@ def _queue_attendance_recalculation(doc, trigger):
 	(mỗi employee bị ảnh hưởng 1 job — thường 1, là 2 khi record đổi employee).
 	Hoạt động cho cả: UI save, Data Import (add new / update if exist), on_trash.
 
+	Data Import: không queue từng record — gom vào maternity_import_recalc, import xong
+	chạy một job chung cho mọi employee.
+
 	Gated by setting recalc_attendance_on_maternity_change
 	(label: "Recalc Attendance on Maternity Save/Delete", default OFF):
 	khi tắt, attendance cập nhật ở lần chạy full kế tiếp hoặc Bulk Update thủ công.
@@ -360,6 +363,11 @@ def _queue_attendance_recalculation(doc, trigger):
 		if not jobs:
 			return
 
+		if getattr(frappe.flags, "in_import", False):
+			from customize_erpnext.customize_erpnext.doctype.employee_maternity.maternity_import_recalc import collect
+			collect(jobs)
+			return
+
 		for employee, affected_dates in jobs.items():
 			affected_dates_sorted = sorted([getdate(d) for d in affected_dates])
 			from_date  = str(affected_dates_sorted[0])
@@ -382,15 +390,13 @@ def _queue_attendance_recalculation(doc, trigger):
 				to_date=to_date,
 			)
 
-			# Skip popup during Data Import (no active web request)
-			if not getattr(frappe.flags, "in_import", False):
-				frappe.msgprint(
-					msg=_("Maternity period changed. Updating attendance for {0} days ({1} → {2})...").format(
-						total_days, from_date, to_date
-					),
-					title=_("Attendance Update Queued"),
-					indicator="blue",
-				)
+			frappe.msgprint(
+				msg=_("Maternity period changed. Updating attendance for {0} days ({1} → {2})...").format(
+					total_days, from_date, to_date
+				),
+				title=_("Attendance Update Queued"),
+				indicator="blue",
+			)
 
 			frappe.logger().info(
 				f"[Maternity] {trigger} — {employee}: queued {total_days} days "
@@ -582,6 +588,40 @@ _MATERNITY_LABELS_VI = {
 	"seniority":          "Thâm niên (tháng)",
 }
 
+# Excel export query (virtual fields gestational_age & seniority computed per row)
+_MATERNITY_SELECT_SQL = """
+	em.name, em.employee, emp.employee_name,
+	em.`group`, em.designation, em.date_of_joining,
+	em.status, em.apply_benefit, em.note,
+	em.pregnant_from_date, em.pregnant_to_date, em.estimated_due_date,
+	em.maternity_from_date, em.maternity_to_date, em.date_of_birth,
+	em.youg_child_from_date, em.youg_child_to_date
+"""
+_MATERNITY_FROM_SQL = """
+	FROM `tabEmployee Maternity` em
+	LEFT JOIN `tabEmployee` emp ON emp.name = em.employee
+"""
+
+
+def _maternity_excel_row(row, today_date):
+	"""Sanitized export row (None → "", date → ISO) + gestational_age / seniority."""
+	from customize_erpnext.api.excel_feed import clean_value
+
+	r = {k: clean_value(v) for k, v in row.items()}
+
+	# gestational_age
+	edd = row.get("estimated_due_date")
+	r["gestational_age"] = _gestational_age_months(edd, today_date) if edd else ""
+
+	# seniority
+	doj = row.get("date_of_joining")
+	if doj:
+		diff = relativedelta(today_date, getdate(doj))
+		r["seniority"] = diff.years * 12 + diff.months
+	else:
+		r["seniority"] = ""
+	return r
+
 
 @frappe.whitelist()
 def get_employee_maternity_for_excel(
@@ -591,6 +631,10 @@ def get_employee_maternity_for_excel(
 	page=1,
 	page_size=500,
 	lang="en",
+	feed=0,
+	after=None,
+	modified_since=None,
+	feed_format="json",
 ):
 	"""
 	API for Excel / Power Query – returns Employee Maternity list.
@@ -604,14 +648,18 @@ def get_employee_maternity_for_excel(
 		group     : filter by group
 		page / page_size : pagination (page_size=0 → return all)
 		lang      : 'en' (default) | 'vi'
+		feed / after / modified_since / feed_format :
+		            feed mode, keyset on record name — same as
+		            employee_utils.get_employees_for_excel (api/excel_feed.py)
 
 	Returns:
 		{ data, columns, col_keys, total, page, page_size, total_pages }
+		Feed mode: { data | rows, columns, col_keys, removed, next_after, server_time }
 	"""
 	from math import ceil
 	from datetime import date as _date
-	from dateutil.relativedelta import relativedelta as _rd
 
+	requested_page_size = page_size
 	page      = frappe.utils.cint(page)
 	page_size = frappe.utils.cint(page_size)
 	load_all  = page_size == 0
@@ -637,6 +685,35 @@ def get_employee_maternity_for_excel(
 		params["group"] = group
 
 	where_sql = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+	today_date = _date.today()
+	label_dict = _MATERNITY_LABELS_VI if lang == "vi" else _MATERNITY_LABELS_EN
+
+	if frappe.utils.cint(feed):
+		from customize_erpnext.api.employee.employee_utils import query_excel_feed, send_excel_feed
+
+		result = query_excel_feed(
+			select_sql=_MATERNITY_SELECT_SQL,
+			from_sql=_MATERNITY_FROM_SQL,
+			key_sql="em.name",
+			key_field="name",
+			# employee_name comes from Employee: a rename there changes the row too
+			modified_sql="(em.modified >= %(modified_since)s OR emp.modified >= %(modified_since)s)",
+			conditions=conditions,
+			params=params,
+			after=after,
+			modified_since=modified_since,
+			page_size=requested_page_size,
+			deleted_doctype="Employee Maternity",
+		)
+		return send_excel_feed(
+			result,
+			[_maternity_excel_row(row, today_date) for row in result.data],
+			_MATERNITY_FIELDS,
+			[label_dict.get(f, f) for f in _MATERNITY_FIELDS],
+			key_field="name",
+			feed_format=feed_format,
+			filename="employee_maternity",
+		)
 
 	# Count
 	total = frappe.db.sql(
@@ -648,15 +725,8 @@ def get_employee_maternity_for_excel(
 	if load_all:
 		rows = frappe.db.sql(
 			f"""
-			SELECT
-				em.name, em.employee, emp.employee_name,
-				em.`group`, em.designation, em.date_of_joining,
-				em.status, em.apply_benefit, em.note,
-				em.pregnant_from_date, em.pregnant_to_date, em.estimated_due_date,
-				em.maternity_from_date, em.maternity_to_date, em.date_of_birth,
-				em.youg_child_from_date, em.youg_child_to_date
-			FROM `tabEmployee Maternity` em
-			LEFT JOIN `tabEmployee` emp ON emp.name = em.employee
+			SELECT {_MATERNITY_SELECT_SQL}
+			{_MATERNITY_FROM_SQL}
 			{where_sql}
 			ORDER BY em.employee
 			""",
@@ -671,15 +741,8 @@ def get_employee_maternity_for_excel(
 		params["offset"] = offset
 		rows = frappe.db.sql(
 			f"""
-			SELECT
-				em.name, em.employee, emp.employee_name,
-				em.`group`, em.designation, em.date_of_joining,
-				em.status, em.apply_benefit, em.note,
-				em.pregnant_from_date, em.pregnant_to_date, em.estimated_due_date,
-				em.maternity_from_date, em.maternity_to_date, em.date_of_birth,
-				em.youg_child_from_date, em.youg_child_to_date
-			FROM `tabEmployee Maternity` em
-			LEFT JOIN `tabEmployee` emp ON emp.name = em.employee
+			SELECT {_MATERNITY_SELECT_SQL}
+			{_MATERNITY_FROM_SQL}
 			{where_sql}
 			ORDER BY em.employee
 			LIMIT %(limit)s OFFSET %(offset)s
@@ -689,34 +752,8 @@ def get_employee_maternity_for_excel(
 		)
 
 	# Compute virtual fields + sanitize
-	today_date = _date.today()
-	cleaned = []
-	for row in rows:
-		r = {}
-		for k, v in row.items():
-			if v is None:
-				r[k] = ""
-			elif hasattr(v, "isoformat"):
-				r[k] = v.isoformat()
-			else:
-				r[k] = v
-
-		# gestational_age
-		edd = row.get("estimated_due_date")
-		r["gestational_age"] = _gestational_age_months(edd, today_date) if edd else ""
-
-		# seniority
-		doj = row.get("date_of_joining")
-		if doj:
-			diff = _rd(today_date, getdate(doj))
-			r["seniority"] = diff.years * 12 + diff.months
-		else:
-			r["seniority"] = ""
-
-		cleaned.append(r)
-
-	label_dict = _MATERNITY_LABELS_VI if lang == "vi" else _MATERNITY_LABELS_EN
-	columns    = [label_dict.get(f, f) for f in _MATERNITY_FIELDS]
+	cleaned = [_maternity_excel_row(row, today_date) for row in rows]
+	columns = [label_dict.get(f, f) for f in _MATERNITY_FIELDS]
 
 	return {
 		"data":        cleaned,
@@ -0,0 +1,153 @@
+# Copyright (c) 2026, IT Team - TIQN and contributors
+# For license information, please see license.txt
+
+"""Gom recalc attendance của Data Import Employee Maternity thành MỘT job.
+
+Save trên UI: `_queue_attendance_recalculation` vẫn queue 1 job / employee như cũ.
+Trong Data Import (`frappe.flags.in_import`) thì không: mỗi record import xong (sau
+commit — row lỗi bị rollback thì không tính) gộp (employee, ngày) vào hash Redis
+PENDING_KEY. Khi Data Import của Employee Maternity chuyển sang trạng thái cuối
+(`db_set("status")` chạy doc_event `on_change`), `flush_pending` được queue một lần
+(job_id cố định + deduplicate) và chạy `_core_process_attendance_logic_optimized`
+cho tất cả nhân viên cùng lúc — chia theo tháng để không tính nhân viên × hợp mọi
+ngày của cả file.
+
+Lưới an toàn: scheduler hourly `flush_if_idle` flush phần còn sót (import chạy bằng
+`bench data-import`, worker chết giữa chừng, job bị bỏ qua vì giờ cao điểm) khi
+không còn Data Import Employee Maternity nào đang Pending.
+
+`flush_pending` đổi tên hash PENDING_KEY → PROCESSING_KEY (RENAME, nguyên tử) rồi mới
+đọc: record import commit trong lúc flush ghi vào PENDING_KEY mới, không bị xoá mất.
+PROCESSING_KEY còn sót (worker chết giữa chừng) được trả về hàng chờ ở lần flush sau.
+"""
+
+import json
+
+import frappe
+from frappe.utils import getdate
+
+PENDING_KEY = "maternity_import_recalc"
+PROCESSING_KEY = "maternity_import_recalc:flushing"
+FLUSH_JOB_ID = "maternity_import_recalc_flush"
+FLUSH_METHOD = (
+	"customize_erpnext.customize_erpnext.doctype.employee_maternity.maternity_import_recalc.flush_pending"
+)
+
+
+def collect(jobs):
+	"""Ghi {employee: [ngày]} vào hàng chờ sau khi transaction của row import commit."""
+	jobs = {employee: list(dates) for employee, dates in jobs.items() if employee and dates}
+	if jobs:
+		frappe.db.after_commit.add(lambda: _merge(jobs))
+
+
+def _decode(value):
+	return value.decode() if isinstance(value, bytes) else value
+
+
+def _merge(jobs):
+	cache = frappe.cache()
+	for employee, dates in jobs.items():
+		stored = cache.hget(PENDING_KEY, employee)
+		merged = set(json.loads(stored)) if stored else set()
+		merged.update(str(d) for d in dates)
+		cache.hset(PENDING_KEY, employee, json.dumps(sorted(merged)))
+
+
+def on_data_import_change(doc, method=None):
+	"""doc_events Data Import on_change: import Employee Maternity xong → queue flush."""
+	if doc.reference_doctype != "Employee Maternity" or doc.status == "Pending":
+		return
+	enqueue_flush()
+
+
+def enqueue_flush():
+	frappe.enqueue(
+		FLUSH_METHOD,
+		queue="long",
+		timeout=3600,
+		job_id=FLUSH_JOB_ID,
+		deduplicate=True,
+		enqueue_after_commit=True,
+	)
+
+
+def flush_if_idle():
+	"""Scheduler hourly: flush phần còn trong hàng chờ nếu không có import nào đang chạy."""
+	cache = frappe.cache()
+	if not (cache.exists(PENDING_KEY) or cache.exists(PROCESSING_KEY)):
+		return
+	if frappe.db.exists("Data Import", {"reference_doctype": "Employee Maternity", "status": "Pending"}):
+		return
+	enqueue_flush()
+
+
+def flush_pending():
+	"""Recalc attendance cho toàn bộ (employee, ngày) đang chờ — một lần, nhiều nhân viên."""
+	from customize_erpnext.customize_erpnext.doctype.attendance_calculation_setting.attendance_calculation_setting import (
+		is_peak_time,
+	)
+	from customize_erpnext.overrides.shift_type.shift_type_optimized import (
+		_core_process_attendance_logic_optimized,
+	)
+
+	# Giờ cao điểm: giữ nguyên hàng chờ, lần flush_if_idle kế tiếp chạy lại
+	if is_peak_time():
+		frappe.logger().info("[Maternity] Peak time — import recalc postponed")
+		return
+
+	cache = frappe.cache()
+	# Lần flush trước chết sau khi đổi tên: trả phần đó về hàng chờ
+	leftover = cache.hgetall(PROCESSING_KEY)
+	if leftover:
+		_merge({_decode(employee): json.loads(stored) for employee, stored in leftover.items()})
+		cache.delete_value(PROCESSING_KEY)
+
+	if not cache.exists(PENDING_KEY):
+		return
+	# Chỉ job này (job_id cố định) đổi tên / xoá PENDING_KEY nên key không thể biến mất
+	# giữa exists() và rename(). RENAME không đi qua make_key của RedisWrapper.
+	cache.rename(cache.make_key(PENDING_KEY), cache.make_key(PROCESSING_KEY))
+	pending = {_decode(employee): stored for employee, stored in (cache.hgetall(PROCESSING_KEY) or {}).items()}
+
+	today = getdate()
+	by_month = {}  # (year, month) -> (set employee, set ngày)
+	for employee, stored in pending.items():
+		for d in json.loads(stored):
+			d = getdate(d)
+			if d > today:
+				continue
+			employees, days = by_month.setdefault((d.year, d.month), (set(), set()))
+			employees.add(employee)
+			days.add(d)
+
+	stats = []
+	months = sorted(by_month)
+	for i, month in enumerate(months):
+		employees, days = by_month[month]
+		days_list = sorted(days)
+		try:
+			stats.append(_core_process_attendance_logic_optimized(
+				employees=sorted(employees),
+				days=days_list,
+				from_date=str(days_list[0]),
+				to_date=str(days_list[-1]),
+				fore_get_logs=True,
+			))
+		except Exception:
+			# Trả các tháng chưa xong về hàng chờ để lần flush sau làm tiếp
+			for later in months[i:]:
+				employees, days = by_month[later]
+				_merge({employee: days for employee in employees})
+			cache.delete_value(PROCESSING_KEY)
+			frappe.log_error(
+				f"[Maternity] Import recalc failed at {month[0]}-{month[1]:02d}",
+				"Maternity Attendance Update Background Job Error",
+			)
+			raise
+
+	cache.delete_value(PROCESSING_KEY)
+	frappe.logger().info(
+		f"[Maternity] Import recalc — {len(pending)} employees, {len(by_month)} months. stats={stats}"
+	)
+	return stats
@@ -5,6 +5,8 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from customize_erpnext.api.eligible_employees_cache import invalidate_on_form_change
+
 
 class EmployeeSelfUpdateForm(Document):
 	def before_insert(self):
@@ -45,3 +47,10 @@ class EmployeeSelfUpdateForm(Document):
 		# self.place_of_origin_full = _join(
 		# self.place_of_origin_village, self.place_of_origin_commune, self.place_of_origin_province
 		# )
+
+	def on_update(self):
+		# Approved / Synced forms drop out of the guest eligible list
+		invalidate_on_form_change(self, "on_update")
+
+	def on_trash(self):
+		invalidate_on_form_change(self, "on_trash")
@@ -53,19 +53,8 @@ frappe.listview_settings['Employee Self Update Form'] = {
 			const selected = listview.get_checked_items();
 			if (!selected.length) return;
 			const names = JSON.stringify(selected.map(r => r.name));
-			frappe.call({
-				method: 'customize_erpnext.api.self_update.self_update_api.download_cccd_photos',
-				args: { names },
-				callback(r) {
-					if (r.message) {
-						const { filename, data } = r.message;
-						const a = document.createElement('a');
-						a.href = 'data:application/zip;base64,' + data;
-						a.download = filename;
-						a.click();
-					}
-				}
-			});
+			// ZIP dựng trong job nền (api/zip_export) — tự tải về khi xong
+			ZipExport.start('customize_erpnext.api.self_update.self_update_api.download_cccd_photos', { names });
 		});
 
 		const $btnReopen = listview.page.add_button(__('Re-Open'), function() {
@@ -97,22 +86,20 @@ frappe.listview_settings['Employee Self Update Form'] = {
 			frappe.confirm(
 				__('Đồng bộ {0} form sang Employee?', [names.length]),
 				function() {
-					let done = 0, failed = 0;
-					const total = names.length;
-					const next = (i) => {
-						if (i >= total) {
-							frappe.msgprint(__('Sync xong: {0} thành công, {1} lỗi.', [done, failed]));
-							listview.refresh();
-							return;
+					// Sync chạy trong job nền (api/form_sync) — kết quả về qua realtime
+					frappe.call({
+						method: 'customize_erpnext.api.self_update.self_update_api.sync_to_employee_bulk',
+						args: { names: JSON.stringify(names) },
+						freeze: true,
+						callback(r) {
+							if (!r.message || !r.message.job_id) return;
+							listen_form_sync(listview, r.message.job_id);
+							frappe.show_alert({
+								message: __('Đang đồng bộ {0} form trong nền...', [r.message.total]),
+								indicator: 'blue'
+							});
 						}
-						frappe.call({
-							method: 'customize_erpnext.api.self_update.self_update_api.sync_to_employee',
-							args: { form_name: names[i] },
-							callback(r) { if (r.message && r.message.status === 'success') done++; else failed++; next(i + 1); },
-							error()    { failed++; next(i + 1); }
-						});
-					};
-					next(0);
+					});
 				}
 			);
 		});
@@ -129,3 +116,39 @@ frappe.listview_settings['Employee Self Update Form'] = {
 		listview.$result.on('change', '#checkbox-select-all', syncButtons);
 	}
 };
+
+function listen_form_sync(listview, job_id) {
+	let finished = false;
+	const handler = (data) => {
+		if (finished || !data || data.job_id !== job_id) return;
+		finished = true;
+		frappe.realtime.off('form_sync_done', handler);
+		frappe.hide_progress();
+		listview.refresh();
+
+		if (!data.success) {
+			frappe.msgprint({ title: __('Lỗi'), indicator: 'red', message: __('Sync thất bại: {0}', [data.error || '']) });
+			return;
+		}
+		let message = __('Sync xong: {0} cập nhật, {1} không đổi, {2} bỏ qua, {3} lỗi.',
+			[data.synced, data.unchanged, data.skipped, data.failed]);
+		if (data.errors && data.errors.length) {
+			message += '<br><br>' + data.errors.map(e =>
+				`<b>${frappe.utils.escape_html(e.employee || e.form)}</b>: ${frappe.utils.escape_html(e.message)}`
+			).join('<br>');
+		}
+		frappe.msgprint({ title: __('Sync to Employee'), indicator: data.failed ? 'orange' : 'green', message });
+	};
+	frappe.realtime.on('form_sync_done', handler);
+
+	// Job ngắn có thể xong trước khi handler được đăng ký — hỏi trạng thái một lần
+	frappe.call({
+		method: 'customize_erpnext.api.form_sync.get_form_sync_status',
+		args: { job_id },
+		callback(r) {
+			const state = r.message;
+			if (!state || !['done', 'failed'].includes(state.status)) return;
+			handler(Object.assign({}, state, { job_id, success: state.status === 'done' }));
+		}
+	});
+}
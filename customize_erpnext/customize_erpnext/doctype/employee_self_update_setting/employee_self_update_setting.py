@@ -5,11 +5,14 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from customize_erpnext.api.eligible_employees_cache import invalidate_self_update
+
 
 class EmployeeSelfUpdateSetting(Document):
 
 	def on_update(self):
 		frappe.cache().delete_key("employee_self_update_config")
+		invalidate_self_update()
 
 	@frappe.whitelist()
 	def btn_add_by_date(self):
@@ -0,0 +1,225 @@
+"""
+OT-only attendance write-through for Overtime Registration submit / cancel / draft edit
+
+An OT registration changes nothing on a weekday attendance except the three OT
+durations and the "... without OT Registration" part of custom_note. Instead of
+running the full attendance pipeline (checkins, leaves, holidays, maternity,
+status) for the whole employee × date envelope, recompute just those columns
+from the stored in_time / out_time:
+
+1. Load the affected Attendance rows, their OT registrations and shift configs
+   (one query each).
+2. Per row: calculate_overtime_segments() exactly as the pipeline calls it
+   (maternity-reduced shift end, 0/1 checkin → approved only), and rebuild the
+   early/late note fragments.
+3. Write the changed rows with one CASE UPDATE per batch.
+
+Pairs the fast path does not cover go back to the full pipeline: Sundays (OT
+moves in/out time and working hours), pairs without an attendance row yet, rows
+whose shift has no start/end.
+"""
+
+import frappe
+from frappe.utils import cint, create_batch, flt, getdate
+from datetime import datetime, timedelta
+
+UPDATE_BATCH_SIZE = 500
+
+# custom_note fragments owned by the OT registration (build_attendance_note §2)
+_OT_NOTE_SUFFIX = "without OT Registration"
+_LOGS_OUTSIDE_SHIFT = ("No check-OUT (all logs before shift start)", "No check-IN (all logs after shift end)")
+_FEMALE_NOTE_PREFIX = "Female checkout"
+
+_SHIFT_FIELDS = (
+	"start_time", "end_time", "custom_begin_break_time", "custom_end_break_time",
+	"custom_overtime_minutes_threshold",
+)
+
+
+def sync_ot_columns(employee_list, date_list):
+	"""Recompute OT columns of existing attendance for employees × dates.
+
+	Returns:
+		(updated, fallback): number of rows written, and {employee: set(dates)}
+		that still need the full attendance pipeline.
+	"""
+	from customize_erpnext.customize_erpnext.doctype.attendance_calculation_setting.attendance_calculation_setting import (
+		get_excluded_employee_ids,
+		get_attendance_settings,
+	)
+
+	settings = get_attendance_settings()
+	excluded = set(get_excluded_employee_ids() or ())
+	prefix = settings.employee_id_prefix or ""
+	employees = [e for e in employee_list if e not in excluded and e.startswith(prefix)]
+	days = [getdate(d) for d in date_list]
+	if not employees or not days:
+		return 0, {}
+
+	attendance = _load_attendance(employees, days)
+	ot_entries = _load_ot_entries(employees, days)
+	shifts = _load_shifts({att.shift for att in attendance.values() if att.shift})
+	threshold = timedelta(minutes=cint(settings.note_early_late_threshold_minutes))
+	benefit_hours = flt(settings.maternity_benefit_hours)
+
+	changed, fallback = [], {}
+	for employee in employees:
+		for day in days:
+			att = attendance.get((employee, day))
+			shift = shifts.get(att.shift) if att else None
+			if not att or day.weekday() == 6 or not shift:
+				fallback.setdefault(employee, set()).add(day)
+				continue
+			row = _recompute(att, shift, ot_entries.get((employee, day), []), threshold, benefit_hours)
+			if row:
+				changed.append(row)
+
+	for batch in create_batch(changed, UPDATE_BATCH_SIZE):
+		_write(batch)
+	return len(changed), fallback
+
+
+def _load_attendance(employees, days):
+	rows = frappe.get_all(
+		"Attendance",
+		filters={
+			"employee": ["in", employees],
+			"attendance_date": ["in", days],
+			"docstatus": ["!=", 2],
+		},
+		fields=[
+			"name", "employee", "attendance_date", "shift", "in_time", "out_time",
+			"custom_maternity_benefit", "custom_note", "actual_overtime_duration",
+			"custom_approved_overtime_duration", "custom_final_overtime_duration",
+		],
+	)
+	return {(r.employee, getdate(r.attendance_date)): r for r in rows}
+
+
+def _load_ot_entries(employees, days):
+	"""{(employee, date): [{begin_time, end_time}]} — same rows the pipeline preloads."""
+	from customize_erpnext.customize_erpnext.doctype.attendance_calculation_setting.attendance_calculation_setting import (
+		get_ot_docstatus_condition,
+	)
+
+	entries = {}
+	for r in frappe.db.sql(f"""
+		SELECT ord.employee, ord.date, ord.begin_time, ord.end_time
+		FROM `tabOvertime Registration Detail` ord
+		JOIN `tabOvertime Registration` or_doc ON ord.parent = or_doc.name
+		WHERE {get_ot_docstatus_condition("or_doc")}
+		  AND ord.employee IN %(employees)s
+		  AND ord.date IN %(days)s
+	""", {"employees": employees, "days": days}, as_dict=True):
+		entries.setdefault((r.employee, getdate(r.date)), []).append({
+			"begin_time": r.begin_time,
+			"end_time": r.end_time,
+		})
+	return entries
+
+
+def _load_shifts(shift_names):
+	if not shift_names:
+		return {}
+	rows = frappe.get_all(
+		"Shift Type",
+		filters={"name": ["in", list(shift_names)]},
+		fields=["name", *_SHIFT_FIELDS],
+	)
+	return {r.name: r for r in rows if r.start_time is not None and r.end_time is not None}
+
+
+def _recompute(att, shift, ot_entries, threshold, benefit_hours):
+	"""Update dict for one attendance row, or None when nothing changed."""
+	from customize_erpnext.overrides.employee_checkin.employee_checkin import calculate_overtime_segments
+
+	in_time, out_time = att.in_time, att.out_time
+	day = getdate(att.attendance_date)
+
+	seg_shift = frappe._dict({f: shift.get(f) for f in _SHIFT_FIELDS})
+	# Maternity: registrations start at the reduced shift end — zone
+	# classification needs the adjusted end_time (same as the pipeline)
+	if cint(att.custom_maternity_benefit):
+		seg_shift.end_time = seg_shift.end_time - timedelta(hours=benefit_hours)
+
+	segments = calculate_overtime_segments(
+		att.employee, day, in_time, out_time, seg_shift, ot_entries=ot_entries
+	)
+	actual, approved, final = segments.actual, segments.approved, segments.final
+	# 0/1 checkin: approved is still shown, actual / final stay 0 (§7.9)
+	if not (in_time and out_time):
+		actual = final = 0
+
+	note = _rebuild_note(att.custom_note, in_time, out_time, day, shift, ot_entries, threshold) if in_time else att.custom_note
+
+	update = {
+		"name": att.name,
+		"actual_overtime_duration": flt(actual, 1),
+		"custom_approved_overtime_duration": flt(approved, 1),
+		"custom_final_overtime_duration": flt(final, 1),
+		"custom_note": note,
+	}
+	if (
+		update["actual_overtime_duration"] == flt(att.actual_overtime_duration, 1)
+		and update["custom_approved_overtime_duration"] == flt(att.custom_approved_overtime_duration, 1)
+		and update["custom_final_overtime_duration"] == flt(att.custom_final_overtime_duration, 1)
+		and (note or None) == (att.custom_note or None)
+	):
+		return None
+	return update
+
+
+def _rebuild_note(note, in_time, out_time, day, shift, ot_entries, threshold):
+	"""custom_note with the early/late "without OT Registration" fragments redone.
+
+	Same rule and position as build_attendance_note §2: raw shift boundaries,
+	pre-shift registration excuses early check-in, post-shift registration
+	excuses late check-out; the fragments sit before the female-checkout note.
+	"""
+	fragments = [f for f in (note or "").split("; ") if f and not f.endswith(_OT_NOTE_SUFFIX)]
+	if any(f in _LOGS_OUTSIDE_SHIFT for f in fragments):
+		return "; ".join(fragments) or None
+
+	shift_start = datetime.combine(day, (datetime.min + shift.start_time).time())
+	shift_end = datetime.combine(day, (datetime.min + shift.end_time).time())
+	pre_registered = any(
+		e.get("end_time") is not None and e["end_time"] <= shift.start_time for e in ot_entries
+	)
+	post_registered = any(
+		e.get("end_time") is not None and e["end_time"] > shift.end_time for e in ot_entries
+	)
+
+	ot_notes = []
+	if in_time and out_time and not pre_registered and (shift_start - in_time) >= threshold:
+		early_min = int((shift_start - in_time).total_seconds() // 60)
+		ot_notes.append(f"Check-in {early_min} min before shift {_OT_NOTE_SUFFIX}")
+	if out_time and not post_registered and (out_time - shift_end) >= threshold:
+		late_min = int((out_time - shift_end).total_seconds() // 60)
+		ot_notes.append(f"Check-out {late_min} min after shift {_OT_NOTE_SUFFIX}")
+
+	at = next((i for i, f in enumerate(fragments) if f.startswith(_FEMALE_NOTE_PREFIX)), len(fragments))
+	fragments[at:at] = ot_notes
+	return "; ".join(fragments) or None
+
+
+def _write(rows):
+	names = [r["name"] for r in rows]
+	columns = (
+		"actual_overtime_duration", "custom_approved_overtime_duration",
+		"custom_final_overtime_duration", "custom_note",
+	)
+	assignments, params = [], []
+	for column in columns:
+		assignments.append(f"`{column}` = CASE name {' '.join(['WHEN %s THEN %s'] * len(rows))} END")
+		for r in rows:
+			params.extend([r["name"], r[column]])
+	frappe.db.sql(
+		f"""
+		UPDATE `tabAttendance`
+		SET {", ".join(assignments)},
+			modified = NOW(),
+			modified_by = %s
+		WHERE name IN ({", ".join(["%s"] * len(names))})
+		""",
+		params + [frappe.session.user] + names,
+	)
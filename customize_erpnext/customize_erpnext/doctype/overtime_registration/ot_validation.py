@@ -0,0 +1,86 @@
+# Copyright (c) 2026, IT Team - TIQN and contributors
+# For license information, please see license.txt
+
+"""Interval checks behind OvertimeRegistration.validate — pure stdlib.
+
+Rows are grouped by (employee, date) once; each check then works on one small
+group of `datetime.time` intervals instead of rescanning (and re-parsing) the
+whole child table. Kept free of frappe so it can be tested without a bench
+(`tests/test_ot_validation.py`).
+
+An entry is a tuple `(pos, begin, end, row)`: `pos` is the row's position in
+the form (the order the old loops reported errors in), `row` is passed back
+untouched to the caller for the error message.
+"""
+
+from operator import itemgetter
+
+_BEGIN = itemgetter(1)
+
+
+def overlaps(begin1, end1, begin2, end2):
+    """Same rule as times_overlap: ranges that only touch do not overlap."""
+    return begin1 < end2 and begin2 < end1
+
+
+def group_entries(entries, key):
+    """{key(row): [entry, ...]} keeping form order inside each group."""
+    groups = {}
+    for entry in entries:
+        groups.setdefault(key(entry[3]), []).append(entry)
+    return groups
+
+
+def _has_overlap(entries):
+    """Sweep over the group sorted by begin — False means no pair can overlap."""
+    ordered = sorted(entries, key=_BEGIN)
+    max_end = ordered[0][2]
+    for entry in ordered[1:]:
+        if entry[1] < max_end:
+            return True
+        max_end = max(max_end, entry[2])
+    return False
+
+
+def first_overlap(groups):
+    """(row_a, row_b) of the first overlapping pair in form order, or None.
+
+    Same pair as the old double loop over every row: smallest pos_a, then
+    smallest pos_b. Only groups the sweep flags are checked pairwise.
+    """
+    best = None
+    for entries in groups.values():
+        if len(entries) < 2 or not _has_overlap(entries):
+            continue
+        found = None
+        for i, a in enumerate(entries):
+            for b in entries[i + 1:]:
+                if overlaps(a[1], a[2], b[1], b[2]):
+                    found = (a, b)
+                    break
+            if found:
+                break
+        if found and (best is None or (found[0][0], found[1][0]) < (best[0][0], best[1][0])):
+            best = found
+    return (best[0][3], best[1][3]) if best else None
+
+
+def split_zones(entries, shift_start, shift_end):
+    """(pre-shift, post-shift) entries, each sorted by begin (ties keep form order).
+
+    Pre-shift ends at or before shift start; post-shift begins at or after the
+    (maternity-adjusted) shift end. Lunch-break OT belongs to neither.
+    """
+    ordered = sorted(entries, key=_BEGIN)
+    pre = [e for e in ordered if e[2] <= shift_start]
+    post = [e for e in ordered if e[1] >= shift_end]
+    return pre, post
+
+
+def first_gap(zone):
+    """(prev, curr) of the first pair in a sorted zone that is not back to back."""
+    for prev, curr in zip(zone, zone[1:]):
+        if curr[1] != prev[2]:
+            return prev, curr
+    return None
+
@@ -10,6 +10,14 @@ from datetime import time, datetime, timedelta
 from customize_erpnext.customize_erpnext.doctype.attendance_calculation_setting.attendance_calculation_setting import (
     get_attendance_settings,
 )
+from customize_erpnext.overrides.interval_index import IntervalIndex
+from customize_erpnext.customize_erpnext.doctype.overtime_registration.ot_validation import (
+    first_gap,
+    first_overlap,
+    group_entries,
+    overlaps,
+    split_zones,
+)
 
 
 def get_maternity_benefit_hours():
@@ -28,6 +36,8 @@ class OvertimeRegistration(Document):
         """Validation khi lưu (Save) - theo thứ tự"""
         # Pre-load shift and maternity data for all employees to avoid N+1 queries
         self._preload_employee_data()
+        # Parse times once and group rows by (employee, date) for every check below
+        self._build_ot_entries()
 
         # 0. begin_time < end_time (server-side — JS check can be bypassed
         #    by Data Import / API; inverted times would pass zone checks and
@@ -53,12 +63,45 @@ class OvertimeRegistration(Document):
 
     def validate_time_order(self):
         """Begin time must be before end time on every row."""
-        for d in self.ot_employees or []:
-            if d.get("begin_time") and d.get("end_time"):
-                if get_time(d.get("begin_time")) >= get_time(d.get("end_time")):
-                    frappe.throw(_("Row #{0}: Begin Time ({1}) must be before End Time ({2})").format(
-                        d.idx, d.get("begin_time"), d.get("end_time")
-                    ))
+        for _pos, begin, end, d in self._timed_rows:
+            if begin >= end:
+                frappe.throw(_("Row #{0}: Begin Time ({1}) must be before End Time ({2})").format(
+                    d.idx, d.get("begin_time"), d.get("end_time")
+                ))
+
+    def _build_ot_entries(self):
+        """(pos, begin, end, row) for every complete row, grouped by (employee, date).
+
+        Each time string is parsed once here instead of once per comparison.
+        """
+        self._timed_rows = [
+            (pos, get_time(d.get("begin_time")), get_time(d.get("end_time")), d)
+            for pos, d in enumerate(self.ot_employees or [])
+            if d.get("begin_time") and d.get("end_time")
+        ]
+        self._ot_entries = [e for e in self._timed_rows if e[3].employee and e[3].date]
+        self._ot_groups = group_entries(self._ot_entries, lambda d: (d.employee, str(d.date)))
+        self._shift_context_cache = {}
+
+    def _get_shift_context(self, employee, date):
+        """(shift_type, shift_config, has_benefit, effective_shift_end) per (employee, date).
+
+        effective_shift_end is the shift end reduced by the maternity benefit hours
+        when the employee has the benefit that day; None when the shift has no config.
+        """
+        key = (employee, str(date))
+        context = self._shift_context_cache.get(key)
+        if context is None:
+            shift_type, _source = self._get_shift_type_cached(employee, date)
+            shift_config = get_shift_config(shift_type)
+            has_benefit, _type, _from, _to = self._check_maternity_cached(employee, date)
+            effective_shift_end = None
+            if shift_config:
+                effective_shift_end = (
+                    maternity_adjusted_end(shift_config["end"]) if has_benefit else shift_config["end"]
+                )
+            context = self._shift_context_cache[key] = (shift_type, shift_config, has_benefit, effective_shift_end)
+        return context
 
     def _preload_employee_data(self):
         """Pre-load shift and maternity data for all employees to avoid N+1 queries."""
@@ -99,16 +142,17 @@ class OvertimeRegistration(Document):
                 ORDER BY start_date DESC, creation DESC
             """, {"employees": list(employees), "min_date": min_date, "max_date": max_date}, as_dict=1)
 
-            # Group by employee to avoid O(n×m) nested loop
-            emp_shift_index = {}
+            # Newest assignment first (ORDER BY start_date DESC) = index priority
+            shift_index = IntervalIndex()
             for a in shift_assigns:
-                emp_shift_index.setdefault(a.employee, []).append(a)
+                shift_index.add(
+                    a.employee, getdate(a.start_date), getdate(a.end_date) if a.end_date else None, a.shift
+                )
 
             for emp, dt in employee_dates:
-                for a in emp_shift_index.get(emp, []):
-                    if str(a.start_date) <= dt and (a.end_date is None or dt <= str(a.end_date)):
-                        self._shift_assign_cache[(emp, dt)] = a.shift
-                        break  # newest assignment first (ORDER BY start_date DESC)
+                shift = shift_index.get(emp, getdate(dt))
+                if shift:
+                    self._shift_assign_cache[(emp, dt)] = shift
 
         # Batch load employee default shifts (fallback after Shift Assignment)
         self._emp_default_shift_cache = {}
@@ -141,26 +185,31 @@ class OvertimeRegistration(Document):
                   )
             """, {"employees": list(employees), "min_date": min_date, "max_date": max_date}, as_dict=1)
 
-            from frappe.utils import getdate
+            # Per record: Nghỉ thai sản → Nuôi con nhỏ → Mang thai (chỉ khi apply_benefit);
+            # Mang thai không hưởng chế độ thì xét tiếp record sau
+            maternity_index = IntervalIndex()
+            for rec in maternity_records:
+                if rec.maternity_from_date and rec.maternity_to_date:
+                    maternity_index.add(
+                        rec.employee, getdate(rec.maternity_from_date), getdate(rec.maternity_to_date),
+                        (True, "Nghỉ thai sản", rec.maternity_from_date, rec.maternity_to_date)
+                    )
+                if rec.youg_child_from_date and rec.youg_child_to_date:
+                    maternity_index.add(
+                        rec.employee, getdate(rec.youg_child_from_date), getdate(rec.youg_child_to_date),
+                        (True, "Nuôi con nhỏ", rec.youg_child_from_date, rec.youg_child_to_date)
+                    )
+                eff_to = rec.pregnant_to_date or rec.estimated_due_date
+                if rec.pregnant_from_date and eff_to and rec.apply_benefit == 1:
+                    maternity_index.add(
+                        rec.employee, getdate(rec.pregnant_from_date), getdate(eff_to),
+                        (True, "Mang thai", rec.pregnant_from_date, eff_to)
+                    )
+
             for emp, dt in employee_dates:
-                check_d = getdate(dt)
-                for rec in maternity_records:
-                    if rec.employee != emp:
-                        continue
-                    if rec.maternity_from_date and rec.maternity_to_date:
-                        if getdate(rec.maternity_from_date) <= check_d <= getdate(rec.maternity_to_date):
-                            self._maternity_cache[(emp, dt)] = (True, "Nghỉ thai sản", rec.maternity_from_date, rec.maternity_to_date)
-                            break
-                    if rec.youg_child_from_date and rec.youg_child_to_date:
-                        if getdate(rec.youg_child_from_date) <= check_d <= getdate(rec.youg_child_to_date):
-                            self._maternity_cache[(emp, dt)] = (True, "Nuôi con nhỏ", rec.youg_child_from_date, rec.youg_child_to_date)
-                            break
-                    if rec.pregnant_from_date:
-                        eff_to = rec.pregnant_to_date or rec.estimated_due_date
-                        if eff_to and getdate(rec.pregnant_from_date) <= check_d <= getdate(eff_to):
-                            if rec.apply_benefit == 1:
-                                self._maternity_cache[(emp, dt)] = (True, "Mang thai", rec.pregnant_from_date, eff_to)
-                                break
+                benefit = maternity_index.get(emp, getdate(dt))
+                if benefit:
+                    self._maternity_cache[(emp, dt)] = benefit
 
     def _get_shift_type_cached(self, employee, date):
         """Get shift type using pre-loaded cache.
@@ -193,22 +242,13 @@ class OvertimeRegistration(Document):
 
     def validate_ot_outside_working_hours(self):
         """Validate OT must be outside working hours"""
-        if not self.ot_employees:
-            return
-
-        for d in self.ot_employees:
-            if not d.employee or not d.date or not d.get("begin_time") or not d.get("end_time"):
-                continue
-
+        for _pos, begin, end, d in self._ot_entries:
             # Skip validation for Sundays
-            date_obj = getdate(d.date)
-            if date_obj.weekday() == 6:  # Sunday
+            if getdate(d.date).weekday() == 6:  # Sunday
                 continue
 
-            # Get shift for employee (using batch-loaded cache)
-            shift_type, _source = self._get_shift_type_cached(d.employee, d.date)
-            shift_config = get_shift_config(shift_type)
-
+            # Shift + maternity benefit (batch-loaded, once per employee-date)
+            shift_type, shift_config, has_benefit, _end = self._get_shift_context(d.employee, d.date)
             if not shift_config:
                 continue
 
@@ -216,12 +256,9 @@ class OvertimeRegistration(Document):
             if not shift_config.get("allows_ot", True):
                 frappe.throw(_("Row #{0}: Ca {1} không được phép đăng ký tăng ca").format(d.idx, shift_type))
 
-            # Check if employee has maternity benefit (using batch-loaded cache)
-            has_benefit, _type, _from, _to = self._check_maternity_cached(d.employee, d.date)
-
             # Validate OT is outside working hours (relaxed mode)
             is_valid, error_msg = validate_ot_continuity_with_shift(
-                d.get("begin_time"), d.get("end_time"), shift_config, has_benefit, None, strict_mode=False
+                begin, end, shift_config, has_benefit, None, strict_mode=False
             )
 
             if not is_valid:
@@ -233,156 +270,80 @@ class OvertimeRegistration(Document):
         Cho phép 1 nhóm OT trước ca và 1 nhóm OT sau ca trong cùng ngày.
         Mỗi nhóm phải liên tục nội bộ, nhưng 2 nhóm không cần liên tục với nhau.
         """
-        if not self.ot_employees:
-            return
-
-        # Group entries by employee and date
-        employee_date_entries = {}
-        for d in self.ot_employees:
-            if not d.employee or not d.date or not d.get("begin_time") or not d.get("end_time"):
-                continue
-
-            key = f"{d.employee}_{d.date}"
-            if key not in employee_date_entries:
-                employee_date_entries[key] = []
-            employee_date_entries[key].append(d)
-
-        # Check continuity for each employee-date group with multiple entries
-        for key, entries in employee_date_entries.items():
+        for (employee, date), entries in self._ot_groups.items():
             if len(entries) <= 1:
                 continue
 
-            # Sort entries by begin_time
-            sorted_entries = sorted(entries, key=lambda x: get_time(x.get("begin_time")))
-
-            # Get shift info (using batch-loaded cache)
-            employee = sorted_entries[0].employee
-            date = sorted_entries[0].date
-            shift_type, _source = self._get_shift_type_cached(employee, date)
-            shift_config = get_shift_config(shift_type)
-
+            _shift_type, shift_config, _benefit, effective_shift_end = self._get_shift_context(employee, date)
             if not shift_config:
                 continue
 
-            has_benefit, _type, _from, _to = self._check_maternity_cached(employee, date)
+            # Split entries into pre-shift and post-shift zones (sorted by begin_time)
+            pre_shift, post_shift = split_zones(entries, shift_config["start"], effective_shift_end)
 
-            if has_benefit:
-                effective_shift_end = maternity_adjusted_end(shift_config["end"])
-            else:
-                effective_shift_end = shift_config["end"]
+            gap = first_gap(pre_shift)
+            if gap:
+                prev_entry, curr_entry = gap
+                frappe.throw(_("Row #{0}: Giờ tăng ca trước ca phải liên tục với OT trước đó (Row #{1} kết thúc lúc {2})").format(
+                    curr_entry[3].idx, prev_entry[3].idx, prev_entry[2].strftime("%H:%M")
+                ))
 
-            shift_start = shift_config["start"]
-
-            # Split entries into pre-shift and post-shift zones
-            pre_shift = [e for e in sorted_entries if get_time(e.get("end_time")) <= shift_start]
-            post_shift = [e for e in sorted_entries if get_time(e.get("begin_time")) >= effective_shift_end]
-
-            # Check internal continuity within pre-shift zone
-            for i in range(1, len(pre_shift)):
-                prev_entry = pre_shift[i - 1]
-                curr_entry = pre_shift[i]
-                prev_end = get_time(prev_entry.get("end_time"))
-                curr_begin = get_time(curr_entry.get("begin_time"))
-                if curr_begin != prev_end:
-                    frappe.throw(_("Row #{0}: Giờ tăng ca trước ca phải liên tục với OT trước đó (Row #{1} kết thúc lúc {2})").format(
-                        curr_entry.idx, prev_entry.idx, prev_end.strftime("%H:%M")
-                    ))
-
-            # Check internal continuity within post-shift zone
-            for i in range(1, len(post_shift)):
-                prev_entry = post_shift[i - 1]
-                curr_entry = post_shift[i]
-                prev_end = get_time(prev_entry.get("end_time"))
-                curr_begin = get_time(curr_entry.get("begin_time"))
-                if curr_begin != prev_end:
-                    frappe.throw(_("Row #{0}: Giờ tăng ca sau ca phải liên tục với OT trước đó (Row #{1} kết thúc lúc {2})").format(
-                        curr_entry.idx, prev_entry.idx, prev_end.strftime("%H:%M")
-                    ))
+            gap = first_gap(post_shift)
+            if gap:
+                prev_entry, curr_entry = gap
+                frappe.throw(_("Row #{0}: Giờ tăng ca sau ca phải liên tục với OT trước đó (Row #{1} kết thúc lúc {2})").format(
+                    curr_entry[3].idx, prev_entry[3].idx, prev_entry[2].strftime("%H:%M")
+                ))
 
     def validate_duplicate_employees(self):
         """Prevent duplicate or overlapping overtime entries within the same form"""
-        
-        entries = []
-        
         for d in self.ot_employees:
-            # Debug what fields are actually available
             missing_fields = []
             if not d.employee:
                 missing_fields.append("Employee")
             if not d.date:
-                missing_fields.append("Date") 
+                missing_fields.append("Date")
             if not d.get("begin_time"):
                 missing_fields.append("Begin Time")
             if not d.get("end_time"):
                 missing_fields.append("End Time")
-                
+
             if missing_fields:
                 frappe.throw(_("Row #{idx}: {fields} are required.").format(idx=d.idx, fields=", ".join(missing_fields)))
-            
-            entries.append({
-                'idx': d.idx,
-                'employee': d.employee,
-                'employee_name': d.employee_name,
-                'date': d.date,
-                'from': d.get("begin_time"),
-                'to': d.get("end_time")
-            })
-        
-        # Check for duplicates and overlaps
-        for i in range(len(entries)):
-            for j in range(i + 1, len(entries)):
-                entry1 = entries[i]
-                entry2 = entries[j]
-                
-                # Same employee and date
-                if entry1['employee'] == entry2['employee'] and entry1['date'] == entry2['date']:
-                    # Check for exact match or time overlap
-                    if times_overlap(entry1['from'], entry1['to'], entry2['from'], entry2['to']):
-                        frappe.throw(_("Row {0} and {1}: Duplicate overtime for employee {2} on {3}").format(
-                            entry1['idx'],
-                            entry2['idx'],
-                            entry1['employee_name'],
-                            entry1['date']
-                        ))
+
+        # Same employee and date, exact match or time overlap — first pair in form order
+        duplicate = first_overlap(self._ot_groups)
+        if duplicate:
+            row1, row2 = duplicate
+            frappe.throw(_("Row {0} and {1}: Duplicate overtime for employee {2} on {3}").format(
+                row1.idx,
+                row2.idx,
+                row1.employee_name,
+                row1.date
+            ))
 
     def validate_conflicting_ot_requests(self):
         """Prevent conflicts and check continuity with existing submitted overtime registrations"""
         if not self.ot_employees:
             return
 
-        # Single batched query for ALL rows (was 1 query per child row),
-        # indexed by (employee, date) in Python
-        employees = list({d.employee for d in self.ot_employees if d.employee})
-        dates = list({str(d.date) for d in self.ot_employees if d.date})
-        existing_index = {}
-        if employees and dates:
-            rows = frappe.db.sql("""
-                SELECT child.employee, child.date, child.parent, child.idx,
-                       child.begin_time as `from`, child.end_time as `to`
-                FROM `tabOvertime Registration Detail` as child
-                JOIN `tabOvertime Registration` as parent ON child.parent = parent.name
-                WHERE child.employee IN %(employees)s
-                AND child.date IN %(dates)s
-                AND parent.name != %(current_doc_name)s
-                AND parent.docstatus = 1
-                ORDER BY child.begin_time
-            """, {
-                "employees": employees,
-                "dates": dates,
-                "current_doc_name": self.name or "new"
-            }, as_dict=1)
-            for r in rows:
-                existing_index.setdefault((r.employee, str(r.date)), []).append(r)
+        # Single batched query for ALL rows, indexed by (employee, date)
+        existing_index = get_submitted_ot_index(
+            {d.employee for d in self.ot_employees if d.employee},
+            {str(d.date) for d in self.ot_employees if d.date},
+            self.name or "new",
+        )
 
-        for d in self.ot_employees:
+        for _pos, from_time_obj, to_time_obj, d in self._ot_entries:
+            existing_entries = existing_index.get((d.employee, str(d.date)))
+            if not existing_entries:
+                continue
             from_time = d.get("begin_time")
             to_time = d.get("end_time")
 
-            existing_entries = existing_index.get((d.employee, str(d.date)), [])
-
             # Check for overlaps
             for existing in existing_entries:
-                if times_overlap(from_time, to_time, existing.get("from"), existing.get("to")):
+                if overlaps(from_time_obj, to_time_obj, existing._from, existing._to):
                     conflicting_doc = existing.get("parent")
                     doc_link = f'<a href="/app/overtime-registration/{conflicting_doc}" target="_blank">{conflicting_doc}</a>'
                     frappe.throw(_("Row {0}: Employee {1} already has overtime on {2} ({3}-{4}). Conflicts with {5}, Row {6}: {7}-{8}").format(
@@ -400,55 +361,40 @@ class OvertimeRegistration(Document):
             # Check continuity with existing submitted OT (zone-aware)
             # OT trước ca và OT sau ca không cần liên tục với nhau,
             # chỉ cần liên tục với các OT cùng zone (trước ca hoặc sau ca).
-            if existing_entries:
-                from_time_obj = get_time(from_time)
-                to_time_obj = get_time(to_time)
-
-                shift_type, _source = self._get_shift_type_cached(d.employee, d.date)
-                shift_config = get_shift_config(shift_type)
-
-                if shift_config:
-                    has_benefit, _type, _from, _to = self._check_maternity_cached(d.employee, d.date)
-
-                    if has_benefit:
-                        effective_shift_end = maternity_adjusted_end(shift_config["end"])
-                    else:
-                        effective_shift_end = shift_config["end"]
-
-                    shift_start = shift_config["start"]
-
-                    # Classify new entry
-                    is_pre_shift = to_time_obj <= shift_start
-                    is_post_shift = from_time_obj >= effective_shift_end
-
-                    # Filter existing entries to same zone only
-                    same_zone_entries = []
-                    for existing in existing_entries:
-                        existing_from = get_time(existing.get("from"))
-                        existing_to = get_time(existing.get("to"))
-                        existing_is_pre = existing_to <= shift_start
-                        existing_is_post = existing_from >= effective_shift_end
-                        if (is_pre_shift and existing_is_pre) or (is_post_shift and existing_is_post):
-                            same_zone_entries.append(existing)
-
-                    # Only check continuity against same-zone entries
-                    if same_zone_entries:
-                        is_continuous = any(
-                            from_time_obj == get_time(e.get("to")) or to_time_obj == get_time(e.get("from"))
-                            for e in same_zone_entries
-                        )
-
-                        if not is_continuous:
-                            existing_times = ", ".join([f"{e.get('from')}-{e.get('to')}" for e in same_zone_entries])
-                            existing_docs = ", ".join([f'<a href="/app/overtime-registration/{e.get("parent")}" target="_blank">{e.get("parent")}</a>' for e in same_zone_entries])
-
-                            frappe.throw(_("Row {0}: OT {1}-{2} không liên tục với OT đã đăng ký ({3}). Xem: {4}").format(
-                                d.idx,
-                                from_time,
-                                to_time,
-                                existing_times,
-                                existing_docs
-                            ))
+            _shift_type, shift_config, _benefit, effective_shift_end = self._get_shift_context(d.employee, d.date)
+            if not shift_config:
+                continue
+
+            shift_start = shift_config["start"]
+
+            # Classify new entry
+            is_pre_shift = to_time_obj <= shift_start
+            is_post_shift = from_time_obj >= effective_shift_end
+
+            # Filter existing entries to same zone only
+            same_zone_entries = [
+                e for e in existing_entries
+                if (is_pre_shift and e._to <= shift_start) or (is_post_shift and e._from >= effective_shift_end)
+            ]
+
+            # Only check continuity against same-zone entries
+            if same_zone_entries:
+                is_continuous = any(
+                    from_time_obj == e._to or to_time_obj == e._from
+                    for e in same_zone_entries
+                )
+
+                if not is_continuous:
+                    existing_times = ", ".join([f"{e.get('from')}-{e.get('to')}" for e in same_zone_entries])
+                    existing_docs = ", ".join([f'<a href="/app/overtime-registration/{e.get("parent")}" target="_blank">{e.get("parent")}</a>' for e in same_zone_entries])
+
+                    frappe.throw(_("Row {0}: OT {1}-{2} không liên tục với OT đã đăng ký ({3}). Xem: {4}").format(
+                        d.idx,
+                        from_time,
+                        to_time,
+                        existing_times,
+                        existing_docs
+                    ))
 
     def calculate_totals_and_apply_reason(self):
         """Manage general reason field and calculate totals"""
@@ -487,6 +433,39 @@ class OvertimeRegistration(Document):
                 if not d.reason:
                     d.reason = self.reason_general
 
+def get_submitted_ot_index(employees, dates, exclude="new"):
+    """{(employee, date_str): [submitted OT rows]} — one query for all pairs.
+
+    Rows carry the raw `from` / `to` values plus `_from` / `_to` parsed once,
+    sorted by begin_time. Pairs outside employees × dates are simply not looked up.
+    """
+    employees, dates = list(employees), list(dates)
+    if not employees or not dates:
+        return {}
+    rows = frappe.db.sql("""
+        SELECT child.employee, child.date, child.parent, child.idx, child.employee_name,
+               child.begin_time as `from`, child.end_time as `to`
+        FROM `tabOvertime Registration Detail` as child
+        JOIN `tabOvertime Registration` as parent ON child.parent = parent.name
+        WHERE child.employee IN %(employees)s
+        AND child.date IN %(dates)s
+        AND parent.name != %(current_doc_name)s
+        AND parent.docstatus = 1
+        ORDER BY child.begin_time
+    """, {
+        "employees": employees,
+        "dates": dates,
+        "current_doc_name": exclude or "new"
+    }, as_dict=1)
+
+    index = {}
+    for r in rows:
+        if r["from"] is None or r["to"] is None:
+            continue
+        r._from, r._to = get_time(r["from"]), get_time(r["to"])
+        index.setdefault((r.employee, str(r.date)), []).append(r)
+    return index
+
 @frappe.whitelist()
 def check_overtime_conflicts(entries, current_doc_name="new"):
     """
@@ -497,29 +476,25 @@ def check_overtime_conflicts(entries, current_doc_name="new"):
     import json
     if isinstance(entries, str):
         entries = json.loads(entries)
-    
+
+    # One query for every (employee, date) in the form (was one per entry)
+    existing_index = get_submitted_ot_index(
+        {e["employee"] for e in entries if e.get("employee")},
+        {str(e["date"]) for e in entries if e.get("date")},
+        current_doc_name,
+    )
+
     conflicts = []
-    
+
     for entry in entries:
-        # Query for existing overtime registrations for same employee and date
-        existing_entries = frappe.db.sql("""
-            SELECT child.parent, child.idx, child.begin_time as `from`, child.end_time as `to`, child.employee_name, child.date
-            FROM `tabOvertime Registration Detail` as child
-            JOIN `tabOvertime Registration` as parent ON child.parent = parent.name
-            WHERE child.employee = %(employee)s
-            AND child.date = %(date)s
-            AND parent.name != %(current_doc_name)s
-            AND parent.docstatus = 1
-            ORDER BY child.begin_time
-        """, {
-            "employee": entry["employee"],
-            "date": entry["date"],
-            "current_doc_name": current_doc_name
-        }, as_dict=1)
+        existing_entries = existing_index.get((entry.get("employee"), str(entry.get("date"))))
+        if not existing_entries or not entry.get("begin_time") or not entry.get("end_time"):
+            continue
+        current_from, current_to = get_time(entry["begin_time"]), get_time(entry["end_time"])
 
         # Check for overlaps
         for existing in existing_entries:
-            if times_overlap(entry["begin_time"], entry["end_time"], existing["from"], existing["to"]):
+            if overlaps(current_from, current_to, existing._from, existing._to):
                 conflicts.append({
                     "idx": entry["idx"],
                     "employee": entry["employee"],
@@ -532,7 +507,7 @@ def check_overtime_conflicts(entries, current_doc_name="new"):
                     "existing_doc": existing["parent"],
                     "existing_idx": existing["idx"]
                 })
-    
+
     return conflicts
 
 def times_overlap(from1, to1, from2, to2):
@@ -5,6 +5,10 @@ Auto-update attendance when overtime registration changes using optimized logic
 This module provides hooks that are called when Overtime Registration documents change
 (on_submit, on_cancel, on_update_after_submit) to recalculate attendance for affected
 employees and dates using the same optimized logic as the main attendance processing.
+
+The background job first takes the OT-only fast path (ot_attendance_sync: just the OT
+durations + OT note of existing weekday attendance); only the pairs it cannot cover
+(Sunday, no attendance yet, shift without hours) go through the full pipeline.
 """
 
 import frappe
@@ -124,6 +128,9 @@ def _process_attendance_background(doc_name, employee_list, date_list, from_date
 	"""
 	Background job: recalculate attendance for employees affected by an OTR.
 
+	OT-only write-through first (sync_ot_columns); the full pipeline runs only for
+	the (employee, date) pairs it hands back.
+
 	Args:
 		doc_name: Overtime Registration name (for logging)
 		employee_list: List of employee IDs
@@ -136,28 +143,47 @@ def _process_attendance_background(doc_name, employee_list, date_list, from_date
 		_core_process_attendance_logic_optimized
 	)
 	from customize_erpnext.customize_erpnext.doctype.attendance_calculation_setting.attendance_calculation_setting import is_peak_time
+	from customize_erpnext.customize_erpnext.doctype.overtime_registration.ot_attendance_sync import sync_ot_columns
 
 	logger = frappe.logger("overtime_registration", allow_site=True)
 
-	# Skip during check-in/out peak windows — next full run catches up
-	if is_peak_time():
-		logger.info(f"OT Attendance Background Job [{doc_name}]: peak time — skipped")
-		return
-
 	# Convert date strings back to date objects
 	days = [getdate(d) for d in date_list]
 
 	try:
 		logger.info(f"OT Attendance Background Job [{doc_name}]: {len(employee_list)} employees, {len(days)} dates")
 
-		stats = _core_process_attendance_logic_optimized(
-			employees=employee_list,
-			days=days,
-			from_date=from_date,
-			to_date=to_date,
-			fore_get_logs=True
+		# OT-only fast path — a handful of queries, so it also runs at peak time
+		try:
+			fast_updated, fallback = sync_ot_columns(employee_list, days)
+		except Exception:
+			frappe.db.rollback()
+			frappe.log_error(title=f"OT Attendance fast path failed - {doc_name}")
+			fast_updated, fallback = 0, {employee: set(days) for employee in employee_list}
+		else:
+			frappe.db.commit()
+		logger.info(
+			f"OT Attendance Background Job [{doc_name}]: OT-only update {fast_updated} rows, "
+			f"{sum(len(v) for v in fallback.values())} pairs left for the full pipeline"
 		)
 
+		stats = {"employees_with_attendance": len(employee_list), "errors": 0}
+		if fallback:
+			# Skip during check-in/out peak windows — next full run catches up
+			if is_peak_time():
+				logger.info(f"OT Attendance Background Job [{doc_name}]: peak time — full recalc skipped")
+				return
+
+			fallback_days = sorted(set().union(*fallback.values()))
+			stats = _core_process_attendance_logic_optimized(
+				employees=sorted(fallback),
+				days=fallback_days,
+				from_date=str(fallback_days[0]),
+				to_date=str(fallback_days[-1]),
+				fore_get_logs=True
+			)
+			stats["employees_with_attendance"] = len(set(employee_list) - set(fallback)) + stats.get("employees_with_attendance", 0)
+
 		logger.info(f"OT Attendance Background Job [{doc_name}]: completed, {stats.get('employees_with_attendance', 0)} employees updated")
 
 		# Send realtime notification to the user
@@ -0,0 +1,156 @@
+# Copyright (c) 2026, IT Team - TIQN and contributors
+# For license information, please see license.txt
+
+"""Cached approval scope and approval inbox for Overtime Request.
+
+Every list load (get_permission_query_conditions), document open
+(overtime_request_permission / has_permission) and badge poll
+(get_pending_approvals_count) used to look up the user's Employee again, and
+the badge / pending popup re-ran the LIKE query over Overtime Request for each
+poll. Supervisors on the floor keep the badge polling all shift.
+
+Two caches, both in Redis with a TTL as safety net:
+
+- Scope `overtime_request_scope:<user>`: the user's Employee (name, employee_name,
+  designation, department) — `{}` when the user has no Employee, so misses
+  are cached too. Dropped on Employee / Department changes.
+- Inbox `overtime_request_inbox:<employee>`: the approver's pending requests
+  (with requester name). The badge count is len() of the same rows. Dropped
+  for the two approvers of a request whenever it changes status.
+
+Invalidation runs now and again after commit, so a request that rebuilt the
+cache from not-yet-committed data does not keep it.
+"""
+
+import frappe
+
+SCOPE_TTL = 60 * 60
+INBOX_TTL = 10 * 60
+
+# Employee fields kept in the scope / shown in the inbox
+EMPLOYEE_FIELDS = ("user_id", "employee_name", "designation", "department")
+
+
+def _scope_key(user):
+    return f"overtime_request_scope:{user}"
+
+
+def _inbox_key(employee_id):
+    return f"overtime_request_inbox:{employee_id}"
+
+
+def get_user_employee(user=None):
+    """Employee of `user` as frappe._dict(name, employee_name, designation, department), or None."""
+    user = user or frappe.session.user
+    cache = frappe.cache()
+    employee = cache.get_value(_scope_key(user))
+    if employee is None:
+        employee = frappe.db.get_value("Employee", {"user_id": user},
+            ["name", "employee_name", "designation", "department"],
+            as_dict=True
+        ) or {}
+        cache.set_value(_scope_key(user), dict(employee), expires_in_sec=SCOPE_TTL)
+    return frappe._dict(employee) if employee else None
+
+
+def get_user_employee_id(user=None):
+    employee = get_user_employee(user)
+    return employee.name if employee else None
+
+
+def get_pending_inbox(employee_id):
+    """Pending requests waiting for `employee_id` at their current approval level."""
+    cache = frappe.cache()
+    rows = cache.get_value(_inbox_key(employee_id))
+    if rows is None:
+        employee_pattern = f"{employee_id} -%"
+        rows = frappe.db.sql("""
+            SELECT
+                r.name,
+                r.requested_by,
+                e.employee_name AS requested_by_name,
+                r.ot_date,
+                r.total_employees,
+                r.total_hours,
+                r.status,
+                r.manager_approver,
+                r.factory_manager_approver,
+                r.request_date,
+                r.creation,
+                r.modified
+            FROM `tabOvertime Request` r
+            LEFT JOIN `tabEmployee` e ON e.name = r.requested_by
+            WHERE
+                r.docstatus = 1
+                AND (
+                    (r.status = 'Pending Manager Approval' AND r.manager_approver LIKE %s)
+                    OR
+                    (r.status = 'Pending Factory Manager Approval' AND r.factory_manager_approver LIKE %s)
+                )
+            ORDER BY r.creation DESC
+        """, (employee_pattern, employee_pattern), as_dict=True)
+        cache.set_value(_inbox_key(employee_id), rows, expires_in_sec=INBOX_TTL)
+    return [frappe._dict(row) for row in rows]
+
+
+def _approver_ids(doc):
+    return {
+        approver.split(' - ')[0]
+        for approver in (doc.get("manager_approver"), doc.get("factory_manager_approver"))
+        if approver
+    }
+
+
+def _clear_now_and_after_commit(clear):
+    clear()
+    frappe.db.after_commit.add(clear)
+
+
+def invalidate_inbox(*employee_ids):
+    """Drop the inbox of the given approvers (all inboxes when none given)."""
+    def _clear():
+        cache = frappe.cache()
+        if employee_ids:
+            cache.delete_value([_inbox_key(e) for e in employee_ids])
+        else:
+            cache.delete_keys(_inbox_key(""))
+
+    _clear_now_and_after_commit(_clear)
+
+
+def invalidate_inbox_for(docs):
+    """Drop the inboxes of every approver on `docs` (Overtime Request docs / dicts)."""
+    employee_ids = set()
+    for doc in docs:
+        employee_ids.update(_approver_ids(doc))
+    if employee_ids:
+        invalidate_inbox(*sorted(employee_ids))
+
+
+def invalidate_scope():
+    def _clear():
+        frappe.cache().delete_keys(_scope_key(""))
+
+    _clear_now_and_after_commit(_clear)
+
+
+def on_request_change(doc, method=None):
+    """OvertimeRequest.on_change / on_trash: status or approvers may have moved."""
+    old = doc.get_doc_before_save() if method != "on_trash" else None
+    docs = [doc, old] if old else [doc]
+    invalidate_inbox_for(docs)
+
+
+def invalidate_on_employee_change(doc, method=None, *args):
+    """doc_events Employee on_update / after_rename (old, new, merge in *args)."""
+    if method == "on_update" and not any(doc.has_value_changed(field) for field in EMPLOYEE_FIELDS):
+        return
+    invalidate_scope()
+    # Requester names are denormalised into the inbox rows
+    if method != "on_update" or doc.has_value_changed("employee_name"):
+        invalidate_inbox()
+
+
+def invalidate_on_department_change(doc=None, method=None, *args):
+    """doc_events Department on_update / after_rename / on_trash."""
+    invalidate_scope()
@@ -0,0 +1,363 @@
+# Copyright (c) 2026, IT Team - TIQN and contributors
+# For license information, please see license.txt
+
+"""Bulk approval for Overtime Request.
+
+approve_overtime_request handles one request per call: it reloads the document,
+looks up every approver / requester separately, re-shares, and sends email +
+Notification Log + popup synchronously before returning. Approving 50 requests
+from the pending popup meant 50 round trips, each waiting on the mail queue.
+
+bulk_approve_overtime_requests does the same state changes for many requests:
+
+1. Load all requests (rows locked) and every involved Employee with one query
+   each; check authority / status in Python with the same rules and messages
+   as approve_overtime_request.
+2. Per batch of BATCH_SIZE (one savepoint each): one UPDATE per approval level,
+   missing shares for the factory manager, overtime records in bulk.
+3. Notifications are grouped per recipient and queued after commit:
+   send_approval_digest sends ONE email + ONE Notification Log + ONE popup per
+   user, listing every request that concerns them.
+"""
+
+import json
+
+import frappe
+from frappe.utils import create_batch, get_url, now
+
+from customize_erpnext.customize_erpnext.doctype.overtime_request.approval_scope import invalidate_inbox_for
+from customize_erpnext.customize_erpnext.doctype.overtime_request.overtime_request import (
+    create_overtime_records_bulk,
+    get_hr_users_emails,
+    get_notification_indicator,
+)
+
+BATCH_SIZE = 50
+DIGEST_METHOD = (
+    "customize_erpnext.customize_erpnext.doctype.overtime_request.ot_request_bulk.send_approval_digest"
+)
+
+_REQUEST_FIELDS = [
+    "name", "docstatus", "status", "requested_by", "manager_approver",
+    "factory_manager_approver", "manager_approved_on", "ot_date",
+    "total_employees", "total_hours", "reason",
+]
+
+# approval_type -> (status required, new status, timestamp field)
+_TRANSITIONS = {
+    "manager": ("Pending Manager Approval", "Pending Factory Manager Approval", "manager_approved_on"),
+    "factory_manager": ("Pending Factory Manager Approval", "Approved", "factory_manager_approved_on"),
+}
+
+
+def _employee_id(approver):
+    # Format: "TIQN-0148 - Name (Designation)"
+    return approver.split(' - ')[0] if approver else ""
+
+
+@frappe.whitelist()
+def bulk_approve_overtime_requests(requests, comments=""):
+    """Approve many Overtime Requests in one call.
+
+    Args:
+        requests: [{"name": ..., "approval_type": "manager" | "factory_manager"}]
+            (JSON string accepted).
+        comments: added as a Comment on every approved request, like
+            reject_overtime_request does.
+
+    Returns:
+        {"success", "results": [{name, status, message}], "total",
+         "success_count", "error_count"} — same shape as quick_approve_multiple.
+    """
+    if isinstance(requests, str):
+        requests = json.loads(requests)
+
+    wanted = {}
+    for request in requests:
+        wanted.setdefault(request["name"], request.get("approval_type"))
+
+    current_employee = frappe.get_value("Employee", {"user_id": frappe.session.user}, "name")
+    docs = {
+        d.name: d
+        for d in frappe.get_all("Overtime Request",
+            filters={"name": ["in", list(wanted)]},
+            fields=_REQUEST_FIELDS,
+            for_update=True
+        )
+    } if wanted else {}
+
+    results = {}
+    by_type = {"manager": [], "factory_manager": []}
+    for name, approval_type in wanted.items():
+        error = _check_approval(docs.get(name), name, approval_type, current_employee)
+        if error:
+            results[name] = {"name": name, "status": "error", "message": error}
+        else:
+            by_type[approval_type].append(docs[name])
+
+    employees = _load_employees(d for group in by_type.values() for d in group)
+    digest = {}
+    timestamp = now()
+
+    for approval_type, approved in by_type.items():
+        for batch in create_batch(approved, BATCH_SIZE):
+            frappe.db.savepoint("ot_request_bulk")
+            try:
+                _apply_batch(batch, approval_type, timestamp, employees)
+                if comments:
+                    _add_comments(batch, approval_type, comments)
+            except Exception as e:
+                frappe.db.rollback(save_point="ot_request_bulk")
+                frappe.log_error(f"Error in bulk_approve_overtime_requests: {str(e)}", "Quick Approve Error")
+                for doc in batch:
+                    results[doc.name] = {"name": doc.name, "status": "error", "message": str(e)}
+                continue
+
+            for doc in batch:
+                results[doc.name] = {"name": doc.name, "status": "success", "message": "Approved successfully"}
+            invalidate_inbox_for(batch)
+            _collect_notifications(digest, batch, approval_type, employees)
+
+    if digest:
+        frappe.enqueue(
+            DIGEST_METHOD,
+            queue="short",
+            digest=digest,
+            from_user=frappe.session.user,
+            enqueue_after_commit=True,
+        )
+
+    ordered = [results[name] for name in wanted]
+    return {
+        "success": True,
+        "results": ordered,
+        "total": len(ordered),
+        "success_count": len([r for r in ordered if r["status"] == "success"]),
+        "error_count": len([r for r in ordered if r["status"] == "error"])
+    }
+
+
+def _check_approval(doc, name, approval_type, current_employee):
+    """Error message approve_overtime_request would raise, or None."""
+    if not doc:
+        return f"Overtime Request {name} not found"
+    if approval_type not in _TRANSITIONS:
+        return f"Unknown approval type: {approval_type}"
+    if doc.docstatus != 1:
+        return "You don't have permission to approve this request"
+
+    if approval_type == "manager":
+        if _employee_id(doc.manager_approver) != current_employee:
+            return "You are not authorized to provide manager approval for this request"
+        if doc.status != "Pending Manager Approval":
+            return "This request is not pending manager approval"
+    else:
+        if _employee_id(doc.factory_manager_approver) != current_employee:
+            return "You are not authorized to provide Factory Manager approval for this request"
+        if doc.status != "Pending Factory Manager Approval":
+            return "This request is not pending Factory Manager approval"
+        if not doc.manager_approved_on:
+            return "Department Manager approval is required before Factory Manager approval"
+    return None
+
+
+def _load_employees(docs):
+    """{employee_id: {user_id, employee_name}} for requesters and approvers of docs."""
+    ids = set()
+    for doc in docs:
+        ids.update(filter(None, (
+            doc.requested_by,
+            _employee_id(doc.manager_approver),
+            _employee_id(doc.factory_manager_approver),
+        )))
+    if not ids:
+        return {}
+    return {
+        e.name: e
+        for e in frappe.get_all("Employee",
+            filters={"name": ["in", list(ids)]},
+            fields=["name", "user_id", "employee_name"]
+        )
+    }
+
+
+def _apply_batch(batch, approval_type, timestamp, employees):
+    required_status, new_status, timestamp_field = _TRANSITIONS[approval_type]
+    names = [doc.name for doc in batch]
+    frappe.db.sql(f"""
+        UPDATE `tabOvertime Request`
+        SET `{timestamp_field}` = %s,
+            status = %s,
+            modified = %s,
+            modified_by = %s
+        WHERE name IN ({", ".join(["%s"] * len(names))})
+          AND status = %s
+    """, [timestamp, new_status, timestamp, frappe.session.user] + names + [required_status])
+
+    for doc in batch:
+        doc[timestamp_field] = timestamp
+        doc.status = new_status
+
+    if approval_type == "manager":
+        # Same as doc.share_with_approvers() after manager approval: make sure
+        # the factory manager can open the request
+        _share_missing(batch, employees)
+    else:
+        create_overtime_records_bulk(batch)
+
+
+def _add_comments(batch, approval_type, comments):
+    content = f"Approved by {approval_type.replace('_', ' ').title()}: {comments}"
+    for doc in batch:
+        frappe.get_doc({
+            "doctype": "Comment",
+            "comment_type": "Comment",
+            "reference_doctype": "Overtime Request",
+            "reference_name": doc.name,
+            "comment_email": frappe.session.user,
+            "content": content,
+        }).insert(ignore_permissions=True)
+
+
+def _share_missing(batch, employees):
+    wanted = set()
+    for doc in batch:
+        factory_manager = employees.get(_employee_id(doc.factory_manager_approver))
+        requester = employees.get(doc.requested_by)
+        if factory_manager and factory_manager.user_id and (
+            not requester or requester.user_id != factory_manager.user_id
+        ):
+            wanted.add((doc.name, factory_manager.user_id))
+    if not wanted:
+        return
+
+    shared = {
+        (s.share_name, s.user)
+        for s in frappe.get_all("DocShare",
+            filters={
+                "share_doctype": "Overtime Request",
+                "share_name": ["in", [name for name, _user in wanted]],
+            },
+            fields=["share_name", "user"]
+        )
+    }
+    for name, user in sorted(wanted - shared):
+        try:
+            frappe.share.add(
+                doctype="Overtime Request",
+                name=name,
+                user=user,
+                read=1,
+                write=1,
+                submit=0,
+                share=0,
+                flags={"ignore_share_permission": True}
+            )
+        except Exception as e:
+            frappe.log_error(f"Error sharing {name} with user {user}: {str(e)}", "Document Share Error")
+
+
+def _collect_notifications(digest, batch, approval_type, employees):
+    """digest: {user: [item]} — what send_*_notification would have sent, per user."""
+    hr_emails = get_hr_users_emails() if approval_type == "factory_manager" else []
+
+    for doc in batch:
+        requester = employees.get(doc.requested_by) or frappe._dict()
+        item = {
+            "kind": "Final Approval Required" if approval_type == "manager" else "Approved",
+            "name": doc.name,
+            "requested_by": doc.requested_by,
+            "requester_name": requester.employee_name,
+            "ot_date": str(doc.ot_date),
+            "total_employees": doc.total_employees,
+            "total_hours": doc.total_hours,
+            "reason": doc.reason,
+        }
+
+        if approval_type == "manager":
+            factory_manager = employees.get(_employee_id(doc.factory_manager_approver))
+            recipients = [factory_manager.user_id] if factory_manager and factory_manager.user_id else []
+        else:
+            recipients = list(set(filter(None, [requester.user_id, *hr_emails])))
+
+        for user in recipients:
+            digest.setdefault(user, []).append(item)
+
+
+def send_approval_digest(digest, from_user=None):
+    """Background job: one email + one Notification Log + one popup per user."""
+    for user, items in digest.items():
+        try:
+            _send_digest_to(user, items, from_user)
+        except Exception as e:
+            frappe.log_error(f"Error sending overtime approval digest to {user}: {str(e)}")
+
+
+def _send_digest_to(user, items, from_user):
+    final_required = [i for i in items if i["kind"] == "Final Approval Required"]
+    approved = [i for i in items if i["kind"] == "Approved"]
+
+    sections = []
+    if final_required:
+        sections.append(
+            f"{len(final_required)} overtime request(s) approved by the Department Manager need your final approval:\n\n"
+            + "\n".join(_digest_line(i) for i in final_required)
+        )
+    if approved:
+        sections.append(
+            f"{len(approved)} overtime request(s) have been fully approved. "
+            f"The overtime entries have been created for all employees:\n\n"
+            + "\n".join(_digest_line(i) for i in approved)
+        )
+
+    count = len(items)
+    if final_required and not approved:
+        subject = f"Overtime Request Final Approval Required - {count} request(s)"
+        notification_subject = "🔔 Final Overtime Approval Required"
+        notification_type = "Final Approval Required"
+    elif approved and not final_required:
+        subject = f"Overtime Request Approved - {count} request(s)"
+        notification_subject = "🎉 Overtime Request Approved"
+        notification_type = "Approved"
+    else:
+        subject = f"Overtime Request Updates - {count} request(s)"
+        notification_subject = "🔔 Overtime Request Updates"
+        notification_type = "Info"
+
+    message = "Dear Team,\n\n" + "\n\n".join(sections) + "\n\nBest regards,\nHR System"
+    frappe.sendmail(recipients=[user], subject=subject, message=message.replace("\n", "<br>"))
+
+    summary = (
+        f"Request {items[0]['name']}: {items[0]['kind']}" if count == 1
+        else f"{count} overtime requests: " + ", ".join(i["name"] for i in items)
+    )
+    frappe.get_doc({
+        "doctype": "Notification Log",
+        "subject": notification_subject,
+        "for_user": user,
+        "type": "Alert",
+        "document_type": "Overtime Request",
+        "document_name": items[0]["name"] if count == 1 else None,
+        "from_user": from_user,
+        "email_content": summary,
+        "read": 0
+    }).insert(ignore_permissions=True)
+
+    frappe.publish_realtime(
+        event="msgprint",
+        message={
+            "title": notification_subject,
+            "message": summary,
+            "indicator": get_notification_indicator(notification_type)
+        },
+        user=user
+    )
+
+
+def _digest_line(item):
+    return (
+        f"- {item['name']}: {item['requester_name'] or ''} ({item['requested_by']}), "
+        f"OT Date {item['ot_date']}, {item['total_employees']} employees, "
+        f"{item['total_hours']} hours, Reason: {item['reason'] or ''} - "
+        f"{get_url()}/app/overtime-request/{item['name']}"
+    )
@@ -5,6 +5,14 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import getdate, now
 
+from customize_erpnext.customize_erpnext.doctype.overtime_request.approval_scope import (
+    get_pending_inbox,
+    get_user_employee,
+    get_user_employee_id,
+    invalidate_inbox_for,
+    on_request_change,
+)
+
 def validate_ot_level_for_date(ot_level, ot_date):
     """Validate if OT level is allowed for the given date"""
     from frappe.utils import getdate
@@ -85,7 +93,7 @@ def overtime_request_permission(doc, ptype="read", user=None):
     
     # Employee role logic
     if "Employee" in user_roles:
-        current_employee = frappe.get_value("Employee", {"user_id": user}, "name")
+        current_employee = get_user_employee_id(user)
         if not current_employee:
             return False
         
@@ -110,9 +118,6 @@ def get_permission_query_conditions(user):
     This function is called by ERPNext framework to filter records
     """
     
-    # FOR DEBUGGING: Log when this function is called
-    frappe.log_error(f"Permission Query Called for user: {user}", "Permission Debug")
-    
     if not user:
         user = frappe.session.user
     
@@ -126,8 +131,8 @@ def get_permission_query_conditions(user):
     if any(role in user_roles for role in ["System Manager", "HR Manager"]):
         return ""
     
-    # Get current user's employee
-    current_employee = frappe.get_value("Employee", {"user_id": user}, "name")
+    # Get current user's employee (cached approval scope)
+    current_employee = get_user_employee_id(user)
     
     if not current_employee:
         # If no employee record, no access
@@ -202,6 +207,30 @@ def get_notification_indicator(notification_type):
     }
     return indicators.get(notification_type, "blue")
 
+def get_hr_users_emails():
+    """Get emails of all HR users (active employees with HR in designation)"""
+    try:
+        # Get all employees with HR in designation
+        hr_employees = frappe.get_all("Employee",
+            filters={
+                "status": "Active",
+                "user_id": ["!=", ""]
+            },
+            fields=["user_id", "designation"]
+        )
+
+        hr_emails = []
+        for emp in hr_employees:
+            if emp.designation and "HR" in emp.designation.upper():
+                if emp.user_id:
+                    hr_emails.append(emp.user_id)
+
+        return hr_emails
+
+    except Exception as e:
+        frappe.log_error(f"Error getting HR users emails: {str(e)}")
+        return []
+
 class OvertimeRequest(Document):
     def validate(self):
         self.validate_ot_date()
@@ -229,7 +258,7 @@ class OvertimeRequest(Document):
             return True
         
         # 3. Get current user's employee record
-        current_employee = frappe.get_value("Employee", {"user_id": user}, "name")
+        current_employee = get_user_employee_id(user)
         
         if not current_employee:
             return False
@@ -437,6 +466,13 @@ class OvertimeRequest(Document):
         # Notify requester
         self.send_cancellation_notification()
 
+    def on_change(self):
+        """Status / approvers may have moved: drop the approvers' cached inbox"""
+        on_request_change(self, "on_change")
+
+    def on_trash(self):
+        on_request_change(self, "on_trash")
+
     def send_manager_approval_notification(self):
         """Send email AND system notification to Department Manager"""
         try:
@@ -799,27 +835,7 @@ class OvertimeRequest(Document):
 
     def get_hr_users_emails(self):
         """Get emails of all HR users"""
-        try:
-            # Get all employees with HR in designation
-            hr_employees = frappe.get_all("Employee",
-                filters={
-                    "status": "Active",
-                    "user_id": ["!=", ""]
-                },
-                fields=["user_id", "designation"]
-            )
-            
-            hr_emails = []
-            for emp in hr_employees:
-                if emp.designation and "HR" in emp.designation.upper():
-                    if emp.user_id:
-                        hr_emails.append(emp.user_id)
-            
-            return hr_emails
-            
-        except Exception as e:
-            frappe.log_error(f"Error getting HR users emails: {str(e)}")
-            return []
+        return get_hr_users_emails()
 
     def share_with_approvers(self):
         """Share document with all approvers for access"""
@@ -934,44 +950,11 @@ def test_notification():
 def get_pending_approvals_for_user(employee_id):
     """Get pending approval requests for specific employee - BYPASS USER PERMISSIONS"""
     try:
-        # Use raw SQL to completely bypass permission system
-        query = """
-            SELECT 
-                name, 
-                requested_by,
-                ot_date,
-                total_employees,
-                total_hours,
-                status,
-                manager_approver,
-                factory_manager_approver,
-                request_date,
-                creation,
-                modified
-            FROM `tabOvertime Request`
-            WHERE 
-                docstatus = 1 
-                AND status IN ('Pending Manager Approval', 'Pending Factory Manager Approval')
-                AND (
-                    (status = 'Pending Manager Approval' AND manager_approver LIKE %s)
-                    OR 
-                    (status = 'Pending Factory Manager Approval' AND factory_manager_approver LIKE %s)
-                )
-            ORDER BY creation DESC
-        """
-        
-        # Search pattern for employee ID
-        employee_pattern = f"{employee_id} -%"
+        # Raw SQL (bypasses the permission system), cached per approver —
+        # see approval_scope.get_pending_inbox
+        results = get_pending_inbox(employee_id)
         
-        results = frappe.db.sql(query, (employee_pattern, employee_pattern), as_dict=True)
-        
-        # Enrich with employee names
-        for record in results:
-            if record.requested_by:
-                requested_by_name = frappe.get_value("Employee", record.requested_by, "employee_name")
-                record["requested_by_name"] = requested_by_name
-        
-        frappe.log_error(f"Pending approvals for {employee_id}: {len(results)} records", "Approval Debug")
+        frappe.logger().debug(f"Pending approvals for {employee_id}: {len(results)} records")
         
         return results
         
@@ -1037,28 +1020,10 @@ def get_processed_approvals_for_user(employee_id):
 
 @frappe.whitelist()
 def get_pending_approvals_count(employee_id):
-    """Get count of pending app rovals for badge display"""
+    """Get count of pending approvals for badge display (same cached inbox as the popup)"""
     try:
-        query = """
-            SELECT COUNT(*) as count
-            FROM `tabOvertime Request` 
-            WHERE 
-                docstatus = 1 
-                AND status IN ('Pending Manager Approval', 'Pending Factory Manager Approval')
-                AND (
-                    (status = 'Pending Manager Approval' AND manager_approver LIKE %s)
-                    OR 
-                    (status = 'Pending Factory Manager Approval' AND factory_manager_approver LIKE %s)
-                )
-        """
-        
-        employee_pattern = f"{employee_id} -%"
-        result = frappe.db.sql(query, (employee_pattern, employee_pattern), as_dict=True)
-        
-        count = result[0].get('count', 0) if result else 0
-        
         return {
-            "count": count,
+            "count": len(get_pending_inbox(employee_id)),
             "employee_id": employee_id
         }
         
@@ -1072,10 +1037,8 @@ def get_user_approval_authority():
     try:
         user = frappe.session.user
         
-        # Get employee record
-        employee = frappe.get_value("Employee", {"user_id": user}, 
-                                  ["name", "employee_name", "designation", "department"], 
-                                  as_dict=True)
+        # Get employee record (cached approval scope)
+        employee = get_user_employee(user)
         
         if not employee:
             return {
@@ -1121,7 +1084,7 @@ def approve_overtime_request(name, approval_type, comments=""):
         if not doc.has_permission("write"):
             frappe.throw("You don't have permission to approve this request")
         
-        current_user_employee = frappe.get_value("Employee", {"user_id": frappe.session.user}, "name")
+        current_user_employee = get_user_employee_id()
         
         if approval_type == "manager":
             manager_id = doc.manager_approver.split(' - ')[0] if doc.manager_approver else ""
@@ -1137,6 +1100,7 @@ def approve_overtime_request(name, approval_type, comments=""):
             
             # Reload document to get updated values
             doc.reload()
+            invalidate_inbox_for([doc])
             
             # Re-share with factory manager (in case it wasn't shared before)
             doc.share_with_approvers()
@@ -1163,6 +1127,7 @@ def approve_overtime_request(name, approval_type, comments=""):
             
             # Reload document to get updated values
             doc.reload()
+            invalidate_inbox_for([doc])
             
             # Create overtime records for each employee
             create_overtime_records(doc)
@@ -1185,7 +1150,7 @@ def reject_overtime_request(name, rejection_type, comments=""):
         if not doc.has_permission("write"):
             frappe.throw("You don't have permission to reject this request")
         
-        current_user_employee = frappe.get_value("Employee", {"user_id": frappe.session.user}, "name")
+        current_user_employee = get_user_employee_id()
         
         if rejection_type == "manager":
             # Extract employee ID from manager_approver (before " - ")
@@ -1219,6 +1184,7 @@ def reject_overtime_request(name, rejection_type, comments=""):
         
         # Reload document to get updated values
         doc.reload()
+        invalidate_inbox_for([doc])
         
         # Add comment
         if comments:
@@ -1235,28 +1201,48 @@ def reject_overtime_request(name, rejection_type, comments=""):
 
 def create_overtime_records(overtime_request):
     """Create individual overtime records for each employee after approval"""
+    create_overtime_records_bulk([overtime_request])
+
+def create_overtime_records_bulk(overtime_requests):
+    """Create overtime records for many approved requests.
+
+    Child rows and existing entries of every request are loaded with one query
+    each instead of one existence check per employee.
+    """
     try:
-        for employee_row in overtime_request.ot_employees:
-            existing = frappe.get_all("Overtime Entry",
-                filters={
-                    "employee": employee_row.employee,
-                    "overtime_date": overtime_request.ot_date,
-                    "overtime_request": overtime_request.name
-                }
+        if not overtime_requests:
+            return
+        ot_dates = {r.name: r.ot_date for r in overtime_requests}
+        names = list(ot_dates)
+
+        employee_rows = frappe.get_all("OT Employee Detail",
+            filters={"parenttype": "Overtime Request", "parent": ["in", names]},
+            fields=["parent", "employee", "employee_name", "planned_hours",
+                    "rate_multiplier", "start_time", "end_time"],
+            order_by="parent, idx"
+        )
+        existing = {
+            (e.overtime_request, e.employee, str(e.overtime_date))
+            for e in frappe.get_all("Overtime Entry",
+                filters={"overtime_request": ["in", names]},
+                fields=["overtime_request", "employee", "overtime_date"]
             )
-            
-            if existing:
+        }
+
+        for employee_row in employee_rows:
+            ot_date = ot_dates[employee_row.parent]
+            if (employee_row.parent, employee_row.employee, str(ot_date)) in existing:
                 continue
             
             overtime_entry = frappe.new_doc("Overtime Entry")
             overtime_entry.employee = employee_row.employee
             overtime_entry.employee_name = employee_row.employee_name
-            overtime_entry.overtime_date = overtime_request.ot_date
+            overtime_entry.overtime_date = ot_date
             overtime_entry.overtime_hours = employee_row.planned_hours
             overtime_entry.overtime_rate_multiplier = employee_row.rate_multiplier
             overtime_entry.start_time = employee_row.start_time
             overtime_entry.end_time = employee_row.end_time
-            overtime_entry.overtime_request = overtime_request.name
+            overtime_entry.overtime_request = employee_row.parent
             overtime_entry.status = "Approved"
             
             try:
@@ -1328,7 +1314,7 @@ def get_pending_approvals(user=None):
         if not user:
             user = frappe.session.user
         
-        employee = frappe.get_value("Employee", {"user_id": user}, "name")
+        employee = get_user_employee_id(user)
         if not employee:
             return []
         
@@ -1610,37 +1596,19 @@ def get_date_multiplier_info(ot_date):
 
 @frappe.whitelist()
 def quick_approve_multiple(request_names, approval_type, comments=""):
-    """Quick approve multiple requests at once"""
+    """Quick approve multiple requests at once (see ot_request_bulk)"""
     try:
         if isinstance(request_names, str):
             import json
             request_names = json.loads(request_names)
         
-        results = []
-        
-        for name in request_names:
-            try:
-                # Call existing approve method
-                approve_overtime_request(name, approval_type, comments)
-                results.append({
-                    "name": name,
-                    "status": "success",
-                    "message": "Approved successfully"
-                })
-            except Exception as e:
-                results.append({
-                    "name": name,
-                    "status": "error", 
-                    "message": str(e)
-                })
-        
-        return {
-            "success": True,
-            "results": results,
-            "total": len(request_names),
-            "success_count": len([r for r in results if r["status"] == "success"]),
-            "error_count": len([r for r in results if r["status"] == "error"])
-        }
+        from customize_erpnext.customize_erpnext.doctype.overtime_request.ot_request_bulk import (
+            bulk_approve_overtime_requests,
+        )
+        return bulk_approve_overtime_requests(
+            [{"name": name, "approval_type": approval_type} for name in request_names],
+            comments
+        )
         
     except Exception as e:
         frappe.log_error(f"Error in quick_approve_multiple: {str(e)}", "Quick Approve Error")
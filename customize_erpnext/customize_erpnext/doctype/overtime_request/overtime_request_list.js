@@ -462,94 +462,53 @@ function bulk_approve_requests(requests, dialog, employee_id, authority_info) {
     frappe.confirm(
         `Are you sure you want to approve ${requests.length} request(s)?`,
         function() {
-            // Show progress
-            let progress_dialog = show_progress_dialog('Processing...', requests.length);
-            
-            let completed = 0;
-            let errors = [];
-            
-            requests.forEach(function(request, index) {
-                setTimeout(() => {
-                    frappe.call({
-                        method: 'customize_erpnext.customize_erpnext.doctype.overtime_request.overtime_request.approve_overtime_request',
-                        args: {
-                            name: request.name,
-                            approval_type: request.approval_type,
-                            comments: 'Bulk approval'
-                        },
-                        callback: function(r) {
-                            completed++;
-                            
-                            if (r.exc) {
-                                errors.push(`${request.name}: ${r.exc}`);
-                            }
-                            
-                            // Update progress
-                            let progress = (completed / requests.length) * 100;
-                            progress_dialog.set_progress(progress);
-                            
-                            // If all completed
-                            if (completed === requests.length) {
-                                progress_dialog.hide();
-                                
-                                if (errors.length === 0) {
-                                    frappe.show_alert({
-                                        message: `Successfully approved ${requests.length} request(s)!`,
-                                        indicator: 'green'
-                                    });
-                                } else {
-                                    frappe.msgprint({
-                                        title: 'Processing Results',
-                                        message: `
-                                            <p><strong>Success:</strong> ${requests.length - errors.length}</p>
-                                            <p><strong>Errors:</strong> ${errors.length}</p>
-                                            ${errors.length > 0 ? '<hr><small>' + errors.join('<br>') + '</small>' : ''}
-                                        `,
-                                        indicator: errors.length > 0 ? 'orange' : 'green'
-                                    });
-                                }
-                                
-                                // Refresh popup
-                                dialog.hide();
-                                setTimeout(() => {
-                                    show_enhanced_pending_popup(employee_id, authority_info);
-                                }, 1000);
-                            }
-                        }
-                    });
-                }, index * 500); // Stagger requests
+            // One call for all selected requests; notifications are sent as a queued digest
+            frappe.call({
+                method: 'customize_erpnext.customize_erpnext.doctype.overtime_request.ot_request_bulk.bulk_approve_overtime_requests',
+                args: {
+                    requests: requests.map(request => ({
+                        name: request.name,
+                        approval_type: request.approval_type
+                    })),
+                    comments: 'Bulk approval'
+                },
+                freeze: true,
+                freeze_message: `Approving ${requests.length} request(s)...`,
+                callback: function(r) {
+                    if (r.exc || !r.message) return;
+                    
+                    let errors = (r.message.results || [])
+                        .filter(result => result.status === 'error')
+                        .map(result => `${result.name}: ${result.message}`);
+                    
+                    if (errors.length === 0) {
+                        frappe.show_alert({
+                            message: `Successfully approved ${requests.length} request(s)!`,
+                            indicator: 'green'
+                        });
+                    } else {
+                        frappe.msgprint({
+                            title: 'Processing Results',
+                            message: `
+                                <p><strong>Success:</strong> ${requests.length - errors.length}</p>
+                                <p><strong>Errors:</strong> ${errors.length}</p>
+                                ${errors.length > 0 ? '<hr><small>' + errors.join('<br>') + '</small>' : ''}
+                            `,
+                            indicator: errors.length > 0 ? 'orange' : 'green'
+                        });
+                    }
+                    
+                    // Refresh popup
+                    dialog.hide();
+                    setTimeout(() => {
+                        show_enhanced_pending_popup(employee_id, authority_info);
+                    }, 1000);
+                }
             });
         }
     );
 }
 
-function show_progress_dialog(title, total) {
-    let dialog = new frappe.ui.Dialog({
-        title: title,
-        fields: [
-            {
-                fieldname: 'progress_html',
-                fieldtype: 'HTML'
-            }
-        ]
-    });
-    
-    dialog.set_progress = function(percent) {
-        let html = `
-            <div class="progress mb-3">
-                <div class="progress-bar bg-success" style="width: ${percent}%"></div>
-            </div>
-            <p class="text-center">${Math.round(percent)}% completed</p>
-        `;
-        dialog.fields_dict.progress_html.$wrapper.html(html);
-    };
-    
-    dialog.set_progress(0);
-    dialog.show();
-    
-    return dialog;
-}
-
 // CSS Styles
 $(document).ready(function() {
     let enhanced_styles = `
@@ -1303,9 +1303,10 @@ function download_all_carton_photos(frm) {
 		frappe.msgprint(__("Chưa có ảnh thùng nào để tải."));
 		return;
 	}
-	window.open(
-		"/api/method/customize_erpnext.customize_erpnext.doctype.packing_list.packing_list.download_all_photos?packing_list=" +
-		encodeURIComponent(frm.doc.name)
+	// ZIP dựng trong job nền (api/zip_export) — tự tải về khi xong
+	ZipExport.start(
+		"customize_erpnext.customize_erpnext.doctype.packing_list.packing_list.download_all_photos",
+		{ packing_list: frm.doc.name }
 	);
 }
 
@@ -1027,42 +1027,36 @@ def download_excel(packing_list):
 
 @frappe.whitelist()
 def download_all_photos(packing_list):
-    """Zip every carton photo of the packing list and stream it as a download."""
-    import io
-    import zipfile
-    from frappe.utils.file_manager import get_file
+    """Zip every carton photo of the packing list in a background job.
+
+    Returns {"job_id", "total"} — see customize_erpnext.api.zip_export.
+    """
+    from customize_erpnext.api.zip_export import start_zip_export
 
     frappe.has_permission("Packing List", "read", doc=packing_list, throw=True)
     doc = frappe.get_doc("Packing List", packing_list)
-    buf = io.BytesIO()
-    count = 0
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
-        for d in doc.details:
-            url = d.get("photo")
-            if not url:
-                continue
-            try:
-                _fname, content = get_file(url)
-            except Exception:
-                continue
-            # Name each zip entry from the CURRENT row data, so the kg is always
-            # up to date even if the stored File was named before weighing.
-            entry = _photo_name(doc.name, d.carton_no, d.gross_weight, d.color, d.size)
-            z.writestr(entry, content)
-            count += 1
-    if not count:
-        frappe.throw(_("No carton photos to download"))
-    frappe.response["filename"] = "{0}_photos.zip".format(doc.name)
-    frappe.response["filecontent"] = buf.getvalue()
-    frappe.response["type"] = "download"
+    # Name each zip entry from the CURRENT row data, so the kg is always
+    # up to date even if the stored File was named before weighing.
+    entries = [
+        (_photo_name(doc.name, d.carton_no, d.gross_weight, d.color, d.size), d.get("photo"))
+        for d in doc.details
+        if d.get("photo")
+    ]
+    return start_zip_export(
+        entries,
+        "{0}_photos.zip".format(doc.name),
+        title=_("Download carton photos"),
+        empty_message=_("No carton photos to download"),
+    )
 
 
 # ---------------------------------------------------------------------- #
-# Scale OCR (red 7-segment display) — ssocr + image pipeline
+# Scale OCR (red 7-segment display) — NumPy decoder (+ ssocr fallback)
 #
 # Robustness comes from three things, all optional/fallback-safe:
 #   roi       – caller-supplied display box (fixed station calibrates once)
-#   ensemble  – several ssocr variants + majority vote (fixes the weak '7')
+#   ensemble  – closing / tilt / threshold variants + majority vote, evaluated
+#               in one vectorised pass (seven_segment.py); ssocr only as fallback
 #   expected  – theoretical gross from the packing data, used as an anchor
 # ---------------------------------------------------------------------- #
 SSOCR_THRESHOLDS = (50, 30, 70)
@@ -1137,42 +1131,11 @@ def _red_mask(im):
     return red > 100
 
 
-def _column_runs(region, frac=0.05):
-    """Column runs of lit pixels: one run per digit (gaps separate the digits)."""
-    colsum = region.sum(0)
-    active = colsum > (region.shape[0] * frac)
-    runs, start = [], None
-    for i, v in enumerate(list(active) + [False]):
-        if v and start is None:
-            start = i
-        elif not v and start is not None:
-            runs.append((start, i))
-            start = None
-    return runs
-
-
-def _digit_runs(region):
-    """Runs that are really digits, judged by HEIGHT — never by pixel count.
-
-    A '1' lights only two segments, so it has few pixels but still spans the full
-    digit height. Trimming by pixel count therefore ate leading ones and turned
-    "11.79" into "179" (= 1.79). Noise specks and the decimal point are short, so
-    height separates them cleanly from digits.
-    """
-    import numpy as np
-
-    h = region.shape[0]
-    out = []
-    for (a, b) in _column_runs(region):
-        rows = np.where(region[:, a:b].any(1))[0]
-        if len(rows) and (rows.max() - rows.min() + 1) >= h * 0.5:
-            out.append((a, b))
-    return out
-
-
 def _trim_columns(region):
     """Crop the strip to the digits, dropping specks / the decimal point."""
-    runs = _digit_runs(region)
+    from .seven_segment import digit_runs
+
+    runs = digit_runs(region)
     if not runs:
         return None
     x0, x1 = min(a for a, b in runs), max(b for a, b in runs)
@@ -1257,10 +1220,12 @@ def _count_digit_cells(sub):
     cannot see a MISSING character; the geometry can.
 
     Measured on real photos: "394" -> 3 runs [27,27,27]; "12.53" -> 4 runs
-    [9,24,19,21] (the "1" is the narrow one). Counted by height like _digit_runs,
+    [9,24,19,21] (the "1" is the narrow one). Counted by height like digit_runs,
     so a thin '1' counts and the decimal point does not.
     """
-    return len(_digit_runs(sub))
+    from .seven_segment import digit_runs
+
+    return len(digit_runs(sub))
 
 
 def _ssocr_read(img, threshold, ndigits=-1):
@@ -1306,17 +1271,39 @@ def _plausible(value, expected):
     return expected * 0.6 <= value <= expected * 1.5
 
 
-def _read_strip(sub, dec, expected):
+def _read_strip(sub, dec, expected, engine="auto"):
     """OCR one candidate digit strip. Returns a result dict, or None.
 
     Correctness rests on the DIGIT COUNT taken from the geometry, never on the
     expected weight: most lists are filled Gross-first (net derived from it), so
     the theoretical gross is often absent or rough and must not be load-bearing.
+
+    engine: "numpy" (in-process decoder, seven_segment.py), "ssocr" (the old
+    subprocess ensemble) or "auto" — numpy first, ssocr only when the numpy
+    vote is not confident and ssocr is installed.
     """
+    import shutil
+
+    from .seven_segment import decode_strip
+
     ncells = _count_digit_cells(sub)
     if ncells < 2 or ncells > 6:
         return None  # not a weight reading
 
+    fallback = None
+    if engine in ("auto", "numpy"):
+        res = decode_strip(sub)
+        if res and len(res["digits"]) == ncells:
+            fallback = {
+                "ok": True, "value": _value_of(res["digits"], dec), "digits": res["digits"],
+                "raw": res["digits"], "confident": res["votes"] >= 2, "votes": res["votes"],
+                "cells": ncells, "expected": expected, "engine": "numpy",
+            }
+            if fallback["confident"]:
+                return fallback
+        if engine == "numpy" or not shutil.which("ssocr"):
+            return fallback
+
     def attempt(closing, angle, thr):
         """Digits ONLY when ssocr read every character AND every lit cell.
 
@@ -1341,6 +1328,7 @@ def _read_strip(sub, dec, expected):
         return {
             "ok": True, "value": _value_of(digits, dec), "digits": digits, "raw": raw,
             "confident": True, "votes": 1, "cells": ncells, "expected": expected,
+            "engine": "ssocr",
         }
 
     # Ensemble: vary stroke repair / tilt / threshold, then vote (clean reads only).
@@ -1354,7 +1342,7 @@ def _read_strip(sub, dec, expected):
                 v = votes.setdefault(d, {"n": 0, "raw": r})
                 v["n"] += 1
     if not votes:
-        return None
+        return fallback
 
     # Most-voted wins. The candidates already all have the right number of digits,
     # so no weight prior is needed to choose between them.
@@ -1368,16 +1356,17 @@ def _read_strip(sub, dec, expected):
         "votes": v["n"],
         "cells": ncells,
         "expected": expected,
+        "engine": "ssocr",
     }
 
 
-def _ocr_image(im, dec, expected):
+def _ocr_image(im, dec, expected, engine="auto"):
     """Full pipeline on one image. Returns a result dict, or None if unreadable.
 
     Tries each red cluster (biggest first) instead of betting on the largest one:
     in a warehouse the biggest red blob is often a fire extinguisher / PCCC box,
-    not the display. Shape gates reject non-digit blobs before ssocr can turn
-    them into confident nonsense.
+    not the display. Shape gates reject non-digit blobs before the decoder can
+    turn them into confident nonsense.
     """
     mask = _red_mask(im)
     if mask.sum() < 40:
@@ -1398,7 +1387,7 @@ def _ocr_image(im, dec, expected):
                 "expected": expected,
             }
             continue
-        res = _read_strip(sub, dec, expected)
+        res = _read_strip(sub, dec, expected, engine)
         if res:
             return res
     return diag
@@ -1408,18 +1397,18 @@ def _ocr_image(im, dec, expected):
 def read_scale_ocr(image, decimals=2, roi=None, packing_list=None, carton_no=None):
     """Read the red 7-segment scale display and return the weight in kg.
 
-    decimals is fixed by the scale (2 by default): ssocr reports digits only, so
-    "943" → 9.43. roi/packing_list/carton_no are optional; without them this
-    behaves exactly like the original full-frame reader.
+    decimals is fixed by the scale (2 by default): the decoder reports digits
+    only, so "943" → 9.43. roi/packing_list/carton_no are optional; without them
+    this behaves exactly like the original full-frame reader.
+
+    Digits are read in-process (seven_segment.py); ssocr, when installed, is
+    only consulted for strips the in-process decoder cannot read confidently.
     """
     import base64
     import io
-    import shutil
 
     from PIL import Image
 
-    if not shutil.which("ssocr"):
-        frappe.throw(_("ssocr is not installed on the server (sudo apt-get install ssocr)."))
     m = re.search(r"base64,(.*)$", image or "", re.S)
     if not m:
         frappe.throw(_("Invalid image data"))
@@ -1452,3 +1441,51 @@ def read_scale_ocr(image, decimals=2, roi=None, packing_list=None, carton_no=Non
             return res
         last = res or last
     return last or {"ok": False, "value": None, "raw": "", "expected": expected}
+
+
+def benchmark_scale_ocr(folder=None, engines=("numpy", "ssocr")):
+    """Accuracy + latency of each OCR engine on a corpus of real scale photos.
+
+    Corpus = test_images/ next to this file (or `folder`), same convention as
+    test_packing_list: "<kg>_<description>.jpg" must read as <kg>, photos under
+    too_far/ must be refused. Drop new station photos there to grow it.
+
+        bench --site <site> execute customize_erpnext.customize_erpnext.doctype.packing_list.packing_list.benchmark_scale_ocr
+    """
+    import glob
+    import os
+    import shutil
+    import time
+
+    from PIL import Image
+
+    folder = folder or os.path.join(os.path.dirname(__file__), "test_images")
+    engines = [e for e in engines if e != "ssocr" or shutil.which("ssocr")]
+    samples = []
+    for path in sorted(glob.glob(os.path.join(folder, "**", "*.jpg"), recursive=True)):
+        m = re.match(r"([0-9]+\.?[0-9]*)_", os.path.basename(path))
+        if m:
+            refuse = os.path.basename(os.path.dirname(path)) == "too_far"
+            samples.append((path, None if refuse else float(m.group(1))))
+
+    summary = {e: {"correct": 0, "total": 0, "ms": 0.0, "rows": []} for e in engines}
+    for path, expected in samples:
+        im = Image.open(path).convert("RGB")
+        for engine in engines:
+            started = time.perf_counter()
+            res = _ocr_image(im, 2, None, engine) or {}
+            ms = (time.perf_counter() - started) * 1000
+            value = res.get("value") if res.get("ok") else None
+            stats = summary[engine]
+            stats["total"] += 1
+            stats["correct"] += int(value == expected)
+            stats["ms"] += ms
+            stats["rows"].append((os.path.relpath(path, folder), expected, value, round(ms, 1)))
+
+    for engine, stats in summary.items():
+        print(f"== {engine}: {stats['correct']}/{stats['total']} correct, "
+              f"{stats['ms'] / max(1, stats['total']):.1f} ms/photo")
+        for name, expected, value, ms in stats["rows"]:
+            flag = "ok " if value == expected else "BAD"
+            print(f"  {flag} {name:<45} expected={expected} got={value} {ms} ms")
+    return summary
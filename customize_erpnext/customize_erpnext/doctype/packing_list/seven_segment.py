@@ -0,0 +1,229 @@
+# Copyright (c) 2026, IT Team - TIQN and contributors
+# For license information, please see license.txt
+
+"""In-process seven-segment decoder for the scale OCR (NumPy only).
+
+Replaces the ssocr ensemble of `_read_strip` (2 closing x 3 angles x 3
+thresholds = up to 18 fork/exec + PNG round-trips per strip) with one
+vectorised pass over the digit strip:
+
+  1. Cells come from the same height-based column runs as `_count_digit_cells`,
+     so the digit count is still taken from the geometry.
+  2. Every cell is resampled onto a fixed GRID; narrow cells (a lit '1' is
+     only segments b+c) are recognised by aspect ratio.
+  3. The variant stack — stroke repair (closing) x shear (tilt) — is built for
+     all cells at once, and the lit fraction of the 7 segment zones is measured
+     for every variant with one einsum.
+  4. Every fill threshold is compared in the same broadcast, each
+     (variant, threshold) pair is looked up in a 128-entry code table, and the
+     complete readings vote exactly like the ssocr ensemble did.
+
+Kept free of frappe / scipy so it can be tested and benchmarked outside a
+bench; ssocr stays available in packing_list.py as the fallback engine.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+GRID = (28, 16)  # rows x cols each digit cell is resampled to
+ONE_MAX_ASPECT = 0.4  # a cell narrower than this x its height is a '1'
+FILL_THRESHOLDS = (0.5, 0.35, 0.65)  # first = the "fast path" threshold
+SHEARS = (0.0, -0.08, 0.08)  # columns shifted per row, relative to the cell width
+
+# Segment zones (y0, y1, x0, x1) as fractions of the cell, standard a..g order:
+#    aaa
+#   f   b
+#    ggg
+#   e   c
+#    ddd
+SEGMENT_ZONES = (
+    (0.00, 0.14, 0.25, 0.75),  # a
+    (0.16, 0.40, 0.70, 1.00),  # b
+    (0.60, 0.84, 0.70, 1.00),  # c
+    (0.86, 1.00, 0.25, 0.75),  # d
+    (0.60, 0.84, 0.00, 0.30),  # e
+    (0.16, 0.40, 0.00, 0.30),  # f
+    (0.43, 0.57, 0.25, 0.75),  # g
+)
+
+# Lit segments per digit. Some scales draw 6/7/9 with or without the extra tail
+# segment (the "weak 7" that ssocr kept reading as 1), so both forms are accepted.
+DIGIT_SEGMENTS = {
+    "0": ("abcdef",),
+    "1": ("bc",),
+    "2": ("abdeg",),
+    "3": ("abcdg",),
+    "4": ("bcfg",),
+    "5": ("acdfg",),
+    "6": ("acdefg", "cdefg"),
+    "7": ("abc", "abcf"),
+    "8": ("abcdefg",),
+    "9": ("abcdfg", "abcfg"),
+}
+
+
+def _code_table():
+    table = np.full(128, -1, dtype=np.int8)
+    for digit, forms in DIGIT_SEGMENTS.items():
+        for form in forms:
+            table[sum(1 << "abcdefg".index(s) for s in form)] = int(digit)
+    return table
+
+
+CODE_TABLE = _code_table()
+
+
+def _zone_masks(grid=GRID):
+    rows, cols = grid
+    masks = np.zeros((len(SEGMENT_ZONES), rows, cols), dtype=np.float32)
+    for i, (y0, y1, x0, x1) in enumerate(SEGMENT_ZONES):
+        masks[i, int(round(y0 * rows)):int(round(y1 * rows)), int(round(x0 * cols)):int(round(x1 * cols))] = 1
+    return masks / masks.sum(axis=(1, 2), keepdims=True)
+
+
+ZONE_MASKS = _zone_masks()
+
+
+def column_runs(region, frac=0.05):
+    """Column runs of lit pixels: one run per digit (gaps separate the digits)."""
+    colsum = region.sum(0)
+    active = colsum > (region.shape[0] * frac)
+    runs, start = [], None
+    for i, v in enumerate(list(active) + [False]):
+        if v and start is None:
+            start = i
+        elif not v and start is not None:
+            runs.append((start, i))
+            start = None
+    return runs
+
+
+def digit_runs(region):
+    """Runs that are really digits, judged by HEIGHT — never by pixel count.
+
+    A '1' lights only two segments, so it has few pixels but still spans the full
+    digit height. Trimming by pixel count therefore ate leading ones and turned
+    "11.79" into "179" (= 1.79). Noise specks and the decimal point are short, so
+    height separates them cleanly from digits.
+    """
+    h = region.shape[0]
+    out = []
+    for (a, b) in column_runs(region):
+        rows = np.where(region[:, a:b].any(1))[0]
+        if len(rows) and (rows.max() - rows.min() + 1) >= h * 0.5:
+            out.append((a, b))
+    return out
+
+
+def _drop_decimal_point(cell, bottom=0.7, max_frac=0.35):
+    """Trim edge columns lit only in the bottom of the cell.
+
+    The decimal point sits close enough to its digit to join the same column
+    run, which pushes the right-hand zones off the b/c strokes. No digit has an
+    edge column lit only below `bottom` of its height, so those columns go.
+    """
+    h, w = cell.shape
+    bottom_only = ~cell[: int(h * bottom)].any(0) & cell.any(0)
+    limit = int(w * max_frac)
+    left = 0
+    while left < limit and bottom_only[left]:
+        left += 1
+    right = w
+    while w - right < limit and bottom_only[right - 1]:
+        right -= 1
+    cell = cell[:, left:right]
+    # gap columns between the digit and the point are empty now — trim them too
+    lit = np.where(cell.any(0))[0]
+    return cell[:, lit.min(): lit.max() + 1] if len(lit) else cell
+
+
+def _resample(cell, grid=GRID):
+    """Nearest-neighbour resample of a bool cell onto grid (rows x cols)."""
+    h, w = cell.shape
+    ys = ((np.arange(grid[0]) + 0.5) * h / grid[0]).astype(int)
+    xs = ((np.arange(grid[1]) + 0.5) * w / grid[1]).astype(int)
+    return cell[np.ix_(ys, xs)]
+
+
+def _closing(stack):
+    """3x3 binary closing over the last two axes of a bool stack."""
+    def morph(a, reduce):
+        p = np.pad(a, [(0, 0)] * (a.ndim - 2) + [(1, 1), (1, 1)], constant_values=reduce is np.logical_and)
+        h, w = a.shape[-2:]
+        out = p[..., 1:h + 1, 1:w + 1].copy()
+        for dy in (0, 1, 2):
+            for dx in (0, 1, 2):
+                out = reduce(out, p[..., dy:dy + h, dx:dx + w])
+        return out
+
+    return morph(morph(stack, np.logical_or), np.logical_and)
+
+
+def _shear(stack, factor):
+    """Shift each row sideways in proportion to its distance from the centre row."""
+    if not factor:
+        return stack
+    rows, cols = stack.shape[-2:]
+    shifts = np.round((np.arange(rows) - (rows - 1) / 2) * factor * cols / rows * 2).astype(int)
+    src = np.arange(cols)[None, :] - shifts[:, None]
+    valid = (src >= 0) & (src < cols)
+    out = np.take_along_axis(stack, np.broadcast_to(np.clip(src, 0, cols - 1), stack.shape), axis=-1)
+    return out & valid
+
+
+def variant_stack(cells):
+    """(n_cells, rows, cols) bool -> (n_variants, n_cells, rows, cols) bool.
+
+    Variant 0 is the closed, unsheared cell — the ssocr fast path equivalent.
+    """
+    closed = _closing(cells)
+    return np.stack([_shear(base, s) for base in (closed, cells) for s in SHEARS])
+
+
+def decode_cells(stack, narrow):
+    """Digit readings for every (variant, threshold): int array, -1 = unreadable.
+
+    stack: (V, n, rows, cols) bool; narrow: (n,) bool — cells read as '1'.
+    Returns (V, T, n).
+    """
+    fill = np.einsum("vnhw,shw->vns", stack.astype(np.float32), ZONE_MASKS)
+    lit = fill[:, None] > np.asarray(FILL_THRESHOLDS, dtype=np.float32)[None, :, None, None]
+    codes = (lit * (1 << np.arange(7))).sum(-1)
+    digits = CODE_TABLE[codes]
+    return np.where(narrow, 1, digits)
+
+
+def decode_strip(strip):
+    """Read one digit strip (bool 2D array, digits only — see _digit_regions).
+
+    Returns {"digits", "votes", "variants", "cells"} for the most-voted complete
+    reading, or None when no variant reads every cell.
+    """
+    strip = np.asarray(strip, dtype=bool)
+    runs = digit_runs(strip)
+    if not runs:
+        return None
+
+    # All cells share the strip's rows: a '4' (no a/d segment) must not be
+    # stretched to full height, or every zone lands on the wrong stroke.
+    rows = np.where(strip.any(1))[0]
+    strip = strip[rows.min(): rows.max() + 1]
+    cells, narrow = [], []
+    for a, b in runs:
+        cell = _drop_decimal_point(strip[:, a:b])
+        narrow.append(cell.shape[1] < cell.shape[0] * ONE_MAX_ASPECT)
+        cells.append(_resample(cell))
+
+    readings = decode_cells(variant_stack(np.stack(cells)), np.asarray(narrow))
+    readings = readings.reshape(-1, len(runs))
+    complete = ["".join(map(str, r)) for r in readings if (r >= 0).all()]
+    if not complete:
+        return None
+
+    # Most-voted wins; on a tie the earliest reading (variant 0 at the first
+    # threshold — the old fast path) is preferred.
+    votes = Counter(complete)
+    best = max(votes.values())
+    digits = next(d for d in complete if votes[d] == best)
+    return {"digits": digits, "votes": best, "variants": len(readings), "cells": len(runs)}
@@ -5,11 +5,10 @@ import base64
 import glob
 import os
 import re
-import shutil
 
 from frappe.tests import IntegrationTestCase
 
-from .packing_list import read_scale_ocr
+from .packing_list import _ocr_image, read_scale_ocr
 
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
@@ -30,7 +29,7 @@ class IntegrationTestPackingList(IntegrationTestCase):
 
 
 class TestScaleOCR(IntegrationTestCase):
-	"""Read real scale photos end-to-end (red mask -> localise -> ssocr -> kg).
+	"""Read real scale photos end-to-end (red mask -> localise -> decode -> kg).
 
 	The expected weight IS the filename prefix: "<kg>_<description>.jpg". To add
 	a case, drop a photo in test_images/ named after what the scale actually
@@ -53,8 +52,6 @@ class TestScaleOCR(IntegrationTestCase):
 		return "base64," + base64.b64encode(data).decode()
 
 	def test_reads_real_scale_photos(self):
-		if not shutil.which("ssocr"):
-			self.skipTest("ssocr is not installed (sudo apt-get install ssocr)")
 		samples = self._samples()
 		self.assertTrue(samples, "No sample photos in test_images/")
 
@@ -66,6 +63,18 @@ class TestScaleOCR(IntegrationTestCase):
 				self.assertTrue(res.get("ok"), f"{name}: not read (reason={res.get('reason')})")
 				self.assertEqual(res.get("value"), expected, f"{name}: wrong kg")
 
+	def test_numpy_engine_reads_without_ssocr(self):
+		"""The in-process decoder alone must read the whole corpus (no subprocess)."""
+		from PIL import Image
+
+		for path, expected in self._samples():
+			name = os.path.basename(path)
+			with self.subTest(image=name):
+				res = _ocr_image(Image.open(path).convert("RGB"), 2, None, "numpy") or {}
+				self.assertTrue(res.get("ok"), f"{name}: not read (reason={res.get('reason')})")
+				self.assertEqual(res.get("engine"), "numpy")
+				self.assertEqual(res.get("value"), expected, f"{name}: wrong kg")
+
 	def test_refuses_photos_shot_too_far(self):
 		"""test_images/too_far/ must NEVER produce a number.
 
@@ -73,8 +82,6 @@ class TestScaleOCR(IntegrationTestCase):
 		the gate later: a wrong weight is worse than no weight, and these came back
 		as confident nonsense before the gates existed.
 		"""
-		if not shutil.which("ssocr"):
-			self.skipTest("ssocr is not installed (sudo apt-get install ssocr)")
 		paths = sorted(glob.glob(os.path.join(TEST_IMAGES, "too_far", "*.jpg")))
 		self.assertTrue(paths, "No sample photos in test_images/too_far/")
 		for path in paths:
@@ -89,11 +96,9 @@ class TestScaleOCR(IntegrationTestCase):
 		"""A far/downscaled photo must be refused, never guessed.
 
 		Digits below MIN_DIGIT_PX carry too little information; upscaling cannot
-		invent detail and ssocr then returns confident nonsense (real example from
+		invent detail and the decoder then returns confident nonsense (real example from
 		the old 480x640 photos: 13px digits produced a confident "8.88").
 		"""
-		if not shutil.which("ssocr"):
-			self.skipTest("ssocr is not installed (sudo apt-get install ssocr)")
 		samples = self._samples()
 		self.assertTrue(samples, "No sample photos in test_images/")
 
@@ -2,6 +2,16 @@
 // For license information, please see license.txt
 
 frappe.ui.form.on("Stock Entry Multi Work Orders", {
+    onload(frm) {
+        // Stock Entry tạo nền sau khi submit (nhiều Work Order) - báo kết quả khi xong
+        frappe.realtime.off('stock_entry_multi_work_orders_done');
+        frappe.realtime.on('stock_entry_multi_work_orders_done', function (result) {
+            if (frm.doc.docstatus !== 1) return;
+            show_stock_entry_creation_result(result);
+            frm.reload_doc();
+        });
+    },
+
     refresh(frm) {
         frm.set_intro(null);
         frm.set_intro(__("Sau khi Submit, hệ thống sẽ tạo các Stock Entry (Draft) kiểu Material Transfer for Manufacture cho các Work Order tương ứng"), 'orange');
@@ -38,6 +48,20 @@ frappe.ui.form.on("Stock Entry Multi Work Orders", {
                 };
                 frappe.set_route("List", "Stock Entry");
             });
+
+            // Tạo Stock Entry cho các Work Order bị lỗi ở lần chạy nền trước
+            frm.add_custom_button(__('Create Missing Stock Entries'), function () {
+                frappe.call({
+                    method: 'customize_erpnext.customize_erpnext.doctype.stock_entry_multi_work_orders.stock_entry_multi_work_orders.retry_stock_entry_creation',
+                    args: { doc_name: frm.doc.name },
+                    callback: function () {
+                        frappe.show_alert({
+                            message: __('Đang tạo Stock Entry trong nền...'),
+                            indicator: 'blue'
+                        });
+                    }
+                });
+            });
         }
 
         // Custom handling for materials table - bulk selection
@@ -272,6 +296,30 @@ function create_stock_entries(frm) {
     );
 }
 
+// Kết quả job tạo Stock Entry chạy nền: {created: [...], failed: [{work_order, error}]}
+function show_stock_entry_creation_result(result) {
+    let message = '';
+    if (result.created && result.created.length) {
+        message += __('Đã tạo các Stock Entry (Draft):') + '<br>';
+        result.created.forEach(entry => {
+            message += `<a href="/app/stock-entry/${entry}" target="_blank">${entry}</a><br>`;
+        });
+    }
+    if (result.failed && result.failed.length) {
+        message += '<br>' + __('Lỗi khi tạo Stock Entry cho các Work Order:') + '<br>';
+        result.failed.forEach(row => {
+            message += `${row.work_order}: ${frappe.utils.escape_html(row.error || '')}<br>`;
+        });
+    }
+    if (!message) return;
+
+    frappe.msgprint({
+        title: __('Stock Entries Created'),
+        indicator: result.failed && result.failed.length ? 'orange' : 'green',
+        message: message
+    });
+}
+
 /**
  * Simplified quantity adjustment dialog - removed validation for qty reductions
  * @param {Object} frm - Form object
@@ -6,6 +6,15 @@ from frappe.model.document import Document
 from frappe.utils import flt, now, nowdate, nowtime
 import json
 
+from customize_erpnext.customize_erpnext.doctype.stock_entry_multi_work_orders.stock_entry_plan import (
+    apply_adjustments,
+    material_adjustments,
+)
+
+# Số Work Order tối đa tạo Stock Entry ngay khi submit; nhiều hơn thì chạy nền
+SYNC_WORK_ORDER_LIMIT = 5
+STOCK_ENTRY_TYPE = "Material Transfer for Manufacture"
+
 class StockEntryMultiWorkOrders(Document):
     def onload(self):
         """Kiểm tra Stock Entry liên quan và cập nhật trạng thái"""
@@ -29,8 +38,19 @@ class StockEntryMultiWorkOrders(Document):
         self.validate_materials_for_work_orders()
     
     def on_submit(self):
-        """Khi submit, tạo các Stock Entry cho từng Work Order"""
-        self.create_stock_entries()
+        """Khi submit, tạo các Stock Entry cho từng Work Order
+        (chạy nền nếu nhiều hơn SYNC_WORK_ORDER_LIMIT Work Order)"""
+        if len(self.work_orders) <= SYNC_WORK_ORDER_LIMIT:
+            self.create_stock_entries()
+            return
+
+        enqueue_stock_entry_creation(self.name)
+        frappe.msgprint(
+            f"Đang tạo Stock Entry cho {len(self.work_orders)} Work Order trong nền. "
+            "Trang sẽ tự cập nhật khi hoàn tất.",
+            indicator="blue",
+            alert=True,
+        )
     
     def on_cancel(self):
         """Khi cancel, hủy/cancel các Stock Entry đã tạo"""
@@ -62,33 +82,20 @@ class StockEntryMultiWorkOrders(Document):
     
     def update_work_order_status(self):
         """Cập nhật trạng thái stock_transfer cho các Work Order"""
+        completed = get_transferred_work_orders([row.work_order for row in self.work_orders])
         for wo_row in self.work_orders:
-            stock_entry = frappe.db.exists(
-                "Stock Entry",
-                {
-                    "work_order": wo_row.work_order,
-                    "stock_entry_type": "Material Transfer for Manufacture",
-                    "docstatus": 1
-                }
-            )
-            
             # Cập nhật trạng thái - thống nhất với yêu cầu
-            wo_row.stock_transfer_status = "Completed" if stock_entry else "Not yet Transfer"
-            frappe.db.set_value("Stock Entry Multi Work Orders Table WO", 
-                               wo_row.name, "stock_transfer_status", wo_row.stock_transfer_status)
+            status = "Completed" if wo_row.work_order in completed else "Not yet Transfer"
+            if wo_row.stock_transfer_status != status:
+                wo_row.stock_transfer_status = status
+                frappe.db.set_value("Stock Entry Multi Work Orders Table WO",
+                                   wo_row.name, "stock_transfer_status", status)
     
     def check_work_order_status(self):
         """Kiểm tra các Work Order đã có Stock Entry chưa"""
+        completed = get_transferred_work_orders([row.work_order for row in self.work_orders])
         for wo_row in self.work_orders:
-            stock_entry = frappe.db.exists(
-                "Stock Entry",
-                {
-                    "work_order": wo_row.work_order,
-                    "stock_entry_type": "Material Transfer for Manufacture",
-                    "docstatus": 1
-                }
-            )
-            
+            stock_entry = completed.get(wo_row.work_order)
             if stock_entry:
                 wo_row.stock_transfer_status = "Completed"
                 frappe.msgprint(f"Work Order {wo_row.work_order} đã có Stock Entry {stock_entry}")
@@ -119,6 +126,7 @@ class StockEntryMultiWorkOrders(Document):
             
         # Lấy materials cần thiết từ các work orders
         required_materials = get_consolidated_materials_from_work_orders(work_orders)
+        item_names = {code: detail["item_name"] for code, detail in required_materials.items()}
         
         # Tạo dictionary từ bảng materials
         current_materials = {}
@@ -151,132 +159,93 @@ class StockEntryMultiWorkOrders(Document):
             if missing_items:
                 error_message += "Các nguyên liệu sau bị thiếu trong bảng materials:<br>"
                 for item in missing_items:
-                    item_name = frappe.db.get_value("Item", item["item_code"], "item_name") or ""
+                    item_name = item_names.get(item["item_code"]) or ""
                     error_message += f"- {item['item_code']} - {item_name}: {item['required_qty']}<br>"
                 error_message += "<br>"
                 
             if insufficient_items:
                 error_message += "Các nguyên liệu sau có số lượng không đủ:<br>"
                 for item in insufficient_items:
-                    item_name = frappe.db.get_value("Item", item["item_code"], "item_name") or ""
+                    item_name = item_names.get(item["item_code"]) or ""
                     error_message += f"- {item['item_code']} - {item_name}: Cần: {item['required_qty']}, Hiện tại: {item['current_qty']}<br>"
             
             frappe.throw(error_message, title="Kiểm tra nguyên liệu thất bại")
     
-    def create_stock_entries(self):
-        """Tạo các Stock Entry cho từng Work Order"""
-        created_entries = []
-        
-        # Bước 1: So sánh tổng hợp items từ materials với tổng hợp từ Work Orders
-        wo_materials = get_consolidated_materials_from_work_orders([row.work_order for row in self.work_orders])
-        adjusted_materials = {}
-        
-        # Tạo dictionary từ bảng materials
-        for row in self.materials:
-            adjusted_materials[row.item_code] = {
-                "required_qty": flt(row.required_qty),
-                "source_warehouse": row.source_warehouse,
-                "wip_warehouse": row.wip_warehouse
-            }
-        
-        # Tìm các items được điều chỉnh (qty lớn hơn)
-        adjustments = {}
-        for item_code, details in adjusted_materials.items():
-            if item_code in wo_materials:
-                original_qty = wo_materials[item_code]["required_qty"]
-                if details["required_qty"] > original_qty:
-                    adjustments[item_code] = {
-                        "additional_qty": details["required_qty"] - original_qty,
-                        "source_warehouse": details["source_warehouse"],
-                        "wip_warehouse": details["wip_warehouse"]
-                    }
-        
-        # Bước 2: Tạo Stock Entry cho từng Work Order
-        for wo_row in self.work_orders:
+    def create_stock_entries(self, raise_on_error=True, publish_progress=False):
+        """Tạo các Stock Entry cho từng Work Order.
+
+        Nguyên liệu, Work Order, giá và UOM của mọi Work Order được load bằng vài
+        query gộp (plan_stock_entries); mỗi Stock Entry vẫn insert() qua controller
+        của ERPNext. Work Order đã có Stock Entry (draft/submitted) từ phiếu này
+        được bỏ qua nên chạy lại an toàn.
+        """
+        existing = {
+            se.work_order
+            for se in frappe.get_all(
+                "Stock Entry",
+                filters={
+                    "custom_stock_entry_multi_work_orders": self.name,
+                    "stock_entry_type": STOCK_ENTRY_TYPE,
+                    "docstatus": ["<", 2],
+                },
+                fields=["work_order"],
+            )
+        }
+        plans = plan_stock_entries(self, skip=existing, issued=self.get_issued_quantities() if existing else None)
+
+        created_entries, failed = [], []
+        for i, plan in enumerate(plans, 1):
+            frappe.db.savepoint("multi_wo_stock_entry")
             try:
-                # Lấy thông tin Work Order
-                work_order = frappe.get_doc("Work Order", wo_row.work_order)
-                
-                # Tạo Stock Entry mới
-                stock_entry = frappe.new_doc("Stock Entry")
-                stock_entry.stock_entry_type = "Material Transfer for Manufacture"
-                stock_entry.purpose = "Material Transfer for Manufacture"
-                stock_entry.work_order = wo_row.work_order
-                stock_entry.from_bom = 1
-                stock_entry.posting_date = self.posting_date
-                stock_entry.posting_time = self.posting_time
-                stock_entry.company = work_order.company
-                stock_entry.to_warehouse = work_order.wip_warehouse
-                
-                # Thêm link đến Stock Entry Multi Work Orders
-                stock_entry.custom_stock_entry_multi_work_orders = self.name
-                
-                # Thêm các nguyên liệu từ Work Order BOM
-                wo_materials = get_materials_for_single_work_order(wo_row.work_order)
-                
-                for material in wo_materials:
-                    s_warehouse = material.source_warehouse
-                    
-                    # Nếu không có source_warehouse, báo lỗi
-                    if not s_warehouse:
-                        frappe.throw(f"Không tìm thấy Source Warehouse cho item {material.item_code} trong Work Order {wo_row.work_order}")
-                    
-                    stock_entry.append("items", {
-                        "s_warehouse": s_warehouse,
-                        "t_warehouse": work_order.wip_warehouse,
-                        "item_code": material.item_code,
-                        "qty": material.required_qty,
-                        "basic_rate": get_item_rate(material.item_code),
-                        "uom": frappe.db.get_value("Item", material.item_code, "stock_uom")
-                    })
-                
-                # Lưu Stock Entry 
+                stock_entry = build_stock_entry(plan, self.posting_date, self.posting_time, self.name)
                 stock_entry.insert()
                 created_entries.append(stock_entry.name)
-                
             except Exception as e:
-                frappe.log_error(f"Error creating Stock Entry for Work Order {wo_row.work_order}: {str(e)}")
-                frappe.throw(f"Lỗi khi tạo Stock Entry cho Work Order {wo_row.work_order}: {str(e)}")
-        
-        # Bước 3: Xử lý các items được điều chỉnh
-        if adjustments and created_entries:
-            # Lấy Stock Entry cuối cùng để thêm items
-            last_se = frappe.get_doc("Stock Entry", created_entries[-1])
-            
-            for item_code, details in adjustments.items():
-                # Kiểm tra xem item đã có trong Stock Entry chưa
-                item_exists = False
-                for item in last_se.items:
-                    if item.item_code == item_code:
-                        # Cập nhật số lượng
-                        item.qty += details["additional_qty"]
-                        item_exists = True
-                        break
-                
-                # Nếu item chưa có, thêm mới
-                if not item_exists:
-                    last_se.append("items", {
-                        "s_warehouse": details["source_warehouse"],
-                        "t_warehouse": details["wip_warehouse"],
-                        "item_code": item_code,
-                        "qty": details["additional_qty"],
-                        "basic_rate": get_item_rate(item_code),
-                        "uom": frappe.db.get_value("Item", item_code, "stock_uom")
-                    })
-            
-            # Lưu Stock Entry
-            last_se.save()
+                # Rollback trước để Error Log không bị cuốn theo savepoint
+                frappe.db.rollback(save_point="multi_wo_stock_entry")
+                frappe.log_error(f"Error creating Stock Entry for Work Order {plan['work_order']}: {str(e)}")
+                if raise_on_error:
+                    frappe.throw(f"Lỗi khi tạo Stock Entry cho Work Order {plan['work_order']}: {str(e)}")
+                failed.append({"work_order": plan["work_order"], "error": str(e)})
+
+            if publish_progress:
+                frappe.db.commit()
+                frappe.publish_progress(
+                    i * 100 / len(plans),
+                    title="Tạo Stock Entry",
+                    doctype=self.doctype,
+                    docname=self.name,
+                    description=f"{i}/{len(plans)} Work Order",
+                )
          
         # Hiển thị thông báo cho user
-        if created_entries:
+        if created_entries and not publish_progress:
             message="Đã tạo các Stock Entry (Draft):" 
             message +=  ", ".join(created_entries) + "<br>" 
             frappe.msgprint(
                 msg=message,
                 title='Stock Entries Created' )
+        if created_entries:
             # Cập nhật trạng thái work_order
             self.update_work_order_status()
 
+        return {"created": created_entries, "failed": failed}
+
+    def get_issued_quantities(self):
+        """{item_code: qty} đã nằm trong Stock Entry (draft/submitted) tạo từ phiếu này."""
+        return {
+            row.item_code: flt(row.qty)
+            for row in frappe.db.sql("""
+                SELECT sed.item_code, SUM(sed.transfer_qty) AS qty
+                FROM `tabStock Entry Detail` sed
+                JOIN `tabStock Entry` se ON se.name = sed.parent
+                WHERE se.custom_stock_entry_multi_work_orders = %s
+                  AND se.stock_entry_type = %s
+                  AND se.docstatus < 2
+                GROUP BY sed.item_code
+            """, (self.name, STOCK_ENTRY_TYPE), as_dict=True)
+        }
+
     def get_stock_entries(self):
         """Lấy danh sách Stock Entry đã tạo từ document này"""
         # Lấy tất cả Stock Entry liên kết với document này qua custom field
@@ -373,29 +342,39 @@ def get_materials_for_work_orders(work_orders):
     if not work_orders:
         return []
     
+    # Bỏ các work_order là chuỗi rỗng
+    work_orders = [wo for wo in work_orders if wo and isinstance(wo, str) and wo.strip()]
+    
+    # Get materials from Work Order BOM — một query cho mọi Work Order
+    materials = get_materials_by_work_order(work_orders)
     all_materials = []
     for work_order in work_orders:
-        # Kiểm tra nếu work_order là chuỗi rỗng
-        if not work_order or not isinstance(work_order, str) or not work_order.strip():
-            continue
-        
-        # Get materials from Work Order BOM
-        try:
-            materials = get_materials_for_single_work_order(work_order)
-            all_materials.extend(materials)
-        except Exception as e:
-            frappe.log_error(f"Error querying materials for {work_order}: {str(e)}")
+        all_materials.extend(materials.get(work_order, []))
     
     return all_materials
 
 def get_materials_for_single_work_order(work_order):
     """Lấy danh sách nguyên liệu cho một Work Order cụ thể"""
+    return get_materials_by_work_order([work_order]).get(work_order, [])
+
+def get_materials_by_work_order(work_orders):
+    """{work_order: [nguyên liệu]} cho nhiều Work Order bằng MỘT query.
+
+    Mỗi dòng kèm stock_uom và valuation_rate của item (thay cho get_item_rate và
+    get_value stock_uom từng item khi tạo Stock Entry).
+    """
+    work_orders = [wo for wo in work_orders if wo]
+    if not work_orders:
+        return {}
     try:
         materials = frappe.db.sql("""
             SELECT 
+                wo.name as work_order,
                 item.item_code as item_code,
                 item.item_name as item_name,
                 item.custom_item_name_detail as item_name_detail,
+                item.stock_uom as stock_uom,
+                item.valuation_rate as valuation_rate,
                 (bom_item.qty_consumed_per_unit * wo.qty) as required_qty,
                 bin.actual_qty as qty_available,
                 wo.wip_warehouse as wip_warehouse,
@@ -418,13 +397,17 @@ def get_materials_for_single_work_order(work_order):
                     bin.warehouse = COALESCE(bom_item.source_warehouse, item_default.default_warehouse, wo.source_warehouse)
                 )
             WHERE 
-                wo.name = %s
-        """, (work_order,), as_dict=1)
-        
-        return materials
+                wo.name IN %(work_orders)s
+            ORDER BY bom_item.idx
+        """, {"work_orders": work_orders}, as_dict=1)
     except Exception as e:
-        frappe.log_error(f"Error in get_materials_for_single_work_order for {work_order}: {str(e)}")
-        return []
+        frappe.log_error(f"Error in get_materials_by_work_order for {work_orders}: {str(e)}")
+        return {}
+
+    by_work_order = {wo: [] for wo in work_orders}
+    for material in materials:
+        by_work_order[material.work_order].append(material)
+    return by_work_order
 
 def get_consolidated_materials_from_work_orders(work_orders):
     """Lấy danh sách nguyên liệu tổng hợp từ các Work Order"""
@@ -440,18 +423,159 @@ def get_consolidated_materials_from_work_orders(work_orders):
             materials_dict[item_code] = {
                 "required_qty": flt(material.required_qty),
                 "source_warehouse": material.source_warehouse,
-                "wip_warehouse": material.wip_warehouse
+                "wip_warehouse": material.wip_warehouse,
+                "item_name": material.item_name,
             }
         else:
             materials_dict[item_code]["required_qty"] += flt(material.required_qty)
     
     return materials_dict
 
+def get_transferred_work_orders(work_orders):
+    """{work_order: stock_entry} cho các Work Order đã có Stock Entry chuyển NVL (đã submit)."""
+    work_orders = [wo for wo in work_orders if wo]
+    if not work_orders:
+        return {}
+    rows = frappe.get_all(
+        "Stock Entry",
+        filters={
+            "work_order": ["in", work_orders],
+            "stock_entry_type": STOCK_ENTRY_TYPE,
+            "docstatus": 1,
+        },
+        fields=["work_order", "name"],
+    )
+    return {row.work_order: row.name for row in rows}
+
 def get_item_rate(item_code):
     """Lấy giá item từ Item Price hoặc Last Purchase Rate"""
     item_rate = frappe.db.get_value("Item", item_code, "valuation_rate") or 0
     return item_rate
 
+def get_item_rates_and_uoms(item_codes):
+    """{item_code: (valuation_rate, stock_uom)} — một query."""
+    if not item_codes:
+        return {}
+    rows = frappe.get_all(
+        "Item",
+        filters={"name": ["in", list(item_codes)]},
+        fields=["name", "valuation_rate", "stock_uom"],
+    )
+    return {row.name: (row.valuation_rate or 0, row.stock_uom) for row in rows}
+
+def plan_stock_entries(doc, work_orders=None, skip=(), issued=None):
+    """Dữ liệu dựng Stock Entry cho từng Work Order, load bằng các query gộp.
+
+    Work Order trong `skip` (đã có Stock Entry) không có plan; số đã xuất ở các Stock
+    Entry đó được truyền qua `issued` ({item_code: qty}). Số lượng điều chỉnh tăng
+    trong bảng materials (so với plan còn lại + `issued`) được cộng vào Stock Entry
+    của Work Order cuối cùng còn lại — như luồng cũ cộng vào Stock Entry tạo sau
+    cùng. Xem stock_entry_plan.
+    """
+    if work_orders is None:
+        work_orders = [row.work_order for row in doc.work_orders if row.work_order]
+    if not work_orders:
+        return []
+
+    headers = {
+        row.name: row
+        for row in frappe.get_all(
+            "Work Order",
+            filters={"name": ["in", work_orders]},
+            fields=["name", "company", "wip_warehouse"],
+        )
+    }
+    materials = get_materials_by_work_order(work_orders)
+
+    plans = []
+    totals = {}
+    for wo_name in work_orders:
+        if wo_name not in headers:
+            frappe.throw(f"Không tìm thấy Work Order {wo_name}")
+        items = []
+        for material in materials.get(wo_name, []):
+            if not material.source_warehouse:
+                frappe.throw(f"Không tìm thấy Source Warehouse cho item {material.item_code} trong Work Order {wo_name}")
+            items.append({
+                "s_warehouse": material.source_warehouse,
+                "t_warehouse": headers[wo_name].wip_warehouse,
+                "item_code": material.item_code,
+                "qty": material.required_qty,
+                "basic_rate": material.valuation_rate or 0,
+                "uom": material.stock_uom,
+            })
+        if wo_name in skip:
+            continue
+        for item in items:
+            totals[item["item_code"]] = totals.get(item["item_code"], 0) + flt(item["qty"])
+        plans.append({
+            "work_order": wo_name,
+            "company": headers[wo_name].company,
+            "wip_warehouse": headers[wo_name].wip_warehouse,
+            "items": items,
+        })
+
+    adjustments = material_adjustments(doc.materials, totals, issued)
+    if adjustments and plans:
+        apply_adjustments(plans[-1]["items"], adjustments, get_item_rates_and_uoms(adjustments))
+
+    return plans
+
+def build_stock_entry(plan, posting_date, posting_time, doc_name):
+    """Stock Entry (chưa insert) từ một phần tử của plan_stock_entries."""
+    stock_entry = frappe.new_doc("Stock Entry")
+    stock_entry.stock_entry_type = STOCK_ENTRY_TYPE
+    stock_entry.purpose = STOCK_ENTRY_TYPE
+    stock_entry.work_order = plan["work_order"]
+    stock_entry.from_bom = 1
+    stock_entry.posting_date = posting_date
+    stock_entry.posting_time = posting_time
+    stock_entry.company = plan["company"]
+    stock_entry.to_warehouse = plan["wip_warehouse"]
+
+    # Thêm link đến Stock Entry Multi Work Orders
+    stock_entry.custom_stock_entry_multi_work_orders = doc_name
+
+    for item in plan["items"]:
+        stock_entry.append("items", item)
+    return stock_entry
+
+def enqueue_stock_entry_creation(doc_name):
+    frappe.enqueue(
+        run_stock_entry_creation,
+        queue="long",
+        timeout=3600,
+        enqueue_after_commit=True,
+        job_id=f"stock_entry_multi_wo::{doc_name}",
+        deduplicate=True,
+        doc_name=doc_name,
+        user=frappe.session.user,
+    )
+
+def run_stock_entry_creation(doc_name, user=None):
+    """Background job: tạo Stock Entry cho các Work Order còn thiếu, commit sau mỗi
+    phiếu; lỗi từng Work Order được ghi lại, không dừng cả lô."""
+    doc = frappe.get_doc("Stock Entry Multi Work Orders", doc_name)
+    result = doc.create_stock_entries(raise_on_error=False, publish_progress=True)
+    frappe.db.commit()
+    frappe.publish_realtime(
+        "stock_entry_multi_work_orders_done",
+        result,
+        doctype=doc.doctype,
+        docname=doc.name,
+        user=user,
+    )
+    return result
+
+@frappe.whitelist()
+def retry_stock_entry_creation(doc_name):
+    """Tạo lại Stock Entry cho các Work Order bị lỗi ở lần chạy nền trước."""
+    doc = frappe.get_doc("Stock Entry Multi Work Orders", doc_name)
+    doc.check_permission("submit")
+    if doc.docstatus != 1:
+        frappe.throw("Chỉ áp dụng cho phiếu đã Submit")
+    enqueue_stock_entry_creation(doc_name)
+
 @frappe.whitelist()
 def create_individual_stock_entries(doc_name, work_orders):
     """Tạo Stock Entry riêng lẻ cho từng Work Order"""
@@ -467,127 +591,20 @@ def create_individual_stock_entries(doc_name, work_orders):
     # Get document
     doc = frappe.get_doc("Stock Entry Multi Work Orders", doc_name)
     
-    # Get adjusted quantities from materials table
-    adjusted_quantities = {}
-    for row in doc.materials:
-        adjusted_quantities[row.item_code] = flt(row.required_qty)
-    
-    # Theo dõi tổng số lượng của mỗi item trong tất cả Work Order
-    total_wo_quantities = {}
+    # Nguyên liệu / giá / UOM của mọi Work Order load một lần; số lượng điều chỉnh
+    # từ bảng materials đã được cộng vào Stock Entry của Work Order cuối cùng
+    plans = plan_stock_entries(doc, work_orders)
     
     # Danh sách các Stock Entries được tạo
     created_entries = []
     
-    # Bước 1: Tạo các Stock Entry cơ bản cho từng Work Order
-    for wo_name in work_orders:
+    for plan in plans:
         try:
-            # Lấy thông tin Work Order
-            work_order = frappe.get_doc("Work Order", wo_name)
-            
-            # Tạo Stock Entry mới
-            stock_entry = frappe.new_doc("Stock Entry")
-            stock_entry.stock_entry_type = "Material Transfer for Manufacture"
-            stock_entry.purpose = "Material Transfer for Manufacture"
-            stock_entry.work_order = wo_name
-            stock_entry.from_bom = 1
-            stock_entry.posting_date = doc.posting_date
-            stock_entry.posting_time = doc.posting_time
-            stock_entry.company = work_order.company
-            stock_entry.to_warehouse = work_order.wip_warehouse
-            stock_entry.stock_entry_multi_work_orders = doc_name
-            
-            # Lấy materials cho Work Order này
-            wo_materials = get_materials_for_single_work_order(wo_name)
-            
-            # Cập nhật tổng số lượng cho từng item
-            for material in wo_materials:
-                item_code = material.item_code
-                if item_code not in total_wo_quantities:
-                    total_wo_quantities[item_code] = flt(material.required_qty)
-                else:
-                    total_wo_quantities[item_code] += flt(material.required_qty)
-            
-            # Thêm các nguyên liệu vào Stock Entry
-            for material in wo_materials:
-                s_warehouse = material.source_warehouse
-                
-                # Nếu không có source_warehouse, báo lỗi
-                if not s_warehouse:
-                    frappe.throw(f"Không tìm thấy Source Warehouse cho item {material.item_code} trong Work Order {wo_name}")
-                
-                stock_entry.append("items", {
-                    "s_warehouse": s_warehouse,
-                    "t_warehouse": work_order.wip_warehouse,
-                    "item_code": material.item_code,
-                    "qty": material.required_qty,
-                    "basic_rate": get_item_rate(material.item_code),
-                    "uom": frappe.db.get_value("Item", material.item_code, "stock_uom")
-                })
-            
-            # Lưu Stock Entry
+            stock_entry = build_stock_entry(plan, doc.posting_date, doc.posting_time, doc_name)
             stock_entry.insert()
             created_entries.append(stock_entry.name)
-            
-        except Exception as e:
-            frappe.log_error(f"Error creating Stock Entry for Work Order {wo_name}: {str(e)}")
-            frappe.throw(f"Lỗi khi tạo Stock Entry cho Work Order {wo_name}: {str(e)}")
-    
-    # Bước 2: Xử lý các điều chỉnh số lượng
-    # Tìm các item có số lượng điều chỉnh lớn hơn tổng từ Work Order
-    items_needing_adjustment = {}
-    for item_code, adj_qty in adjusted_quantities.items():
-        wo_qty = total_wo_quantities.get(item_code, 0)
-        if adj_qty > wo_qty:
-            # Lấy source_warehouse và wip_warehouse từ bảng materials
-            source_warehouse = None
-            wip_warehouse = None
-            for row in doc.materials:
-                if row.item_code == item_code:
-                    source_warehouse = row.source_warehouse
-                    wip_warehouse = row.wip_warehouse
-                    break
-                    
-            if source_warehouse and wip_warehouse:
-                items_needing_adjustment[item_code] = {
-                    "additional_qty": adj_qty - wo_qty,
-                    "source_warehouse": source_warehouse,
-                    "wip_warehouse": wip_warehouse
-                }
-    
-    # Nếu có items cần điều chỉnh và đã tạo ít nhất một Stock Entry
-    if items_needing_adjustment and created_entries:
-        try:
-            # Lấy Stock Entry cuối cùng
-            last_se = frappe.get_doc("Stock Entry", created_entries[-1])
-            
-            for item_code, detail in items_needing_adjustment.items():
-                # Kiểm tra xem item đã có trong Stock Entry chưa
-                item_exists = False
-                for item in last_se.items:
-                    if item.item_code == item_code:
-                        # Cập nhật số lượng
-                        item.qty += detail["additional_qty"]
-                        item_exists = True
-                        break
-                
-                # Nếu item chưa có, thêm mới
-                if not item_exists:
-                    last_se.append("items", {
-                        "s_warehouse": detail["source_warehouse"],
-                        "t_warehouse": detail["wip_warehouse"],
-                        "item_code": item_code,
-                        "qty": detail["additional_qty"],
-                        "basic_rate": get_item_rate(item_code),
-                        "uom": frappe.db.get_value("Item", item_code, "stock_uom")
-                    })
-            
-            # Lưu Stock Entry
-            last_se.save()
-            
-            frappe.msgprint(f"Đã cập nhật số lượng điều chỉnh cho {len(items_needing_adjustment)} nguyên liệu trong Stock Entry {last_se.name}")
-            
         except Exception as e:
-            frappe.log_error(f"Error adjusting quantities in Stock Entry: {str(e)}")
-            frappe.msgprint(f"Đã tạo các Stock Entry cơ bản nhưng gặp lỗi khi áp dụng số lượng đã điều chỉnh: {str(e)}")
+            frappe.log_error(f"Error creating Stock Entry for Work Order {plan['work_order']}: {str(e)}")
+            frappe.throw(f"Lỗi khi tạo Stock Entry cho Work Order {plan['work_order']}: {str(e)}")
     
-    return created_entries
\ No newline at end of file
+    return created_entries
@@ -0,0 +1,63 @@
+# Copyright (c) 2026, IT Team - TIQN and contributors
+# For license information, please see license.txt
+
+"""Số lượng điều chỉnh tăng của bảng materials — thuần stdlib.
+
+Bảng materials có thể yêu cầu nhiều hơn tổng nguyên liệu của các Work Order; phần
+dư được cộng vào Stock Entry của Work Order cuối cùng. Khi chạy lại (retry), Work
+Order đã có Stock Entry bị bỏ qua; Stock Entry của chúng có thể đã mang phần dư,
+nên phần dư phải tính trên (nguyên liệu của plan còn lại + số đã xuất ở Stock Entry
+hiện có), không phải trên tổng nguyên liệu của mọi Work Order.
+
+Tách riêng để test được không cần bench (tests/test_stock_entry_plan.py).
+"""
+
+
+def _qty(value):
+    return float(value or 0)
+
+
+def material_adjustments(materials, planned, issued=None):
+    """{item_code: {additional_qty, source_warehouse, wip_warehouse}}.
+
+    materials -- dòng bảng materials (item_code, required_qty, source_warehouse, wip_warehouse)
+    planned   -- {item_code: qty} trong các plan sắp tạo
+    issued    -- {item_code: qty} đã nằm trong Stock Entry hiện có (draft/submitted) của phiếu
+    """
+    issued = issued or {}
+    adjustments = {}
+    for row in materials:
+        item_code = _attr(row, "item_code")
+        additional_qty = (
+            _qty(_attr(row, "required_qty")) - _qty(planned.get(item_code)) - _qty(issued.get(item_code))
+        )
+        if additional_qty > 0 and _attr(row, "source_warehouse") and _attr(row, "wip_warehouse"):
+            adjustments[item_code] = {
+                "additional_qty": additional_qty,
+                "source_warehouse": _attr(row, "source_warehouse"),
+                "wip_warehouse": _attr(row, "wip_warehouse"),
+            }
+    return adjustments
+
+
+def apply_adjustments(items, adjustments, rates):
+    """Cộng `adjustments` vào `items` (dòng Stock Entry của plan cuối); rates: {item_code: (rate, uom)}."""
+    for item_code, detail in adjustments.items():
+        # Kiểm tra xem item đã có trong Stock Entry chưa
+        existing = next((item for item in items if item["item_code"] == item_code), None)
+        if existing:
+            existing["qty"] = _qty(existing["qty"]) + detail["additional_qty"]
+            continue
+        rate, uom = rates.get(item_code, (0, None))
+        items.append({
+            "s_warehouse": detail["source_warehouse"],
+            "t_warehouse": detail["wip_warehouse"],
+            "item_code": item_code,
+            "qty": detail["additional_qty"],
+            "basic_rate": rate,
+            "uom": uom,
+        })
+
+
+def _attr(row, field):
+    return row.get(field) if isinstance(row, dict) else getattr(row, field, None)
@@ -244,6 +244,15 @@ scheduler_events = {
     "hourly": [
         # Delete attendance Excel export files older than 45 minutes
         "customize_erpnext.customize_erpnext.report.shift_attendance_customize.shift_attendance_customize.cleanup_export_files",
+        # Delete ZIP exports (CCCD / carton photos) older than zip_export.JOB_TTL
+        "customize_erpnext.api.zip_export.cleanup_zip_exports",
+        # Delete chunk-rendered PDFs (QR labels / employee cards) older than pdf_batch.FILE_TTL
+        "customize_erpnext.api.pdf_batch.cleanup_pdf_batches",
+        # Employee Maternity Data Import — flush recalc attendance còn trong hàng chờ
+        "customize_erpnext.customize_erpnext.doctype.employee_maternity.maternity_import_recalc.flush_if_idle",
+        # MongoDB Employee mirror — push employees modified since the last watermark
+        # (bật cùng lúc với hook sync_employee_to_mongodb của Employee)
+        # "customize_erpnext.api.employee.erpnext_mongodb.sync_modified_employees",
     ],
     "cron": {
          # Chạy mỗi phút - Giải phóng RAM rembg sau 30 phút không dùng rembg để edit ảnh thẻ
@@ -422,12 +431,36 @@ doc_events = {
             # Xem doctype/labor_contract/labor_contract.md mục 10.
             # "customize_erpnext.customize_erpnext.doctype.labor_contract.labor_contract.create_initial_contract_on_employee_insert",
         ],
+        "on_update": [
+            # Guest self-service forms: drop the cached eligible-employee lists
+            "customize_erpnext.api.eligible_employees_cache.invalidate_on_employee_change",
+            # Overtime Request: cached user → employee scope / approver inboxes
+            "customize_erpnext.customize_erpnext.doctype.overtime_request.approval_scope.invalidate_on_employee_change",
+        ],
+        "after_rename": "customize_erpnext.customize_erpnext.doctype.overtime_request.approval_scope.invalidate_on_employee_change",
         "on_trash": [
             "customize_erpnext.api.employee.employee_validation.prevent_employee_deletion",
             # "customize_erpnext.api.employee.erpnext_mongodb.delete_employee_from_mongodb"
         ]
     },
 
+    # Department: cached Overtime Request approval scope (approval_scope.py)
+    "Department": {
+        "on_update": "customize_erpnext.customize_erpnext.doctype.overtime_request.approval_scope.invalidate_on_department_change",
+        "after_rename": "customize_erpnext.customize_erpnext.doctype.overtime_request.approval_scope.invalidate_on_department_change",
+        "on_trash": "customize_erpnext.customize_erpnext.doctype.overtime_request.approval_scope.invalidate_on_department_change",
+    },
+
+    # Employee Onboarding (guest web form) — invalidate the cached eligible list
+    # (api/eligible_employees_cache.py). Employee Self Update does it in its controllers.
+    "Employee Onboarding Settings": {
+        "on_update": "customize_erpnext.api.eligible_employees_cache.invalidate_onboarding",
+    },
+    "Employee Onboarding Form": {
+        "on_update": "customize_erpnext.api.eligible_employees_cache.invalidate_on_form_change",
+        "on_trash": "customize_erpnext.api.eligible_employees_cache.invalidate_on_form_change",
+    },
+
     # Employee Maternity Events
     # - Auto-update Attendance when maternity date ranges change (UI + Data Import)
     # - Gated by Attendance Calculation Setting "Recalc Attendance on Maternity Save/Delete" (default OFF)
@@ -436,6 +469,11 @@ doc_events = {
         "on_update": "customize_erpnext.customize_erpnext.doctype.employee_maternity.employee_maternity.on_maternity_update",
         "on_trash":  "customize_erpnext.customize_erpnext.doctype.employee_maternity.employee_maternity.on_maternity_delete",
     },
+    # Data Import Employee Maternity xong (db_set status → on_change): một job recalc
+    # attendance chung cho cả file thay vì một job mỗi record
+    "Data Import": {
+        "on_change": "customize_erpnext.customize_erpnext.doctype.employee_maternity.maternity_import_recalc.on_data_import_change",
+    },
 
     # Stock Entry Events
     # - Chặn Submit nếu dòng items thiếu Invoice Number (chốt chặn server-side)
@@ -454,8 +492,12 @@ doc_events = {
 
     # Item Events
     # - Auto-add barcode when item is created or updated
+    # - Invalidate the item pattern index used by the Excel importers
     "Item": {
-        "validate": "customize_erpnext.api.bulk_update_scripts.item_update_barcode.auto_add_barcode_on_item_save"
+        "validate": "customize_erpnext.api.bulk_update_scripts.item_update_barcode.auto_add_barcode_on_item_save",
+        "on_update": "customize_erpnext.api.item.item_lookup.invalidate_item_pattern_index",
+        "on_trash": "customize_erpnext.api.item.item_lookup.invalidate_item_pattern_index",
+        "after_rename": "customize_erpnext.api.item.item_lookup.invalidate_item_pattern_index",
     },
      "Shoe Rack": {
         "validate": "customize_erpnext.customize_erpnext.doctype.shoe_rack.shoe_rack.validate",
@@ -483,7 +525,26 @@ doc_events = {
         "before_cancel": [
             "customize_erpnext.overrides.leave_application.leave_application.on_leave_application_cancel",
         ],
-    }
+        "on_cancel": "customize_erpnext.overrides.leave_reports.leave_balance_store.invalidate_leave_balance_index",
+    },
+
+    # Leave balance index (Redis, leave_reports/leave_balance_store.py)
+    # - xoá index của nhân viên khi ledger đổi; HRMS xoá ledger của các chứng từ
+    #   dưới đây bằng SQL thô khi cancel nên phải bắt ở on_cancel của chúng
+    "Leave Ledger Entry": {
+        "after_insert": "customize_erpnext.overrides.leave_reports.leave_balance_store.invalidate_leave_balance_index",
+        "on_cancel": "customize_erpnext.overrides.leave_reports.leave_balance_store.invalidate_leave_balance_index",
+        "on_trash": "customize_erpnext.overrides.leave_reports.leave_balance_store.invalidate_leave_balance_index",
+    },
+    "Leave Allocation": {
+        "on_cancel": "customize_erpnext.overrides.leave_reports.leave_balance_store.invalidate_leave_balance_index",
+    },
+    "Leave Encashment": {
+        "on_cancel": "customize_erpnext.overrides.leave_reports.leave_balance_store.invalidate_leave_balance_index",
+    },
+    "Compensatory Leave Request": {
+        "on_cancel": "customize_erpnext.overrides.leave_reports.leave_balance_store.invalidate_leave_balance_index",
+    },
 
 }
 
@@ -495,6 +556,9 @@ doc_events = {
 # lazy-load bản self-host tại /assets/customize_erpnext/cropperjs/ khi cần crop
 app_include_js = [
     "/assets/customize_erpnext/js/fingerprint_scanner_dialog.js",
+    "/assets/customize_erpnext/js/background_file_job.js",
+    "/assets/customize_erpnext/js/zip_export.js",
+    "/assets/customize_erpnext/js/pdf_batch.js",
     "csv_bom_fix.bundle.js"
 ]
 
@@ -514,6 +578,8 @@ web_include_js = [
 jinja = {
     "methods": [
         "customize_erpnext.api.qr_label_print.generate_qr_code_base64",
+        # Nhiều mã QR một lần (vd. bảng lô / cuộn trong print format) — {data: base64}
+        "customize_erpnext.api.qr_label_print.qr_codes_base64",
         # Số tiền bằng chữ / định dạng VND cho print format.
         # money_in_words_vi và so_tien_bang_chu là cùng một hàm (alias).
         "customize_erpnext.api.vn_number_words.money_in_words_vi",
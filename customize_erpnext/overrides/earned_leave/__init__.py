@@ -40,6 +40,7 @@ from customize_erpnext.overrides.earned_leave.earned_leave_eligibility import (
     get_employee_probation_days,
     get_leave_type_applicable_after,
     calculate_eligibility_date,
+    evaluate_eligibility,
     get_first_eligible_allocation_date,
     log_eligibility_skip,
 )
@@ -499,126 +499,31 @@ def custom_allocate_earned_leaves():
     1. Added eligibility check before allocating
     2. Skip allocation if employee not yet eligible (probation not completed)
     3. Use new allocation: 1 day/month, 2 days in June & December
-    4. Log skipped allocations for debugging
+    4. Log skipped allocations for debugging (one summary Error Log per run)
+    5. Batched: inputs preloaded per leave type, writes in bulk
+       (see earned_leave_batch.py)
 
     Original function: hrms.hr.utils.allocate_earned_leaves
     """
-    from frappe.utils import flt, comma_and, get_link_to_form
-    from frappe.query_builder.functions import Count
-    from hrms.hr.utils import (
-        get_earned_leaves,
-        get_leave_allocations,
-        get_upcoming_earned_leave_from_schedule,
-        get_annual_allocation_from_policy,
-        log_allocation_error,
-        create_additional_leave_ledger_entry,
-        OverAllocationError,
+    from customize_erpnext.overrides.earned_leave.earned_leave_batch import (
+        allocate_earned_leaves_batched,
     )
-    from customize_erpnext.overrides.earned_leave.earned_leave_eligibility import (
-        is_employee_eligible_for_earned_leave,
-        log_eligibility_skip,
-    )
-    from customize_erpnext.overrides.earned_leave.earned_leave_config import (
-        get_monthly_allocation_for_month,
-        get_annual_allocation_with_seniority,
-    )
-
-    e_leave_types = get_earned_leaves()
-    today = frappe.flags.current_date or getdate()
-    failed_allocations = []
-    skipped_allocations = []
-    successful_allocations = []
-
-    for e_leave_type in e_leave_types:
-        leave_allocations = get_leave_allocations(today, e_leave_type.name)
-
-        for allocation in leave_allocations:
-            # Get employee info
-            emp_info = frappe.db.get_value(
-                "Employee", allocation.employee,
-                ["date_of_joining"], as_dict=True
-            )
-            date_of_joining = emp_info.date_of_joining if emp_info else None
-
-            # Determine allocation date
-            if allocation.earned_leave_schedule_exists:
-                allocation_date, scheduled_leaves = get_upcoming_earned_leave_from_schedule(
-                    allocation.name, today
-                ) or (None, None)
-                base_annual_allocation = get_annual_allocation_from_policy(allocation, e_leave_type)
-            else:
-                allocation_date = custom_get_expected_allocation_date_for_period(
-                    e_leave_type.earned_leave_frequency,
-                    e_leave_type.allocate_on_day,
-                    today,
-                    date_of_joining
-                )
-                base_annual_allocation = get_annual_allocation_from_policy(allocation, e_leave_type)
-
-            if not allocation_date or allocation_date != today:
-                continue
-
-            # ========== ELIGIBILITY CHECK ==========
-            eligibility_result = is_employee_eligible_for_earned_leave(
-                allocation.employee,
-                allocation_date,
-                e_leave_type.name
-            )
 
-            if not eligibility_result["is_eligible"]:
-                # Log and skip
-                log_eligibility_skip(
-                    allocation.employee,
-                    allocation_date,
-                    e_leave_type.name,
-                    eligibility_result
-                )
-                skipped_allocations.append({
-                    "employee": allocation.employee,
-                    "leave_type": e_leave_type.name,
-                    "eligibility_date": eligibility_result["eligibility_date"],
-                    "reason": eligibility_result["reason"]
-                })
-                continue
-
-            # ========== CALCULATE MONTHLY ALLOCATION WITH SENIORITY ==========
-            # Calculate annual allocation with seniority bonus
-            annual_allocation = get_annual_allocation_with_seniority(
-                base_annual_allocation, date_of_joining, today
-            ) if date_of_joining else base_annual_allocation
-
-            # Ưu tiên số đã lên lịch trong Earned Leave Schedule: kỳ tháng 12 đã được
-            # điều chỉnh cho khớp tổng năm (_true_up_december), tính lại ở đây sẽ ra con số
-            # khác và làm cả năm cộng không đủ annual_allocation.
-            if allocation.earned_leave_schedule_exists and scheduled_leaves is not None:
-                earned_leaves = flt(scheduled_leaves)
-            else:
-                earned_leaves = get_monthly_allocation_for_month(today.month, annual_allocation)
-
-            try:
-                # Update allocation using custom logic
-                custom_update_leave_allocation(
-                    allocation, annual_allocation, e_leave_type, earned_leaves, today
-                )
-                successful_allocations.append({
-                    "employee": allocation.employee,
-                    "leave_type": e_leave_type.name,
-                    "leaves": earned_leaves,
-                    "month": today.month
-                })
-            except Exception as e:
-                log_allocation_error(allocation.name, e)
-                failed_allocations.append(allocation.name)
+    result = allocate_earned_leaves_batched(frappe.flags.current_date or getdate())
+    failed_allocations = result["failed"]
+    skipped_allocations = result["skipped"]
+    successful_allocations = result["allocated"]
 
     if failed_allocations:
         notify_failed_allocations(failed_allocations)
 
-    # Log summary
+    # Log summary (replaces one "Earned Leave Eligibility Skip" log per employee)
     if skipped_allocations:
         frappe.log_error(
             message=f"Skipped {len(skipped_allocations)} allocations due to eligibility:\n" +
-                    "\n".join([f"- {s['employee']}: {s['leave_type']} (eligible from {s['eligibility_date']})"
-                              for s in skipped_allocations]),
+                    "\n".join([f"- {s['employee']} ({s['employee_name']}): {s['leave_type']} "
+                               f"(eligible from {s['eligibility_date']}, {s['reason']})"
+                               for s in skipped_allocations]),
             title="Earned Leave Eligibility - Daily Summary"
         )
 
@@ -674,31 +579,17 @@ def notify_failed_allocations(failed_allocations):
     )
 
 
-def custom_update_leave_allocation(allocation, annual_allocation, e_leave_type, earned_leaves, today):
+def check_allocation_limits(new_allocation, new_allocation_without_cf, annual_allocation, e_leave_type):
     """
-    Custom update function for leave allocation with new allocation logic.
+    Throw OverAllocationError if an earned leave top-up breaks the limits.
 
     Args:
-        allocation: Leave Allocation record
-        annual_allocation: Annual allocation from policy
+        new_allocation: total_leaves_allocated after the top-up
+        new_allocation_without_cf: allocated ledger total (no carry forward) after the top-up
+        annual_allocation: Annual allocation (with seniority)
         e_leave_type: Leave Type details
-        earned_leaves: Number of leaves to allocate (1 or 2)
-        today: Current date
     """
-    from frappe.utils import flt
-    from hrms.hr.utils import (
-        create_additional_leave_ledger_entry,
-        OverAllocationError,
-    )
-
-    allocation_doc = frappe.get_doc("Leave Allocation", allocation.name)
-    precision = allocation_doc.precision("total_leaves_allocated")
-
-    new_allocation = flt(allocation_doc.total_leaves_allocated) + flt(earned_leaves)
-    new_allocation_without_cf = flt(
-        flt(allocation_doc.get_existing_leave_count()) + flt(earned_leaves),
-        precision,
-    )
+    from hrms.hr.utils import OverAllocationError
 
     # Check max_leaves_allowed
     if new_allocation > e_leave_type.max_leaves_allowed and e_leave_type.max_leaves_allowed > 0:
@@ -718,6 +609,32 @@ def custom_update_leave_allocation(allocation, annual_allocation, e_leave_type,
             OverAllocationError,
         )
 
+
+def custom_update_leave_allocation(allocation, annual_allocation, e_leave_type, earned_leaves, today):
+    """
+    Custom update function for leave allocation with new allocation logic.
+
+    Args:
+        allocation: Leave Allocation record
+        annual_allocation: Annual allocation from policy
+        e_leave_type: Leave Type details
+        earned_leaves: Number of leaves to allocate (1 or 2)
+        today: Current date
+    """
+    from frappe.utils import flt
+    from hrms.hr.utils import create_additional_leave_ledger_entry
+
+    allocation_doc = frappe.get_doc("Leave Allocation", allocation.name)
+    precision = allocation_doc.precision("total_leaves_allocated")
+
+    new_allocation = flt(allocation_doc.total_leaves_allocated) + flt(earned_leaves)
+    new_allocation_without_cf = flt(
+        flt(allocation_doc.get_existing_leave_count()) + flt(earned_leaves),
+        precision,
+    )
+
+    check_allocation_limits(new_allocation, new_allocation_without_cf, annual_allocation, e_leave_type)
+
     # Update allocation
     allocation_doc.db_set("total_leaves_allocated", new_allocation, update_modified=False)
     create_additional_leave_ledger_entry(allocation_doc, earned_leaves, today)
@@ -949,77 +866,103 @@ def rebalance_earned_leave_schedule(dry_run: int = 1, batch_size: int = 200):
 	    tháng 12 = annual − (tổng kỳ ĐÃ cấp) − (tổng kỳ chưa cấp khác × tỷ lệ mới)
 
 	Nhờ đó tổng cả năm vẫn đúng `annual` dù các kỳ đầu năm đã cấp theo cách cũ.
+
+	Chạy trên tập: một query JOIN lấy mọi dòng lịch của Leave Allocation đã submit (gom
+	theo parent), tính trong bộ nhớ, chỉ ghi dòng có số thay đổi — mỗi lô `batch_size`
+	dòng là một `UPDATE ... CASE`. dry_run trả về danh sách chênh lệch (`diff`) thay vì ghi.
 	"""
-	from customize_erpnext.overrides.earned_leave.earned_leave_config import (
-		get_monthly_allocation_for_month,
-	)
+	from itertools import groupby
 
 	dry_run = int(dry_run)
-	parents = {
-		r.parent for r in frappe.get_all(
-			"Earned Leave Schedule", fields=["parent"], group_by="parent"
-		)
-	}
-	names = [
-		r.name for r in frappe.get_all(
-			"Leave Allocation", filters={"docstatus": 1}, fields=["name"], order_by="name"
-		)
-		if r.name in parents
-	]
-	print(f"Leave Allocation (submitted) có lịch: {len(names)}")
-
-	changed = unchanged = 0
-	problems = []
-	for i, name in enumerate(names, 1):
-		doc = frappe.get_doc("Leave Allocation", name)
-		rows = doc.get("earned_leave_schedule") or []
-		if not rows:
-			continue
-
-		annual = flt(doc.total_leaves_allocated)
-		# total_leaves_allocated chỉ phản ánh phần ĐÃ cấp; mức năm là tổng của lịch cũ
-		annual_target = sum(flt(r.number_of_leaves) for r in rows)
+	batch_size = max(int(batch_size), 1)
+	rows = frappe.db.sql(
+		"""
+		SELECT els.parent, els.name, els.allocation_date, els.number_of_leaves, els.is_allocated
+		FROM `tabEarned Leave Schedule` els
+		INNER JOIN `tabLeave Allocation` la ON la.name = els.parent
+		WHERE els.parenttype = 'Leave Allocation' AND la.docstatus = 1
+		ORDER BY els.parent, els.idx
+		""",
+		as_dict=True,
+	)
 
-		monthly = get_monthly_allocation_for_month(1, annual_target)
-		pending = [r for r in rows if not r.is_allocated]
-		if not pending:
+	allocations = changed = unchanged = 0
+	problems, diff = [], []
+	for parent, group in groupby(rows, key=lambda r: r.parent):
+		allocations += 1
+		new_values, problem = _rebalance_schedule_rows(list(group))
+		if problem:
+			problems.append((parent, *problem))
+			continue
+		if not new_values:
 			unchanged += 1
 			continue
-
-		december = None
-		for r in pending:
-			if getdate(r.allocation_date).month == 12:
-				december = r
-		if december is None:
-			december = pending[-1]
-
-		new_values = {}
-		for r in pending:
-			if r.name != december.name:
-				new_values[r.name] = monthly
-		allocated_total = sum(flt(r.number_of_leaves) for r in rows if r.is_allocated)
-		new_values[december.name] = flt(
-			annual_target - allocated_total - sum(new_values.values()), 1
+		changed += 1
+		diff.extend(
+			{"allocation": parent, "row": r.name, "allocation_date": r.allocation_date,
+			 "old": flt(r.number_of_leaves), "new": v}
+			for r, v in new_values
 		)
+	print(f"Leave Allocation (submitted) có lịch: {allocations}")
 
-		if new_values[december.name] < 0:
-			problems.append((name, annual_target, allocated_total,
-			                 new_values[december.name]))
-			continue
-
-		if not dry_run:
-			for row_name, v in new_values.items():
-				frappe.db.set_value("Earned Leave Schedule", row_name,
-				                    "number_of_leaves", v, update_modified=False)
-		changed += 1
-		if not dry_run and i % batch_size == 0:
+	if not dry_run:
+		for start in range(0, len(diff), batch_size):
+			chunk = diff[start:start + batch_size]
+			frappe.db.sql(
+				f"""
+				UPDATE `tabEarned Leave Schedule`
+				SET number_of_leaves = CASE name {" ".join(["WHEN %s THEN %s"] * len(chunk))} END
+				WHERE name IN ({", ".join(["%s"] * len(chunk))})
+				""",
+				[x for d in chunk for x in (d["row"], d["new"])] + [d["row"] for d in chunk],
+			)
 			frappe.db.commit()
-			print(f"  ... {i}/{len(names)}")
+			print(f"  ... {min(start + batch_size, len(diff))}/{len(diff)} dòng")
 
-	if not dry_run:
-		frappe.db.commit()
-	print(f"{'[DRY RUN] ' if dry_run else ''}cập nhật: {changed} | "
-	      f"không còn kỳ chờ: {unchanged} | ⚠ tháng 12 ÂM: {len(problems)}")
+	print(f"{'[DRY RUN] ' if dry_run else ''}cập nhật: {changed} ({len(diff)} dòng) | "
+	      f"không đổi: {unchanged} | ⚠ tháng 12 ÂM: {len(problems)}")
 	for p in problems[:10]:
 		print(f"   ⚠ {p[0]}: năm={p[1]}, đã cấp={p[2]}, tháng 12 ra {p[3]}")
-	return {"changed": changed, "unchanged": unchanged, "problems": problems[:50]}
+	if dry_run:
+		for d in diff[:20]:
+			print(f"   {d['allocation']} {d['allocation_date']}: {d['old']} → {d['new']}")
+	return {
+		"changed": changed,
+		"unchanged": unchanged,
+		"problems": problems[:50],
+		"diff": diff[:500] if dry_run else [],
+	}
+
+
+def _rebalance_schedule_rows(rows):
+	"""Số mới cho lịch của MỘT allocation (rows theo idx).
+
+	Trả về ([(row, số mới)] — chỉ dòng thay đổi, None) hoặc
+	(None, (annual, đã cấp, tháng 12)) khi tháng 12 ra âm.
+	"""
+	from customize_erpnext.overrides.earned_leave.earned_leave_config import (
+		get_monthly_allocation_for_month,
+	)
+
+	pending = [r for r in rows if not r.is_allocated]
+	if not pending:
+		return [], None
+
+	# total_leaves_allocated chỉ phản ánh phần ĐÃ cấp; mức năm là tổng của lịch cũ
+	annual_target = sum(flt(r.number_of_leaves) for r in rows)
+	allocated_total = sum(flt(r.number_of_leaves) for r in rows if r.is_allocated)
+	monthly = get_monthly_allocation_for_month(1, annual_target)
+
+	december = None
+	for r in pending:
+		if getdate(r.allocation_date).month == 12:
+			december = r
+	if december is None:
+		december = pending[-1]
+
+	december_value = flt(annual_target - allocated_total - monthly * (len(pending) - 1), 1)
+	if december_value < 0:
+		return None, (annual_target, allocated_total, december_value)
+
+	new_values = [(r, december_value if r is december else monthly) for r in pending]
+	return [(r, v) for r, v in new_values if flt(r.number_of_leaves) != flt(v)], None
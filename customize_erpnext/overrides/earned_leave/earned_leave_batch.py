@@ -0,0 +1,310 @@
+# Copyright (c) 2026, IT Team - TIQN
+# License: MIT
+
+"""
+Batched earned leave allocation (scheduler)
+
+custom_allocate_earned_leaves used to walk every allocation of every earned
+leave type doing, per allocation: an Employee get_value, a schedule lookup, a
+policy lookup, the full eligibility check (Employee + Leave Type again), then
+custom_update_leave_allocation (get_doc, ledger SUM, db_set, ledger insert +
+submit, schedule UPDATE). On the 15th that is ~10 queries × 1000+ employees.
+
+Here, per leave type:
+1. Preload (one query each): Employee rows, today's Earned Leave Schedule rows,
+   Leave Allocation totals, allocated ledger SUM; applicable_after and policy
+   annual allocation once per leave type / policy.
+2. Plan in memory: allocation date, eligibility (evaluate_eligibility),
+   seniority, amount, limit checks (check_allocation_limits). A row that breaks
+   a limit is logged with log_allocation_error and left out.
+3. Write per CHUNK_SIZE rows under one savepoint: one CASE UPDATE of
+   total_leaves_allocated, one bulk_insert of submitted Leave Ledger Entry
+   rows (leave balance index invalidated for those employees), one UPDATE of
+   the schedule rows. If the chunk fails it is rolled back and replayed row by
+   row through custom_update_leave_allocation, each row in its own savepoint,
+   so one bad allocation does not block the others.
+"""
+
+import frappe
+from frappe.utils import flt, getdate, now_datetime
+
+CHUNK_SIZE = 500
+
+
+def allocate_earned_leaves_batched(today=None):
+    """
+    Allocate today's earned leaves for every earned leave type.
+
+    Returns:
+        dict: {"allocated": [...], "skipped": [...], "failed": [allocation names]}
+    """
+    from hrms.hr.utils import get_earned_leaves, get_leave_allocations
+
+    today = getdate(today or frappe.flags.current_date or getdate())
+    result = {"allocated": [], "skipped": [], "failed": []}
+
+    for e_leave_type in get_earned_leaves():
+        allocations = get_leave_allocations(today, e_leave_type.name)
+        if not allocations:
+            continue
+        plan = _plan_allocations(allocations, e_leave_type, today, result)
+        for start in range(0, len(plan), CHUNK_SIZE):
+            _write_chunk(plan[start:start + CHUNK_SIZE], e_leave_type, today, result)
+
+    return result
+
+
+def _plan_allocations(allocations, e_leave_type, today, result):
+    """Rows to write today: [{"allocation", "annual_allocation", "earned_leaves", "new_total", ...}]."""
+    from hrms.hr.utils import get_annual_allocation_from_policy, log_allocation_error
+
+    from customize_erpnext.overrides.earned_leave.earned_leave import (
+        check_allocation_limits,
+        custom_get_expected_allocation_date_for_period,
+    )
+    from customize_erpnext.overrides.earned_leave.earned_leave_config import (
+        get_annual_allocation_with_seniority,
+        get_monthly_allocation_for_month,
+    )
+    from customize_erpnext.overrides.earned_leave.earned_leave_eligibility import (
+        evaluate_eligibility,
+        get_leave_type_applicable_after,
+    )
+
+    employees = _load_employees({a.employee for a in allocations})
+    scheduled = _load_scheduled_leaves(
+        [a.name for a in allocations if a.earned_leave_schedule_exists], today
+    )
+
+    # Allocation date first: most allocations are not due today (wrong day, or
+    # schedule row already allocated) and need nothing else.
+    due = []
+    for allocation in allocations:
+        emp_info = employees.get(allocation.employee)
+        date_of_joining = emp_info.date_of_joining if emp_info else None
+        if allocation.earned_leave_schedule_exists:
+            scheduled_leaves = scheduled.get(allocation.name)
+            allocation_date = today if scheduled_leaves is not None else None
+        else:
+            scheduled_leaves = None
+            allocation_date = custom_get_expected_allocation_date_for_period(
+                e_leave_type.earned_leave_frequency,
+                e_leave_type.allocate_on_day,
+                today,
+                date_of_joining
+            )
+        if allocation_date and allocation_date == today:
+            due.append((allocation, emp_info, scheduled_leaves))
+
+    if not due:
+        return []
+
+    applicable_after = get_leave_type_applicable_after(e_leave_type.name)
+    details = _load_allocation_details([a.name for a, _e, _s in due])
+    allocated_counts = _load_allocated_counts([a.name for a, _e, _s in due])
+    precision = frappe.get_precision("Leave Allocation", "total_leaves_allocated")
+    policy_allocation = {}
+
+    plan = []
+    for allocation, emp_info, scheduled_leaves in due:
+        eligibility = evaluate_eligibility(emp_info, today, applicable_after)
+        if not eligibility["is_eligible"]:
+            result["skipped"].append({
+                "employee": allocation.employee,
+                "employee_name": eligibility.get("employee_name") or "",
+                "leave_type": e_leave_type.name,
+                "eligibility_date": eligibility["eligibility_date"],
+                "reason": eligibility["reason"]
+            })
+            continue
+
+        if allocation.leave_policy not in policy_allocation:
+            policy_allocation[allocation.leave_policy] = get_annual_allocation_from_policy(
+                allocation, e_leave_type
+            )
+        base_annual_allocation = policy_allocation[allocation.leave_policy]
+        date_of_joining = emp_info.date_of_joining
+        annual_allocation = get_annual_allocation_with_seniority(
+            base_annual_allocation, date_of_joining, today
+        ) if date_of_joining else base_annual_allocation
+
+        # Same rule as before: the scheduled number wins (December is trued up)
+        if scheduled_leaves is not None:
+            earned_leaves = flt(scheduled_leaves)
+        else:
+            earned_leaves = get_monthly_allocation_for_month(today.month, annual_allocation)
+
+        detail = details.get(allocation.name)
+        if not detail:
+            continue
+        new_total = flt(detail.total_leaves_allocated) + flt(earned_leaves)
+        try:
+            check_allocation_limits(
+                new_total,
+                flt(flt(allocated_counts.get(allocation.name)) + flt(earned_leaves), precision),
+                annual_allocation,
+                e_leave_type,
+            )
+        except Exception as e:
+            log_allocation_error(allocation.name, e)
+            result["failed"].append(allocation.name)
+            continue
+
+        plan.append(frappe._dict(
+            allocation=allocation,
+            detail=detail,
+            annual_allocation=annual_allocation,
+            earned_leaves=earned_leaves,
+            new_total=new_total,
+        ))
+
+    return plan
+
+
+def _load_employees(employees):
+    rows = frappe.get_all(
+        "Employee",
+        filters={"name": ["in", list(employees)]},
+        fields=["name", "employee_name", "date_of_joining", "custom_probation_days"],
+    )
+    return {r.name: r for r in rows}
+
+
+def _load_scheduled_leaves(allocation_names, today):
+    """{allocation: number_of_leaves} of today's not-yet-allocated schedule row."""
+    if not allocation_names:
+        return {}
+    scheduled = {}
+    for row in frappe.get_all(
+        "Earned Leave Schedule",
+        filters={
+            "parenttype": "Leave Allocation",
+            "parent": ["in", allocation_names],
+            "allocation_date": today,
+            "is_allocated": 0,
+        },
+        fields=["parent", "number_of_leaves"],
+        order_by="idx asc",
+    ):
+        scheduled.setdefault(row.parent, row.number_of_leaves)
+    return scheduled
+
+
+def _load_allocation_details(allocation_names):
+    rows = frappe.get_all(
+        "Leave Allocation",
+        filters={"name": ["in", allocation_names]},
+        fields=["name", "employee", "employee_name", "leave_type", "company", "to_date", "total_leaves_allocated"],
+    )
+    return {r.name: r for r in rows}
+
+
+def _load_allocated_counts(allocation_names):
+    """LeaveAllocation.get_existing_leave_count() for many allocations at once."""
+    return dict(frappe.db.sql(
+        """
+        SELECT transaction_name, SUM(leaves)
+        FROM `tabLeave Ledger Entry`
+        WHERE transaction_type = 'Leave Allocation'
+            AND transaction_name IN %(names)s
+            AND is_carry_forward = 0
+            AND docstatus = 1
+        GROUP BY transaction_name
+        """,
+        {"names": allocation_names},
+    ))
+
+
+def _write_chunk(chunk, e_leave_type, today, result):
+    """Bulk-write one chunk; on failure replay it row by row."""
+    if not chunk:
+        return
+    frappe.db.savepoint("earned_leave_chunk")
+    try:
+        _bulk_write(chunk, today)
+    except Exception:
+        frappe.db.rollback(save_point="earned_leave_chunk")
+        _write_rows(chunk, e_leave_type, today, result)
+        return
+
+    for row in chunk:
+        result["allocated"].append({
+            "employee": row.allocation.employee,
+            "leave_type": e_leave_type.name,
+            "leaves": row.earned_leaves,
+            "month": today.month
+        })
+
+
+def _bulk_write(chunk, today):
+    from customize_erpnext.overrides.leave_reports.leave_balance_store import invalidate_employees
+
+    names = [row.allocation.name for row in chunk]
+
+    # total_leaves_allocated (db_set, update_modified=False before)
+    cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+    params = []
+    for row in chunk:
+        params.extend([row.allocation.name, row.new_total])
+    frappe.db.sql(
+        f"""
+        UPDATE `tabLeave Allocation`
+        SET total_leaves_allocated = CASE name {cases} END
+        WHERE name IN ({", ".join(["%s"] * len(names))})
+        """,
+        params + names,
+    )
+
+    # What create_additional_leave_ledger_entry submits for each allocation
+    now, user = now_datetime(), frappe.session.user
+    frappe.db.bulk_insert(
+        "Leave Ledger Entry",
+        ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+         "employee", "employee_name", "leave_type", "company", "transaction_type", "transaction_name",
+         "leaves", "from_date", "to_date", "is_carry_forward", "is_expired", "is_lwp"],
+        [
+            (frappe.generate_hash(length=10), now, now, user, user, 1,
+             row.detail.employee, row.detail.employee_name, row.detail.leave_type, row.detail.company,
+             "Leave Allocation", row.allocation.name,
+             row.earned_leaves, today, row.detail.to_date, 0, 0, 0)
+            for row in chunk
+        ],
+    )
+
+    # bulk_insert skips the Leave Ledger Entry doc_events
+    for leave_type in {row.detail.leave_type for row in chunk}:
+        invalidate_employees(
+            leave_type, [row.detail.employee for row in chunk if row.detail.leave_type == leave_type]
+        )
+
+    earned_leave_schedule = frappe.qb.DocType("Earned Leave Schedule")
+    frappe.qb.update(earned_leave_schedule).where(
+        (earned_leave_schedule.parent.isin(names)) & (earned_leave_schedule.allocation_date == today)
+    ).set(earned_leave_schedule.is_allocated, 1).set(earned_leave_schedule.attempted, 1).set(
+        earned_leave_schedule.allocated_via, "Scheduler"
+    ).run()
+
+
+def _write_rows(chunk, e_leave_type, today, result):
+    """Per-row fallback: the old write path, one savepoint per allocation."""
+    from hrms.hr.utils import log_allocation_error
+
+    from customize_erpnext.overrides.earned_leave.earned_leave import custom_update_leave_allocation
+
+    for row in chunk:
+        frappe.db.savepoint("earned_leave_row")
+        try:
+            custom_update_leave_allocation(
+                row.allocation, row.annual_allocation, e_leave_type, row.earned_leaves, today
+            )
+        except Exception as e:
+            frappe.db.rollback(save_point="earned_leave_row")
+            log_allocation_error(row.allocation.name, e)
+            result["failed"].append(row.allocation.name)
+            continue
+        result["allocated"].append({
+            "employee": row.allocation.employee,
+            "leave_type": e_leave_type.name,
+            "leaves": row.earned_leaves,
+            "month": today.month
+        })
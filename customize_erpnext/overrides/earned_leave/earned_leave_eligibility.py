@@ -132,7 +132,26 @@ def is_employee_eligible_for_earned_leave(employee, allocation_date, leave_type)
         as_dict=True
     )
 
-    if not emp_info or not emp_info.date_of_joining:
+    return evaluate_eligibility(emp_info, allocation_date, get_leave_type_applicable_after(leave_type))
+
+
+def evaluate_eligibility(emp_info, allocation_date, applicable_after):
+    """
+    Eligibility check on preloaded values (no DB access).
+
+    Shared by is_employee_eligible_for_earned_leave and the batched scheduler
+    (earned_leave_batch.py), which loads Employee rows and applicable_after once
+    for all allocations due today.
+
+    Args:
+        emp_info: dict with date_of_joining, custom_probation_days, employee_name (or None)
+        allocation_date: Date of allocation
+        applicable_after: applicable_after of the Leave Type
+
+    Returns:
+        dict: same shape as is_employee_eligible_for_earned_leave
+    """
+    if not emp_info or not emp_info.get("date_of_joining"):
         return {
             "is_eligible": False,
             "eligibility_date": None,
@@ -142,15 +161,12 @@ def is_employee_eligible_for_earned_leave(employee, allocation_date, leave_type)
             "applicable_after": 0
         }
 
-    doj = getdate(emp_info.date_of_joining)
+    doj = getdate(emp_info.get("date_of_joining"))
 
     # Get probation days from Employee (None if not set)
-    probation_value = cint(emp_info.custom_probation_days)
+    probation_value = cint(emp_info.get("custom_probation_days"))
     probation_days = probation_value if probation_value > 0 else None
 
-    # Get applicable_after from Leave Type (fallback)
-    applicable_after = get_leave_type_applicable_after(leave_type)
-
     # Calculate eligibility date
     eligibility_date, reason = calculate_eligibility_date(
         doj, probation_days, applicable_after
@@ -167,7 +183,7 @@ def is_employee_eligible_for_earned_leave(employee, allocation_date, leave_type)
         "date_of_joining": doj,
         "probation_days": probation_days,
         "applicable_after": applicable_after,
-        "employee_name": emp_info.employee_name
+        "employee_name": emp_info.get("employee_name")
     }
 
 
@@ -0,0 +1,104 @@
+"""Khoảng ngày theo từng key (thường là nhân viên) — tra theo ngày bằng bisect.
+
+Chỉ dùng stdlib, test được không cần bench (`tests/test_interval_index.py`).
+
+Dùng chung cho mọi chỗ trước đây duyệt list để hỏi "ngày D rơi vào khoảng nào":
+  - giai đoạn Employee Maternity (Mang thai / Thai sản / Nuôi con nhỏ)
+  - Shift Assignment (mới nhất thắng)
+  - Leave Application (dựng map (nhân viên, ngày) bằng `expand`)
+
+Khoảng là [start, end] tính cả hai đầu; end = None là mở (Shift Assignment không có
+end_date). **Thứ tự `add` là thứ tự ưu tiên**: `get` trả giá trị được add trước trong các
+khoảng chứa D — caller add theo đúng thứ tự mà vòng lặp cũ duyệt (vd. assignment theo
+start_date giảm dần) thì kết quả y như cũ.
+
+Mỗi key được chia thành các đoạn liền nhau mà tập khoảng phủ lên không đổi (dựng một lần,
+lần tra đầu tiên sau `add`); tra một ngày là một lần bisect trên điểm đầu các đoạn.
+"""
+
+import bisect
+from datetime import date
+
+_OPEN = date.max.toordinal() + 1
+
+
+def _ordinal(day):
+	return day.toordinal()
+
+
+class IntervalIndex:
+	def __init__(self):
+		self._intervals = {}  # key -> [(start, end_or_OPEN, seq, value)]
+		self._segments = {}   # key -> ([điểm đầu đoạn], [tuple giá trị theo ưu tiên])
+		self._seq = 0
+
+	def add(self, key, start, end, value):
+		"""Thêm khoảng [start, end] (date; end None = không giới hạn). Bỏ qua nếu start trống."""
+		if start is None:
+			return
+		end_ordinal = _OPEN if end is None else _ordinal(end)
+		if end_ordinal < _ordinal(start):
+			return
+		self._intervals.setdefault(key, []).append((_ordinal(start), end_ordinal, self._seq, value))
+		self._seq += 1
+		self._segments.pop(key, None)
+
+	def __contains__(self, key):
+		return key in self._intervals
+
+	def keys(self):
+		return self._intervals.keys()
+
+	def _build(self, key):
+		segments = self._segments.get(key)
+		if segments is not None:
+			return segments
+
+		intervals = sorted(self._intervals.get(key, ()), key=lambda r: r[0])
+		bounds = sorted({r[0] for r in intervals} | {r[1] + 1 for r in intervals if r[1] != _OPEN})
+		seg_starts, seg_values = [], []
+		active = []  # (seq, end, value), giữ theo seq
+		i = 0
+		for bound in bounds:
+			while i < len(intervals) and intervals[i][0] <= bound:
+				start, end, seq, value = intervals[i]
+				bisect.insort(active, (seq, end, value), key=lambda a: a[0])
+				i += 1
+			active = [a for a in active if a[1] >= bound]
+			seg_starts.append(bound)
+			seg_values.append(tuple(a[2] for a in active))
+
+		segments = self._segments[key] = (seg_starts, seg_values)
+		return segments
+
+	def get_all(self, key, day):
+		"""Mọi giá trị có khoảng chứa `day`, theo thứ tự ưu tiên."""
+		seg_starts, seg_values = self._build(key)
+		i = bisect.bisect_right(seg_starts, _ordinal(day)) - 1
+		return seg_values[i] if i >= 0 else ()
+
+	def get(self, key, day, default=None):
+		"""Giá trị ưu tiên nhất có khoảng chứa `day`."""
+		values = self.get_all(key, day)
+		return values[0] if values else default
+
+	def overlapping(self, key, start, end):
+		"""Giá trị có khoảng giao [start, end], theo thứ tự ưu tiên, không lặp."""
+		lo, hi = _ordinal(start), _ordinal(end)
+		return [value for s, e, _seq, value in self._intervals.get(key, ()) if s <= hi and e >= lo]
+
+	def expand(self, key, start, end):
+		"""(ngày, tuple giá trị) cho từng ngày trong [start, end] có ít nhất một khoảng phủ."""
+		seg_starts, seg_values = self._build(key)
+		if not seg_starts:
+			return
+		lo, hi = _ordinal(start), _ordinal(end)
+		i = max(bisect.bisect_right(seg_starts, lo) - 1, 0)
+		while i < len(seg_starts) and seg_starts[i] <= hi:
+			seg_end = seg_starts[i + 1] - 1 if i + 1 < len(seg_starts) else hi
+			values = seg_values[i]
+			if values:
+				for ordinal in range(max(seg_starts[i], lo), min(seg_end, hi) + 1):
+					yield date.fromordinal(ordinal), values
+			i += 1
+
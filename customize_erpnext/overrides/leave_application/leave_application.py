@@ -30,11 +30,15 @@ Override so với HRMS gốc:
    engine bước 2b tự xoá attendance trong giai đoạn Maternity Leave (Employee Maternity là
    source of truth), và setting `recalc_attendance_on_maternity_change` **mặc định TẮT** — nên
    thực tế không có gì recalc cho tới FULL run kế tiếp.
+
+5. `CustomLeaveApplication.validate_balance_leaves()` — đủ số dư theo index ledger
+   (`overrides/leave_reports/leave_balance_store.py`) thì khỏi chạy các query số dư của
+   HRMS; thiếu / trường hợp khó thì vẫn để HRMS kiểm và báo lỗi như cũ.
 """
 
 import frappe
 from frappe import _
-from frappe.utils import getdate, formatdate, get_link_to_form
+from frappe.utils import flt, getdate, formatdate, get_link_to_form
 from hrms.hr.doctype.leave_application.leave_application import LeaveApplication
 
 
@@ -404,6 +408,39 @@ class CustomLeaveApplication(LeaveApplication):
 		d = getdate(self.from_date or self.posting_date or frappe.utils.nowdate())
 		self.name = make_autoname(f"LA-{d.year:04d}-{d.month:02d}-.#####")
 
+	def validate_balance_leaves(self):
+		"""Kiểm số dư qua `LeaveBalanceEngine.balance_for_consumption` (index Redis).
+
+		Chỉ là đường tắt khi **đủ** phép: index trả None (vắt biên, carry forward, Leave
+		Encashment, chưa có allocation) hoặc số dư thiếu thì gọi bản HRMS — thông báo thiếu phép, cho phép âm,
+		... vẫn do HRMS quyết. Import hàng loạt (`import_leave.run`) nhờ vậy không chạy bộ
+		query số dư cho từng đơn.
+		"""
+		from hrms.hr.doctype.leave_application.leave_application import get_number_of_leave_days
+		from hrms.hr.utils import is_lwp
+
+		from customize_erpnext.overrides.leave_reports.leave_report_core import LeaveBalanceEngine
+
+		if not (self.from_date and self.to_date) or is_lwp(self.leave_type):
+			return super().validate_balance_leaves()
+
+		total_leave_days = get_number_of_leave_days(
+			self.employee, self.leave_type, self.from_date, self.to_date, self.half_day, self.half_day_date
+		)
+		if total_leave_days <= 0:
+			return super().validate_balance_leaves()
+
+		balance = LeaveBalanceEngine(self.leave_type, [self.employee]).balance_for_consumption(
+			self.employee, self.from_date
+		)
+		if balance is None or (
+			flt(balance.leave_balance_for_consumption, self.precision("leave_balance")) < total_leave_days
+		):
+			return super().validate_balance_leaves()
+		# Cùng field HRMS ghi khi đủ phép
+		self.total_leave_days = total_leave_days
+		self.leave_balance = balance.leave_balance
+
 	def cancel_attendance(self):
 		"""Batch cancel attendance trong 1 SQL thay vì loop per-record của HRMS.
 
@@ -5,7 +5,7 @@
 
 Giữ **nguyên** bộ cột và công thức của HRMS. Thay bốn thứ:
   1. `get_leave_types()` (10 loại) -> filter `Leave Type`, mặc định phép năm, **bỏ trống = tất cả**
-  2. các hàm con per-(NV × leave type) -> `LeaveBalanceEngine` (3 query, hằng số)
+  2. các hàm con per-(NV × leave type) -> `LeaveBalanceEngine` (index Redis, chỉ nạp ledger cho người chưa có)
   3. `get_employees()` -> thêm phạm vi `Attendance Calculation Setting` (prefix + exclude)
   4. `consolidate_leave_types` chỉ áp khi thật sự có **nhiều** leave type + nới cột Employee /
      Employee Name
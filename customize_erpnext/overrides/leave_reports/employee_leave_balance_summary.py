@@ -123,7 +123,7 @@ def custom_get_data(filters, leave_types):
 	as_on = filters.get("date") or frappe.utils.nowdate()
 	fallback_start = _period_start(as_on)
 
-	# 3 query mỗi leave type, không phụ thuộc số nhân viên
+	# Mỗi leave type: một HGETALL Redis + tối đa 2 query, không phụ thuộc số nhân viên
 	engines = {lt: LeaveBalanceEngine(lt, emp_names) for lt in leave_types}
 
 	data = []
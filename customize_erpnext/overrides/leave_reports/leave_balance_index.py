@@ -0,0 +1,231 @@
+"""Chỉ số số dư phép của MỘT cặp (nhân viên, leave type) — prefix-sum trên Leave Ledger Entry.
+
+Chỉ dùng stdlib: index dựng từ các dòng ledger / allocation thô (xem
+`leave_balance_store.py` — nơi nạp, lưu Redis và xoá khi ledger đổi), nên test được
+mà không cần bench (`tests/test_leave_balance_index.py`).
+
+Ledger được tách làm hai phần:
+  - dòng **Leave Application** (phần lớn ledger, tăng theo từng đơn nghỉ): sắp theo
+    from_date, kèm prefix-sum số ngày nghỉ và prefix-max to_date → `leaves_taken()` và
+    `has_straddling_entry()` là hai lần bisect, O(log n).
+  - dòng **phân bổ** (Allocation / Adjustment / ...): prefix-sum cho `allocated()` và
+    `carry_forwarded()`; các câu hỏi còn lại (`allocation_record_on`, `expired`, ...) duyệt
+    riêng phần này — vài chục dòng mỗi năm, không lẫn đơn nghỉ.
+
+Mọi hàm khớp đúng hàm cùng tên của `LeaveBalanceEngine` bản quét tuyến tính (đã đối chiếu
+với HRMS trong `test_leave_reports.py`). Ngày truyền vào là `datetime.date`.
+"""
+
+import bisect
+from itertools import accumulate
+
+# Tăng khi đổi cấu trúc `state` — index cũ trong Redis tự bị bỏ qua
+INDEX_VERSION = 1
+
+LEDGER_FIELDS = (
+	"transaction_type", "transaction_name", "from_date", "to_date", "leaves", "is_carry_forward", "is_expired",
+)
+ALLOCATION_FIELDS = ("name", "from_date", "to_date")
+
+_ALLOCATION_TYPES = ("Leave Allocation", "Leave Adjustment")
+
+
+def _round(value):
+	# Hiệu hai prefix-sum: bỏ nhiễu float (13.999999999 → 14.0)
+	return round(value, 9)
+
+
+def _range_sum(keys, cumulative, f, t):
+	"""Tổng các dòng có key trong [f, t] — keys đã sắp, cumulative[i] = tổng i dòng đầu."""
+	if f > t:
+		return 0.0
+	lo = bisect.bisect_left(keys, f)
+	hi = bisect.bisect_right(keys, t)
+	return _round(cumulative[hi] - cumulative[lo]) if hi > lo else 0.0
+
+
+def _attr(row, field):
+	return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+class LeaveLedgerIndex:
+	"""Ledger + Leave Allocation (đã submit) của một nhân viên cho một leave type.
+
+	ledger       -- dòng có các key trong LEDGER_FIELDS, theo thứ tự (from_date, name)
+	allocations  -- dòng có các key trong ALLOCATION_FIELDS
+	"""
+
+	def __init__(self, ledger=(), allocations=()):
+		applications, rows = [], []
+		for r in ledger:
+			row = tuple(_attr(r, field) for field in LEDGER_FIELDS)
+			if row[0] == "Leave Application":
+				if row[3] is not None:
+					applications.append(row)
+			else:
+				rows.append(row)
+		applications.sort(key=lambda r: r[2])
+
+		self.state = {
+			"version": INDEX_VERSION,
+			# Leave Application: from_date, prefix-max to_date, prefix-sum ngày nghỉ (leaves < 0)
+			"app_from": [r[2] for r in applications],
+			"app_to_max": list(accumulate((r[3] for r in applications), max)),
+			"taken_from": [r[2] for r in applications if r[4] < 0],
+			"taken_cum": [0.0] + list(accumulate(float(r[4]) for r in applications if r[4] < 0)),
+			# Dòng phân bổ giữ nguyên thứ tự ledger (cf_expiry / manually_expired lấy dòng ĐẦU)
+			"rows": rows,
+			"allocations": sorted(
+				(tuple(_attr(a, field) for field in ALLOCATION_FIELDS) for a in allocations),
+				key=lambda a: a[2],
+			),
+		}
+		self._build_allocation_sums()
+
+	@classmethod
+	def from_state(cls, state):
+		"""Index từ `state` đã lưu (None nếu khác INDEX_VERSION)."""
+		if not state or state.get("version") != INDEX_VERSION:
+			return None
+		index = cls.__new__(cls)
+		index.state = state
+		index._build_allocation_sums()
+		return index
+
+	def _build_allocation_sums(self):
+		# Phần phân bổ nhỏ — dựng lại khi nạp, không cần lưu
+		allocated = sorted(
+			(r[2], r[4]) for r in self.state["rows"]
+			if r[0] in _ALLOCATION_TYPES and not r[6] and not r[5]
+		)
+		cf = sorted(
+			(r[2], r[4]) for r in self.state["rows"]
+			if r[0] == "Leave Allocation" and not r[6] and r[5]
+		)
+		self._allocated_from = [d for d, _l in allocated]
+		self._allocated_cum = [0.0] + list(accumulate(float(v) for _d, v in allocated))
+		self._cf_from = [d for d, _l in cf]
+		self._cf_cum = [0.0] + list(accumulate(float(v) for _d, v in cf))
+
+	# --------------------------------------------------------- đơn nghỉ
+	def has_straddling_entry(self, f, t):
+		"""Có dòng Leave Application nào bị biên [f, t] cắt ngang không.
+
+		Vắt biên f: from_date < f <= to_date. Vắt biên t: from_date <= t < to_date.
+		Cả hai là "to_date lớn nhất trong các dòng from_date < biên" — prefix-max.
+		"""
+		if f > t:
+			return False
+		app_from, to_max = self.state["app_from"], self.state["app_to_max"]
+		i = bisect.bisect_left(app_from, f)
+		if i and to_max[i - 1] >= f:
+			return True
+		j = bisect.bisect_right(app_from, t)
+		return bool(j and to_max[j - 1] > t)
+
+	def leaves_taken(self, f, t):
+		"""Số ngày đã nghỉ trong [f, t], số dương — chỉ đúng khi KHÔNG có dòng vắt biên.
+
+		Không vắt biên thì dòng có from_date trong [f, t] cũng có to_date <= t.
+		"""
+		return -_range_sum(self.state["taken_from"], self.state["taken_cum"], f, t) or 0.0
+
+	# ------------------------------------------------ 3 cột phân bổ / hết hạn
+	def allocated(self, f, t):
+		return _range_sum(self._allocated_from, self._allocated_cum, f, t)
+
+	def carry_forwarded(self, f, t):
+		return _range_sum(self._cf_from, self._cf_cum, f, t)
+
+	def expired(self, f, t):
+		total = sum(
+			float(r[4])
+			for r in self.state["rows"]
+			if r[0] == "Leave Allocation"
+			and r[6]
+			and ((f <= r[2] <= t) or (r[3] is not None and f <= r[3] <= t))
+		)
+		return abs(total)
+
+	# ------------------------------------------------------- số dư đầu kỳ
+	def previous_allocation(self, before):
+		"""(name, from_date, to_date) của allocation gần nhất có to_date < before."""
+		allocations = self.state["allocations"]
+		i = bisect.bisect_left([a[2] for a in allocations], before)
+		return allocations[i - 1] if i else None
+
+	def allocation_record_on(self, d):
+		"""dict như `get_leave_allocation_records`, hoặc None."""
+		cf = new = 0.0
+		froms, tos = [], []
+		alloc_range = {a[0]: (a[1], a[2]) for a in self.state["allocations"]}
+
+		for r in self.state["rows"]:
+			transaction_type, transaction_name, from_date, to_date, leaves, is_cf, is_expired = r
+			if transaction_type not in _ALLOCATION_TYPES:
+				continue
+			if is_expired or from_date > d:
+				continue
+
+			if not is_cf:
+				if to_date is None or to_date < d:
+					continue
+			else:
+				rng = alloc_range.get(transaction_name)
+				if not rng:
+					continue
+				a_from, a_to = rng
+				if not (to_date and a_from <= to_date <= a_to):
+					continue
+				if not (a_from <= d <= a_to):
+					continue
+
+			if is_cf:
+				cf += float(leaves)
+			else:
+				new += float(leaves)
+
+			froms.append(from_date)
+			if to_date:
+				tos.append(to_date)
+
+		if not froms:
+			return None
+
+		return {
+			"from_date": min(froms),
+			"to_date": max(tos) if tos else None,
+			"total_leaves_allocated": cf + new,
+			"unused_leaves": cf,
+			"new_leaves_allocated": new,
+		}
+
+	def has_encashment(self, f, t):
+		"""Có dòng Leave Encashment nào from_date trong [f, t] không."""
+		return any(r[0] == "Leave Encashment" and f <= r[2] <= t for r in self.state["rows"])
+
+	def cf_expiry(self, to_date, alloc_from_date):
+		if not alloc_from_date:
+			return ""
+		for r in self.state["rows"]:
+			if r[5] and r[0] == "Leave Allocation" and r[3] is not None and alloc_from_date <= r[3] <= to_date:
+				return r[3]
+		return ""
+
+	def manually_expired(self, from_date, end_date):
+		if not from_date:
+			return 0.0
+		for r in self.state["rows"]:
+			if (
+				r[0] == "Leave Allocation"
+				and r[6]
+				and not r[5]
+				and r[2] >= from_date
+				and r[3] is not None
+				and r[3] < end_date
+			):
+				return float(r[4])
+		return 0.0
+
+
+EMPTY = LeaveLedgerIndex()
@@ -0,0 +1,177 @@
+"""Lưu `LeaveLedgerIndex` trong Redis, xoá khi ledger của nhân viên đổi.
+
+Mỗi leave type một hash Redis `leave_balance_index:v<INDEX_VERSION>:<leave type>`,
+field = mã nhân viên, value = `LeaveLedgerIndex.state`. Report chạy cả công ty đọc
+cả hash bằng một HGETALL; chỉ nhân viên chưa có (hoặc vừa bị xoá) mới phải nạp lại
+ledger — hai query cho tất cả những người đó.
+
+Xoá (ngay lúc gọi VÀ sau commit, như `item_lookup.invalidate_item_pattern_index`):
+  - doc_events Leave Ledger Entry (after_insert / on_cancel / on_trash)
+  - on_cancel của Leave Application / Leave Allocation / Leave Encashment /
+    Compensatory Leave Request: HRMS xoá ledger của chúng bằng SQL thô
+    (`delete_ledger_entry`), không qua document
+  - ghi ledger không qua document (vd. `bulk_insert` trong earned_leave_batch)
+    phải tự gọi `invalidate_employees()`
+
+Nhân viên đã đổi ledger trong transaction đang chạy thì index dựng lại KHÔNG được lưu
+(transaction còn có thể rollback về savepoint); danh sách đó xoá khi commit / rollback.
+INDEX_TTL chỉ là lưới an toàn cho đường ghi quên gọi invalidate.
+"""
+
+import frappe
+from frappe.utils import getdate
+
+from customize_erpnext.overrides.leave_reports.leave_balance_index import (
+	INDEX_VERSION,
+	LeaveLedgerIndex,
+)
+
+INDEX_TTL = 24 * 3600
+
+# Chứng từ mà HRMS xoá ledger bằng SQL khi cancel
+LEDGER_SOURCE_DOCTYPES = (
+	"Leave Application",
+	"Leave Allocation",
+	"Leave Encashment",
+	"Compensatory Leave Request",
+)
+
+
+def _hash_key(leave_type):
+	return f"leave_balance_index:v{INDEX_VERSION}:{leave_type}"
+
+
+def _decode(key):
+	return key.decode() if isinstance(key, bytes) else key
+
+
+def _dirty():
+	"""{(employee, leave_type)} có ledger đổi trong transaction hiện tại."""
+	if not hasattr(frappe.local, "leave_balance_index_dirty"):
+		frappe.local.leave_balance_index_dirty = set()
+	return frappe.local.leave_balance_index_dirty
+
+
+def get_leave_balance_indexes(leave_type, employees=None):
+	"""{employee: LeaveLedgerIndex} cho `employees`.
+
+	employees=None: nạp lại cả leave type từ DB (mọi nhân viên có ledger / allocation) và
+	lưu đè. Nhân viên không có dòng nào vẫn có index (rỗng), để lần sau khỏi nạp lại.
+	"""
+	cache = frappe.cache()
+	key = _hash_key(leave_type)
+	dirty = _dirty()
+
+	indexes, missing = {}, []
+	if employees is not None:
+		employees = list(dict.fromkeys(employees))
+		if len(employees) == 1:
+			stored = {employees[0]: cache.hget(key, employees[0])}
+		else:
+			stored = {_decode(k): v for k, v in (cache.hgetall(key) or {}).items()}
+		for employee in employees:
+			index = None
+			if (employee, leave_type) not in dirty:
+				index = LeaveLedgerIndex.from_state(stored.get(employee))
+			if index is None:
+				missing.append(employee)
+			else:
+				indexes[employee] = index
+		if not missing:
+			return indexes
+	else:
+		missing = None
+
+	is_new = not cache.exists(key)
+	for employee, index in _build(leave_type, missing).items():
+		indexes[employee] = index
+		if (employee, leave_type) not in dirty:
+			cache.hset(key, employee, index.state)
+	if is_new:
+		cache.expire(cache.make_key(key), INDEX_TTL)
+	return indexes
+
+
+def get_leave_balance_index(employee, leave_type):
+	return get_leave_balance_indexes(leave_type, [employee])[employee]
+
+
+def _build(leave_type, employees):
+	"""Nạp ledger + allocation của `employees` (None = tất cả) — hai query."""
+	cond, params = "", {"lt": leave_type}
+	if employees is not None:
+		cond = " AND employee IN %(emps)s"
+		params["emps"] = tuple(employees) or ("",)
+
+	ledger = frappe.db.sql(
+		f"""
+		SELECT employee, transaction_type, transaction_name, from_date, to_date,
+		       leaves, is_carry_forward, is_expired
+		FROM `tabLeave Ledger Entry`
+		WHERE docstatus = 1 AND leave_type = %(lt)s {cond}
+		ORDER BY employee, from_date, name
+		""",
+		params,
+		as_dict=True,
+	)
+	allocations = frappe.db.sql(
+		f"""
+		SELECT name, employee, from_date, to_date
+		FROM `tabLeave Allocation`
+		WHERE docstatus = 1 AND leave_type = %(lt)s {cond}
+		ORDER BY employee, to_date
+		""",
+		params,
+		as_dict=True,
+	)
+
+	rows = {employee: ([], []) for employee in (employees or ())}
+	for r in ledger:
+		r.from_date = getdate(r.from_date)
+		r.to_date = getdate(r.to_date) if r.to_date else None
+		r.leaves = float(r.leaves or 0)
+		rows.setdefault(r.employee, ([], []))[0].append(r)
+	for r in allocations:
+		r.from_date = getdate(r.from_date)
+		r.to_date = getdate(r.to_date)
+		rows.setdefault(r.employee, ([], []))[1].append(r)
+
+	return {
+		employee: LeaveLedgerIndex(ledger_rows, allocation_rows)
+		for employee, (ledger_rows, allocation_rows) in rows.items()
+	}
+
+
+def invalidate_employees(leave_type, employees):
+	"""Xoá index của `employees` cho `leave_type` — ngay và sau commit."""
+	employees = [e for e in set(employees) if e]
+	if not employees or not leave_type:
+		return
+
+	dirty = _dirty()
+	if not dirty:
+		frappe.db.after_commit.add(_clear_dirty)
+		frappe.db.after_rollback.add(_clear_dirty)
+	dirty.update((employee, leave_type) for employee in employees)
+
+	def _delete():
+		for employee in employees:
+			frappe.cache().hdel(_hash_key(leave_type), employee)
+
+	_delete()
+	frappe.db.after_commit.add(_delete)
+
+
+def _clear_dirty():
+	_dirty().clear()
+
+
+def invalidate_leave_balance_index(doc, method=None):
+	"""doc_events: Leave Ledger Entry và các chứng từ trong LEDGER_SOURCE_DOCTYPES."""
+	invalidate_employees(doc.get("leave_type"), [doc.get("employee")])
+
+
+def clear_leave_balance_index(leave_type=None):
+	"""Xoá toàn bộ index (một leave type hoặc tất cả) — dùng khi sửa ledger bằng tay."""
+	leave_types = [leave_type] if leave_type else frappe.get_all("Leave Type", pluck="name")
+	frappe.cache().delete_value([_hash_key(lt) for lt in leave_types])
@@ -54,9 +54,14 @@ nhân viên khớp tuyệt đối, và kỳ 2025-12-26→2026-12-25 có **0** en
 Nhưng vắt biên **vẫn có thể xảy ra** ở kỳ khác. Nên: hễ một nhân viên có entry vắt biên thì
 **giao cả nhân viên đó cho hàm gốc của HRMS** (`leaves_taken()` gọi lại `get_leaves_for_period`)
 — chậm nhưng đúng, và chỉ áp cho đúng những người đó.
-"""
 
-from collections import defaultdict
+## Index lưu sẵn (`leave_balance_index.py` + `leave_balance_store.py`)
+
+Engine không còn nạp lại cả ledger mỗi lần chạy: mỗi (nhân viên, leave type) có một
+`LeaveLedgerIndex` (prefix-sum theo from_date) lưu trong Redis, bị xoá khi ledger của người đó
+đổi. `leaves_taken` / `allocated` / `carry_forwarded` là bisect O(log n). Cùng index phục vụ
+`CustomLeaveApplication.validate_balance_leaves` qua `balance_for_consumption()`.
+"""
 
 import frappe
 from frappe.utils import flt, getdate
@@ -107,78 +112,31 @@ def resolve_leave_types(filters) -> list[str]:
 
 
 class LeaveBalanceEngine:
-	"""Toàn bộ ledger + allocation của MỘT leave type, tính trong bộ nhớ.
+	"""Số dư phép của MỘT leave type cho danh sách nhân viên, tính trong bộ nhớ.
 
-	Số query là **hằng số** (3), không phụ thuộc số nhân viên.
+	Mỗi nhân viên một `LeaveLedgerIndex` (prefix-sum, xem `leave_balance_index.py`) lấy từ
+	Redis (`leave_balance_store.py`); chỉ người chưa có index mới phải nạp ledger — 2 query
+	cho tất cả những người đó, không phụ thuộc số nhân viên. Index được xoá khi ledger của
+	nhân viên đổi, nên report chạy lại không phải nạp lại cả ledger.
 	"""
 
 	def __init__(self, leave_type: str, employees: list[str] | None = None):
-		self.leave_type = leave_type
-		self.employees = set(employees) if employees else None
-
-		self.ledger = defaultdict(list)      # employee -> [dòng ledger]
-		self.allocations = defaultdict(list)  # employee -> [Leave Allocation đã submit]
-
-		self._load_ledger()
-		self._load_allocations()
-
-	# ------------------------------------------------------------------ nạp
-	def _load_ledger(self):
-		cond, params = "", {"lt": self.leave_type}
-		if self.employees is not None:
-			cond = " AND employee IN %(emps)s"
-			params["emps"] = tuple(self.employees) or ("",)
-
-		rows = frappe.db.sql(
-			f"""
-			SELECT employee, transaction_type, transaction_name, from_date, to_date,
-			       leaves, is_carry_forward, is_expired, holiday_list
-			FROM `tabLeave Ledger Entry`
-			WHERE docstatus = 1 AND leave_type = %(lt)s {cond}
-			ORDER BY employee, from_date, name
-			""",
-			params,
-			as_dict=True,
-		)
-		for r in rows:
-			r.from_date = getdate(r.from_date)
-			r.to_date = getdate(r.to_date) if r.to_date else None
-			self.ledger[r.employee].append(r)
-
-	def _load_allocations(self):
-		cond, params = "", {"lt": self.leave_type}
-		if self.employees is not None:
-			cond = " AND employee IN %(emps)s"
-			params["emps"] = tuple(self.employees) or ("",)
-
-		rows = frappe.db.sql(
-			f"""
-			SELECT name, employee, from_date, to_date, total_leaves_allocated, unused_leaves
-			FROM `tabLeave Allocation`
-			WHERE docstatus = 1 AND leave_type = %(lt)s {cond}
-			ORDER BY employee, to_date
-			""",
-			params,
-			as_dict=True,
+		from customize_erpnext.overrides.leave_reports.leave_balance_store import (
+			get_leave_balance_indexes,
 		)
-		for r in rows:
-			r.from_date = getdate(r.from_date)
-			r.to_date = getdate(r.to_date)
-			self.allocations[r.employee].append(r)
+
+		self.leave_type = leave_type
+		self.indexes = get_leave_balance_indexes(leave_type, employees)
+
+	def _index(self, employee: str):
+		from customize_erpnext.overrides.leave_reports.leave_balance_index import EMPTY
+
+		return self.indexes.get(employee) or EMPTY
 
 	# --------------------------------------------------- vắt biên -> fallback
 	def has_straddling_entry(self, employee: str, from_date, to_date) -> bool:
 		"""Có entry nghỉ nào bị biên kỳ cắt ngang không (xem docstring module)."""
-		f, t = getdate(from_date), getdate(to_date)
-		for e in self.ledger.get(employee, ()):
-			if e.transaction_type != "Leave Application":
-				continue
-			if e.to_date is None:
-				continue
-			overlaps = e.from_date <= t and e.to_date >= f
-			if overlaps and (e.from_date < f or e.to_date > t):
-				return True
-		return False
+		return self._index(employee).has_straddling_entry(getdate(from_date), getdate(to_date))
 
 	def leaves_taken(self, employee: str, from_date, to_date) -> float:
 		"""Số ngày đã nghỉ trong kỳ, **số dương** (ledger lưu số âm).
@@ -190,58 +148,26 @@ class LeaveBalanceEngine:
 
 			return flt(get_leaves_for_period(employee, self.leave_type, from_date, to_date)) * -1
 
-		f, t = getdate(from_date), getdate(to_date)
-		total = 0.0
-		for e in self.ledger.get(employee, ()):
-			if e.transaction_type != "Leave Application" or e.leaves >= 0:
-				continue
-			if e.from_date >= f and e.to_date is not None and e.to_date <= t:
-				total += flt(e.leaves)
-		return total * -1
+		return self._index(employee).leaves_taken(getdate(from_date), getdate(to_date))
 
 	# ------------------------------------------------ 3 cột phân bổ / hết hạn
 	def allocated(self, employee: str, from_date, to_date) -> float:
 		"""Khớp `get_allocated_leaves`: Allocation + Adjustment, chưa hết hạn, không CF."""
-		f, t = getdate(from_date), getdate(to_date)
-		return sum(
-			flt(e.leaves)
-			for e in self.ledger.get(employee, ())
-			if e.transaction_type in ("Leave Allocation", "Leave Adjustment")
-			and not e.is_expired
-			and not e.is_carry_forward
-			and f <= e.from_date <= t
-		)
+		return self._index(employee).allocated(getdate(from_date), getdate(to_date))
 
 	def expired(self, employee: str, from_date, to_date) -> float:
 		"""Khớp `get_expired_leaves`: ABS(SUM) — from_date HOẶC to_date nằm trong kỳ."""
-		f, t = getdate(from_date), getdate(to_date)
-		total = sum(
-			flt(e.leaves)
-			for e in self.ledger.get(employee, ())
-			if e.transaction_type == "Leave Allocation"
-			and e.is_expired
-			and ((f <= e.from_date <= t) or (e.to_date is not None and f <= e.to_date <= t))
-		)
-		return abs(total)
+		return self._index(employee).expired(getdate(from_date), getdate(to_date))
 
 	def carry_forwarded(self, employee: str, from_date, to_date) -> float:
 		"""Khớp `get_cf_leaves`: Allocation, chưa hết hạn, is_carry_forward = 1."""
-		f, t = getdate(from_date), getdate(to_date)
-		return sum(
-			flt(e.leaves)
-			for e in self.ledger.get(employee, ())
-			if e.transaction_type == "Leave Allocation"
-			and not e.is_expired
-			and e.is_carry_forward
-			and f <= e.from_date <= t
-		)
+		return self._index(employee).carry_forwarded(getdate(from_date), getdate(to_date))
 
 	# ------------------------------------------------------- số dư đầu kỳ
 	def previous_allocation(self, employee: str, before_date):
 		"""Khớp `get_previous_allocation`: allocation gần nhất có to_date < before_date."""
-		d = getdate(before_date)
-		prev = [a for a in self.allocations.get(employee, ()) if a.to_date < d]
-		return max(prev, key=lambda a: a.to_date) if prev else None
+		prev = self._index(employee).previous_allocation(getdate(before_date))
+		return frappe._dict(name=prev[0], from_date=prev[1], to_date=prev[2]) if prev else None
 
 	def allocation_record_on(self, employee: str, date):
 		"""Khớp `get_leave_allocation_records(employee, date, leave_type)`.
@@ -250,84 +176,22 @@ class LeaveBalanceEngine:
 		 · dòng mới (is_carry_forward=0) thì to_date >= date
 		 · dòng CF thì to_date phải nằm trong khoảng của Leave Allocation chứa nó
 		"""
-		d = getdate(date)
-		cf = new = 0.0
-		froms, tos = [], []
-
-		alloc_range = {a.name: (a.from_date, a.to_date) for a in self.allocations.get(employee, ())}
-
-		for e in self.ledger.get(employee, ()):
-			if e.transaction_type not in ("Leave Allocation", "Leave Adjustment"):
-				continue
-			if e.is_expired or e.from_date > d:
-				continue
-
-			if not e.is_carry_forward:
-				if e.to_date is None or e.to_date < d:
-					continue
-			else:
-				rng = alloc_range.get(e.transaction_name)
-				if not rng:
-					continue
-				a_from, a_to = rng
-				if not (e.to_date and a_from <= e.to_date <= a_to):
-					continue
-				if not (a_from <= d <= a_to):
-					continue
-
-			if e.is_carry_forward:
-				cf += flt(e.leaves)
-			else:
-				new += flt(e.leaves)
-
-			froms.append(e.from_date)
-			if e.to_date:
-				tos.append(e.to_date)
-
-		if not froms:
+		record = self._index(employee).allocation_record_on(getdate(date))
+		if not record:
 			return frappe._dict()
-
-		return frappe._dict(
-			employee=employee,
-			leave_type=self.leave_type,
-			from_date=min(froms),
-			to_date=max(tos) if tos else None,
-			total_leaves_allocated=cf + new,
-			unused_leaves=cf,
-			new_leaves_allocated=new,
-		)
+		return frappe._dict(record, employee=employee, leave_type=self.leave_type)
 
 	def cf_expiry(self, employee: str, to_date, alloc_from_date):
 		"""Khớp `get_allocation_expiry_for_cf_leaves`."""
 		if not alloc_from_date:
 			return ""
-		f, t = getdate(alloc_from_date), getdate(to_date)
-		for e in self.ledger.get(employee, ()):
-			if (
-				e.is_carry_forward
-				and e.transaction_type == "Leave Allocation"
-				and e.to_date is not None
-				and f <= e.to_date <= t
-			):
-				return e.to_date
-		return ""
+		return self._index(employee).cf_expiry(getdate(to_date), getdate(alloc_from_date))
 
 	def manually_expired(self, employee: str, from_date, end_date) -> float:
 		"""Khớp `get_manually_expired_leaves` — lưu ý HRMS lấy DÒNG ĐẦU, không SUM."""
 		if not from_date:
 			return 0.0
-		f, t = getdate(from_date), getdate(end_date)
-		for e in self.ledger.get(employee, ()):
-			if (
-				e.transaction_type == "Leave Allocation"
-				and e.is_expired
-				and not e.is_carry_forward
-				and e.from_date >= f
-				and e.to_date is not None
-				and e.to_date < t
-			):
-				return flt(e.leaves)
-		return 0.0
+		return self._index(employee).manually_expired(getdate(from_date), getdate(end_date))
 
 	def balance_on(self, employee: str, date) -> float:
 		"""Khớp `get_leave_balance_on(employee, leave_type, date)` (không consumption).
@@ -352,3 +216,33 @@ class LeaveBalanceEngine:
 			return flt(get_leave_balance_on(employee, self.leave_type, d))
 
 		return flt(alloc.total_leaves_allocated) + flt(taken) + flt(manual)
+
+	def balance_for_consumption(self, employee: str, date):
+		"""Số dư cho đơn nghỉ bắt đầu `date` — None nếu phải hỏi HRMS.
+
+		Như `get_leave_balance_on(..., consider_all_leaves_in_the_allocation_period=True,
+		for_consumption=True)`: trừ mọi ngày nghỉ trong CẢ kỳ phân bổ; trả
+		`{leave_balance, leave_balance_for_consumption}`, phần sau không vượt số ngày còn
+		lại tới hết kỳ. Các nhánh khó (vắt biên, có phép chuyển sang, có Leave Encashment)
+		trả None để caller gọi HRMS.
+		"""
+		d = getdate(date)
+		alloc = self.allocation_record_on(employee, d)
+		if not alloc or not alloc.to_date:
+			return None
+		if alloc.unused_leaves:
+			# HRMS xét hạn phép chuyển sang theo to_date của đơn — giao hết cho HRMS
+			return None
+		index = self._index(employee)
+		if index.has_encashment(alloc.from_date, alloc.to_date):
+			return None
+		if self.has_straddling_entry(employee, alloc.from_date, alloc.to_date):
+			return None
+
+		taken = index.leaves_taken(alloc.from_date, alloc.to_date)
+		manual = min(self.manually_expired(employee, alloc.from_date, alloc.to_date), 0.0)
+		balance = flt(alloc.total_leaves_allocated) - flt(taken) + flt(manual)
+		remaining = balance
+		if remaining > 0:
+			remaining = min(remaining, frappe.utils.date_diff(alloc.to_date, d) + 1)
+		return frappe._dict(leave_balance=balance, leave_balance_for_consumption=remaining)
@@ -13,7 +13,8 @@ from customize_erpnext.overrides.employee_checkin.employee_checkin import (
 	custom_mark_attendance_and_link_log
 )
 from customize_erpnext.api.employee.employee_utils import (
-	check_employee_maternity_status
+	check_employee_maternity_status,
+	load_maternity_index,
 )
 from customize_erpnext.customize_erpnext.doctype.attendance_calculation_setting.attendance_calculation_setting import (
 	get_force_update_hours
@@ -441,6 +442,8 @@ def mark_bulk_attendance_absent_maternity_leave(employees=None, days=None):
 	for batch in create_batch(all_employees, EMPLOYEE_CHUNK_SIZE):
 		# Collect all attendance docs for this batch
 		attendance_docs = []
+		# One Employee Maternity query per batch instead of one per (employee, day)
+		maternity_index = load_maternity_index(batch)
 
 		for employee in batch:
 			# Get existing attendance for these specific days
@@ -489,7 +492,7 @@ def mark_bulk_attendance_absent_maternity_leave(employees=None, days=None):
 			# Prepare attendance docs for each unmarked day
 			for date in filtered_unmarked_days:
 				# Check maternity status
-				maternity_status, custom_maternity_benefit = check_employee_maternity_status(employee, date)
+				maternity_status, custom_maternity_benefit = check_employee_maternity_status(employee, date, maternity_index)
 
 				# Determine attendance status
 				status = 'Maternity Leave' if maternity_status == 'Maternity Leave' else 'Absent'
@@ -36,6 +36,7 @@ from customize_erpnext.customize_erpnext.doctype.attendance_calculation_setting.
 
 # Single source of truth for the async hand-off size, shared with attendance_list.js
 from customize_erpnext.overrides.shift_type.attendance_config import BULK_ATTENDANCE_ASYNC_THRESHOLD
+from customize_erpnext.overrides.interval_index import IntervalIndex
 # Quy tac nghi phep dung chung voi luong Leave Application. Engine luon ghi sau cung nen hai
 # ben BUOC phai dung cung mot ham quyet dinh, neu khong moi FULL run lai ghi de lan nhau.
 # Xem overrides/leave_application/PLAN_LEAVE_OVERRIDE.md GD 1-3.
@@ -658,24 +659,24 @@ def preload_reference_data(employee_list: List[str], from_date: str, to_date: st
 
 	# Build index: (employee, date) -> list of leave details
 	# Use list to support dual leave: 2 Half Day LAs on same date
+	# (IntervalIndex.expand: days covered by several LAs keep query order)
+	leave_index = IntervalIndex()
+	leave_span = {}
 	for record in leave_records:
-		current_date = getdate(record.from_date)
-		end_date = getdate(record.to_date)
-
+		from_d, to_d = getdate(record.from_date), getdate(record.to_date)
 		leave_abbr = data['leave_type_abbreviations'].get(record.leave_type, record.leave_type[:2].upper())
-
-		while current_date <= end_date:
-			key = (record.employee, current_date)
-			if key not in data['leave_applications']:
-				data['leave_applications'][key] = []
-			data['leave_applications'][key].append({
-				'leave_type': record.leave_type,
-				'leave_application': record.leave_application,
-				'is_half_day': record.half_day,
-				'half_day_date': getdate(record.half_day_date) if record.half_day_date else None,
-				'abbreviation': leave_abbr
-			})
-			current_date = frappe.utils.add_days(current_date, 1)
+		leave_index.add(record.employee, from_d, to_d, {
+			'leave_type': record.leave_type,
+			'leave_application': record.leave_application,
+			'is_half_day': record.half_day,
+			'half_day_date': getdate(record.half_day_date) if record.half_day_date else None,
+			'abbreviation': leave_abbr
+		})
+		span = leave_span.get(record.employee)
+		leave_span[record.employee] = (min(span[0], from_d), max(span[1], to_d)) if span else (from_d, to_d)
+	for emp_id, (span_from, span_to) in leave_span.items():
+		for leave_day, details in leave_index.expand(emp_id, span_from, span_to):
+			data['leave_applications'][(emp_id, leave_day)] = list(details)
 
 	total_leave_days = len(data['leave_applications'])
 	print(f"   ✓ Loaded {len(leave_records)} leave applications ({total_leave_days} leave-days)")
@@ -748,6 +749,38 @@ def preload_reference_data(employee_list: List[str], from_date: str, to_date: st
 	return data
 
 
+def _maternity_index(ref_data: Dict) -> IntervalIndex:
+	"""IntervalIndex over ref_data['maternity_tracking'], built on first use and kept in ref_data."""
+	index = ref_data.get('_maternity_index')
+	if index is None:
+		index = IntervalIndex()
+		for emp_id, records in ref_data.get('maternity_tracking', {}).items():
+			for record in records:
+				# effective_to_date = to_date if set, else estimated_due_date
+				effective_to_date = record.get('effective_to_date') or record.get('to_date') or record.get('estimated_due_date')
+				if effective_to_date:
+					index.add(emp_id, record['from_date'], effective_to_date, record)
+		ref_data['_maternity_index'] = index
+	return index
+
+
+def _shift_index(ref_data: Dict) -> IntervalIndex:
+	"""IntervalIndex over ref_data['shift_assignments'] (newest start_date first wins)."""
+	index = ref_data.get('_shift_index')
+	if index is None:
+		index = IntervalIndex()
+		for emp_id, assignments in ref_data['shift_assignments'].items():
+			for assign in assignments:
+				index.add(
+					emp_id,
+					getdate(assign.start_date),
+					getdate(assign.end_date) if assign.end_date else None,
+					assign.shift_type
+				)
+		ref_data['_shift_index'] = index
+	return index
+
+
 def check_maternity_status_cached(employee: str, attendance_date: date, ref_data: Dict) -> Tuple[Optional[str], bool]:
 	"""
 	Check employee maternity status using preloaded data (no DB queries).
@@ -764,30 +797,24 @@ def check_maternity_status_cached(employee: str, attendance_date: date, ref_data
 			- maternity_status: 'Pregnant', 'Maternity Leave', 'Young Child', or None
 			- apply_pregnant_benefit: True if should reduce working hours by 1 hour
 	"""
-	maternity_records = ref_data.get('maternity_tracking', {}).get(employee, [])
-
-	for record in maternity_records:
-		# Check if date is within the maternity period
-		# effective_to_date = to_date if set, else estimated_due_date
-		effective_to_date = record.get('effective_to_date') or record.get('to_date') or record.get('estimated_due_date')
-		if not effective_to_date:
-			continue
-		if record['from_date'] <= attendance_date <= effective_to_date:
-			maternity_status = record['type']
-			apply_pregnant_benefit = False
+	# First period (in maternity_tracking order) that contains the date
+	record = _maternity_index(ref_data).get(employee, attendance_date)
+	if not record:
+		return (None, False)
 
-			# Logic:
-			# - Young Child: always apply benefit (reduce working hours)
-			# - Maternity Leave: always apply benefit
-			# - Pregnant: only if apply_benefit checkbox is ticked
-			if record['type'] in ('Young Child', 'Maternity Leave'):
-				apply_pregnant_benefit = True
-			elif record['type'] == 'Pregnant' and record.get('apply_benefit'):
-				apply_pregnant_benefit = True
+	maternity_status = record['type']
+	apply_pregnant_benefit = False
 
-			return (maternity_status, apply_pregnant_benefit)
+	# Logic:
+	# - Young Child: always apply benefit (reduce working hours)
+	# - Maternity Leave: always apply benefit
+	# - Pregnant: only if apply_benefit checkbox is ticked
+	if record['type'] in ('Young Child', 'Maternity Leave'):
+		apply_pregnant_benefit = True
+	elif record['type'] == 'Pregnant' and record.get('apply_benefit'):
+		apply_pregnant_benefit = True
 
-	return (None, False)
+	return (maternity_status, apply_pregnant_benefit)
 
 
 def check_leave_status_cached(employee: str, attendance_date: date, ref_data: Dict) -> Optional[Dict]:
@@ -894,17 +921,11 @@ def get_employee_shift_cached(
 		# datetime object
 		attendance_date = attendance_date.date()
 
-	# Assignments are pre-sorted by start_date desc in preload_reference_data()
-	assignments = ref_data['shift_assignments'].get(employee, [])
-
-	for assign in assignments:
-		# Ensure dates are comparable
-		start_date = getdate(assign.start_date) if isinstance(assign.start_date, str) else assign.start_date
-		end_date = getdate(assign.end_date) if assign.end_date and isinstance(assign.end_date, str) else assign.end_date
-
-		if start_date <= attendance_date:
-			if not end_date or end_date >= attendance_date:
-				return assign.shift_type
+	# Assignments are pre-sorted by start_date desc in preload_reference_data(),
+	# so the index returns the newest assignment covering the date
+	shift_type = _shift_index(ref_data).get(employee, attendance_date)
+	if shift_type:
+		return shift_type
 
 	# Priority: Shift Assignment (above) -> employee default_shift -> configured
 	# default shift (all null => default so a shift is always resolved)
@@ -2538,7 +2559,7 @@ def _core_process_attendance_logic_optimized(
 	if employees_skipped > 0:
 		all_employees_set = set(employees)
 		skipped_set = all_employees_set - employees_with_attendance_set
-		maternity_tracking = ref_data.get('maternity_tracking', {})
+		maternity_index = _maternity_index(ref_data)
 		from_date_d = getdate(from_date)
 		to_date_d = getdate(to_date)
 
@@ -2547,14 +2568,10 @@ def _core_process_attendance_logic_optimized(
 			emp_name = emp_data.employee_name if emp_data else emp_id
 
 			# Reason 1: Maternity Leave phase overlaps date range
-			is_maternity = False
-			for period in maternity_tracking.get(emp_id, []):
-				if period.get('type') == 'Maternity Leave':
-					p_from = period.get('from_date')
-					p_to = period.get('effective_to_date')
-					if p_from and p_to and p_from <= to_date_d and p_to >= from_date_d:
-						is_maternity = True
-						break
+			is_maternity = any(
+				period.get('type') == 'Maternity Leave'
+				for period in maternity_index.overlapping(emp_id, from_date_d, to_date_d)
+			)
 			if is_maternity:
 				skipped_details.append({"employee": emp_id, "employee_name": emp_name, "reason": "Maternity Leave"})
 				continue
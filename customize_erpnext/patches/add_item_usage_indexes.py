@@ -0,0 +1,50 @@
+"""
+Indexes for the unused-variant analysis (api/item/unused_variants.py).
+
+Every USAGE_SOURCES entry is an EXISTS probe on the item column of that table;
+without an index leading on that column each probe is a full scan per variant.
+Some of these columns are already indexed by ERPNext depending on version, so
+each index is only created when no existing index starts with the column.
+
+Safe to run multiple times.
+"""
+
+import frappe
+
+
+ITEM_USAGE_COLUMNS = (
+    ("tabStock Ledger Entry", "item_code"),
+    ("tabBin", "item_code"),
+    ("tabBOM", "item"),
+    ("tabBOM Item", "item_code"),
+    ("tabSales Order Item", "item_code"),
+    ("tabMaterial Request Item", "item_code"),
+    ("tabWork Order", "production_item"),
+    ("tabWork Order Item", "item_code"),
+)
+
+
+def execute():
+    for table, column in ITEM_USAGE_COLUMNS:
+        _add_leading_index_if_missing(table, column)
+
+
+def _add_leading_index_if_missing(table, column):
+    """Create idx_<column> unless some index on the table already leads with column."""
+    exists = frappe.db.sql("""
+        SELECT COUNT(*)
+        FROM information_schema.STATISTICS
+        WHERE table_schema = DATABASE()
+          AND table_name   = %s
+          AND column_name  = %s
+          AND seq_in_index = 1
+    """, (table, column))[0][0]
+
+    if exists:
+        print(f"   ⏭  {table}.{column} already indexed")
+        return
+
+    index_name = f"idx_usage_{column}"
+    frappe.db.sql(f"CREATE INDEX `{index_name}` ON `{table}` (`{column}`)")
+    frappe.db.commit()
+    print(f"   ✅ Created index: {index_name} on {table} ({column})")
@@ -0,0 +1,70 @@
+/**
+ * Background File Job - Shared Module
+ * Client side shared by ZipExport and PdfBatch: the server queues a job that
+ * writes a private file (customize_erpnext.api.job_files) and answers with a
+ * job_id; the realtime `<event>` for that job carries the result.
+ *
+ * - Events can arrive before the caller knows its job_id (fast job, slow
+ *   response): they are kept in `unclaimed` and delivered on watch().
+ * - The file is offered as a link in a dialog, not window.open(): the event is
+ *   a socket callback, not a user click, so browsers block the popup.
+ */
+
+window.BackgroundFileJob = {
+
+    watchers: {},
+    unclaimed: {},
+    listening: {},
+
+    /**
+     * Listen for `event` (call before the server request so no event is missed).
+     * @param {string} event - realtime event name
+     */
+    listen(event) {
+        if (this.listening[event]) return;
+        this.listening[event] = true;
+        frappe.realtime.on(event, (data) => {
+            if (!data || !data.job_id) return;
+            const watcher = this.watchers[data.job_id];
+            if (!watcher) {
+                this.unclaimed[data.job_id] = data;
+                return;
+            }
+            delete this.watchers[data.job_id];
+            this.finish(watcher, data);
+        });
+    },
+
+    /**
+     * @param {string} event - realtime event name
+     * @param {string} job_id
+     * @param {Object} opts - {url_key, title, error_message, describe(data)}
+     */
+    watch(event, job_id, opts) {
+        this.listen(event);
+        const early = this.unclaimed[job_id];
+        if (early) {
+            delete this.unclaimed[job_id];
+            this.finish(opts, early);
+            return;
+        }
+        this.watchers[job_id] = opts;
+    },
+
+    finish(opts, data) {
+        frappe.hide_progress();
+        if (!data.success) {
+            frappe.msgprint({
+                title: __('Lỗi'),
+                indicator: 'red',
+                message: __(opts.error_message, [data.error || ''])
+            });
+            return;
+        }
+        const url = data[opts.url_key];
+        let message = `<a href="${frappe.utils.escape_html(url)}" target="_blank" rel="noopener">`
+            + `${frappe.utils.escape_html(data.filename || url.split('/').pop())}</a>`;
+        if (opts.describe) message += opts.describe(data);
+        frappe.msgprint({ title: opts.title, indicator: 'green', message });
+    }
+};
@@ -1899,6 +1899,7 @@ function generate_cards_for_employees(employee_ids, with_barcode, page_size, nam
             method: 'customize_erpnext.api.employee.employee_utils.generate_employee_cards_pdf',
             args: common_args,
             callback: function (r) {
+                if (PdfBatch.handle(r.message)) return;
                 if (r.message && r.message.pdf_data && r.message.pdf_filename) {
                     frappe.show_alert({ message: __('Employee cards generated successfully'), indicator: 'green' });
                     const linkSource = `data:application/pdf;base64,${r.message.pdf_data}`;
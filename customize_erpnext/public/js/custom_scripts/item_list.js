@@ -554,7 +554,10 @@ function generate_qr_labels_pdf(values, listview, dialog) {
             // Restore button state
             generate_btn.text(original_text).prop('disabled', false);
 
-            if (r.message) {
+            if (PdfBatch.handle(r.message)) {
+                // Large run: rendered in background, opened on pdf_batch_done
+                dialog.hide();
+            } else if (r.message) {
                 // Download PDF
                 download_pdf(r.message.pdf_data, r.message.filename);
 
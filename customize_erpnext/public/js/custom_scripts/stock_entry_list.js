@@ -369,44 +369,79 @@ function import_material_issue_entries(values, dialog) {
     `;
     dialog.set_value('import_results', import_progress_html);
 
-    let import_progress = 0;
-    const import_interval = setInterval(() => {
-        import_progress += Math.random() * 15;
-        if (import_progress > 95) import_progress = 95;
-        $('#import-progress-bar').css('width', import_progress + '%');
-
-        if (import_progress > 20 && import_progress < 50) {
-            $('#import-status').text(__('Creating stock entries...'));
-            $('#import-details').show();
-        } else if (import_progress >= 50 && import_progress < 80) {
-            $('#import-status').text(__('Validating stock movements...'));
-        } else if (import_progress >= 80) {
-            $('#import-status').text(__('Finalizing import...'));
+    run_stock_entry_import_job('Material Issue', file_url, dialog, '', display_import_results);
+}
+
+// Import chạy nền: server tạo Stock Entry theo chunk, báo tiến độ qua realtime.
+// Job lỗi giữa chừng có thể Resume — các nhóm custom_no đã tạo sẽ được bỏ qua.
+function run_stock_entry_import_job(purpose, file_url, dialog, prefix, display_results) {
+    const pipeline = 'customize_erpnext.api.bulk_update_scripts.stock_entry_import_pipeline';
+    let job_id = null;
+    // Job nhanh có thể báo tiến độ / xong trước khi frappe.call trả job_id về
+    let buffered = [];
+
+    const on_event = (data) => {
+        if (!data) return;
+        if (!job_id) {
+            buffered.push(data);
+            return;
         }
-    }, 300);
+        on_progress(data);
+    };
 
-    frappe.call({
-        method: 'customize_erpnext.api.bulk_update_scripts.create_material_issue.import_material_issue_from_excel',
-        args: {
-            file_url: file_url
-        },
-        callback: function (r) {
-            clearInterval(import_interval);
-            $('#import-progress-bar').css('width', '100%');
-
-            setTimeout(() => {
-                if (r.message) {
-                    display_import_results(r.message, dialog);
-                } else {
-                    dialog.set_value('import_results', `<div class="alert alert-danger">${__('Import failed')}</div>`);
-                }
-            }, 500);
-        },
-        error: function (r) {
-            clearInterval(import_interval);
-            dialog.set_value('import_results', `<div class="alert alert-danger">${__('Error')}: ${r.message || __('Unknown error')}</div>`);
+    const on_progress = (data) => {
+        if (!data || data.job_id !== job_id) return;
+        $(`#${prefix}import-progress-bar`).css('width', (data.progress_pct || 0) + '%');
+        $(`#${prefix}import-status`).text(data.phase || '');
+        if (data.total_groups) {
+            $(`#${prefix}import-details`).show();
+            $(`#${prefix}groups-processed`).text(data.done_groups);
+            $(`#${prefix}total-groups`).text(data.total_groups);
         }
-    });
+        if (['done', 'partial', 'error'].includes(data.status)) {
+            frappe.realtime.off('stock_entry_import_progress', on_event);
+            frappe.call({
+                method: `${pipeline}.get_stock_entry_import_status`,
+                args: { job_id: job_id },
+                callback: (r) => show_result(r.message)
+            });
+        }
+    };
+
+    const show_result = (result) => {
+        if (!result || result.status === 'not_found') {
+            dialog.set_value('import_results', `<div class="alert alert-danger">${__('Import failed')}</div>`);
+            return;
+        }
+        display_results(result, dialog);
+        if (result.can_resume) {
+            const $resume = $(`<button class="btn btn-sm btn-warning mt-2">
+                <i class="fa fa-repeat"></i> ${__('Resume Import')}</button>`);
+            $resume.on('click', () => start(`${pipeline}.resume_stock_entry_import`, { job_id: result.job_id }));
+            dialog.fields_dict.import_results.$wrapper.append($resume);
+        }
+    };
+
+    const start = (method, args) => {
+        frappe.realtime.on('stock_entry_import_progress', on_event);
+        frappe.call({
+            method: method,
+            args: args,
+            callback: (r) => {
+                job_id = r.message && r.message.job_id;
+                $(`#${prefix}import-status`).text(__('Queued...'));
+                const early = buffered;
+                buffered = [];
+                early.forEach(on_progress);
+            },
+            error: (r) => {
+                frappe.realtime.off('stock_entry_import_progress', on_event);
+                dialog.set_value('import_results', `<div class="alert alert-danger">${__('Error')}: ${r.message || __('Unknown error')}</div>`);
+            }
+        });
+    };
+
+    start(`${pipeline}.enqueue_stock_entry_import`, { file_url: file_url, purpose: purpose });
 }
 
 function display_import_results(import_result, dialog) {
@@ -912,44 +947,7 @@ function import_material_receipt_entries(values, dialog) {
     `;
     dialog.set_value('import_results', import_progress_html);
 
-    let import_progress = 0;
-    const import_interval = setInterval(() => {
-        import_progress += Math.random() * 15;
-        if (import_progress > 95) import_progress = 95;
-        $('#receipt-import-progress-bar').css('width', import_progress + '%');
-
-        if (import_progress > 20 && import_progress < 50) {
-            $('#receipt-import-status').text(__('Creating stock entries...'));
-            $('#receipt-import-details').show();
-        } else if (import_progress >= 50 && import_progress < 80) {
-            $('#receipt-import-status').text(__('Validating stock movements...'));
-        } else if (import_progress >= 80) {
-            $('#receipt-import-status').text(__('Finalizing import...'));
-        }
-    }, 300);
-
-    frappe.call({
-        method: 'customize_erpnext.api.bulk_update_scripts.create_material_receipt.import_material_receipt_from_excel',
-        args: {
-            file_url: file_url
-        },
-        callback: function (r) {
-            clearInterval(import_interval);
-            $('#receipt-import-progress-bar').css('width', '100%');
-
-            setTimeout(() => {
-                if (r.message) {
-                    display_receipt_import_results(r.message, dialog);
-                } else {
-                    dialog.set_value('import_results', `<div class="alert alert-danger">${__('Import failed')}</div>`);
-                }
-            }, 500);
-        },
-        error: function (r) {
-            clearInterval(import_interval);
-            dialog.set_value('import_results', `<div class="alert alert-danger">${__('Error')}: ${r.message || __('Unknown error')}</div>`);
-        }
-    });
+    run_stock_entry_import_job('Material Receipt', file_url, dialog, 'receipt-', display_receipt_import_results);
 }
 
 function display_receipt_import_results(import_result, dialog) {
@@ -0,0 +1,31 @@
+/**
+ * PDF Batch - Shared Module
+ * Client side of customize_erpnext.api.pdf_batch: large label / card PDFs are
+ * rendered in a background job; the server answers {background_job, job_id}
+ * and a link to the file is shown when the `pdf_batch_done` realtime event
+ * arrives. Event handling lives in BackgroundFileJob (background_file_job.js).
+ */
+
+window.PdfBatch = {
+
+    /**
+     * @param {Object} response - server reply with background_job / job_id
+     * @returns {boolean} true if the reply was a queued background job
+     */
+    handle(response) {
+        if (!response || !response.background_job) return false;
+        frappe.show_alert({
+            message: __('Đang tạo PDF trong nền, link tải sẽ hiện khi xong...'),
+            indicator: 'blue'
+        }, 7);
+        BackgroundFileJob.watch('pdf_batch_done', response.job_id, {
+            url_key: 'file_url',
+            title: __('PDF đã sẵn sàng'),
+            error_message: 'PDF generation failed: {0}'
+        });
+        return true;
+    }
+};
+
+// Subscribe once the socket is up, so a job finishing before its request returns is buffered
+$(document).on('app_ready', () => BackgroundFileJob.listen('pdf_batch_done'));
@@ -0,0 +1,47 @@
+/**
+ * ZIP Export - Shared Module
+ * Client side of customize_erpnext.api.zip_export: the server method queues a
+ * background job and returns {job_id, total}; a download link is shown when the
+ * `zip_export_done` realtime event for that job arrives (the bell notification
+ * carries the same link if the user has left the page). Event handling lives
+ * in BackgroundFileJob (background_file_job.js).
+ */
+
+window.ZipExport = {
+
+    /**
+     * @param {string} method - whitelisted method returning {job_id, total}
+     * @param {Object} args - arguments for the method
+     */
+    start(method, args) {
+        BackgroundFileJob.listen('zip_export_done');
+        frappe.call({
+            method: method,
+            args: args,
+            freeze: true,
+            freeze_message: __('Đang gửi yêu cầu tạo ZIP...'),
+            callback: (r) => {
+                if (!r.message || !r.message.job_id) return;
+                frappe.show_alert({
+                    message: __('Đang tạo file ZIP ({0} file) trong nền...', [r.message.total]),
+                    indicator: 'blue'
+                });
+                BackgroundFileJob.watch('zip_export_done', r.message.job_id, {
+                    url_key: 'download_url',
+                    title: __('File ZIP đã sẵn sàng'),
+                    error_message: 'Không tạo được file ZIP: {0}',
+                    describe: (data) => {
+                        let text = ` (${__('{0} file', [data.added])})`;
+                        if (data.missing) {
+                            text += '<br>' + __('{0} file không tìm thấy trên server, đã bỏ qua.', [data.missing]);
+                        }
+                        return text;
+                    }
+                });
+            }
+        });
+    }
+};
+
+// Subscribe once the socket is up, so a job finishing before its request returns is buffered
+$(document).on('app_ready', () => BackgroundFileJob.listen('zip_export_done'));
@@ -0,0 +1,53 @@
+"""Bench-free unit tests for customize_erpnext.api.item.attribute_value_check.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. attribute_value_check.py itself is pure stdlib.
+"""
+
+import importlib.util
+import unittest
+from pathlib import Path
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "customize_erpnext" / "api" / "item" / "attribute_value_check.py"
+_spec = importlib.util.spec_from_file_location("attribute_value_check", _MODULE_PATH)
+avc = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(avc)
+
+ATTRIBUTES = {
+    "Color": {"numeric": False, "abbr": {"Red": "RD", "Blank": ""}, "range": (0, 0, 0)},
+    "Length": {"numeric": True, "abbr": {}, "range": (10, 20, 0.5)},
+}
+
+
+class TestAttributeValueErrors(unittest.TestCase):
+    def test_valid_values(self):
+        self.assertEqual(avc.attribute_value_errors([("Color", "Red"), ("Length", "12.5")], ATTRIBUTES), [])
+        self.assertEqual(avc.attribute_value_errors([("Color", "Blank"), ("Length", 20)], ATTRIBUTES), [])
+
+    def test_unknown_value(self):
+        errors = avc.attribute_value_errors([("Color", "Purple"), ("Length", "11")], ATTRIBUTES)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Purple", errors[0])
+
+    def test_value_is_case_sensitive(self):
+        self.assertEqual(len(avc.attribute_value_errors([("Color", "red")], ATTRIBUTES)), 1)
+
+    def test_unknown_attribute(self):
+        self.assertEqual(avc.attribute_value_errors([("Size", "M")], ATTRIBUTES), ["Attribute Size does not exist"])
+
+    def test_numeric_range_and_increment(self):
+        self.assertEqual(len(avc.attribute_value_errors([("Length", "21")], ATTRIBUTES)), 1)
+        self.assertEqual(len(avc.attribute_value_errors([("Length", "12.3")], ATTRIBUTES)), 1)
+        self.assertEqual(len(avc.attribute_value_errors([("Length", "abc")], ATTRIBUTES)), 1)
+
+    def test_float_increment_precision(self):
+        self.assertTrue(avc.is_incremental("0.3", 0, 1, 0.1))
+        self.assertFalse(avc.is_incremental("0.35", 0, 1, 0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
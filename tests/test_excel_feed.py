@@ -0,0 +1,106 @@
+"""Bench-free unit tests for customize_erpnext.api.excel_feed.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. excel_feed.py itself is pure stdlib. Walking the keyset
+pages is checked against slicing the full ordered result the OFFSET pages
+returned.
+"""
+
+import csv
+import gzip
+import importlib.util
+import io
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "customize_erpnext" / "api" / "excel_feed.py"
+_spec = importlib.util.spec_from_file_location("excel_feed", _MODULE_PATH)
+feed = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(feed)
+
+
+def keyset_query(table, after, page_size):
+    """What `WHERE name > after ORDER BY name LIMIT n` returns (fresh dicts, like the DB)."""
+    rows = [dict(r) for r in sorted(table, key=lambda r: r["employee"]) if not after or r["employee"] > after]
+    return rows[:page_size] if page_size else rows
+
+
+class TestSplitPage(unittest.TestCase):
+    def test_keyset_walk_matches_full_result(self):
+        table = [
+            {"employee": f"TIQN-{n:04d}", "employee_name": f"NV {n}", feed.IN_SCOPE: int(n % 7 != 0)}
+            for n in range(1, 24)
+        ]
+        data, removed, after, pages = [], [], None, 0
+        while True:
+            page_data, page_removed, after = feed.split_page(keyset_query(table, after, 5), "employee", 5)
+            data += page_data
+            removed += page_removed
+            pages += 1
+            if after is None:
+                break
+
+        self.assertEqual(pages, 5)
+        self.assertEqual([r["employee"] for r in data], [r["employee"] for r in table if r[feed.IN_SCOPE]])
+        self.assertEqual(removed, ["TIQN-0007", "TIQN-0014", "TIQN-0021"])
+        self.assertTrue(all(feed.IN_SCOPE not in r for r in data))
+
+    def test_full_last_page_needs_one_more_request(self):
+        table = [{"employee": f"E{n}", feed.IN_SCOPE: 1} for n in range(4)]
+        _data, _removed, after = feed.split_page(keyset_query(table, None, 4), "employee", 4)
+        self.assertEqual(after, "E3")
+        data, removed, after = feed.split_page(keyset_query(table, after, 4), "employee", 4)
+        self.assertEqual((data, removed, after), ([], [], None))
+
+    def test_page_of_removed_keys_still_advances(self):
+        table = [{"employee": f"E{n}", feed.IN_SCOPE: 0} for n in range(3)]
+        data, removed, after = feed.split_page(keyset_query(table, None, 3), "employee", 3)
+        self.assertEqual((data, removed, after), ([], ["E0", "E1", "E2"], "E2"))
+
+    def test_page_size_zero_is_everything(self):
+        table = [{"employee": f"E{n}", feed.IN_SCOPE: 1} for n in range(3)]
+        data, _removed, after = feed.split_page(keyset_query(table, None, 0), "employee", 0)
+        self.assertEqual(len(data), 3)
+        self.assertIsNone(after)
+
+
+class TestEncoding(unittest.TestCase):
+    def test_clean_value(self):
+        self.assertEqual(feed.clean_value(None), "")
+        self.assertEqual(feed.clean_value(date(2026, 10, 1)), "2026-10-01")
+        self.assertEqual(feed.clean_value(datetime(2026, 10, 1, 7, 30)), "2026-10-01T07:30:00")
+        self.assertEqual(feed.clean_value(3), 3)
+
+    def test_feed_page_size(self):
+        self.assertEqual(feed.feed_page_size("0"), 0)
+        self.assertEqual(feed.feed_page_size(None), 0)
+        self.assertEqual(feed.feed_page_size("500"), 500)
+        self.assertEqual(feed.feed_page_size(-1), feed.DEFAULT_FEED_PAGE_SIZE)
+        self.assertEqual(feed.feed_page_size(feed.MAX_FEED_PAGE_SIZE + 1), feed.MAX_FEED_PAGE_SIZE)
+        self.assertEqual(feed.feed_page_size("abc"), feed.DEFAULT_FEED_PAGE_SIZE)
+
+    def test_csv_gz_roundtrip(self):
+        col_keys = ["employee", "employee_name", "date_of_joining"]
+        rows = [
+            {"employee": "TIQN-0001", "employee_name": "Nguyễn Văn A, \"Tổ 1\"", "date_of_joining": "2024-01-02"},
+            {"employee": "TIQN-0002", "employee_name": "Trần Thị B"},
+        ]
+        values = feed.to_columnar(rows, col_keys)
+        self.assertEqual(values[1], ["TIQN-0002", "Trần Thị B", ""])
+
+        blob = feed.encode_csv_gz(["Mã NV", "Họ và tên", "Ngày vào làm"], values, ["TIQN-0009"], key_index=0)
+        text = gzip.decompress(blob).decode("utf-8")
+        self.assertTrue(text.startswith("\ufeff"))
+        parsed = list(csv.reader(io.StringIO(text[1:])))
+        self.assertEqual(parsed[0], ["Mã NV", "Họ và tên", "Ngày vào làm", feed.REMOVED])
+        self.assertEqual(parsed[1], ["TIQN-0001", "Nguyễn Văn A, \"Tổ 1\"", "2024-01-02", "0"])
+        self.assertEqual(parsed[3], ["TIQN-0009", "", "", "1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
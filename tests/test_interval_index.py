@@ -0,0 +1,129 @@
+"""Bench-free unit tests for customize_erpnext.overrides.interval_index.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. interval_index.py itself is pure stdlib. Every lookup
+is checked against the "first interval in insertion order that contains the
+day" scan that the maternity / shift assignment loops did before the index.
+"""
+
+import importlib.util
+import random
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+_MODULE_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "customize_erpnext" / "overrides" / "interval_index.py"
+)
+_spec = importlib.util.spec_from_file_location("interval_index", _MODULE_PATH)
+interval_index = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(interval_index)
+IntervalIndex = interval_index.IntervalIndex
+
+D = date(2026, 1, 1)
+
+
+def day(n):
+    return D + timedelta(days=n)
+
+
+def scan_all(intervals, key, d):
+    return tuple(
+        value for k, start, end, value in intervals
+        if k == key and start <= d and (end is None or d <= end)
+    )
+
+
+class TestIntervalIndex(unittest.TestCase):
+    def test_insertion_order_is_priority(self):
+        # Shift assignments newest first: the later one wins where they overlap
+        index = IntervalIndex()
+        index.add("EMP-1", day(30), None, "Night")
+        index.add("EMP-1", day(0), day(59), "Day")
+        self.assertEqual(index.get("EMP-1", day(10)), "Day")
+        self.assertEqual(index.get("EMP-1", day(45)), "Night")
+        self.assertEqual(index.get("EMP-1", day(5000)), "Night")
+        self.assertEqual(index.get_all("EMP-1", day(45)), ("Night", "Day"))
+
+    def test_bounds_inclusive_and_misses(self):
+        index = IntervalIndex()
+        index.add("EMP-1", day(10), day(20), "Pregnant")
+        self.assertIsNone(index.get("EMP-1", day(9)))
+        self.assertEqual(index.get("EMP-1", day(10)), "Pregnant")
+        self.assertEqual(index.get("EMP-1", day(20)), "Pregnant")
+        self.assertIsNone(index.get("EMP-1", day(21)))
+        self.assertEqual(index.get("EMP-2", day(15), "none"), "none")
+        self.assertEqual(index.get_all("EMP-2", day(15)), ())
+
+    def test_skips_empty_and_inverted(self):
+        index = IntervalIndex()
+        index.add("EMP-1", None, day(5), "x")
+        index.add("EMP-1", day(5), day(4), "y")
+        self.assertNotIn("EMP-1", index)
+        self.assertEqual(index.get_all("EMP-1", day(5)), ())
+
+    def test_add_after_lookup_rebuilds(self):
+        index = IntervalIndex()
+        index.add("EMP-1", day(0), day(10), "a")
+        self.assertEqual(index.get("EMP-1", day(20)), None)
+        index.add("EMP-1", day(15), day(25), "b")
+        self.assertEqual(index.get("EMP-1", day(20)), "b")
+
+    def test_overlapping(self):
+        index = IntervalIndex()
+        index.add("EMP-1", day(0), day(9), "a")
+        index.add("EMP-1", day(20), day(29), "b")
+        index.add("EMP-1", day(5), None, "c")
+        self.assertEqual(index.overlapping("EMP-1", day(10), day(19)), ["c"])
+        self.assertEqual(index.overlapping("EMP-1", day(9), day(20)), ["a", "b", "c"])
+        self.assertEqual(index.overlapping("EMP-2", day(0), day(99)), [])
+
+    def test_expand_matches_day_loop(self):
+        # Leave Applications: the per-day while loop in preload_reference_data
+        index = IntervalIndex()
+        index.add("EMP-1", day(3), day(5), "LA-1")
+        index.add("EMP-1", day(5), day(5), "LA-2")
+        index.add("EMP-1", day(9), day(9), "LA-3")
+        self.assertEqual(list(index.expand("EMP-1", day(0), day(30))), [
+            (day(3), ("LA-1",)),
+            (day(4), ("LA-1",)),
+            (day(5), ("LA-1", "LA-2")),
+            (day(9), ("LA-3",)),
+        ])
+        self.assertEqual(list(index.expand("EMP-1", day(4), day(5))), [
+            (day(4), ("LA-1",)),
+            (day(5), ("LA-1", "LA-2")),
+        ])
+        self.assertEqual(list(index.expand("EMP-2", day(0), day(30))), [])
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(11)
+        intervals = []
+        index = IntervalIndex()
+        for n in range(400):
+            key = f"EMP-{rng.randrange(5)}"
+            start = day(rng.randrange(0, 300))
+            end = None if rng.random() < 0.1 else start + timedelta(days=rng.randrange(0, 60))
+            intervals.append((key, start, end, n))
+            index.add(key, start, end, n)
+
+        for _ in range(2000):
+            key = f"EMP-{rng.randrange(6)}"
+            d = day(rng.randrange(-10, 400))
+            expected = scan_all(intervals, key, d)
+            self.assertEqual(index.get_all(key, d), expected, (key, d))
+            self.assertEqual(index.get(key, d), expected[0] if expected else None)
+
+        for key in ("EMP-0", "EMP-3"):
+            expanded = dict(index.expand(key, day(50), day(120)))
+            for n in range(50, 121):
+                self.assertEqual(expanded.get(day(n), ()), scan_all(intervals, key, day(n)))
+
+
+if __name__ == "__main__":
+    unittest.main()
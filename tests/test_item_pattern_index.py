@@ -0,0 +1,113 @@
+"""Bench-free unit tests for customize_erpnext.api.item.item_pattern_index.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. item_pattern_index.py itself is pure stdlib.
+"""
+
+import importlib.util
+import unittest
+from pathlib import Path
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "customize_erpnext" / "api" / "item" / "item_pattern_index.py"
+_spec = importlib.util.spec_from_file_location("item_pattern_index", _MODULE_PATH)
+ipi = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ipi)
+
+
+def _item(code, detail, variant_of=None):
+    return {
+        "name": code,
+        "item_code": code,
+        "item_name": detail,
+        "stock_uom": "Meter",
+        "custom_item_name_detail": detail,
+        "variant_of": variant_of,
+    }
+
+
+ITEMS = [
+    _item("FAB-001-RED-S", "Fabric Cotton 100% Red S", "FAB-001"),
+    _item("FAB-001-RED-M", "Fabric Cotton 100% Red M", "FAB-001"),
+    _item("FAB-001-BLU-S", "Fabric Cotton 100% Blue S", "FAB-001"),
+    _item("THR-002", "Thread Polyester 40/2 Black"),
+    _item("THR-002-DUP", "Thread Polyester 40/2 Black"),
+]
+
+ATTRIBUTES = [
+    ("FAB-001-RED-S", "Color", "Red"), ("FAB-001-RED-S", "Size", "S"),
+    ("FAB-001-RED-M", "Color", "Red"), ("FAB-001-RED-M", "Size", "M"),
+    ("FAB-001-BLU-S", "Color", "Blue"), ("FAB-001-BLU-S", "Size", "S"),
+]
+
+
+class TestNormalizePattern(unittest.TestCase):
+    def test_case_and_whitespace(self):
+        self.assertEqual(ipi.normalize_pattern("  Fabric   COTTON\tRed "), "fabric cotton red")
+
+    def test_empty(self):
+        self.assertEqual(ipi.normalize_pattern(None), "")
+        self.assertEqual(ipi.normalize_pattern("   "), "")
+
+    def test_unicode_composition(self):
+        # precomposed "ề" vs. "e" + combining circumflex + combining grave
+        self.assertEqual(ipi.normalize_pattern("V\u1ec1"), ipi.normalize_pattern("Ve\u0302\u0300"))
+
+
+class TestItemPatternIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ipi.ItemPatternIndex(ITEMS, ATTRIBUTES)
+
+    def test_exact_is_case_and_space_insensitive(self):
+        item = self.index.exact("fabric  cotton 100% red s ")
+        self.assertEqual(item["item_code"], "FAB-001-RED-S")
+
+    def test_exact_miss(self):
+        self.assertIsNone(self.index.exact("Fabric Cotton 100% Green S"))
+
+    def test_duplicate_detail_keeps_first(self):
+        self.assertEqual(self.index.exact("Thread Polyester 40/2 Black")["item_code"], "THR-002")
+        self.assertEqual(len(self.index), 4)
+
+    def test_item_code(self):
+        self.assertEqual(self.index.item_code("thr-002-dup")["item_code"], "THR-002-DUP")
+
+    def test_variant_by_attribute_set(self):
+        item = self.index.variant("FAB-001", ["S", "red"])
+        self.assertEqual(item["item_code"], "FAB-001-RED-S")
+        self.assertIsNone(self.index.variant("FAB-001", ["Blue", "M"]))
+
+    def test_prefix(self):
+        codes = [i["item_code"] for i in self.index.prefix("Fabric Cotton 100% Red")]
+        self.assertEqual(codes, ["FAB-001-RED-M", "FAB-001-RED-S"])
+        self.assertEqual(len(self.index.prefix("Fabric", limit=2)), 2)
+        self.assertEqual(self.index.prefix(""), [])
+
+    def test_fuzzy_tolerates_typo(self):
+        matches = self.index.fuzzy("Fabric Coton 100% Blue S")
+        self.assertEqual(matches[0][0]["item_code"], "FAB-001-BLU-S")
+
+    def test_fuzzy_without_shared_token_finds_nothing(self):
+        self.assertEqual(self.index.fuzzy("zzz"), [])
+
+    def test_suggest_shape_and_order(self):
+        suggestions = self.index.suggest("Fabric Cotton 100% Red", limit=3)
+        self.assertEqual([s["similarity_score"] for s in suggestions[:2]], [90, 90])
+        self.assertEqual(set(suggestions[0]), {"item_code", "custom_item_name_detail", "similarity_score"})
+        self.assertLessEqual(len(suggestions), 3)
+
+    def test_suggest_exact_first(self):
+        suggestions = self.index.suggest("Fabric Cotton 100% Red S")
+        self.assertEqual(suggestions[0], {
+            "item_code": "FAB-001-RED-S",
+            "custom_item_name_detail": "Fabric Cotton 100% Red S",
+            "similarity_score": 100,
+        })
+        self.assertEqual(len({s["item_code"] for s in suggestions}), len(suggestions))
+
+
+if __name__ == "__main__":
+    unittest.main()
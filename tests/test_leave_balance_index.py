@@ -0,0 +1,156 @@
+"""Bench-free unit tests for customize_erpnext.overrides.leave_reports.leave_balance_index.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. leave_balance_index.py itself is pure stdlib. Every
+bisect / prefix-sum answer is checked against a straight scan of the same rows
+(the way LeaveBalanceEngine computed it before the index).
+"""
+
+import importlib.util
+import random
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+_MODULE_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "customize_erpnext" / "overrides" / "leave_reports" / "leave_balance_index.py"
+)
+_spec = importlib.util.spec_from_file_location("leave_balance_index", _MODULE_PATH)
+lbi = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(lbi)
+
+
+def entry(transaction_type, from_date, to_date, leaves, name="", cf=0, expired=0):
+    return {
+        "transaction_type": transaction_type,
+        "transaction_name": name,
+        "from_date": from_date,
+        "to_date": to_date,
+        "leaves": leaves,
+        "is_carry_forward": cf,
+        "is_expired": expired,
+    }
+
+
+D = date(2026, 1, 1)
+
+
+def day(n):
+    return D + timedelta(days=n)
+
+
+def scan_taken(ledger, f, t):
+    return -sum(
+        e["leaves"] for e in ledger
+        if e["transaction_type"] == "Leave Application" and e["leaves"] < 0
+        and e["from_date"] >= f and e["to_date"] is not None and e["to_date"] <= t
+    )
+
+
+def scan_straddle(ledger, f, t):
+    for e in ledger:
+        if e["transaction_type"] != "Leave Application" or e["to_date"] is None:
+            continue
+        if e["from_date"] <= t and e["to_date"] >= f and (e["from_date"] < f or e["to_date"] > t):
+            return True
+    return False
+
+
+def scan_allocated(ledger, f, t):
+    return sum(
+        e["leaves"] for e in ledger
+        if e["transaction_type"] in ("Leave Allocation", "Leave Adjustment")
+        and not e["is_expired"] and not e["is_carry_forward"] and f <= e["from_date"] <= t
+    )
+
+
+class TestLeaveLedgerIndex(unittest.TestCase):
+    def setUp(self):
+        self.allocations = [{"name": "LA-2026", "from_date": day(0), "to_date": day(364)}]
+        self.ledger = [entry("Leave Allocation", day(0), day(364), 14.0, "LA-2026")]
+        # Earned leave top-ups on the 15th
+        for month in range(1, 12):
+            self.ledger.append(entry("Leave Allocation", day(month * 30 + 14), day(364), 1.17, "LA-2026"))
+        self.ledger += [
+            entry("Leave Application", day(10), day(11), -2.0, "A1"),
+            entry("Leave Application", day(40), day(40), -0.5, "A2"),
+            entry("Leave Application", day(58), day(62), -5.0, "A3"),  # spans end of Feb
+            entry("Leave Application", day(100), day(100), -1.0, "A4"),
+        ]
+        self.index = lbi.LeaveLedgerIndex(self.ledger, self.allocations)
+
+    def test_leaves_taken(self):
+        self.assertEqual(self.index.leaves_taken(day(0), day(364)), 8.5)
+        self.assertEqual(self.index.leaves_taken(day(30), day(57)), 0.5)
+        self.assertEqual(self.index.leaves_taken(day(200), day(300)), 0.0)
+
+    def test_straddling(self):
+        self.assertTrue(self.index.has_straddling_entry(day(60), day(90)))
+        self.assertTrue(self.index.has_straddling_entry(day(30), day(59)))
+        self.assertFalse(self.index.has_straddling_entry(day(58), day(62)))
+        self.assertFalse(self.index.has_straddling_entry(day(63), day(99)))
+
+    def test_allocation_columns(self):
+        self.assertAlmostEqual(self.index.allocated(day(0), day(364)), 14.0 + 11 * 1.17)
+        self.assertAlmostEqual(self.index.allocated(day(1), day(50)), 1.17)
+        self.assertEqual(self.index.carry_forwarded(day(0), day(364)), 0.0)
+
+    def test_allocation_record_on(self):
+        record = self.index.allocation_record_on(day(50))
+        self.assertEqual(record["from_date"], day(0))
+        self.assertEqual(record["to_date"], day(364))
+        self.assertAlmostEqual(record["total_leaves_allocated"], 14.0 + 1.17)
+        self.assertIsNone(self.index.allocation_record_on(day(400)))
+
+    def test_previous_allocation(self):
+        self.assertIsNone(self.index.previous_allocation(day(364)))
+        self.assertEqual(self.index.previous_allocation(day(365))[0], "LA-2026")
+
+    def test_state_round_trip(self):
+        restored = lbi.LeaveLedgerIndex.from_state(self.index.state)
+        self.assertEqual(restored.leaves_taken(day(0), day(364)), 8.5)
+        self.assertAlmostEqual(restored.allocated(day(0), day(364)), 14.0 + 11 * 1.17)
+        self.assertIsNone(lbi.LeaveLedgerIndex.from_state(dict(self.index.state, version=0)))
+        self.assertIsNone(lbi.LeaveLedgerIndex.from_state(None))
+
+    def test_encashment(self):
+        self.assertFalse(self.index.has_encashment(day(0), day(364)))
+        ledger = self.ledger + [entry("Leave Encashment", day(200), day(200), -3.0, "EN1")]
+        index = lbi.LeaveLedgerIndex(ledger, self.allocations)
+        self.assertTrue(index.has_encashment(day(0), day(364)))
+        self.assertFalse(index.has_encashment(day(0), day(199)))
+        self.assertEqual(index.leaves_taken(day(0), day(364)), 8.5)
+
+    def test_empty(self):
+        self.assertEqual(lbi.EMPTY.leaves_taken(day(0), day(10)), 0.0)
+        self.assertFalse(lbi.EMPTY.has_straddling_entry(day(0), day(10)))
+        self.assertIsNone(lbi.EMPTY.allocation_record_on(day(0)))
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+        ledger = [entry("Leave Allocation", day(0), day(364), 14.0, "LA")]
+        for _ in range(300):
+            start = rng.randrange(0, 360)
+            length = rng.randrange(0, 4)
+            ledger.append(entry("Leave Application", day(start), day(start + length), -rng.choice([0.5, 1.0, 2.0])))
+        for _ in range(20):
+            ledger.append(entry("Leave Adjustment", day(rng.randrange(0, 360)), day(364), rng.choice([1.0, -1.0])))
+        ledger.sort(key=lambda e: e["from_date"])
+        index = lbi.LeaveLedgerIndex(ledger, [])
+
+        for _ in range(500):
+            f = day(rng.randrange(0, 365))
+            t = f + timedelta(days=rng.randrange(0, 120))
+            self.assertEqual(index.has_straddling_entry(f, t), scan_straddle(ledger, f, t), (f, t))
+            if not scan_straddle(ledger, f, t):
+                self.assertAlmostEqual(index.leaves_taken(f, t), scan_taken(ledger, f, t), places=6)
+            self.assertAlmostEqual(index.allocated(f, t), scan_allocated(ledger, f, t), places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
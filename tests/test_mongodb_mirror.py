@@ -0,0 +1,122 @@
+"""Tests for customize_erpnext.api.employee.mongodb_mirror.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. mongodb_mirror.py only needs pymongo. The transform
+tests always run (when pymongo is installed); the write tests need a local
+mongod — set MONGODB_TEST_URI (default mongodb://localhost:27017) and they use
+a throw-away database that is dropped afterwards.
+"""
+
+import importlib.util
+import os
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+try:
+    import pymongo
+except ImportError:
+    pymongo = None
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "customize_erpnext" / "api" / "employee" / "mongodb_mirror.py"
+TEST_URI = os.environ.get("MONGODB_TEST_URI", "mongodb://localhost:27017")
+
+if pymongo is not None:
+    _spec = importlib.util.spec_from_file_location("mongodb_mirror", _MODULE_PATH)
+    mm = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(mm)
+
+
+def _mongod_available():
+    if pymongo is None:
+        return False
+    try:
+        pymongo.MongoClient(TEST_URI, serverSelectionTimeoutMS=500).admin.command("ping")
+        return True
+    except Exception:
+        return False
+
+
+def employee(name, **fields):
+    row = {
+        "name": name,
+        "employee_name": f"Nhân viên {name}",
+        "gender": "Female",
+        "department": "Sewing - TIQN",
+        "custom_group": "Line 1",
+        "status": "Active",
+        "attendance_device_id": "123",
+        "date_of_birth": date(1995, 5, 17),
+        "date_of_joining": "2024-01-02",
+        "relieving_date": None,
+    }
+    row.update(fields)
+    return row
+
+
+@unittest.skipIf(pymongo is None, "pymongo not installed")
+class TestTransform(unittest.TestCase):
+    def test_mapping(self):
+        doc = mm.transform_employee_data(employee("TIQN-0001"))
+        self.assertEqual(doc["empId"], "TIQN-0001")
+        self.assertEqual(doc["gender"], "F")
+        self.assertEqual(doc["department"], "Sewing")
+        self.assertEqual(doc["workStatus"], "Working")
+        self.assertEqual(doc["attFingerId"], 123)
+        self.assertEqual(doc["lineTeam"], "Line 1")
+
+    def test_dates_are_bson_datetimes(self):
+        doc = mm.transform_employee_data(employee("TIQN-0001"))
+        self.assertEqual(doc["dob"], datetime(1995, 5, 17))
+        self.assertEqual(doc["joiningDate"], datetime(2024, 1, 2))
+        self.assertEqual(doc["resignOn"], mm.RESIGN_PLACEHOLDER)
+
+    def test_missing_device_id(self):
+        self.assertEqual(mm.transform_employee_data(employee("X", attendance_device_id=None))["attFingerId"], 0)
+        self.assertEqual(mm.transform_employee_data(employee("X", attendance_device_id="n/a"))["attFingerId"], 0)
+
+
+@unittest.skipUnless(_mongod_available(), "no mongod at MONGODB_TEST_URI")
+class TestWrites(unittest.TestCase):
+    def setUp(self):
+        self.client = mm.get_client(TEST_URI)
+        self.db_name = f"test_mongodb_mirror_{os.getpid()}"
+        self.collection = self.client[self.db_name]["Employee"]
+        self.collection.create_index("empId", unique=True)
+
+    def tearDown(self):
+        self.client.drop_database(self.db_name)
+
+    def test_pooled_client(self):
+        self.assertIs(mm.get_client(TEST_URI), self.client)
+
+    def test_bulk_upsert_keeps_numeric_ids(self):
+        self.collection.insert_one(dict(mm.transform_employee_data(employee("A")), _id=7))
+        docs = [mm.transform_employee_data(employee(n)) for n in ("A", "B", "C")]
+        docs[0]["name"] = "Renamed"
+
+        result = mm.bulk_upsert(self.collection, docs, chunk_size=2)
+        self.assertEqual((result["matched"], result["modified"], result["inserted"]), (1, 1, 2))
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(self.collection.find_one({"empId": "A"})["name"], "Renamed")
+        self.assertEqual(sorted(d["_id"] for d in self.collection.find()), [7, 8, 9])
+
+        # Re-running is a no-op
+        again = mm.bulk_upsert(self.collection, docs)
+        self.assertEqual((again["modified"], again["inserted"]), (0, 0))
+
+    def test_upsert_one(self):
+        doc = mm.transform_employee_data(employee("A"))
+        self.assertEqual(mm.upsert_one(self.collection, doc), "inserted")
+        doc["name"] = "Changed"
+        self.assertEqual(mm.upsert_one(self.collection, doc), "updated")
+        stored = self.collection.find_one({"empId": "A"})
+        self.assertEqual((stored["_id"], stored["name"]), (1, "Changed"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Bench-free unit tests for the Overtime Registration interval checks.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. ot_validation.py itself is pure stdlib. first_overlap
+is checked against the O(n²) double loop validate_duplicate_employees used
+before the rows were grouped.
+"""
+
+import importlib.util
+import random
+import unittest
+from datetime import time
+from pathlib import Path
+
+_MODULE_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "customize_erpnext" / "customize_erpnext" / "doctype" / "overtime_registration" / "ot_validation.py"
+)
+_spec = importlib.util.spec_from_file_location("ot_validation", _MODULE_PATH)
+ot = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ot)
+
+
+def t(hhmm):
+    h, m = hhmm.split(":")
+    return time(int(h), int(m))
+
+
+def make_entries(rows):
+    """rows: [(employee, date, "HH:MM", "HH:MM")] → entries with the row dict as payload."""
+    return [
+        (pos, t(begin), t(end), {"idx": pos + 1, "employee": emp, "date": day})
+        for pos, (emp, day, begin, end) in enumerate(rows)
+    ]
+
+
+def by_employee_date(row):
+    return (row["employee"], row["date"])
+
+
+def double_loop(entries):
+    for i in range(len(entries)):
+        for j in range(i + 1, len(entries)):
+            a, b = entries[i], entries[j]
+            if by_employee_date(a[3]) == by_employee_date(b[3]) and ot.overlaps(a[1], a[2], b[1], b[2]):
+                return a[3], b[3]
+    return None
+
+
+class TestFirstOverlap(unittest.TestCase):
+    def test_adjacent_is_not_overlap(self):
+        entries = make_entries([
+            ("E1", "2026-10-01", "17:00", "18:00"),
+            ("E1", "2026-10-01", "18:00", "19:00"),
+            ("E2", "2026-10-01", "17:00", "19:00"),
+        ])
+        self.assertIsNone(ot.first_overlap(ot.group_entries(entries, by_employee_date)))
+
+    def test_reports_first_pair_in_form_order(self):
+        entries = make_entries([
+            ("E2", "2026-10-01", "17:00", "19:00"),
+            ("E1", "2026-10-01", "17:00", "18:00"),
+            ("E2", "2026-10-01", "18:00", "20:00"),
+            ("E1", "2026-10-01", "17:30", "18:30"),
+        ])
+        row1, row2 = ot.first_overlap(ot.group_entries(entries, by_employee_date))
+        self.assertEqual((row1["idx"], row2["idx"]), (1, 3))
+
+    def test_matches_double_loop(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            rows = []
+            for _ in range(rng.randrange(1, 40)):
+                begin = rng.randrange(6 * 60, 22 * 60, 30)
+                end = begin + rng.choice([30, 60, 90, 120])
+                rows.append((
+                    f"E{rng.randrange(8)}", f"2026-10-0{rng.randrange(1, 4)}",
+                    f"{begin // 60}:{begin % 60:02d}", f"{min(end, 23 * 60 + 30) // 60}:{min(end, 23 * 60 + 30) % 60:02d}",
+                ))
+            entries = make_entries(rows)
+            self.assertEqual(ot.first_overlap(ot.group_entries(entries, by_employee_date)), double_loop(entries))
+
+
+class TestZones(unittest.TestCase):
+    def test_split_and_gap(self):
+        entries = make_entries([
+            ("E1", "2026-10-01", "19:00", "20:00"),
+            ("E1", "2026-10-01", "06:00", "07:00"),
+            ("E1", "2026-10-01", "17:00", "18:00"),
+            ("E1", "2026-10-01", "07:00", "08:00"),
+            ("E1", "2026-10-01", "12:00", "13:00"),  # lunch break: neither zone
+        ])
+        pre, post = ot.split_zones(entries, t("08:00"), t("17:00"))
+        self.assertEqual([e[3]["idx"] for e in pre], [2, 4])
+        self.assertEqual([e[3]["idx"] for e in post], [3, 1])
+        self.assertIsNone(ot.first_gap(pre))
+        prev, curr = ot.first_gap(post)
+        self.assertEqual((prev[3]["idx"], curr[3]["idx"]), (3, 1))
+
+    def test_maternity_adjusted_end(self):
+        entries = make_entries([
+            ("E1", "2026-10-01", "16:00", "17:00"),
+            ("E1", "2026-10-01", "17:00", "18:00"),
+        ])
+        _pre, post = ot.split_zones(entries, t("08:00"), t("16:00"))
+        self.assertEqual(len(post), 2)
+        self.assertIsNone(ot.first_gap(post))
+
+
+if __name__ == "__main__":
+    unittest.main()
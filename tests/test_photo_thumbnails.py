@@ -0,0 +1,89 @@
+"""Bench-free unit tests for customize_erpnext.api.employee.photo_thumbnails.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. photo_thumbnails.py only needs stdlib (+ Pillow for
+the actual resizing, which is skipped when Pillow is not installed).
+"""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "customize_erpnext" / "api" / "employee" / "photo_thumbnails.py"
+_spec = importlib.util.spec_from_file_location("photo_thumbnails", _MODULE_PATH)
+pt = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(pt)
+
+
+class TestResolvePhotoPath(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.site = self._tmp.name
+        for sub in ("public/files", "public/files/employee_photos", "private/files"):
+            os.makedirs(os.path.join(self.site, sub))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _touch(self, rel):
+        path = os.path.join(self.site, rel)
+        Path(path).write_bytes(b"x")
+        return path
+
+    def test_public_url(self):
+        path = self._touch("public/files/a.jpg")
+        self.assertEqual(pt.resolve_photo_path("/files/a.jpg", self.site), path)
+
+    def test_private_url(self):
+        path = self._touch("private/files/b.jpg")
+        self.assertEqual(pt.resolve_photo_path("/private/files/b.jpg", self.site), path)
+
+    def test_falls_back_to_basename_in_employee_photos(self):
+        path = self._touch("public/files/employee_photos/c.png")
+        self.assertEqual(pt.resolve_photo_path("/files/old/folder/c.png", self.site), path)
+
+    def test_missing(self):
+        self.assertIsNone(pt.resolve_photo_path("/files/none.jpg", self.site))
+        self.assertIsNone(pt.resolve_photo_path("", self.site))
+
+
+class TestThumbnailKey(unittest.TestCase):
+    def test_changes_with_mtime_and_size(self):
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as f:
+            key = pt.thumbnail_key(f.name, (100, 100))
+            self.assertEqual(key, pt.thumbnail_key(f.name, (100, 100)))
+            self.assertNotEqual(key, pt.thumbnail_key(f.name, (200, 100)))
+            self.assertNotEqual(key, pt.thumbnail_key(f.name, (100, 100), quality=85))
+            stat = os.stat(f.name)
+            os.utime(f.name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertNotEqual(key, pt.thumbnail_key(f.name, (100, 100)))
+
+    def test_missing_file(self):
+        self.assertIsNone(pt.thumbnail_key("/nonexistent/photo.jpg", (100, 100)))
+
+
+@unittest.skipIf(pt.Image is None, "Pillow not installed")
+class TestBuildThumbnails(unittest.TestCase):
+    def test_resize_and_alpha(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rgb = os.path.join(tmp, "rgb.jpg")
+            rgba = os.path.join(tmp, "rgba.png")
+            broken = os.path.join(tmp, "broken.jpg")
+            pt.Image.new("RGB", (800, 600), (255, 0, 0)).save(rgb)
+            pt.Image.new("RGBA", (800, 600), (0, 0, 0, 0)).save(rgba)
+            Path(broken).write_bytes(b"not an image")
+
+            result = pt.build_thumbnails([rgb, rgba, broken], (100, 100), fmt="auto")
+            self.assertEqual(result[rgb][0], "image/jpeg")
+            self.assertEqual(result[rgba][0], "image/png")
+            self.assertIsNone(result[broken])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Bench-free unit tests for customize_erpnext.api.qr_png_cache.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. qr_png_cache.py only needs stdlib (+ qrcode / Pillow
+for encoding, which is skipped when they are not installed).
+"""
+
+import importlib.util
+import io
+import unittest
+from pathlib import Path
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "customize_erpnext" / "api" / "qr_png_cache.py"
+_spec = importlib.util.spec_from_file_location("qr_png_cache", _MODULE_PATH)
+qpc = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(qpc)
+
+
+class TestQrKey(unittest.TestCase):
+    def test_stable_and_parameter_sensitive(self):
+        self.assertEqual(qpc.qr_key("ITEM-001"), qpc.qr_key("ITEM-001"))
+        self.assertNotEqual(qpc.qr_key("ITEM-001"), qpc.qr_key("ITEM-002"))
+        self.assertNotEqual(qpc.qr_key("ITEM-001"), qpc.qr_key("ITEM-001", box_size=4))
+        self.assertNotEqual(qpc.qr_key("ITEM-001"), qpc.qr_key("ITEM-001", border=4))
+
+    def test_unicode_payload(self):
+        self.assertEqual(len(qpc.qr_key("Vải côttông")), 40)
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = qpc.LRUCache(maxsize=2)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")
+        cache.set("c", b"3")
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_miss_returns_none(self):
+        self.assertIsNone(qpc.LRUCache().get("missing"))
+
+
+class TestLookupAndStore(unittest.TestCase):
+    def setUp(self):
+        qpc.lru.clear()
+
+    def test_round_trip_and_dedupe(self):
+        qpc.store_many({"A": b"png-a"})
+        hits, missing = qpc.lookup_many(["A", "B", "B", "A"])
+        self.assertEqual(hits, {"A": b"png-a"})
+        self.assertEqual(missing, ["B"])
+
+
+@unittest.skipUnless(qpc.ENCODER_AVAILABLE, "qrcode / Pillow not installed")
+class TestEncode(unittest.TestCase):
+    def test_matches_qrcode_make_image(self):
+        from PIL import Image, ImageChops
+
+        data = "FAB-001-RED-S"
+        qr = qpc.qrcode.QRCode(
+            version=1,
+            error_correction=qpc.qrcode.constants.ERROR_CORRECT_Q,
+            box_size=qpc.BOX_SIZE,
+            border=qpc.BORDER,
+        )
+        qr.add_data(data)
+        qr.make(fit=True)
+        expected = qr.make_image(fill_color="black", back_color="white").get_image().convert("1")
+
+        actual = Image.open(io.BytesIO(qpc.encode_qr_png(data))).convert("1")
+        self.assertEqual(actual.size, expected.size)
+        self.assertIsNone(ImageChops.difference(actual, expected).getbbox())
+
+    def test_encode_many_dedupes(self):
+        pngs = qpc.encode_many(["A", "A", "B"])
+        self.assertEqual(set(pngs), {"A", "B"})
+        self.assertTrue(pngs["A"].startswith(b"\x89PNG"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Bench-free unit tests for the packing-list seven-segment decoder.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. seven_segment.py only needs NumPy (skipped when it is
+not installed). The real-photo corpus is exercised by the doctype's own
+test_packing_list.py and by packing_list.benchmark_scale_ocr.
+"""
+
+import importlib.util
+import unittest
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_MODULE_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "customize_erpnext" / "customize_erpnext" / "doctype" / "packing_list" / "seven_segment.py"
+)
+
+if np is not None:
+    _spec = importlib.util.spec_from_file_location("seven_segment", _MODULE_PATH)
+    ss = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(ss)
+
+H, W, T, GAP = 60, 34, 7, 12  # digit height / width, stroke, gap between digits
+
+# (y0, y1, x0, x1) of each drawn stroke, in pixels of one H x W digit
+STROKES = {
+    "a": (0, T, 0, W),
+    "b": (0, H // 2, W - T, W),
+    "c": (H // 2, H, W - T, W),
+    "d": (H - T, H, 0, W),
+    "e": (H // 2, H, 0, T),
+    "f": (0, H // 2, 0, T),
+    "g": (H // 2 - T // 2, H // 2 + T // 2 + 1, 0, W),
+}
+
+
+def render(text, segments=None):
+    """Bool strip for a digit string; '.' draws a decimal point after a digit."""
+    segments = segments or {d: forms[0] for d, forms in ss.DIGIT_SEGMENTS.items()}
+    cells = []
+    for ch in text:
+        if ch == ".":
+            dot = np.zeros((H, T + 3), dtype=bool)
+            dot[H - T:, 3:] = True
+            cells[-1] = np.hstack([cells[-1], dot])
+            continue
+        if ch == "1":
+            cell = np.zeros((H, T), dtype=bool)
+            cell[:, :] = True
+        else:
+            cell = np.zeros((H, W), dtype=bool)
+            for seg in segments[ch]:
+                y0, y1, x0, x1 = STROKES[seg]
+                cell[y0:y1, x0:x1] = True
+        cells.append(cell)
+    gap = np.zeros((H, GAP), dtype=bool)
+    parts = []
+    for cell in cells:
+        parts += [cell, gap]
+    return np.hstack(parts[:-1])
+
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class TestDecodeStrip(unittest.TestCase):
+    def test_every_digit(self):
+        for text in ("0123", "4567", "89", "1253", "11.79"):
+            with self.subTest(text=text):
+                res = ss.decode_strip(render(text))
+                self.assertIsNotNone(res)
+                self.assertEqual(res["digits"], text.replace(".", ""))
+                self.assertEqual(res["cells"], len(text.replace(".", "")))
+
+    def test_decimal_point_does_not_shift_zones(self):
+        self.assertEqual(ss.decode_strip(render("5.83"))["digits"], "583")
+
+    def test_alternative_forms(self):
+        # '7' with the f tail, '6' / '9' without their a / d segment
+        alt = {d: forms[-1] for d, forms in ss.DIGIT_SEGMENTS.items()}
+        self.assertEqual(ss.decode_strip(render("769", alt))["digits"], "769")
+
+    def test_broken_stroke_is_repaired(self):
+        strip = render("88")
+        strip[H // 2 - T // 2: H // 2 + T // 2 + 1, W // 2 - 1: W // 2 + 1] = False  # gap in g
+        res = ss.decode_strip(strip)
+        self.assertEqual(res["digits"], "88")
+        self.assertGreaterEqual(res["votes"], 2)
+
+    def test_unreadable(self):
+        self.assertIsNone(ss.decode_strip(np.zeros((H, 3 * W), dtype=bool)))
+        strip = render("8")
+        strip[T: H - T] = False  # only a + d lit: not a digit
+        strip[:, :2] = True  # keep the cell full height
+        self.assertIsNone(ss.decode_strip(strip))
+
+    def test_code_table(self):
+        self.assertEqual(ss.CODE_TABLE[0b1111111], 8)
+        self.assertEqual(ss.CODE_TABLE[0b0000111], 7)
+        self.assertEqual(ss.CODE_TABLE[0], -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Bench-free unit tests for the Stock Entry Multi Work Orders material adjustments.
+
+Run from the app root without a site:
+
+    cd apps/customize_erpnext && python -m unittest discover tests
+
+Loaded by file path for the same reason as test_vn_number_words: importing the
+package pulls in frappe. stock_entry_plan.py itself is pure stdlib.
+"""
+
+import importlib.util
+import unittest
+from pathlib import Path
+
+_MODULE_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "customize_erpnext" / "customize_erpnext" / "doctype"
+    / "stock_entry_multi_work_orders" / "stock_entry_plan.py"
+)
+_spec = importlib.util.spec_from_file_location("stock_entry_plan", _MODULE_PATH)
+sep = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sep)
+
+# Bảng materials: 18 FABRIC cho WO-1 (10) + WO-2 (5) → dư 3, cộng vào WO-2 (cuối)
+MATERIALS = [
+    {"item_code": "FABRIC", "required_qty": 18, "source_warehouse": "Store", "wip_warehouse": "WIP"},
+    {"item_code": "THREAD", "required_qty": 2, "source_warehouse": "Store", "wip_warehouse": "WIP"},
+]
+WO_1 = {"FABRIC": 10, "THREAD": 1}
+WO_2 = {"FABRIC": 5, "THREAD": 1}
+
+
+def items_of(quantities):
+    return [
+        {"s_warehouse": "Store", "t_warehouse": "WIP", "item_code": code, "qty": qty, "basic_rate": 1, "uom": "Nos"}
+        for code, qty in quantities.items()
+    ]
+
+
+def planned_stock_entry(work_order, planned, issued=None):
+    """Dòng Stock Entry của plan cuối cùng sau khi cộng phần điều chỉnh."""
+    items = items_of(work_order)
+    sep.apply_adjustments(items, sep.material_adjustments(MATERIALS, planned, issued), {})
+    return {item["item_code"]: item["qty"] for item in items}
+
+
+class TestMaterialAdjustments(unittest.TestCase):
+    def test_first_run_adds_surplus_to_last_work_order(self):
+        self.assertEqual(planned_stock_entry(WO_2, {"FABRIC": 15, "THREAD": 2}), {"FABRIC": 8, "THREAD": 1})
+
+    def test_retry_after_last_work_order_succeeded(self):
+        # WO-1 lỗi, WO-2 đã có Stock Entry mang cả phần dư (8) → retry không cộng lại
+        self.assertEqual(planned_stock_entry(WO_1, WO_1, issued={"FABRIC": 8, "THREAD": 1}), WO_1)
+
+    def test_retry_after_last_work_order_failed(self):
+        # WO-1 đã có Stock Entry (10), WO-2 lỗi → phần dư vẫn vào WO-2
+        self.assertEqual(
+            planned_stock_entry(WO_2, WO_2, issued={"FABRIC": 10, "THREAD": 1}),
+            {"FABRIC": 8, "THREAD": 1},
+        )
+
+    def test_new_item_appended_with_rate(self):
+        materials = MATERIALS + [{"item_code": "LABEL", "required_qty": 4, "source_warehouse": "Store", "wip_warehouse": "WIP"}]
+        items = items_of(WO_2)
+        adjustments = sep.material_adjustments(materials, {"FABRIC": 18, "THREAD": 2})
+        sep.apply_adjustments(items, adjustments, {"LABEL": (2.5, "Pcs")})
+        self.assertEqual(items[-1]["item_code"], "LABEL")
+        self.assertEqual((items[-1]["qty"], items[-1]["basic_rate"], items[-1]["uom"]), (4.0, 2.5, "Pcs"))
+
+    def test_missing_warehouse_is_skipped(self):
+        materials = [{"item_code": "FABRIC", "required_qty": 20, "source_warehouse": None, "wip_warehouse": "WIP"}]
+        self.assertEqual(sep.material_adjustments(materials, {"FABRIC": 15}), {})
+
+
+if __name__ == "__main__":
+    unittest.main()